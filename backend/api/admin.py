@@ -12,6 +12,12 @@ from core.config import settings
 from core.db import first
 from db.supabase_client import get_service_role_client
 from middleware.admin_audit import log_admin_action
+from workers.handlers.stage_latency_rollup import (
+    BASELINE_DAYS,
+    fetch_daily_rollups,
+    fetch_stage_latency,
+    find_regressions,
+)
 
 RejectionReasonType = Literal[
     "permanently_closed",
@@ -148,7 +154,16 @@ async def retry_job(
     # Conditional update — only succeeds if job is still in a retryable state (TOCTOU guard)
     update_response = (
         db.table("job_queue")
-        .update({"status": "pending", "attempts": 0, "last_error": None, "claimed_at": None})
+        .update(
+            {
+                "status": "pending",
+                "attempts": 0,
+                "last_error": None,
+                "claimed_at": None,
+                # A retried job must not collide with a fresh pending job for the same key
+                "dedupe_key": None,
+            }
+        )
         .eq("id", job_id)
         .in_("status", ["failed", "dead_letter"])
         .execute()
@@ -991,3 +1006,28 @@ async def get_pipeline_spend_history(
     ]
 
     return SpendHistoryResponse(history=history)
+
+
+@router.get("/stage-latency")
+async def get_stage_latency(
+    days: int = Query(default=14, ge=1, le=90),
+    hours: int = Query(default=24, ge=1, le=168),
+    user: dict[str, Any] = Depends(require_admin),  # noqa: B008
+) -> dict[str, Any]:
+    """Per-stage p50/p95/p99 from step_timings: a rolling window, daily rollups, and any
+    stage whose rolling p95 is at least double its recent daily baseline."""
+    del user
+    db = get_service_role_client()
+    now = datetime.now(UTC)
+    rolling = fetch_stage_latency(db, now - timedelta(hours=hours), now)
+    daily = fetch_daily_rollups(
+        db, now.date() - timedelta(days=days), now.date() + timedelta(days=1)
+    )
+    baseline_since = (now.date() - timedelta(days=BASELINE_DAYS)).isoformat()
+    baseline = [row for row in daily if str(row["day"]) >= baseline_since]
+    return {
+        "window_hours": hours,
+        "rolling": sorted(rolling, key=lambda r: (r["job_type"], r["step"])),
+        "daily": daily,
+        "regressions": find_regressions(rolling, baseline),
+    }
@@ -7,12 +7,13 @@ from postgrest.exceptions import APIError
 from pydantic import BaseModel
 
 from api.admin import RejectionReasonType
-from api.deps import require_admin
+from api.deps import get_embeddings, require_admin
 from core.db import escape_ilike, first
 from db.supabase_client import get_service_role_client
 from middleware.admin_audit import log_admin_action
 from models.types import JobStatus, JobType, ProcessingStatus
-from providers.embeddings import EmbeddingsProvider, get_embeddings_provider
+from providers.embeddings.interface import EmbeddingsProvider
+from workers.handlers.scrape_batch import shard_scrape_payloads
 from workers.queue import JobQueue
 
 router = APIRouter(prefix="/admin/shops", tags=["admin"])
@@ -40,6 +41,8 @@ class UpdateShopRequest(BaseModel):
 
 class EnqueueRequest(BaseModel):
     job_type: JobType
+    # Ask the model again instead of replaying a cached result for identical inputs
+    bypass_llm_cache: bool = False
 
 
 class BulkApproveRequest(BaseModel):
@@ -365,10 +368,8 @@ async def bulk_approve(
 
     queued = 0
     if batch_shops:
-        await queue.enqueue(
-            job_type=JobType.SCRAPE_BATCH,
-            payload={"batch_id": batch_id, "shops": batch_shops},
-            priority=5,
+        await queue.enqueue_batch(
+            JobType.SCRAPE_BATCH, shard_scrape_payloads(batch_id, batch_shops), priority=5
         )
         queued = len(batch_shops)
 
@@ -586,6 +587,8 @@ async def enqueue_job(
             "batch_id": batch_id,
             "shops": [{"shop_id": str(shop_id), "google_maps_url": url}],
         }
+    if body.bypass_llm_cache:
+        payload["bypass_llm_cache"] = True
 
     queue = JobQueue(db=db)
     job_id = await queue.enqueue(
@@ -608,7 +611,7 @@ async def search_rank(
     shop_id: str,
     query: str = Query(..., min_length=1),
     user: dict[str, Any] = Depends(require_admin),  # noqa: B008
-    embeddings: EmbeddingsProvider = Depends(get_embeddings_provider),  # noqa: B008
+    embeddings: EmbeddingsProvider = Depends(get_embeddings),  # noqa: B008
 ) -> dict[str, Any]:
     """Run a search query and return where this shop ranks in results."""
     query_embedding = await embeddings.embed(query)
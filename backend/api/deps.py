@@ -10,6 +10,8 @@ from supabase_auth.errors import AuthApiError
 from core.config import settings
 from db.supabase_client import get_service_role_client, get_user_client
 from providers.email import get_email_provider
+from providers.embeddings.interface import EmbeddingsProvider
+from providers.registry import ProviderRegistry, get_provider_registry
 from services.claims_service import ClaimsService
 
 logger = structlog.get_logger()
@@ -33,6 +35,16 @@ def _get_bearer_token(request: Request) -> str:
     return auth_header.removeprefix("Bearer ")
 
 
+def get_embeddings(
+    providers: ProviderRegistry = Depends(get_provider_registry),  # noqa: B008
+) -> EmbeddingsProvider:
+    """The process-wide embeddings adapter, which keeps its HTTP connections between requests.
+
+    Raises EmbeddingsProviderUnavailableError when the provider is not configured.
+    """
+    return providers.embeddings()
+
+
 def get_admin_db() -> Client:
     """Return a service-role Supabase client (bypasses RLS).
     Use only for admin operations that require elevated privileges."""
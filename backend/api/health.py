@@ -1,10 +1,12 @@
-from typing import Any
+from typing import Any, Literal
 
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import PlainTextResponse
 
 from api.deps import require_admin
 from middleware.rate_limit import limiter
-from workers.scheduler import get_scheduler_status
+from workers.metrics import render_prometheus
+from workers.scheduler import get_queue_metrics, get_scheduler_status
 
 router = APIRouter()
 
@@ -20,6 +22,23 @@ async def scheduler_health(
     return get_scheduler_status(request.app.state.scheduler)
 
 
+@limiter.exempt  # type: ignore[untyped-decorator]
+@router.get("/health/queue", response_model=None)
+async def queue_health(
+    output: Literal["json", "prometheus"] = Query(default="json", alias="format"),
+    _: dict[str, Any] = Depends(require_admin),  # noqa: B008
+) -> dict[str, Any] | PlainTextResponse:
+    """Job queue metrics — per-type depth, wait/run percentiles, in-flight vs limit, backoff.
+    Figures are summed over every worker's recently published snapshot. Admin-only."""
+    metrics = await get_queue_metrics()
+    if output == "prometheus":
+        return PlainTextResponse(
+            render_prometheus(metrics["job_types"], metrics["workers"]),
+            media_type="text/plain; version=0.0.4",
+        )
+    return metrics
+
+
 @limiter.exempt  # type: ignore[untyped-decorator]
 @router.get("/health/sentry-debug")
 async def sentry_debug(
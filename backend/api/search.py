@@ -12,7 +12,9 @@ from core.config import settings
 from middleware.rate_limit import get_user_id_or_ip, limiter
 from models.types import SearchQuery
 from providers.cache import get_search_cache_provider
-from providers.embeddings import EmbeddingsProviderUnavailableError, get_embeddings_provider
+from providers.embeddings import EmbeddingsProviderUnavailableError
+from providers.embeddings.interface import EmbeddingsProvider
+from providers.registry import ProviderRegistry, get_provider_registry
 from services.query_classifier import classify
 from services.search_service import SearchService, SuggestResponse
 
@@ -45,6 +47,20 @@ def _log_search_event(
         logger.warning("search_event insert failed", query_type=query_type, exc_info=True)
 
 
+def get_search_embeddings(
+    providers: ProviderRegistry = Depends(get_provider_registry),  # noqa: B008
+) -> EmbeddingsProvider:
+    """The pooled embeddings adapter; a 503 instead of a 500 when it is not configured."""
+    try:
+        return providers.embeddings()
+    except EmbeddingsProviderUnavailableError as exc:
+        logger.error("Embeddings provider unavailable", error=str(exc))
+        raise HTTPException(
+            status_code=503,
+            detail="Search is temporarily unavailable. The embeddings provider is not configured.",
+        ) from exc
+
+
 @limiter.limit(settings.rate_limit_search, key_func=get_user_id_or_ip)
 @router.get("/search")
 async def search(
@@ -56,20 +72,12 @@ async def search(
     user: dict[str, Any] | None = Depends(get_optional_user),  # noqa: B008
     db: Client = Depends(get_optional_user_db),  # noqa: B008
     admin_db: Client = Depends(get_admin_db),  # noqa: B008
+    embeddings: EmbeddingsProvider = Depends(get_search_embeddings),  # noqa: B008
 ) -> dict[str, Any]:
     """Semantic search with optional mode filter.
 
     Auth optional; unauthenticated users can search.
     """
-    try:
-        embeddings = get_embeddings_provider()
-    except EmbeddingsProviderUnavailableError as exc:
-        logger.error("Embeddings provider unavailable", error=str(exc))
-        raise HTTPException(
-            status_code=503,
-            detail="Search is temporarily unavailable. The embeddings provider is not configured.",
-        ) from exc
-
     cache = get_search_cache_provider(admin_db)
     service = SearchService(db=db, embeddings=embeddings, cache=cache)
     query = SearchQuery(text=text, limit=limit)
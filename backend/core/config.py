@@ -17,12 +17,63 @@ class Settings(BaseSettings):
     openai_llm_model: str = "gpt-5.4"
     openai_llm_classify_model: str = "gpt-5.4-mini"
     openai_llm_nano_model: str = "gpt-5.4-nano"
+    # Combined enrichment: classify_shop also returns tarot_title / flavor_text, saving the
+    # separate assign_tarot call per shop. Gate on scripts/eval_tarot_combined.py first.
+    llm_enrich_with_tarot: bool = False
+    # Bulk runs of at least llm_batch_min_requests shops go through the provider batch APIs
+    # (half price, results within 24h) and are collected by LLM_BATCH_POLL jobs. Shops still
+    # unfinished after llm_batch_max_wait_seconds fall back to interactive jobs.
+    llm_batch_enabled: bool = True
+    llm_batch_min_requests: int = 20
+    llm_batch_poll_interval_seconds: int = 600
+    llm_batch_max_wait_seconds: int = 26 * 60 * 60
+    # Content-addressed cache of enrich/tarot/summary/menu results (llm_result_cache table
+    # behind a per-process LRU); a job payload with bypass_llm_cache=true skips the reads.
+    llm_cache_enabled: bool = True
+    llm_cache_ttl_seconds: int = 30 * 24 * 60 * 60
+    llm_cache_memory_entries: int = 512
+    # Review packing for enrich/summarize prompts (providers/llm/_packing.py): near-duplicate
+    # reviews are dropped, long ones truncated, and the rest kept within a per-method budget
+    llm_pack_enabled: bool = True
+    llm_pack_budget_tokens: dict[str, int] = {"enrich_shop": 6000, "summarize_reviews": 4000}
+    llm_pack_max_review_tokens: int = 600
+    llm_pack_duplicate_threshold: float = 0.7
+    # Shops with a community summary get it revised with only the texts written since;
+    # after this many texts have been folded in that way the summary is rebuilt from all texts
+    summarize_incremental_enabled: bool = True
+    summarize_rebuild_after_texts: int = 40
+    # Hybrid routing (providers/llm/hybrid_adapter.py): a call past its deadline raises
+    # TimeoutError. With hedging on, a call still running after its p95 budget is duplicated
+    # to the other provider and the first valid result wins. enrich_shop is not hedged by
+    # default: OpenAI enrichment is below the Sonnet quality gate.
+    llm_deadline_seconds: dict[str, float] = {
+        "enrich_shop": 120.0,
+        "summarize_reviews": 60.0,
+        "extract_menu_data": 90.0,
+        "classify_photo": 20.0,
+        "classify_photos": 60.0,
+        "assign_tarot": 45.0,
+    }
+    llm_hedge_enabled: bool = False
+    llm_hedge_after_seconds: dict[str, float] = {
+        "summarize_reviews": 20.0,
+        "extract_menu_data": 30.0,
+        "classify_photo": 6.0,
+        "classify_photos": 20.0,
+        "assign_tarot": 15.0,
+    }
 
     # Embeddings
     embeddings_provider: str = "openai"
     openai_api_key: str = ""
     openai_embedding_model: str = "text-embedding-3-small"
 
+    # Pooled HTTP client per provider vendor, shared by every adapter in the process
+    # (providers/registry.py)
+    provider_http_max_connections: int = 100
+    provider_http_max_keepalive_connections: int = 20
+    provider_http_keepalive_expiry_seconds: float = 30.0
+
     # Email
     email_provider: str = "resend"
     resend_api_key: str = ""
@@ -67,10 +118,60 @@ class Settings(BaseSettings):
     worker_concurrency_enrich: int = 3
     worker_concurrency_embed: int = 20
     worker_concurrency_publish: int = 20
-    worker_concurrency_scrape: int = 1
+    worker_concurrency_scrape: int = 4
     worker_concurrency_default: int = 1
+    worker_concurrency_pipeline: int = 3
+    # Batch scrapes are split into SCRAPE_BATCH jobs of at most this many shops, so shards
+    # run as concurrent Apify actor runs (capped by WORKER_CONCURRENCY_SCRAPE)
+    worker_scrape_shard_size: int = 20
+    # Run user submissions through every stage inside one SHOP_PIPELINE job
+    worker_pipeline_fast_path: bool = True
+    # Adaptive concurrency shared by job types that call the same "<provider>:<model>".
+    # Requests-per-minute keys look like "anthropic:claude-sonnet-4-6"; unset = no bucket.
+    worker_provider_initial_concurrency: int = 4
+    worker_provider_min_concurrency: int = 1
+    worker_provider_max_concurrency: int = 32
+    worker_provider_requests_per_minute: dict[str, int] = {}
+    # Fan-out inside one job: LLM calls in flight per "<provider>:<model>" in this process,
+    # per shop for photo classification (each request labels up to N thumbnails), and per
+    # shop for menu photo extraction
+    worker_provider_call_concurrency: int = 16
+    worker_classify_photo_concurrency: int = 4
+    worker_classify_photos_per_request: int = 5
+    worker_menu_extract_concurrency: int = 3
+    # Standalone worker (`python -m workers`). Concurrency limits above apply per process.
+    # Set WORKER_SCHEDULER_IN_API=false when the dedicated worker service is deployed.
+    worker_scheduler_in_api: bool = True
+    worker_processes: int = 2
+    # Leader election: only the lease holder runs cron triggers and the reclaim loop
+    worker_leader_lease_seconds: int = 60
+    worker_leader_renew_seconds: int = 20
+    # On shutdown, in-flight jobs get this long to finish before being released to pending
+    worker_shutdown_grace_seconds: int = 25
+    # Every scheduler publishes its job metrics this often; /health/queue ignores snapshots
+    # older than the stale window (a stopped or crashed process drops out of the totals)
+    worker_metrics_publish_seconds: int = 15
+    worker_metrics_stale_seconds: int = 60
+    # Follow-up jobs that many stages request for the same shop (embedding, menu highlights)
+    # wait this long and absorb repeat requests; see JobQueue.enqueue(debounce_seconds=...).
+    worker_enqueue_debounce_seconds: int = 30
+    # Claim order: effective priority = priority + 1 per N seconds runnable (capped), and a
+    # share of each claim reserved for jobs carrying submission_id (see claim_jobs_fair)
+    worker_priority_aging_seconds: int = 300
+    worker_priority_aging_max: int = 5
+    worker_submission_claim_share: float = 0.5
+    # Relative weight of each job type in the claim order (default 1): a type with weight w
+    # is served first w times as often, which decides who fills a shared provider limit
+    worker_claim_weights: dict[str, float] = {
+        "shop_pipeline": 4.0,
+        "classify_shop_photos": 2.0,
+        "enrich_shop": 2.0,
+    }
     # Stuck job reaper
     worker_stuck_job_timeout_minutes: int = 10
+    # Terminal jobs (and their job_logs) older than this move to the *_archive tables
+    worker_job_retention_days: int = 14
+    worker_failed_job_retention_days: int = 30
 
     # Search cache
     search_cache_provider: str = "supabase"
@@ -37,7 +37,9 @@ from db.supabase_client import get_service_role_client
 from middleware.bot_detection import BotDetectionMiddleware
 from middleware.rate_limit import limiter
 from middleware.request_id import RequestIDMiddleware
-from workers.scheduler import create_scheduler
+from providers.registry import close_provider_registry
+from workers.leader import release_leadership
+from workers.scheduler import create_scheduler, drain_jobs
 
 logger = structlog.get_logger()
 
@@ -80,7 +82,10 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     _init_sentry()
     logger.info("Starting CafeRoam API", environment=settings.environment)
     app.state.scheduler = scheduler
-    if settings.environment != "test":
+    run_scheduler = settings.environment != "test" and settings.worker_scheduler_in_api
+    if not settings.worker_scheduler_in_api:
+        logger.info("In-API scheduler disabled — jobs run in the standalone worker")
+    if run_scheduler:
         scheduler.start()
         logger.info("Scheduler started")
         for job in scheduler.get_jobs():
@@ -91,8 +96,11 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
             )
         logger.info("Scheduler ready", total_jobs=len(scheduler.get_jobs()))
     yield
-    if settings.environment != "test":
+    if run_scheduler:
+        await drain_jobs()
         scheduler.shutdown()
+        await release_leadership()
+    await close_provider_registry()
     logger.info("Shutting down CafeRoam API")
 
 
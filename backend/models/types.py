@@ -437,6 +437,11 @@ class ShopEnrichmentInput(BaseModel):
 # --- Provider result types ---
 
 
+class TarotEnrichmentResult(BaseModel):
+    tarot_title: str | None = None
+    flavor_text: str = ""
+
+
 class EnrichmentResult(BaseModel):
     tags: list[TaxonomyTag]
     tag_confidences: dict[str, float] = {}
@@ -446,6 +451,8 @@ class EnrichmentResult(BaseModel):
     menu_highlights: list[str] = []
     coffee_origins: list[str] = []
     menu_items: list[dict[str, Any]] = []
+    # Set only by combined enrichment (classify_shop with tarot fields)
+    tarot: TarotEnrichmentResult | None = None
 
 
 class MenuExtractionResult(BaseModel):
@@ -453,11 +460,6 @@ class MenuExtractionResult(BaseModel):
     raw_text: str | None = None
 
 
-class TarotEnrichmentResult(BaseModel):
-    tarot_title: str | None = None
-    flavor_text: str = ""
-
-
 class ReviewTopic(BaseModel):
     topic: str
     count: int
@@ -515,6 +517,8 @@ class JobType(StrEnum):
     CLASSIFY_SHOP_PHOTOS = "classify_shop_photos"
     SUMMARIZE_REVIEWS = "summarize_reviews"
     SHOP_DATA_REPORT = "shop_data_report"
+    SHOP_PIPELINE = "shop_pipeline"
+    LLM_BATCH_POLL = "llm_batch_poll"
 
 
 class JobStatus(StrEnum):
@@ -553,6 +557,7 @@ class Job(BaseModel):
     cancel_reason: str | None = None
     cancelled_at: datetime | None = None
     failed_at: datetime | None = None
+    dedupe_key: str | None = None
 
 
 # --- Pipeline types ---
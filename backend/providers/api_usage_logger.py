@@ -1,9 +1,37 @@
 import logging
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 
 from db.supabase_client import get_service_role_client
 
 logger = logging.getLogger(__name__)
 
+_task_suffix: ContextVar[str] = ContextVar("api_usage_task_suffix", default="")
+
+
+@contextmanager
+def usage_task_suffix(suffix: str) -> Iterator[None]:
+    """Log every call made inside the block as task + suffix, e.g. enrich_shop_hedge."""
+    token = _task_suffix.set(suffix)
+    try:
+        yield
+    finally:
+        _task_suffix.reset(token)
+
+
+def cache_hit_ratio(
+    tokens_input: int | None, tokens_cache_write: int | None, tokens_cache_read: int | None
+) -> float | None:
+    """Share of prompt tokens served from the provider's prompt cache; None without tokens.
+
+    tokens_input counts uncached prompt tokens only (Anthropic's input_tokens convention).
+    """
+    total = (tokens_input or 0) + (tokens_cache_write or 0) + (tokens_cache_read or 0)
+    if total == 0:
+        return None
+    return round((tokens_cache_read or 0) / total, 4)
+
 
 def log_api_usage(
     *,
@@ -23,12 +51,15 @@ def log_api_usage(
         db.table("api_usage_log").insert(
             {
                 "provider": provider,
-                "task": task,
+                "task": f"{task}{_task_suffix.get()}",
                 "model": model,
                 "tokens_input": tokens_input,
                 "tokens_output": tokens_output,
                 "tokens_cache_write": tokens_cache_write,
                 "tokens_cache_read": tokens_cache_read,
+                "cache_hit_ratio": cache_hit_ratio(
+                    tokens_input, tokens_cache_write, tokens_cache_read
+                ),
                 "compute_units": compute_units,
                 "cost_usd": cost_usd,
             }
@@ -1,12 +1,19 @@
+from typing import TYPE_CHECKING
+
 from core.config import settings
 from providers.embeddings.interface import EmbeddingsProvider
 
+if TYPE_CHECKING:
+    from openai import DefaultAsyncHttpxClient
+
 
 class EmbeddingsProviderUnavailableError(Exception):
     """Raised when the embeddings provider cannot be initialized (e.g. missing API key)."""
 
 
-def get_embeddings_provider() -> EmbeddingsProvider:
+def get_embeddings_provider(
+    http_client: "DefaultAsyncHttpxClient | None" = None,
+) -> EmbeddingsProvider:
     match settings.embeddings_provider:
         case "openai":
             if not settings.openai_api_key:
@@ -18,6 +25,7 @@ def get_embeddings_provider() -> EmbeddingsProvider:
             return OpenAIEmbeddingsAdapter(
                 api_key=settings.openai_api_key,
                 model=settings.openai_embedding_model,
+                http_client=http_client,
             )
         case _:
             raise ValueError(f"Unknown embeddings provider: {settings.embeddings_provider}")
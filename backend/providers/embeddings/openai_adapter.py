@@ -1,12 +1,17 @@
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 
 from providers.api_usage_logger import log_api_usage
 from providers.cost import compute_llm_cost
 
 
 class OpenAIEmbeddingsAdapter:
-    def __init__(self, api_key: str, model: str = "text-embedding-3-small"):
-        self._client = AsyncOpenAI(api_key=api_key)
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "text-embedding-3-small",
+        http_client: DefaultAsyncHttpxClient | None = None,
+    ):
+        self._client = AsyncOpenAI(api_key=api_key, http_client=http_client)
         self._model = model
         self._dimensions = 1536
 
@@ -1,9 +1,84 @@
+from typing import TYPE_CHECKING, cast
+
 from core.config import settings
 from models.types import TaxonomyTag
-from providers.llm.interface import LLMProvider
+from providers.llm._packing import PromptPacker
+from providers.llm.interface import LLMBatchProvider, LLMProvider
+
+if TYPE_CHECKING:
+    from anthropic import DefaultAsyncHttpxClient as AnthropicHttpClient
+    from openai import DefaultAsyncHttpxClient as OpenAIHttpClient
+
+
+def get_llm_provider(
+    taxonomy: list[TaxonomyTag] | None = None,
+    *,
+    anthropic_http_client: "AnthropicHttpClient | None" = None,
+    openai_http_client: "OpenAIHttpClient | None" = None,
+) -> LLMProvider:
+    """Adapter for settings.llm_provider, behind the LLM result cache when llm_cache_enabled.
+
+    The http clients are pooled clients for the vendor SDKs; without them each SDK client
+    opens its own connection pool (see providers/registry.py).
+    """
+    llm = _build_llm_provider(taxonomy, anthropic_http_client, openai_http_client)
+    if not settings.llm_cache_enabled:
+        return llm
+
+    from providers.llm.cached_adapter import CachedLLMAdapter
+
+    return CachedLLMAdapter(
+        llm,
+        model=_cache_model_id(),
+        taxonomy=taxonomy,
+        ttl_seconds=settings.llm_cache_ttl_seconds,
+        memory_entries=settings.llm_cache_memory_entries,
+    )
+
+
+def _cache_model_id() -> str:
+    """Every model the configured provider may route to; changing any of them misses the cache.
+
+    Combined enrichment uses a different enrich_shop prompt, and the prompt packer config
+    decides which review text reaches the prompt, so both are part of the id too.
+    """
+    anthropic = f"{settings.anthropic_model},{settings.anthropic_classify_model}"
+    openai = (
+        f"{settings.openai_llm_model},{settings.openai_llm_classify_model},"
+        f"{settings.openai_llm_nano_model}"
+    )
+    mode = "+tarot" if settings.llm_enrich_with_tarot else ""
+    if settings.llm_pack_enabled:
+        budgets = ",".join(f"{k}={v}" for k, v in sorted(settings.llm_pack_budget_tokens.items()))
+        mode += (
+            f"+pack:{budgets};{settings.llm_pack_max_review_tokens};"
+            f"{settings.llm_pack_duplicate_threshold}"
+        )
+    match settings.llm_provider:
+        case "anthropic":
+            return f"anthropic:{anthropic}{mode}"
+        case "openai":
+            return f"openai:{openai}{mode}"
+        case _:
+            return f"{settings.llm_provider}:{anthropic};{openai}{mode}"
+
 
+def _build_prompt_packer() -> PromptPacker | None:
+    if not settings.llm_pack_enabled:
+        return None
+    return PromptPacker(
+        budgets=settings.llm_pack_budget_tokens,
+        max_text_tokens=settings.llm_pack_max_review_tokens,
+        duplicate_threshold=settings.llm_pack_duplicate_threshold,
+    )
 
-def get_llm_provider(taxonomy: list[TaxonomyTag] | None = None) -> LLMProvider:
+
+def _build_llm_provider(
+    taxonomy: list[TaxonomyTag] | None,
+    anthropic_http_client: "AnthropicHttpClient | None",
+    openai_http_client: "OpenAIHttpClient | None",
+) -> LLMProvider:
+    packer = _build_prompt_packer()
     match settings.llm_provider:
         case "anthropic":
             from providers.llm.anthropic_adapter import AnthropicLLMAdapter
@@ -13,6 +88,9 @@ def get_llm_provider(taxonomy: list[TaxonomyTag] | None = None) -> LLMProvider:
                 model=settings.anthropic_model,
                 classify_model=settings.anthropic_classify_model,
                 taxonomy=taxonomy or [],
+                enrich_with_tarot=settings.llm_enrich_with_tarot,
+                prompt_packer=packer,
+                http_client=anthropic_http_client,
             )
         case "openai":
             from providers.llm.openai_adapter import OpenAILLMAdapter
@@ -23,6 +101,9 @@ def get_llm_provider(taxonomy: list[TaxonomyTag] | None = None) -> LLMProvider:
                 classify_model=settings.openai_llm_classify_model,
                 nano_model=settings.openai_llm_nano_model,
                 taxonomy=taxonomy or [],
+                enrich_with_tarot=settings.llm_enrich_with_tarot,
+                prompt_packer=packer,
+                http_client=openai_http_client,
             )
         case "hybrid":
             from providers.llm.anthropic_adapter import AnthropicLLMAdapter
@@ -35,6 +116,9 @@ def get_llm_provider(taxonomy: list[TaxonomyTag] | None = None) -> LLMProvider:
                     model=settings.anthropic_model,
                     classify_model=settings.anthropic_classify_model,
                     taxonomy=taxonomy or [],
+                    enrich_with_tarot=settings.llm_enrich_with_tarot,
+                    prompt_packer=packer,
+                    http_client=anthropic_http_client,
                 ),
                 openai=OpenAILLMAdapter(
                     api_key=settings.openai_api_key,
@@ -42,7 +126,29 @@ def get_llm_provider(taxonomy: list[TaxonomyTag] | None = None) -> LLMProvider:
                     classify_model=settings.openai_llm_classify_model,
                     nano_model=settings.openai_llm_nano_model,
                     taxonomy=taxonomy or [],
+                    enrich_with_tarot=settings.llm_enrich_with_tarot,
+                    prompt_packer=packer,
+                    http_client=openai_http_client,
+                ),
+                deadline_seconds=settings.llm_deadline_seconds,
+                hedge_after_seconds=(
+                    settings.llm_hedge_after_seconds if settings.llm_hedge_enabled else None
                 ),
             )
         case _:
             raise ValueError(f"Unknown LLM provider: {settings.llm_provider}")
+
+
+def get_llm_batch_provider(
+    taxonomy: list[TaxonomyTag] | None = None,
+    *,
+    anthropic_http_client: "AnthropicHttpClient | None" = None,
+    openai_http_client: "OpenAIHttpClient | None" = None,
+) -> LLMBatchProvider:
+    """Batch-capable adapter for settings.llm_provider; every adapter implements both protocols.
+
+    Batch results are not cached: the uncached adapter is returned.
+    """
+    return cast(
+        "LLMBatchProvider", _build_llm_provider(taxonomy, anthropic_http_client, openai_http_client)
+    )
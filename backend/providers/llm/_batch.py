@@ -0,0 +1,19 @@
+"""Shared helpers for the provider batch implementations (see LLMBatchProvider)."""
+
+from providers.llm.interface import BatchMethod
+
+# Provider-side custom ids carry the method so results (including errored ones, which have
+# no tool call to inspect) can be parsed without a side table. "-" never appears in a
+# method name, and Anthropic allows [a-zA-Z0-9_-]{1,64}: enough for a method + UUID.
+_SEPARATOR = "-"
+
+
+def encode_custom_id(method: BatchMethod, custom_id: str) -> str:
+    return f"{method}{_SEPARATOR}{custom_id}"
+
+
+def decode_custom_id(provider_custom_id: str) -> tuple[BatchMethod, str]:
+    method, _, custom_id = provider_custom_id.partition(_SEPARATOR)
+    if method not in ("enrich_shop", "summarize_reviews", "assign_tarot"):
+        raise ValueError(f"Unknown batch method in custom_id: {provider_custom_id!r}")
+    return method, custom_id  # type: ignore[return-value]
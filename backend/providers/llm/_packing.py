@@ -0,0 +1,190 @@
+"""Review packing for LLM prompts, shared by the Anthropic and OpenAI adapters.
+
+Scraped Google reviews are often near-duplicates ("很好喝！" five times over) or run to
+thousands of characters. PromptPacker turns the review texts of one prompt into the subset
+worth sending:
+
+1. Near-duplicates are dropped: Jaccard similarity over shingles, which are bigrams of
+   CJK characters and lowercase Latin words, so "安靜好工作" and "很安靜，好工作" match.
+2. Texts longer than max_text_tokens are cut at a sentence or word boundary.
+3. If the rest is still over the method's token budget, texts are picked greedily by how
+   many shingles they add that earlier picks have not covered. Picked texts keep their
+   input order.
+
+Groups are packed in priority order against one shared budget (summaries pass check-in
+notes before Google reviews). Token counts are estimates: one token per CJK character and
+one per four other characters, which over-counts English slightly for both providers.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Literal
+
+import structlog
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from models.types import ShopEnrichmentInput
+
+logger = structlog.get_logger()
+
+PackedMethod = Literal["enrich_shop", "summarize_reviews"]
+
+_CJK_CHARS = r"\u3040-\u30FF\u3400-\u4DBF\u4E00-\u9FFF\uF900-\uFAFF"
+_UNIT_RE = re.compile(rf"[{_CJK_CHARS}]|[a-z0-9]+")
+_CJK_RE = re.compile(rf"[{_CJK_CHARS}]")
+# Preferred cut points when truncating: sentence ends first, then clause breaks and spaces
+_BREAK_CHARS = "。！？!?.\n；;，,、 "
+_ELLIPSIS = "…"
+
+
+def estimate_tokens(text: str) -> int:
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+def shingles(text: str) -> frozenset[str]:
+    """Bigrams of CJK characters and Latin words; a single unit when there is only one."""
+    units = _UNIT_RE.findall(unicodedata.normalize("NFKC", text).lower())
+    if len(units) < 2:
+        return frozenset(units)
+    return frozenset(f"{a} {b}" for a, b in zip(units, units[1:], strict=False))
+
+
+def jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to about max_tokens, at the last break in its final fifth if there is one."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    budget = float(max_tokens)
+    end = 0
+    for char in text:
+        budget -= 1.0 if _CJK_RE.match(char) else 0.25
+        if budget < 0:
+            break
+        end += 1
+    floor = end * 4 // 5
+    cut = max(text.rfind(c, floor, end) for c in _BREAK_CHARS)
+    if cut > 0:
+        end = cut + 1
+    return text[:end].rstrip() + _ELLIPSIS
+
+
+@dataclass
+class PackResult:
+    groups: list[list[str]]
+    tokens_before: int = 0
+    tokens_after: int = 0
+    duplicates: int = 0
+    truncated: int = 0
+    dropped: int = 0  # not picked to fit the budget
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+class PromptPacker:
+    def __init__(
+        self,
+        *,
+        budgets: dict[str, int],
+        max_text_tokens: int,
+        duplicate_threshold: float,
+    ) -> None:
+        self._budgets = budgets
+        self._max_text_tokens = max_text_tokens
+        self._duplicate_threshold = duplicate_threshold
+
+    def pack(self, method: PackedMethod, *groups: Sequence[str]) -> PackResult:
+        """Pack each group of texts in turn; unknown methods only dedupe and truncate."""
+        result = PackResult(groups=[])
+        budget = self._budgets.get(method)
+        seen: list[frozenset[str]] = []
+        covered: set[str] = set()
+        for texts in groups:
+            candidates = self._dedupe_and_truncate(texts, seen, result)
+            if budget is not None:
+                candidates = _select(candidates, budget - result.tokens_after, covered, result)
+            result.groups.append([text for text, _, _ in candidates])
+            result.tokens_after += sum(tokens for _, tokens, _ in candidates)
+            for _, _, grams in candidates:
+                covered |= grams
+
+        if result.tokens_saved > 0:
+            logger.info(
+                "Prompt packed",
+                method=method,
+                tokens_before=result.tokens_before,
+                tokens_after=result.tokens_after,
+                tokens_saved=result.tokens_saved,
+                duplicates=result.duplicates,
+                truncated=result.truncated,
+                dropped=result.dropped,
+            )
+        return result
+
+    def pack_shop(self, shop: ShopEnrichmentInput) -> ShopEnrichmentInput:
+        """The enrichment input with its reviews packed for an enrich_shop prompt."""
+        if not shop.reviews:
+            return shop
+        reviews = self.pack("enrich_shop", shop.reviews).groups[0]
+        return shop.model_copy(update={"reviews": reviews})
+
+    def _dedupe_and_truncate(
+        self, texts: Sequence[str], seen: list[frozenset[str]], result: PackResult
+    ) -> list[tuple[str, int, frozenset[str]]]:
+        kept: list[tuple[str, int, frozenset[str]]] = []
+        for text in texts:
+            result.tokens_before += estimate_tokens(text)
+            grams = shingles(text)
+            if any(jaccard(grams, other) >= self._duplicate_threshold for other in seen):
+                result.duplicates += 1
+                continue
+            seen.append(grams)
+            short = truncate_to_tokens(text, self._max_text_tokens)
+            if short != text:
+                result.truncated += 1
+                grams = shingles(short)
+            kept.append((short, estimate_tokens(short), grams))
+        return kept
+
+
+def _select(
+    candidates: list[tuple[str, int, frozenset[str]]],
+    budget: int,
+    covered: set[str],
+    result: PackResult,
+) -> list[tuple[str, int, frozenset[str]]]:
+    """Greedy max-coverage within budget; everything is kept when it already fits."""
+    if sum(tokens for _, tokens, _ in candidates) <= budget:
+        return candidates
+    covered = set(covered)
+    remaining = dict(enumerate(candidates))
+    picked: list[int] = []
+    while remaining:
+        fitting = [(i, c) for i, c in remaining.items() if c[1] <= budget]
+        if not fitting:
+            break
+        # Ties go to the earlier text, which callers rank higher
+        index, (_, tokens, grams) = max(
+            fitting, key=lambda item: (len(item[1][2] - covered), -item[0])
+        )
+        if not grams - covered and picked:
+            break
+        picked.append(index)
+        budget -= tokens
+        covered |= grams
+        del remaining[index]
+    result.dropped += len(candidates) - len(picked)
+    return [candidates[i] for i in sorted(picked)]
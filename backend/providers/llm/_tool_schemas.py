@@ -121,48 +121,89 @@ EXTRACT_MENU_SCHEMA: dict[str, Any] = {
     },
 }
 
+_TAROT_PROPERTIES: dict[str, Any] = {
+    "tarot_title": {
+        "type": "string",
+        "enum": list(TAROT_TITLES),
+        "description": "The tarot archetype title that best fits this shop",
+    },
+    "flavor_text": {
+        "type": "string",
+        "description": (
+            "One evocative sentence in the style of a tarot reading. Max 80 characters."
+        ),
+    },
+}
+
 ASSIGN_TAROT_SCHEMA: dict[str, Any] = {
     "name": "assign_tarot",
     "description": "Assign a mystical tarot archetype title and flavor text to a coffee shop",
     "input_schema": {
         "type": "object",
-        "properties": {
-            "tarot_title": {
-                "type": "string",
-                "enum": list(TAROT_TITLES),
-                "description": "The tarot archetype title that best fits this shop",
-            },
-            "flavor_text": {
-                "type": "string",
-                "description": (
-                    "One evocative sentence in the style of a tarot reading. Max 80 characters."
-                ),
-            },
-        },
+        "properties": _TAROT_PROPERTIES,
         "required": ["tarot_title", "flavor_text"],
     },
 }
 
+# Combined enrichment: classify_shop also returns the tarot fields, so one call per shop
+# replaces enrich_shop + assign_tarot (which resends the same reviews).
+CLASSIFY_SHOP_WITH_TAROT_SCHEMA: dict[str, Any] = {
+    **CLASSIFY_SHOP_SCHEMA,
+    "input_schema": {
+        **CLASSIFY_SHOP_SCHEMA["input_schema"],
+        "properties": {**CLASSIFY_SHOP_SCHEMA["input_schema"]["properties"], **_TAROT_PROPERTIES},
+        "required": [*CLASSIFY_SHOP_SCHEMA["input_schema"]["required"], *_TAROT_PROPERTIES],
+    },
+}
+
+_PHOTO_CATEGORY_PROPERTY: dict[str, Any] = {
+    "type": "string",
+    "enum": ["MENU", "VIBE", "SKIP"],
+    "description": (
+        "MENU: photo contains readable menu board, price list, or drink list text. "
+        "VIBE: photo shows shop ambience, interior, exterior, or food/drinks. "
+        "SKIP: photo is blurry, irrelevant, or primarily shows people."
+    ),
+}
+
 CLASSIFY_PHOTO_SCHEMA: dict[str, Any] = {
     "name": "classify_photo",
     "description": "Classify a coffee shop photo into one category.",
     "input_schema": {
         "type": "object",
         "properties": {
-            "category": {
-                "type": "string",
-                "enum": ["MENU", "VIBE", "SKIP"],
-                "description": (
-                    "MENU: photo contains readable menu board, price list, or drink list text. "
-                    "VIBE: photo shows shop ambience, interior, exterior, or food/drinks. "
-                    "SKIP: photo is blurry, irrelevant, or primarily shows people."
-                ),
-            },
+            "category": _PHOTO_CATEGORY_PROPERTY,
         },
         "required": ["category"],
     },
 }
 
+CLASSIFY_PHOTOS_SCHEMA: dict[str, Any] = {
+    "name": "classify_photos",
+    "description": "Classify each numbered coffee shop photo into one category.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "photos": {
+                "type": "array",
+                "description": "One entry per photo in the request, in order.",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "index": {
+                            "type": "integer",
+                            "description": "The photo's number as labelled in the request.",
+                        },
+                        "category": _PHOTO_CATEGORY_PROPERTY,
+                    },
+                    "required": ["index", "category"],
+                },
+            },
+        },
+        "required": ["photos"],
+    },
+}
+
 SUMMARIZE_REVIEWS_TOOL_SCHEMA: dict[str, Any] = {
     "name": "summarize_reviews",
     "description": (
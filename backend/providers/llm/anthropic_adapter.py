@@ -1,8 +1,9 @@
 import logging
 import re
 import unicodedata
+from typing import Any, cast
 
-from anthropic import AsyncAnthropic
+from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
 from anthropic.types import Message
 
 from core.search_vocabulary import ITEM_TERMS, SPECIALTY_TERMS
@@ -20,19 +21,28 @@ from models.types import (
 )
 from providers.api_usage_logger import log_api_usage
 from providers.cost import compute_llm_cost
+from providers.llm._batch import decode_custom_id, encode_custom_id
+from providers.llm._packing import PromptPacker
 from providers.llm._tool_schemas import (
     ASSIGN_TAROT_SCHEMA as ASSIGN_TAROT_TOOL,
 )
 from providers.llm._tool_schemas import (
     CLASSIFY_PHOTO_SCHEMA as CLASSIFY_PHOTO_TOOL,
 )
+from providers.llm._tool_schemas import (
+    CLASSIFY_PHOTOS_SCHEMA as CLASSIFY_PHOTOS_TOOL,
+)
 from providers.llm._tool_schemas import (
     CLASSIFY_SHOP_SCHEMA as CLASSIFY_SHOP_TOOL,
 )
+from providers.llm._tool_schemas import (
+    CLASSIFY_SHOP_WITH_TAROT_SCHEMA as CLASSIFY_SHOP_WITH_TAROT_TOOL,
+)
 from providers.llm._tool_schemas import (
     EXTRACT_MENU_SCHEMA as EXTRACT_MENU_TOOL,
 )
 from providers.llm._tool_schemas import SUMMARIZE_REVIEWS_TOOL_SCHEMA
+from providers.llm.interface import BatchMethod, LLMBatchRequest, LLMBatchResult
 
 logger = logging.getLogger(__name__)
 
@@ -60,6 +70,56 @@ def _to_vocab_term(raw: str, vocab: dict[str, str]) -> str | None:
 _MENU_VOCAB_REF = ", ".join(ITEM_TERMS)
 _SPECIALTY_VOCAB_REF = ", ".join(SPECIALTY_TERMS)
 
+# Anthropic prompt-cache breakpoint: tools + system up to and including this block are cached
+_EPHEMERAL_CACHE = {"type": "ephemeral"}
+
+
+def _build_enrich_reference(taxonomy: list[TaxonomyTag], *, with_tarot: bool = False) -> str:
+    """Taxonomy and vocabulary reference for enrich_shop — identical for every shop.
+
+    Kept out of the per-shop message so providers can serve it from the prompt cache;
+    it must stay byte-for-byte stable across calls for the cached prefix to match.
+    with_tarot appends the tarot title-to-tag reference for combined enrichment.
+    """
+    lines = ["Available taxonomy tags (ONLY select from this list):"]
+    for tag in taxonomy:
+        lines.append(f"  {tag.id} ({tag.dimension}) — {tag.label} / {tag.label_zh}")
+    lines.append("")
+    lines.append("Reference — food & drink items (use exact terms for menu_highlights):")
+    lines.append(_MENU_VOCAB_REF)
+    lines.append("")
+    lines.append(
+        "Reference — coffee origins, varieties & processing"
+        " (use Traditional Chinese names for coffee_origins):"
+    )
+    lines.append(_SPECIALTY_VOCAB_REF)
+    lines.append("")
+    lines.append(
+        "Instruction: When extracting coffee_origins, use the Traditional Chinese name"
+        " exactly as it appears in the reference list above"
+        " (e.g. 古吉 not 'Guji', 耶加雪菲 not 'Yirgacheffe')."
+        " For menu_highlights, prefer the Traditional Chinese term from the list"
+        " (e.g. 手沖 not 'pour over', 可頌 not 'croissant')."
+    )
+    if with_tarot:
+        lines.append("")
+        lines.append("Reference — tarot titles and the tags they fit (for tarot_title):")
+        for title, tags in TITLE_TO_TAGS.items():
+            lines.append(f"  {title}: {', '.join(tags)}")
+    return "\n".join(lines)
+
+
+_MENU_EXTRACT_SYSTEM_PROMPT = (
+    "Extract all menu items from coffee shop menu photos. "
+    "Return structured data with item names, prices (as numbers), "
+    "descriptions, and categories where visible."
+    "\n\nReference — menu item names (prefer exact terms): "
+    f"{_MENU_VOCAB_REF}"
+    "\n\nFor item names, prefer the Traditional Chinese term "
+    "from the list above where applicable "
+    "(e.g. 手沖 not 'pour over', 可頌 not 'croissant')."
+)
+
 SUMMARIZE_REVIEWS_SYSTEM_PROMPT = (
     "You summarize coffee shop visitor reviews into a concise community snapshot. "
     "You MUST write entirely in Traditional Chinese (繁體中文). Even if the source "
@@ -82,6 +142,45 @@ _SUMMARIZE_SYSTEM_PROMPT = (
     "- count 為估計提及次數"
 )
 
+_SUMMARIZE_UPDATE_SYSTEM_PROMPT = (
+    _SUMMARIZE_SYSTEM_PROMPT + "\n\n"
+    "更新規則：\n"
+    "- 使用者訊息附上現有摘要與主題標籤，以及其後新增的評論\n"
+    "- 以現有摘要為基礎修訂：保留仍然成立的內容，只依新增評論補充或調整\n"
+    "- count 為累計次數：現有 count 加上新增評論中的提及次數\n"
+    "- 新主題提及次數較多時，可取代次數最少的現有主題"
+)
+
+
+def _summarize_prompt(
+    google_reviews: list[str],
+    checkin_texts: list[str],
+    previous: ReviewSummaryResult | None,
+    packer: PromptPacker | None = None,
+) -> tuple[str, str]:
+    """Return the (system, user) prompts; with previous, only the new texts are listed."""
+    if packer is not None:
+        # Community notes take the budget first, as the prompt tells the model to prefer them
+        checkin_texts, google_reviews = packer.pack(
+            "summarize_reviews", checkin_texts, google_reviews
+        ).groups
+    parts: list[str] = []
+    if previous is not None:
+        topics = "、".join(f"{t.topic}（{t.count}）" for t in previous.review_topics)
+        parts.append(
+            f"現有摘要：\n{previous.summary_zh_tw}\n\n現有主題標籤：\n{topics or '（無）'}"
+        )
+    prefix = "新增" if previous is not None else ""
+    if google_reviews:
+        lines = "\n".join(f"[{i + 1}] {r}" for i, r in enumerate(google_reviews))
+        parts.append(f"{prefix}Google 評論：\n{lines}")
+    if checkin_texts:
+        lines = "\n".join(f"[{i + 1}] {t}" for i, t in enumerate(checkin_texts))
+        parts.append(f"{prefix}社群筆記（請優先參考）：\n{lines}")
+    system = _SUMMARIZE_SYSTEM_PROMPT if previous is None else _SUMMARIZE_UPDATE_SYSTEM_PROMPT
+    return system, "\n\n".join(parts)
+
+
 TAROT_SYSTEM_PROMPT = (
     "You are a mystical coffee guide who assigns tarot archetype names to cafes. "
     "Based on the shop's characteristics and reviews, pick the single best-fitting "
@@ -110,6 +209,14 @@ SYSTEM_PROMPT = (
     "social (meeting people), or mixed."
 )
 
+# Appended to SYSTEM_PROMPT in combined enrichment mode (classify_shop returns tarot fields)
+ENRICH_TAROT_RULES = (
+    "\n- Pick the single best-fitting tarot archetype title (tarot_title) from the tarot "
+    "reference, copied exactly; it is exempt from the language requirement. Write "
+    "flavor_text as one evocative, mysterious line in the style of a tarot reading, no "
+    "longer than 80 characters, in English like the title."
+)
+
 MODE_SCORES: dict[str, ShopModeScores] = {
     "work": ShopModeScores(work=1.0, rest=0.0, social=0.0),
     "rest": ShopModeScores(work=0.0, rest=1.0, social=0.0),
@@ -165,6 +272,36 @@ def _parse_enrichment_payload(payload: dict, taxonomy_by_id: dict) -> Enrichment
         menu_highlights=menu_highlights,
         coffee_origins=coffee_origins,
         menu_items=menu_items,
+        tarot=_parse_tarot(payload) if "tarot_title" in payload else None,
+    )
+
+
+def _parse_photo_categories(tool_input: dict, count: int) -> list[PhotoCategory]:
+    """Map a classify_photos payload back to request order; every photo must be labelled."""
+    by_index: dict[int, PhotoCategory] = {}
+    for entry in tool_input.get("photos", []):
+        by_index[int(entry["index"])] = PhotoCategory(entry["category"])
+    missing = [i for i in range(1, count + 1) if i not in by_index]
+    if missing:
+        raise ValueError(f"classify_photos response missing photos {missing}: {tool_input!r}")
+    return [by_index[i] for i in range(1, count + 1)]
+
+
+def _parse_tarot(tool_input: dict) -> TarotEnrichmentResult:
+    title = tool_input.get("tarot_title", "")
+    validated_title = title if title in TAROT_TITLES else None
+    return TarotEnrichmentResult(
+        tarot_title=validated_title, flavor_text=tool_input.get("flavor_text", "")
+    )
+
+
+def _parse_summary(tool_input: dict) -> ReviewSummaryResult:
+    return ReviewSummaryResult(
+        summary_zh_tw=tool_input["summary_zh_tw"],
+        review_topics=[
+            ReviewTopic(topic=t["topic"], count=t["count"])
+            for t in tool_input.get("review_topics", [])
+        ],
     )
 
 
@@ -175,50 +312,51 @@ class AnthropicLLMAdapter:
         model: str,
         taxonomy: list[TaxonomyTag],
         classify_model: str,
+        enrich_with_tarot: bool = False,
+        prompt_packer: PromptPacker | None = None,
+        http_client: DefaultAsyncHttpxClient | None = None,
     ):
-        self._client = AsyncAnthropic(api_key=api_key)
+        # http_client: a pooled client shared across adapters (see providers/registry.py)
+        self._client = AsyncAnthropic(api_key=api_key, http_client=http_client)
+        self._packer = prompt_packer
         self._model = model
         self._classify_model = classify_model
         self._taxonomy = taxonomy
         self._taxonomy_by_id: dict[str, TaxonomyTag] = {tag.id: tag for tag in taxonomy}
-
-    async def enrich_shop(self, shop: ShopEnrichmentInput) -> EnrichmentResult:
-        messages = self._build_enrich_messages(shop)
-
-        response = await self._client.messages.create(
-            model=self._model,
-            max_tokens=2048,
-            system=SYSTEM_PROMPT,
-            messages=messages,
-            tools=[CLASSIFY_SHOP_TOOL],
-            tool_choice={"type": "tool", "name": "classify_shop"},
-        )
-
-        usage = response.usage
-        log_api_usage(
-            provider="anthropic",
-            task="enrich_shop",
-            model=self._model,
-            tokens_input=usage.input_tokens,
-            tokens_output=usage.output_tokens,
-            tokens_cache_write=getattr(usage, "cache_creation_input_tokens", 0) or 0,
-            tokens_cache_read=getattr(usage, "cache_read_input_tokens", 0) or 0,
-            cost_usd=compute_llm_cost(
-                self._model,
-                usage.input_tokens,
-                usage.output_tokens,
-                getattr(usage, "cache_creation_input_tokens", 0) or 0,
-                getattr(usage, "cache_read_input_tokens", 0) or 0,
-            ),
+        # Static prefix of every enrich_shop call (after the tool definition); the cache
+        # breakpoint on the reference block lets later calls read it at the cache rate.
+        self._enrich_system: list[dict] = [
+            {
+                "type": "text",
+                "text": SYSTEM_PROMPT + ENRICH_TAROT_RULES if enrich_with_tarot else SYSTEM_PROMPT,
+            },
+            {
+                "type": "text",
+                "text": _build_enrich_reference(taxonomy, with_tarot=enrich_with_tarot),
+                "cache_control": _EPHEMERAL_CACHE,
+            },
+        ]
+        # Combined mode: classify_shop also returns tarot_title / flavor_text
+        self._enrich_tool = (
+            CLASSIFY_SHOP_WITH_TAROT_TOOL if enrich_with_tarot else CLASSIFY_SHOP_TOOL
         )
 
-        tool_input = self._extract_tool_input(response, "classify_shop")
-        return self._parse_enrichment(tool_input)
+    async def enrich_shop(self, shop: ShopEnrichmentInput) -> EnrichmentResult:
+        response = await self._client.messages.create(**self._enrich_request(shop))
+        self._log_usage("enrich_shop", self._model, response.usage)
+        return self._parse_enrichment(self._extract_tool_input(response, "classify_shop"))
 
     async def extract_menu_data(self, image_url: str) -> MenuExtractionResult:
         response = await self._client.messages.create(
             model=self._model,
             max_tokens=4096,
+            system=[
+                {
+                    "type": "text",
+                    "text": _MENU_EXTRACT_SYSTEM_PROMPT,
+                    "cache_control": _EPHEMERAL_CACHE,
+                }
+            ],
             messages=[
                 {
                     "role": "user",
@@ -229,16 +367,7 @@ class AnthropicLLMAdapter:
                         },
                         {
                             "type": "text",
-                            "text": (
-                                "Extract all menu items from this coffee shop menu photo. "
-                                "Return structured data with item names, prices (as numbers), "
-                                "descriptions, and categories where visible."
-                                "\n\nReference — menu item names (prefer exact terms): "
-                                f"{_MENU_VOCAB_REF}"
-                                "\n\nFor item names, prefer the Traditional Chinese term "
-                                "from the list above where applicable "
-                                "(e.g. 手沖 not 'pour over', 可頌 not 'croissant')."
-                            ),
+                            "text": "Extract all menu items from this coffee shop menu photo.",
                         },
                     ],
                 }
@@ -246,24 +375,7 @@ class AnthropicLLMAdapter:
             tools=[EXTRACT_MENU_TOOL],
             tool_choice={"type": "tool", "name": "extract_menu"},
         )
-
-        usage = response.usage
-        log_api_usage(
-            provider="anthropic",
-            task="extract_menu_data",
-            model=self._model,
-            tokens_input=usage.input_tokens,
-            tokens_output=usage.output_tokens,
-            tokens_cache_write=getattr(usage, "cache_creation_input_tokens", 0) or 0,
-            tokens_cache_read=getattr(usage, "cache_read_input_tokens", 0) or 0,
-            cost_usd=compute_llm_cost(
-                self._model,
-                usage.input_tokens,
-                usage.output_tokens,
-                getattr(usage, "cache_creation_input_tokens", 0) or 0,
-                getattr(usage, "cache_read_input_tokens", 0) or 0,
-            ),
-        )
+        self._log_usage("extract_menu_data", self._model, response.usage)
         tool_input = self._extract_tool_input(response, "extract_menu")
         return MenuExtractionResult(
             items=tool_input.get("items", []),
@@ -272,48 +384,9 @@ class AnthropicLLMAdapter:
 
     async def assign_tarot(self, shop: ShopEnrichmentInput) -> TarotEnrichmentResult:
         """Assign a tarot title and flavor text to a shop."""
-        lines = [f"Shop: {shop.name}"]
-        if shop.description:
-            lines.append(f"Description: {shop.description}")
-        if shop.reviews:
-            lines.append(f"Sample reviews: {'; '.join(shop.reviews[:5])}")
-        lines.append("")
-        lines.append("Title-to-tag reference (pick the best match):")
-        for title, tags in TITLE_TO_TAGS.items():
-            lines.append(f"  {title}: {', '.join(tags)}")
-
-        response = await self._client.messages.create(
-            model=self._model,
-            max_tokens=256,
-            system=TAROT_SYSTEM_PROMPT,
-            messages=[{"role": "user", "content": "\n".join(lines)}],
-            tools=[ASSIGN_TAROT_TOOL],
-            tool_choice={"type": "tool", "name": "assign_tarot"},
-        )
-
-        usage = response.usage
-        log_api_usage(
-            provider="anthropic",
-            task="assign_tarot",
-            model=self._model,
-            tokens_input=usage.input_tokens,
-            tokens_output=usage.output_tokens,
-            tokens_cache_write=getattr(usage, "cache_creation_input_tokens", 0) or 0,
-            tokens_cache_read=getattr(usage, "cache_read_input_tokens", 0) or 0,
-            cost_usd=compute_llm_cost(
-                self._model,
-                usage.input_tokens,
-                usage.output_tokens,
-                getattr(usage, "cache_creation_input_tokens", 0) or 0,
-                getattr(usage, "cache_read_input_tokens", 0) or 0,
-            ),
-        )
-        tool_input = self._extract_tool_input(response, "assign_tarot")
-        title = tool_input.get("tarot_title", "")
-        flavor = tool_input.get("flavor_text", "")
-        validated_title = title if title in TAROT_TITLES else None
-
-        return TarotEnrichmentResult(tarot_title=validated_title, flavor_text=flavor)
+        response = await self._client.messages.create(**self._tarot_request(shop))
+        self._log_usage("assign_tarot", self._model, response.usage)
+        return _parse_tarot(self._extract_tool_input(response, "assign_tarot"))
 
     async def classify_photo(self, image_url: str) -> PhotoCategory:
         response = await self._client.messages.create(
@@ -340,78 +413,189 @@ class AnthropicLLMAdapter:
             tools=[CLASSIFY_PHOTO_TOOL],
             tool_choice={"type": "tool", "name": "classify_photo"},
         )
-
-        usage = response.usage
-        log_api_usage(
-            provider="anthropic",
-            task="classify_photo",
-            model=self._classify_model,
-            tokens_input=usage.input_tokens,
-            tokens_output=usage.output_tokens,
-            tokens_cache_write=getattr(usage, "cache_creation_input_tokens", 0) or 0,
-            tokens_cache_read=getattr(usage, "cache_read_input_tokens", 0) or 0,
-            cost_usd=compute_llm_cost(
-                self._classify_model,
-                usage.input_tokens,
-                usage.output_tokens,
-                getattr(usage, "cache_creation_input_tokens", 0) or 0,
-                getattr(usage, "cache_read_input_tokens", 0) or 0,
-            ),
-        )
+        self._log_usage("classify_photo", self._classify_model, response.usage)
         tool_input = self._extract_tool_input(response, "classify_photo")
         raw_category = tool_input.get("category")
         if not raw_category:
             raise ValueError(f"classify_photo tool response missing 'category' key: {tool_input!r}")
         return PhotoCategory(raw_category)
 
+    async def classify_photos(self, image_urls: list[str]) -> list[PhotoCategory]:
+        """Classify several photos in one request; categories come back in input order."""
+        content: list[dict[str, Any]] = []
+        for i, url in enumerate(image_urls, 1):
+            content.append({"type": "text", "text": f"Photo {i}:"})
+            content.append({"type": "image", "source": {"type": "url", "url": url}})
+        content.append(
+            {
+                "type": "text",
+                "text": (
+                    f"Classify each of these {len(image_urls)} coffee shop photos. "
+                    "If both MENU and VIBE apply to a photo, choose MENU."
+                ),
+            }
+        )
+        response = await self._client.messages.create(
+            model=self._classify_model,
+            max_tokens=64 + 32 * len(image_urls),
+            messages=[{"role": "user", "content": content}],
+            tools=[CLASSIFY_PHOTOS_TOOL],
+            tool_choice={"type": "tool", "name": "classify_photos"},
+        )
+        self._log_usage("classify_photos", self._classify_model, response.usage)
+        tool_input = self._extract_tool_input(response, "classify_photos")
+        return _parse_photo_categories(tool_input, len(image_urls))
+
     async def summarize_reviews(
         self,
         google_reviews: list[str],
         checkin_texts: list[str],
+        previous: ReviewSummaryResult | None = None,
     ) -> ReviewSummaryResult:
-        """Summarize Google reviews and community check-in texts into a structured snapshot."""
-        parts: list[str] = []
-        if google_reviews:
-            lines = "\n".join(f"[{i + 1}] {r}" for i, r in enumerate(google_reviews))
-            parts.append(f"Google 評論：\n{lines}")
-        if checkin_texts:
-            lines = "\n".join(f"[{i + 1}] {t}" for i, t in enumerate(checkin_texts))
-            parts.append(f"社群筆記（請優先參考）：\n{lines}")
-
-        user_content = "\n\n".join(parts)
+        """Summarize Google reviews and community check-in texts into a structured snapshot.
+
+        With previous, the texts are only the ones written since that summary, and the
+        model revises it instead of starting over.
+        """
         response = await self._client.messages.create(
-            model=self._classify_model,
-            max_tokens=512,
-            system=_SUMMARIZE_SYSTEM_PROMPT,
-            messages=[{"role": "user", "content": user_content}],
-            tools=[SUMMARIZE_REVIEWS_TOOL_SCHEMA],
-            tool_choice={"type": "tool", "name": "summarize_reviews"},
+            **self._summarize_request(google_reviews, checkin_texts, previous)
         )
-        usage = response.usage
+        self._log_usage("summarize_reviews", self._classify_model, response.usage)
+        return _parse_summary(self._extract_tool_input(response, "summarize_reviews"))
+
+    # --- Message Batches (LLMBatchProvider) ---
+
+    async def submit_batch(self, requests: list[LLMBatchRequest]) -> str:
+        batch = await self._client.messages.batches.create(
+            requests=[
+                {
+                    "custom_id": encode_custom_id(r.method, r.custom_id),
+                    "params": self._batch_params(r),
+                }
+                for r in requests
+            ]
+        )
+        logger.info("Submitted Anthropic message batch %s (%d requests)", batch.id, len(requests))
+        return batch.id
+
+    async def batch_finished(self, batch_id: str) -> bool:
+        batch = await self._client.messages.batches.retrieve(batch_id)
+        return batch.processing_status == "ended"
+
+    async def cancel_batch(self, batch_id: str) -> None:
+        await self._client.messages.batches.cancel(batch_id)
+        logger.info("Cancelled Anthropic message batch %s", batch_id)
+
+    async def batch_results(self, batch_id: str) -> list[LLMBatchResult]:
+        results: list[LLMBatchResult] = []
+        async for entry in await self._client.messages.batches.results(batch_id):
+            method, custom_id = decode_custom_id(entry.custom_id)
+            if entry.result.type != "succeeded":
+                error = getattr(entry.result, "error", None) or entry.result.type
+                results.append(LLMBatchResult(custom_id=custom_id, method=method, error=str(error)))
+                continue
+            message = entry.result.message
+            model = self._model if method != "summarize_reviews" else self._classify_model
+            self._log_usage(method, model, message.usage, batch=True)
+            try:
+                results.append(
+                    LLMBatchResult(
+                        custom_id=custom_id,
+                        method=method,
+                        result=self._parse_batch(method, message),
+                    )
+                )
+            except Exception as exc:
+                results.append(LLMBatchResult(custom_id=custom_id, method=method, error=str(exc)))
+        return results
+
+    def _batch_params(self, request: LLMBatchRequest) -> dict[str, Any]:
+        match request.method:
+            case "enrich_shop":
+                return self._enrich_request(cast("ShopEnrichmentInput", request.shop))
+            case "assign_tarot":
+                return self._tarot_request(cast("ShopEnrichmentInput", request.shop))
+            case "summarize_reviews":
+                return self._summarize_request(
+                    request.google_reviews, request.checkin_texts, request.previous
+                )
+
+    def _parse_batch(
+        self, method: BatchMethod, message: Message
+    ) -> EnrichmentResult | ReviewSummaryResult | TarotEnrichmentResult:
+        match method:
+            case "enrich_shop":
+                return self._parse_enrichment(self._extract_tool_input(message, "classify_shop"))
+            case "assign_tarot":
+                return _parse_tarot(self._extract_tool_input(message, "assign_tarot"))
+            case "summarize_reviews":
+                return _parse_summary(self._extract_tool_input(message, "summarize_reviews"))
+
+    # --- Request builders shared by interactive and batch calls ---
+
+    def _enrich_request(self, shop: ShopEnrichmentInput) -> dict[str, Any]:
+        if self._packer is not None:
+            shop = self._packer.pack_shop(shop)
+        return {
+            "model": self._model,
+            "max_tokens": 2048,
+            "system": self._enrich_system,
+            "messages": self._build_enrich_messages(shop),
+            "tools": [self._enrich_tool],
+            "tool_choice": {"type": "tool", "name": "classify_shop"},
+        }
+
+    def _tarot_request(self, shop: ShopEnrichmentInput) -> dict[str, Any]:
+        lines = [f"Shop: {shop.name}"]
+        if shop.description:
+            lines.append(f"Description: {shop.description}")
+        if shop.reviews:
+            lines.append(f"Sample reviews: {'; '.join(shop.reviews[:5])}")
+        lines.append("")
+        lines.append("Title-to-tag reference (pick the best match):")
+        for title, tags in TITLE_TO_TAGS.items():
+            lines.append(f"  {title}: {', '.join(tags)}")
+        return {
+            "model": self._model,
+            "max_tokens": 256,
+            "system": TAROT_SYSTEM_PROMPT,
+            "messages": [{"role": "user", "content": "\n".join(lines)}],
+            "tools": [ASSIGN_TAROT_TOOL],
+            "tool_choice": {"type": "tool", "name": "assign_tarot"},
+        }
+
+    def _summarize_request(
+        self,
+        google_reviews: list[str],
+        checkin_texts: list[str],
+        previous: ReviewSummaryResult | None = None,
+    ) -> dict[str, Any]:
+        system, content = _summarize_prompt(google_reviews, checkin_texts, previous, self._packer)
+        return {
+            "model": self._classify_model,
+            "max_tokens": 512,
+            "system": system,
+            "messages": [{"role": "user", "content": content}],
+            "tools": [SUMMARIZE_REVIEWS_TOOL_SCHEMA],
+            "tool_choice": {"type": "tool", "name": "summarize_reviews"},
+        }
+
+    @staticmethod
+    def _log_usage(task: str, model: str, usage: Any, *, batch: bool = False) -> None:
+        cache_write = getattr(usage, "cache_creation_input_tokens", 0) or 0
+        cache_read = getattr(usage, "cache_read_input_tokens", 0) or 0
         log_api_usage(
             provider="anthropic",
-            task="summarize_reviews",
-            model=self._classify_model,
+            task=f"{task}_batch" if batch else task,
+            model=model,
             tokens_input=usage.input_tokens,
             tokens_output=usage.output_tokens,
-            tokens_cache_write=getattr(usage, "cache_creation_input_tokens", 0) or 0,
-            tokens_cache_read=getattr(usage, "cache_read_input_tokens", 0) or 0,
+            tokens_cache_write=cache_write,
+            tokens_cache_read=cache_read,
             cost_usd=compute_llm_cost(
-                self._classify_model,
-                usage.input_tokens,
-                usage.output_tokens,
-                getattr(usage, "cache_creation_input_tokens", 0) or 0,
-                getattr(usage, "cache_read_input_tokens", 0) or 0,
+                model, usage.input_tokens, usage.output_tokens, cache_write, cache_read, batch=batch
             ),
         )
-        tool_input = self._extract_tool_input(response, "summarize_reviews")
-        return ReviewSummaryResult(
-            summary_zh_tw=tool_input["summary_zh_tw"],
-            review_topics=[
-                ReviewTopic(topic=t["topic"], count=t["count"])
-                for t in tool_input.get("review_topics", [])
-            ],
-        )
 
     def _build_enrich_messages(self, shop: ShopEnrichmentInput) -> list[dict]:
         """Build the messages list for the enrich_shop API call.
@@ -466,29 +650,6 @@ class AnthropicLLMAdapter:
             for i, review in enumerate(shop.reviews, 1):
                 lines.append(f"[{i}] {review}")
 
-        lines.append("")
-        lines.append("Available taxonomy tags (ONLY select from this list):")
-        for tag in self._taxonomy:
-            lines.append(f"  {tag.id} ({tag.dimension}) — {tag.label} / {tag.label_zh}")
-
-        lines.append("")
-        lines.append("Reference — food & drink items (use exact terms for menu_highlights):")
-        lines.append(_MENU_VOCAB_REF)
-        lines.append("")
-        lines.append(
-            "Reference — coffee origins, varieties & processing"
-            " (use Traditional Chinese names for coffee_origins):"
-        )
-        lines.append(_SPECIALTY_VOCAB_REF)
-        lines.append("")
-        lines.append(
-            "Instruction: When extracting coffee_origins, use the Traditional Chinese name"
-            " exactly as it appears in the reference list above"
-            " (e.g. 古吉 not 'Guji', 耶加雪菲 not 'Yirgacheffe')."
-            " For menu_highlights, prefer the Traditional Chinese term from the list"
-            " (e.g. 手沖 not 'pour over', 可頌 not 'croissant')."
-        )
-
         if shop.google_maps_features:
             feature_list = ", ".join(k for k, v in shop.google_maps_features.items() if v)
             if feature_list:
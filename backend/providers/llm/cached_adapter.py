@@ -0,0 +1,268 @@
+"""CachedLLMAdapter puts a content-addressed result cache in front of an LLMProvider.
+
+enrich_shop, assign_tarot, summarize_reviews and extract_menu_data results are keyed by
+sha256 over (method, model, prompt version, canonical JSON of the inputs), so a retry after a
+later-stage failure, an admin re-enqueue or a re-scrape of an unchanged shop replays the
+stored result instead of calling the model. Lookups hit a per-process LRU first, then the
+llm_result_cache table; fresh results are written to both. Cache reads and writes never fail
+the call. Inside ``with llm_cache_bypass():`` reads are skipped and fresh results overwrite
+the stored ones. Photo classification is passed straight through.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, Any, Literal, TypeVar, cast
+
+import structlog
+from pydantic import BaseModel, ValidationError
+
+from core.lang import is_zh_dominant
+from db.supabase_client import get_service_role_client
+from models.types import (
+    EnrichmentResult,
+    MenuExtractionResult,
+    ReviewSummaryResult,
+    TarotEnrichmentResult,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Iterator
+
+    from supabase import Client
+
+    from models.types import PhotoCategory, ShopEnrichmentInput, TaxonomyTag
+    from providers.llm.interface import LLMProvider
+
+logger = structlog.get_logger()
+
+CachedMethod = Literal["enrich_shop", "assign_tarot", "summarize_reviews", "extract_menu_data"]
+
+# Bump a method's version whenever its prompt, tool schema or result parsing changes, so
+# results produced under the old prompt stop matching.
+PROMPT_VERSIONS: dict[CachedMethod, int] = {
+    "enrich_shop": 2,
+    "assign_tarot": 1,
+    "summarize_reviews": 2,
+    "extract_menu_data": 1,
+}
+
+_RESULT_TYPES: dict[CachedMethod, type[BaseModel]] = {
+    "enrich_shop": EnrichmentResult,
+    "assign_tarot": TarotEnrichmentResult,
+    "summarize_reviews": ReviewSummaryResult,
+    "extract_menu_data": MenuExtractionResult,
+}
+
+R = TypeVar("R", bound=BaseModel)
+
+_bypass: ContextVar[bool] = ContextVar("llm_cache_bypass", default=False)
+
+# Process-wide LRU front, shared by every adapter providers/registry.py builds and kept
+# when one is replaced (new taxonomy version or settings).
+# Values are (expires_at, result JSON); results are re-validated on every hit.
+_memory: OrderedDict[str, tuple[datetime, dict[str, Any]]] = OrderedDict()
+
+
+@contextmanager
+def llm_cache_bypass(enabled: bool = True) -> Iterator[None]:
+    """Skip cache reads for LLM calls made inside the block; fresh results are still stored."""
+    token = _bypass.set(enabled)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def llm_cache_key(method: CachedMethod, model: str, inputs: dict[str, Any]) -> str:
+    canonical = json.dumps(
+        {
+            "method": method,
+            "model": model,
+            "prompt_version": PROMPT_VERSIONS[method],
+            "inputs": inputs,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def acceptable_result(result: object) -> bool:
+    """False for results the handlers reject.
+
+    They are not stored, so their retry asks the model again, and a hedged call
+    (hybrid_adapter.py) waits for the other provider instead of returning them.
+    """
+    if isinstance(result, EnrichmentResult):
+        return not result.summary or is_zh_dominant(result.summary)
+    if isinstance(result, ReviewSummaryResult):
+        return bool(result.summary_zh_tw) and is_zh_dominant(result.summary_zh_tw)
+    return True
+
+
+class CachedLLMAdapter:
+    def __init__(
+        self,
+        inner: LLMProvider,
+        *,
+        model: str,
+        taxonomy: list[TaxonomyTag] | None = None,
+        ttl_seconds: int,
+        memory_entries: int,
+        db: Client | None = None,
+    ) -> None:
+        self._inner = inner
+        self._model = model
+        # enrich_shop prompts embed the taxonomy, so its results depend on it too
+        self._taxonomy_inputs = [
+            tag.model_dump(mode="json") for tag in sorted(taxonomy or [], key=lambda t: t.id)
+        ]
+        self._ttl = timedelta(seconds=ttl_seconds)
+        self._memory_entries = memory_entries
+        self._db = db
+
+    async def enrich_shop(self, shop: ShopEnrichmentInput) -> EnrichmentResult:
+        return await self._cached(
+            "enrich_shop",
+            {"shop": shop.model_dump(mode="json"), "taxonomy": self._taxonomy_inputs},
+            lambda: self._inner.enrich_shop(shop),
+        )
+
+    async def extract_menu_data(self, image_url: str) -> MenuExtractionResult:
+        return await self._cached(
+            "extract_menu_data",
+            {"image_url": image_url},
+            lambda: self._inner.extract_menu_data(image_url),
+        )
+
+    async def assign_tarot(self, shop: ShopEnrichmentInput) -> TarotEnrichmentResult:
+        return await self._cached(
+            "assign_tarot",
+            {"shop": shop.model_dump(mode="json")},
+            lambda: self._inner.assign_tarot(shop),
+        )
+
+    async def classify_photo(self, image_url: str) -> PhotoCategory:
+        return await self._inner.classify_photo(image_url)
+
+    async def classify_photos(self, image_urls: list[str]) -> list[PhotoCategory]:
+        return await self._inner.classify_photos(image_urls)
+
+    async def summarize_reviews(
+        self,
+        google_reviews: list[str],
+        checkin_texts: list[str],
+        previous: ReviewSummaryResult | None = None,
+    ) -> ReviewSummaryResult:
+        inputs: dict[str, Any] = {"google_reviews": google_reviews, "checkin_texts": checkin_texts}
+        if previous is not None:
+            # Only keyed when set, so full-rebuild entries stored before keep matching
+            inputs["previous"] = previous.model_dump(mode="json")
+        return await self._cached(
+            "summarize_reviews",
+            inputs,
+            lambda: self._inner.summarize_reviews(
+                google_reviews=google_reviews,
+                checkin_texts=checkin_texts,
+                previous=previous,
+            ),
+        )
+
+    async def _cached(
+        self,
+        method: CachedMethod,
+        inputs: dict[str, Any],
+        call: Callable[[], Awaitable[R]],
+    ) -> R:
+        key = llm_cache_key(method, self._model, inputs)
+        if not _bypass.get():
+            stored = await self._lookup(key)
+            if stored is not None:
+                try:
+                    cached = _RESULT_TYPES[method].model_validate(stored)
+                except ValidationError:
+                    logger.warning("Discarding unreadable LLM cache entry", method=method, key=key)
+                else:
+                    logger.info("LLM cache hit", method=method, key=key)
+                    return cast("R", cached)
+
+        result = await call()
+        if acceptable_result(result):
+            await self._store(key, method, result)
+        return result
+
+    async def _lookup(self, key: str) -> dict[str, Any] | None:
+        now = datetime.now(UTC)
+        entry = _memory.get(key)
+        if entry is not None:
+            expires_at, stored = entry
+            if expires_at > now:
+                _memory.move_to_end(key)
+                return stored
+            del _memory[key]
+
+        try:
+            response = await asyncio.to_thread(
+                lambda: (
+                    self._client()
+                    .table("llm_result_cache")
+                    .select("result, expires_at")
+                    .eq("cache_key", key)
+                    .gt("expires_at", now.isoformat())
+                    .limit(1)
+                    .execute()
+                )
+            )
+        except Exception as exc:
+            logger.warning("LLM cache lookup failed", key=key, error=str(exc))
+            return None
+        rows = cast("list[dict[str, Any]]", response.data or [])
+        if not rows:
+            return None
+        stored = cast("dict[str, Any]", rows[0]["result"])
+        self._remember(key, datetime.fromisoformat(rows[0]["expires_at"]), stored)
+        return stored
+
+    async def _store(self, key: str, method: CachedMethod, result: BaseModel) -> None:
+        now = datetime.now(UTC)
+        expires_at = now + self._ttl
+        stored = result.model_dump(mode="json")
+        self._remember(key, expires_at, stored)
+        try:
+            await asyncio.to_thread(
+                lambda: (
+                    self._client()
+                    .table("llm_result_cache")
+                    .upsert(
+                        {
+                            "cache_key": key,
+                            "method": method,
+                            "model": self._model,
+                            "result": stored,
+                            "created_at": now.isoformat(),
+                            "expires_at": expires_at.isoformat(),
+                        },
+                        on_conflict="cache_key",
+                    )
+                    .execute()
+                )
+            )
+        except Exception as exc:
+            logger.warning("LLM cache write failed", key=key, error=str(exc))
+
+    def _remember(self, key: str, expires_at: datetime, stored: dict[str, Any]) -> None:
+        _memory[key] = (expires_at, stored)
+        _memory.move_to_end(key)
+        while len(_memory) > self._memory_entries:
+            _memory.popitem(last=False)
+
+    def _client(self) -> Client:
+        return self._db if self._db is not None else get_service_role_client()
@@ -0,0 +1,75 @@
+"""In-memory LLMBatchProvider for tests and local runs without provider batch access.
+
+Each submitted request is answered by calling the wrapped interactive LLMProvider, so the
+results have exactly the shape a real batch returns. batch_finished reports False for the
+first polls_until_done - 1 polls, which lets tests exercise the re-poll path.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, cast
+from uuid import uuid4
+
+from providers.llm.interface import LLMBatchRequest, LLMBatchResult
+
+if TYPE_CHECKING:
+    from models.types import (
+        EnrichmentResult,
+        ReviewSummaryResult,
+        ShopEnrichmentInput,
+        TarotEnrichmentResult,
+    )
+    from providers.llm.interface import LLMProvider
+
+
+@dataclass
+class _FakeBatch:
+    requests: list[LLMBatchRequest]
+    polls: int = 0
+    cancelled: bool = False
+    results: list[LLMBatchResult] = field(default_factory=list)
+
+
+class FakeBatchLLMAdapter:
+    def __init__(self, llm: LLMProvider, polls_until_done: int = 1) -> None:
+        self._llm = llm
+        self._polls_until_done = polls_until_done
+        self.batches: dict[str, _FakeBatch] = {}
+
+    async def submit_batch(self, requests: list[LLMBatchRequest]) -> str:
+        batch_id = f"fakebatch_{uuid4().hex}"
+        self.batches[batch_id] = _FakeBatch(requests=list(requests))
+        return batch_id
+
+    async def batch_finished(self, batch_id: str) -> bool:
+        batch = self.batches[batch_id]
+        batch.polls += 1
+        return batch.polls >= self._polls_until_done
+
+    async def cancel_batch(self, batch_id: str) -> None:
+        self.batches[batch_id].cancelled = True
+
+    async def batch_results(self, batch_id: str) -> list[LLMBatchResult]:
+        batch = self.batches[batch_id]
+        if not batch.results:
+            batch.results = [await self._run(request) for request in batch.requests]
+        return batch.results
+
+    async def _run(self, request: LLMBatchRequest) -> LLMBatchResult:
+        result: EnrichmentResult | ReviewSummaryResult | TarotEnrichmentResult
+        try:
+            match request.method:
+                case "enrich_shop":
+                    result = await self._llm.enrich_shop(cast("ShopEnrichmentInput", request.shop))
+                case "assign_tarot":
+                    result = await self._llm.assign_tarot(cast("ShopEnrichmentInput", request.shop))
+                case "summarize_reviews":
+                    result = await self._llm.summarize_reviews(
+                        request.google_reviews, request.checkin_texts, request.previous
+                    )
+        except Exception as exc:
+            return LLMBatchResult(
+                custom_id=request.custom_id, method=request.method, error=str(exc)
+            )
+        return LLMBatchResult(custom_id=request.custom_id, method=request.method, result=result)
@@ -2,14 +2,32 @@
 most cost-effective provider. Keeps enrich_shop on Claude Sonnet 4.6 (quality gate, see
 ADR 2026-02-24) and routes the other four methods to OpenAI.
 
+Every call is bounded by its method's deadline (LLM_DEADLINE_SECONDS) and raises
+TimeoutError past it, so one stalled request cannot hold a worker slot for the SDK's
+default ten minutes. With LLM_HEDGE_ENABLED, a call still running after its p95 budget
+(LLM_HEDGE_AFTER_SECONDS) is sent to the other provider as well, and the first valid
+result wins. The losing call is left to finish in the background, up to its deadline,
+because the provider bills it either way. Its usage is then logged like any other call.
+The duplicate's usage is logged as task "<method>_hedge", so the admin spend view shows
+what hedging costs.
+
 See docs/decisions/2026-04-10-hybrid-llm-routing.md for full rationale.
 """
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any, cast
+
+import structlog
+
+from providers.api_usage_logger import usage_task_suffix
+from providers.llm.cached_adapter import acceptable_result
 
 if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
     from models.types import (
         EnrichmentResult,
         MenuExtractionResult,
@@ -18,32 +36,181 @@ if TYPE_CHECKING:
         ShopEnrichmentInput,
         TarotEnrichmentResult,
     )
-    from providers.llm.interface import LLMProvider
+    from providers.llm.interface import (
+        LLMBatchProvider,
+        LLMBatchRequest,
+        LLMBatchResult,
+        LLMProvider,
+    )
+
+logger = structlog.get_logger()
+
+# Losing hedged calls still running; held so they are not garbage-collected mid-flight
+_detached: set[asyncio.Task[Any]] = set()
+
+
+async def _bounded[T](call: Awaitable[T], deadline: float | None, *, hedge: bool = False) -> T:
+    async with asyncio.timeout(deadline):
+        if not hedge:
+            return await call
+        with usage_task_suffix("_hedge"):
+            return await call
+
+
+def _detach(task: asyncio.Task[Any]) -> None:
+    _detached.add(task)
+    task.add_done_callback(_forget)
+
+
+def _forget(task: asyncio.Task[Any]) -> None:
+    _detached.discard(task)
+    # Retrieving the exception keeps asyncio from logging it as never retrieved
+    if not task.cancelled():
+        task.exception()
 
 
 class HybridLLMAdapter:
-    def __init__(self, *, anthropic: LLMProvider, openai: LLMProvider) -> None:
+    def __init__(
+        self,
+        *,
+        anthropic: LLMProvider,
+        openai: LLMProvider,
+        deadline_seconds: dict[str, float] | None = None,
+        hedge_after_seconds: dict[str, float] | None = None,
+    ) -> None:
         self._anthropic = anthropic
         self._openai = openai
+        self._deadlines = deadline_seconds or {}
+        # Empty when hedging is off
+        self._hedge_after = hedge_after_seconds or {}
 
     async def enrich_shop(self, shop: ShopEnrichmentInput) -> EnrichmentResult:
-        return await self._anthropic.enrich_shop(shop)
+        return await self._call("enrich_shop", self._anthropic, lambda p: p.enrich_shop(shop))
 
     async def extract_menu_data(self, image_url: str) -> MenuExtractionResult:
-        return await self._openai.extract_menu_data(image_url)
+        return await self._call(
+            "extract_menu_data", self._openai, lambda p: p.extract_menu_data(image_url)
+        )
 
     async def classify_photo(self, image_url: str) -> PhotoCategory:
-        return await self._openai.classify_photo(image_url)
+        return await self._call(
+            "classify_photo", self._openai, lambda p: p.classify_photo(image_url)
+        )
+
+    async def classify_photos(self, image_urls: list[str]) -> list[PhotoCategory]:
+        return await self._call(
+            "classify_photos", self._openai, lambda p: p.classify_photos(image_urls)
+        )
 
     async def summarize_reviews(
         self,
         google_reviews: list[str],
         checkin_texts: list[str],
+        previous: ReviewSummaryResult | None = None,
     ) -> ReviewSummaryResult:
-        return await self._openai.summarize_reviews(
-            google_reviews=google_reviews,
-            checkin_texts=checkin_texts,
+        return await self._call(
+            "summarize_reviews",
+            self._openai,
+            lambda p: p.summarize_reviews(
+                google_reviews=google_reviews,
+                checkin_texts=checkin_texts,
+                previous=previous,
+            ),
         )
 
     async def assign_tarot(self, shop: ShopEnrichmentInput) -> TarotEnrichmentResult:
-        return await self._openai.assign_tarot(shop)
+        return await self._call("assign_tarot", self._openai, lambda p: p.assign_tarot(shop))
+
+    async def _call[T](
+        self, method: str, primary: LLMProvider, call: Callable[[LLMProvider], Awaitable[T]]
+    ) -> T:
+        deadline = self._deadlines.get(method)
+        hedge_after = self._hedge_after.get(method)
+        if hedge_after is None:
+            return await _bounded(call(primary), deadline)
+
+        started = time.monotonic()
+        first = asyncio.create_task(_bounded(call(primary), deadline))
+        tasks = [first]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if done:
+                return first.result()
+
+            alternate = self._openai if primary is self._anthropic else self._anthropic
+            logger.info(
+                "LLM call hedged",
+                method=method,
+                after_seconds=hedge_after,
+                to="openai" if alternate is self._openai else "anthropic",
+            )
+            second = asyncio.create_task(_bounded(call(alternate), deadline, hedge=True))
+            tasks.append(second)
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # The primary first when both finish together
+                for task in sorted(done, key=lambda t: t is not first):
+                    if task.exception() is None and acceptable_result(task.result()):
+                        logger.info(
+                            "LLM hedge settled",
+                            method=method,
+                            winner="hedge" if task is second else "primary",
+                            elapsed_seconds=round(time.monotonic() - started, 3),
+                        )
+                        for loser in pending:
+                            _detach(loser)
+                        return task.result()
+        except asyncio.CancelledError:
+            # The caller was cancelled: nobody is waiting for either call any more
+            for task in tasks:
+                task.cancel()
+            raise
+        # Neither result is usable: surface the primary's, as an unhedged call would
+        return first.result()
+
+    # --- Batch API: same per-method routing; the batch id joins one id per provider ---
+
+    def _batch_provider(self, name: str) -> LLMBatchProvider:
+        return cast("LLMBatchProvider", self._anthropic if name == "anthropic" else self._openai)
+
+    async def submit_batch(self, requests: list[LLMBatchRequest]) -> str:
+        by_provider: dict[str, list[LLMBatchRequest]] = {}
+        for request in requests:
+            name = "anthropic" if request.method == "enrich_shop" else "openai"
+            by_provider.setdefault(name, []).append(request)
+        parts = [
+            f"{name}:{await self._batch_provider(name).submit_batch(group)}"
+            for name, group in by_provider.items()
+        ]
+        return ",".join(parts)
+
+    @staticmethod
+    def _split_batch_id(batch_id: str) -> list[tuple[str, str]]:
+        return [
+            (name, provider_id)
+            for name, _, provider_id in (part.partition(":") for part in batch_id.split(","))
+        ]
+
+    async def batch_finished(self, batch_id: str) -> bool:
+        finished = await asyncio.gather(
+            *(
+                self._batch_provider(name).batch_finished(provider_id)
+                for name, provider_id in self._split_batch_id(batch_id)
+            )
+        )
+        return all(finished)
+
+    async def batch_results(self, batch_id: str) -> list[LLMBatchResult]:
+        results: list[LLMBatchResult] = []
+        for name, provider_id in self._split_batch_id(batch_id):
+            results.extend(await self._batch_provider(name).batch_results(provider_id))
+        return results
+
+    async def cancel_batch(self, batch_id: str) -> None:
+        await asyncio.gather(
+            *(
+                self._batch_provider(name).cancel_batch(provider_id)
+                for name, provider_id in self._split_batch_id(batch_id)
+            )
+        )
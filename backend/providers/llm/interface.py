@@ -1,4 +1,6 @@
-from typing import Protocol
+from typing import Literal, Protocol
+
+from pydantic import BaseModel
 
 from models.types import (
     EnrichmentResult,
@@ -19,8 +21,52 @@ class LLMProvider(Protocol):
 
     async def classify_photo(self, image_url: str) -> PhotoCategory: ...
 
+    # Several photos in one request; categories come back in input order
+    async def classify_photos(self, image_urls: list[str]) -> list[PhotoCategory]: ...
+
     async def summarize_reviews(
         self,
         google_reviews: list[str],
         checkin_texts: list[str],
+        # Incremental update: the stored summary, revised with texts written since it
+        previous: ReviewSummaryResult | None = None,
     ) -> ReviewSummaryResult: ...
+
+
+BatchMethod = Literal["enrich_shop", "summarize_reviews", "assign_tarot"]
+
+
+class LLMBatchRequest(BaseModel):
+    """One call in a provider batch; custom_id (e.g. the shop id) comes back on its result."""
+
+    custom_id: str
+    method: BatchMethod
+    # enrich_shop / assign_tarot
+    shop: ShopEnrichmentInput | None = None
+    # summarize_reviews
+    google_reviews: list[str] = []
+    checkin_texts: list[str] = []
+    previous: ReviewSummaryResult | None = None
+
+
+class LLMBatchResult(BaseModel):
+    custom_id: str
+    method: BatchMethod
+    result: EnrichmentResult | ReviewSummaryResult | TarotEnrichmentResult | None = None
+    error: str | None = None
+
+
+class LLMBatchProvider(Protocol):
+    """Asynchronous bulk execution: submit now, poll, then collect results (hours, not seconds).
+
+    Batch ids are opaque to callers. Results carry one entry per submitted custom_id;
+    a request the provider could not complete has error set and result None.
+    """
+
+    async def submit_batch(self, requests: list[LLMBatchRequest]) -> str: ...
+
+    async def batch_finished(self, batch_id: str) -> bool: ...
+
+    async def batch_results(self, batch_id: str) -> list[LLMBatchResult]: ...
+
+    async def cancel_batch(self, batch_id: str) -> None: ...
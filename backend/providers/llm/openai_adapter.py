@@ -5,7 +5,9 @@ This adapter rewraps them into OpenAI's function_calling envelope at call time.
 """
 
 import json
-from typing import Any, cast
+from typing import TYPE_CHECKING, Any, Final, cast
+
+from openai.types.chat import ChatCompletion
 
 from core.tarot_vocabulary import TAROT_TITLES, TITLE_TO_TAGS
 from models.types import (
@@ -20,21 +22,37 @@ from models.types import (
 )
 from providers.api_usage_logger import log_api_usage
 from providers.cost import compute_llm_cost
+from providers.llm._batch import decode_custom_id, encode_custom_id
+from providers.llm._packing import PromptPacker
 from providers.llm._tool_schemas import (
     ASSIGN_TAROT_SCHEMA,
     CLASSIFY_PHOTO_SCHEMA,
+    CLASSIFY_PHOTOS_SCHEMA,
     CLASSIFY_SHOP_SCHEMA,
+    CLASSIFY_SHOP_WITH_TAROT_SCHEMA,
     EXTRACT_MENU_SCHEMA,
     SUMMARIZE_REVIEWS_TOOL_SCHEMA,
 )
 from providers.llm.anthropic_adapter import (
-    _MENU_VOCAB_REF,
-    _SPECIALTY_VOCAB_REF,
-    _SUMMARIZE_SYSTEM_PROMPT,
+    ENRICH_TAROT_RULES,
     SYSTEM_PROMPT,
     TAROT_SYSTEM_PROMPT,
+    _build_enrich_reference,
     _parse_enrichment_payload,
+    _parse_photo_categories,
+    _summarize_prompt,
 )
+from providers.llm.interface import BatchMethod, LLMBatchRequest, LLMBatchResult
+
+if TYPE_CHECKING:
+    from openai import DefaultAsyncHttpxClient
+
+# OpenAI caches prompt prefixes of 1024+ tokens automatically; routing every enrich_shop
+# call with the same key keeps them on the same cache shard
+_ENRICH_PROMPT_CACHE_KEY = "caferoam:enrich_shop"
+
+_BATCH_ENDPOINT: Final = "/v1/chat/completions"
+_BATCH_TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
 
 
 def _wrap_schema_for_openai(schema: dict[str, Any]) -> dict[str, Any]:
@@ -69,11 +87,60 @@ def _extract_tool_input(response: Any, expected_name: str) -> dict[str, Any]:
         ) from exc
 
 
+def _log_usage(task: str, model: str, usage: Any, *, batch: bool = False) -> None:
+    """Log one call; prompt tokens served from OpenAI's prompt cache are billed separately."""
+    if usage is None:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None)
+    cached = cached if isinstance(cached, int) else 0
+    # prompt_tokens includes cached tokens; log them apart like Anthropic's usage does
+    uncached = (usage.prompt_tokens or 0) - cached
+    output = usage.completion_tokens or 0
+    log_api_usage(
+        provider="openai",
+        task=f"{task}_batch" if batch else task,
+        model=model,
+        tokens_input=uncached,
+        tokens_output=output,
+        tokens_cache_read=cached,
+        cost_usd=compute_llm_cost(model, uncached, output, tokens_cache_read=cached, batch=batch),
+    )
+
+
+def _tool_choice(name: str) -> dict[str, Any]:
+    return {"type": "function", "function": {"name": name}}
+
+
+def _parse_summary(tool_input: dict[str, Any]) -> ReviewSummaryResult:
+    return ReviewSummaryResult(
+        summary_zh_tw=tool_input["summary_zh_tw"],
+        review_topics=[
+            ReviewTopic(topic=t["topic"], count=t["count"])
+            for t in tool_input.get("review_topics", [])
+        ],
+    )
+
+
+def _parse_tarot(payload: dict[str, Any]) -> TarotEnrichmentResult:
+    title: str | None = payload.get("tarot_title")
+    if title not in TAROT_TITLES:
+        title = None
+    return TarotEnrichmentResult(
+        tarot_title=title,
+        flavor_text=payload.get("flavor_text", ""),
+    )
+
+
 def _build_enrich_messages(
     shop: ShopEnrichmentInput,
-    taxonomy: list[TaxonomyTag],
+    system_prompt: str,
 ) -> list[dict[str, Any]]:
-    """Build OpenAI messages list for enrich_shop."""
+    """Build OpenAI messages list for enrich_shop.
+
+    system_prompt carries the static instructions and taxonomy/vocabulary reference so the
+    cacheable prefix is identical across shops; only the user message varies.
+    """
     lines = [
         "Classify this coffee shop based on its reviews and attributes.",
         "",
@@ -97,27 +164,6 @@ def _build_enrich_messages(
         lines.append(f"Reviews ({len(shop.reviews)}):")
         for i, review in enumerate(shop.reviews, 1):
             lines.append(f"[{i}] {review}")
-    lines.append("")
-    lines.append("Available taxonomy tags (ONLY select from this list):")
-    for tag in taxonomy:
-        lines.append(f"  {tag.id} ({tag.dimension}) — {tag.label} / {tag.label_zh}")
-    lines.append("")
-    lines.append("Reference — food & drink items (use exact terms for menu_highlights):")
-    lines.append(_MENU_VOCAB_REF)
-    lines.append("")
-    lines.append(
-        "Reference — coffee origins, varieties & processing"
-        " (use Traditional Chinese names for coffee_origins):"
-    )
-    lines.append(_SPECIALTY_VOCAB_REF)
-    lines.append("")
-    lines.append(
-        "Instruction: When extracting coffee_origins, use the Traditional Chinese name"
-        " exactly as it appears in the reference list above"
-        " (e.g. 古吉 not 'Guji', 耶加雪菲 not 'Yirgacheffe')."
-        " For menu_highlights, prefer the Traditional Chinese term from the list"
-        " (e.g. 手沖 not 'pour over', 可頌 not 'croissant')."
-    )
     if shop.google_maps_features:
         feature_list = ", ".join(k for k, v in shop.google_maps_features.items() if v)
         if feature_list:
@@ -128,7 +174,7 @@ def _build_enrich_messages(
             )
     text_prompt = "\n".join(lines)
 
-    system_message = {"role": "system", "content": SYSTEM_PROMPT}
+    system_message = {"role": "system", "content": system_prompt}
     if not shop.vibe_photo_urls:
         return [system_message, {"role": "user", "content": text_prompt}]
 
@@ -156,45 +202,33 @@ class OpenAILLMAdapter:
         classify_model: str,
         nano_model: str,
         taxonomy: list[TaxonomyTag],
+        enrich_with_tarot: bool = False,
+        prompt_packer: PromptPacker | None = None,
+        http_client: "DefaultAsyncHttpxClient | None" = None,
     ) -> None:
         from openai import AsyncOpenAI
 
-        self._client = AsyncOpenAI(api_key=api_key)
+        self._client = AsyncOpenAI(api_key=api_key, http_client=http_client)
+        self._packer = prompt_packer
         self._model = model
         self._classify_model = classify_model
         self._nano_model = nano_model
         self._taxonomy = taxonomy
         self._taxonomy_by_id: dict[str, TaxonomyTag] = {tag.id: tag for tag in taxonomy}
+        system = SYSTEM_PROMPT + ENRICH_TAROT_RULES if enrich_with_tarot else SYSTEM_PROMPT
+        reference = _build_enrich_reference(taxonomy, with_tarot=enrich_with_tarot)
+        self._enrich_system_prompt = f"{system}\n\n{reference}"
+        # Combined mode: classify_shop also returns tarot_title / flavor_text
+        self._enrich_schema = (
+            CLASSIFY_SHOP_WITH_TAROT_SCHEMA if enrich_with_tarot else CLASSIFY_SHOP_SCHEMA
+        )
         # max_completion_tokens is used throughout this adapter because all targeted models
         # (gpt-5.4 series) support it. If this adapter is ever extended to non-reasoning
         # GPT models, replace max_completion_tokens with max_tokens for those calls.
 
     async def enrich_shop(self, shop: ShopEnrichmentInput) -> EnrichmentResult:
-        messages = _build_enrich_messages(shop, self._taxonomy)
-        response = await self._client.chat.completions.create(
-            model=self._model,
-            messages=cast("list[Any]", messages),
-            tools=cast("Any", [_wrap_schema_for_openai(CLASSIFY_SHOP_SCHEMA)]),
-            tool_choice=cast(
-                "Any",
-                {"type": "function", "function": {"name": "classify_shop"}},
-            ),
-            max_completion_tokens=2048,
-        )
-        _usage = response.usage
-        if _usage is not None:
-            log_api_usage(
-                provider="openai",
-                task="enrich_shop",
-                model=self._model,
-                tokens_input=_usage.prompt_tokens or 0,
-                tokens_output=_usage.completion_tokens or 0,
-                cost_usd=compute_llm_cost(
-                    self._model,
-                    _usage.prompt_tokens or 0,
-                    _usage.completion_tokens or 0,
-                ),
-            )
+        response = await self._client.chat.completions.create(**self._enrich_request(shop))
+        _log_usage("enrich_shop", self._model, response.usage)
         payload = _extract_tool_input(response, "classify_shop")
         return _parse_enrichment_payload(payload, self._taxonomy_by_id)
 
@@ -221,27 +255,11 @@ class OpenAILLMAdapter:
             model=self._classify_model,
             messages=cast("list[Any]", messages),
             tools=cast("Any", [_wrap_schema_for_openai(EXTRACT_MENU_SCHEMA)]),
-            tool_choice=cast(
-                "Any",
-                {"type": "function", "function": {"name": "extract_menu"}},
-            ),
+            tool_choice=cast("Any", _tool_choice("extract_menu")),
             max_completion_tokens=4096,
             temperature=0,
         )
-        _usage = response.usage
-        if _usage is not None:
-            log_api_usage(
-                provider="openai",
-                task="extract_menu_data",
-                model=self._classify_model,
-                tokens_input=_usage.prompt_tokens or 0,
-                tokens_output=_usage.completion_tokens or 0,
-                cost_usd=compute_llm_cost(
-                    self._classify_model,
-                    _usage.prompt_tokens or 0,
-                    _usage.completion_tokens or 0,
-                ),
-            )
+        _log_usage("extract_menu_data", self._classify_model, response.usage)
         payload = _extract_tool_input(response, "extract_menu")
         return MenuExtractionResult(
             items=payload.get("items", []) or [],
@@ -268,82 +286,179 @@ class OpenAILLMAdapter:
             model=self._classify_model,
             messages=cast("list[Any]", messages),
             tools=cast("Any", [_wrap_schema_for_openai(CLASSIFY_PHOTO_SCHEMA)]),
-            tool_choice=cast(
-                "Any",
-                {"type": "function", "function": {"name": "classify_photo"}},
-            ),
+            tool_choice=cast("Any", _tool_choice("classify_photo")),
             max_completion_tokens=128,
         )
-        _usage = response.usage
-        if _usage is not None:
-            log_api_usage(
-                provider="openai",
-                task="classify_photo",
-                model=self._classify_model,
-                tokens_input=_usage.prompt_tokens or 0,
-                tokens_output=_usage.completion_tokens or 0,
-                cost_usd=compute_llm_cost(
-                    self._classify_model,
-                    _usage.prompt_tokens or 0,
-                    _usage.completion_tokens or 0,
-                ),
-            )
+        _log_usage("classify_photo", self._classify_model, response.usage)
         payload = _extract_tool_input(response, "classify_photo")
         return PhotoCategory(payload["category"])
 
+    async def classify_photos(self, image_urls: list[str]) -> list[PhotoCategory]:
+        content: list[dict[str, Any]] = []
+        for i, url in enumerate(image_urls, 1):
+            content.append({"type": "text", "text": f"Photo {i}:"})
+            content.append({"type": "image_url", "image_url": {"url": url}})
+        content.append(
+            {
+                "type": "text",
+                "text": (
+                    f"Classify each of these {len(image_urls)} coffee shop photos. "
+                    "If both MENU and VIBE apply to a photo, choose MENU."
+                ),
+            }
+        )
+        messages: list[dict[str, Any]] = [{"role": "user", "content": content}]
+        response = await self._client.chat.completions.create(
+            model=self._classify_model,
+            messages=cast("list[Any]", messages),
+            tools=cast("Any", [_wrap_schema_for_openai(CLASSIFY_PHOTOS_SCHEMA)]),
+            tool_choice=cast("Any", _tool_choice("classify_photos")),
+            max_completion_tokens=128 + 64 * len(image_urls),
+        )
+        _log_usage("classify_photos", self._classify_model, response.usage)
+        payload = _extract_tool_input(response, "classify_photos")
+        return _parse_photo_categories(payload, len(image_urls))
+
     async def summarize_reviews(
         self,
         google_reviews: list[str],
         checkin_texts: list[str],
+        previous: ReviewSummaryResult | None = None,
     ) -> ReviewSummaryResult:
-        parts: list[str] = []
-        if google_reviews:
-            lines = "\n".join(f"[{i + 1}] {r}" for i, r in enumerate(google_reviews))
-            parts.append(f"Google 評論：\n{lines}")
-        if checkin_texts:
-            lines = "\n".join(f"[{i + 1}] {t}" for i, t in enumerate(checkin_texts))
-            parts.append(f"社群筆記（請優先參考）：\n{lines}")
-
-        user_content = "\n\n".join(parts)
-        wrapped = _wrap_schema_for_openai(SUMMARIZE_REVIEWS_TOOL_SCHEMA)
-        messages: list[dict[str, Any]] = [
-            {"role": "system", "content": _SUMMARIZE_SYSTEM_PROMPT},
-            {"role": "user", "content": user_content},
-        ]
         response = await self._client.chat.completions.create(
-            model=self._classify_model,
-            messages=cast("list[Any]", messages),
-            tools=cast("Any", [wrapped]),
-            tool_choice=cast(
-                "Any",
-                {"type": "function", "function": {"name": "summarize_reviews"}},
-            ),
-            max_completion_tokens=512,
+            **self._summarize_request(google_reviews, checkin_texts, previous)
         )
-        _usage = response.usage
-        if _usage is not None:
-            log_api_usage(
-                provider="openai",
-                task="summarize_reviews",
-                model=self._classify_model,
-                tokens_input=_usage.prompt_tokens or 0,
-                tokens_output=_usage.completion_tokens or 0,
-                cost_usd=compute_llm_cost(
-                    self._classify_model,
-                    _usage.prompt_tokens or 0,
-                    _usage.completion_tokens or 0,
-                ),
+        _log_usage("summarize_reviews", self._classify_model, response.usage)
+        return _parse_summary(_extract_tool_input(response, "summarize_reviews"))
+
+    async def assign_tarot(self, shop: ShopEnrichmentInput) -> TarotEnrichmentResult:
+        response = await self._client.chat.completions.create(**self._tarot_request(shop))
+        _log_usage("assign_tarot", self._nano_model, response.usage)
+        return _parse_tarot(_extract_tool_input(response, "assign_tarot"))
+
+    # --- Batch API (LLMBatchProvider) ---
+
+    async def submit_batch(self, requests: list[LLMBatchRequest]) -> str:
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": encode_custom_id(r.method, r.custom_id),
+                    "method": "POST",
+                    "url": _BATCH_ENDPOINT,
+                    "body": self._batch_body(r),
+                },
+                ensure_ascii=False,
             )
-        tool_input = _extract_tool_input(response, "summarize_reviews")
-        return ReviewSummaryResult(
-            summary_zh_tw=tool_input["summary_zh_tw"],
-            review_topics=[
-                ReviewTopic(topic=t["topic"], count=t["count"])
-                for t in tool_input.get("review_topics", [])
-            ],
+            for r in requests
+        ]
+        upload = await self._client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode()), purpose="batch"
+        )
+        batch = await self._client.batches.create(
+            input_file_id=upload.id, endpoint=_BATCH_ENDPOINT, completion_window="24h"
         )
+        return batch.id
 
-    async def assign_tarot(self, shop: ShopEnrichmentInput) -> TarotEnrichmentResult:
+    async def batch_finished(self, batch_id: str) -> bool:
+        batch = await self._client.batches.retrieve(batch_id)
+        return batch.status in _BATCH_TERMINAL_STATUSES
+
+    async def cancel_batch(self, batch_id: str) -> None:
+        await self._client.batches.cancel(batch_id)
+
+    async def batch_results(self, batch_id: str) -> list[LLMBatchResult]:
+        batch = await self._client.batches.retrieve(batch_id)
+        lines: list[str] = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                content = await self._client.files.content(file_id)
+                lines.extend(line for line in content.text.splitlines() if line.strip())
+
+        results: list[LLMBatchResult] = []
+        for line in lines:
+            entry = json.loads(line)
+            method, custom_id = decode_custom_id(entry["custom_id"])
+            response = entry.get("response") or {}
+            if entry.get("error") or response.get("status_code") != 200:
+                error = entry.get("error") or response.get("body", {}).get("error")
+                results.append(LLMBatchResult(custom_id=custom_id, method=method, error=str(error)))
+                continue
+            completion = ChatCompletion.model_validate(response["body"])
+            # completion.model is the dated snapshot name, which LLM_PRICING does not list
+            _log_usage(method, self._batch_model(method), completion.usage, batch=True)
+            try:
+                parsed = self._parse_batch(method, completion)
+            except Exception as exc:
+                results.append(LLMBatchResult(custom_id=custom_id, method=method, error=str(exc)))
+                continue
+            results.append(LLMBatchResult(custom_id=custom_id, method=method, result=parsed))
+        return results
+
+    def _batch_body(self, request: LLMBatchRequest) -> dict[str, Any]:
+        match request.method:
+            case "enrich_shop":
+                return self._enrich_request(cast("ShopEnrichmentInput", request.shop))
+            case "assign_tarot":
+                return self._tarot_request(cast("ShopEnrichmentInput", request.shop))
+            case "summarize_reviews":
+                return self._summarize_request(
+                    request.google_reviews, request.checkin_texts, request.previous
+                )
+
+    def _batch_model(self, method: BatchMethod) -> str:
+        match method:
+            case "enrich_shop":
+                return self._model
+            case "summarize_reviews":
+                return self._classify_model
+            case "assign_tarot":
+                return self._nano_model
+
+    def _parse_batch(
+        self, method: BatchMethod, response: Any
+    ) -> EnrichmentResult | ReviewSummaryResult | TarotEnrichmentResult:
+        match method:
+            case "enrich_shop":
+                payload = _extract_tool_input(response, "classify_shop")
+                return _parse_enrichment_payload(payload, self._taxonomy_by_id)
+            case "assign_tarot":
+                return _parse_tarot(_extract_tool_input(response, "assign_tarot"))
+            case "summarize_reviews":
+                return _parse_summary(_extract_tool_input(response, "summarize_reviews"))
+
+    # --- Request builders shared by interactive and batch calls ---
+
+    def _enrich_request(self, shop: ShopEnrichmentInput) -> dict[str, Any]:
+        if self._packer is not None:
+            shop = self._packer.pack_shop(shop)
+        return {
+            "model": self._model,
+            "messages": _build_enrich_messages(shop, self._enrich_system_prompt),
+            "prompt_cache_key": _ENRICH_PROMPT_CACHE_KEY,
+            "tools": [_wrap_schema_for_openai(self._enrich_schema)],
+            "tool_choice": _tool_choice("classify_shop"),
+            "max_completion_tokens": 2048,
+        }
+
+    def _summarize_request(
+        self,
+        google_reviews: list[str],
+        checkin_texts: list[str],
+        previous: ReviewSummaryResult | None = None,
+    ) -> dict[str, Any]:
+        system, content = _summarize_prompt(google_reviews, checkin_texts, previous, self._packer)
+        return {
+            "model": self._classify_model,
+            "messages": [
+                {"role": "system", "content": system},
+                {"role": "user", "content": content},
+            ],
+            "tools": [_wrap_schema_for_openai(SUMMARIZE_REVIEWS_TOOL_SCHEMA)],
+            "tool_choice": _tool_choice("summarize_reviews"),
+            "max_completion_tokens": 512,
+        }
+
+    def _tarot_request(self, shop: ShopEnrichmentInput) -> dict[str, Any]:
         lines = [f"Shop: {shop.name}"]
         if shop.description:
             lines.append(f"Description: {shop.description}")
@@ -353,40 +468,13 @@ class OpenAILLMAdapter:
         lines.append("Title-to-tag reference (pick the best match):")
         for tarot_title, tags in TITLE_TO_TAGS.items():
             lines.append(f"  {tarot_title}: {', '.join(tags)}")
-        prompt = "\n".join(lines)
-        messages: list[dict[str, Any]] = [
-            {"role": "system", "content": TAROT_SYSTEM_PROMPT},
-            {"role": "user", "content": prompt},
-        ]
-        response = await self._client.chat.completions.create(
-            model=self._nano_model,
-            messages=cast("list[Any]", messages),
-            tools=cast("Any", [_wrap_schema_for_openai(ASSIGN_TAROT_SCHEMA)]),
-            tool_choice=cast(
-                "Any",
-                {"type": "function", "function": {"name": "assign_tarot"}},
-            ),
-            max_completion_tokens=256,
-        )
-        _usage = response.usage
-        if _usage is not None:
-            log_api_usage(
-                provider="openai",
-                task="assign_tarot",
-                model=self._nano_model,
-                tokens_input=_usage.prompt_tokens or 0,
-                tokens_output=_usage.completion_tokens or 0,
-                cost_usd=compute_llm_cost(
-                    self._nano_model,
-                    _usage.prompt_tokens or 0,
-                    _usage.completion_tokens or 0,
-                ),
-            )
-        payload = _extract_tool_input(response, "assign_tarot")
-        title: str | None = payload.get("tarot_title")
-        if title not in TAROT_TITLES:
-            title = None
-        return TarotEnrichmentResult(
-            tarot_title=title,
-            flavor_text=payload.get("flavor_text", ""),
-        )
+        return {
+            "model": self._nano_model,
+            "messages": [
+                {"role": "system", "content": TAROT_SYSTEM_PROMPT},
+                {"role": "user", "content": "\n".join(lines)},
+            ],
+            "tools": [_wrap_schema_for_openai(ASSIGN_TAROT_SCHEMA)],
+            "tool_choice": _tool_choice("assign_tarot"),
+            "max_completion_tokens": 256,
+        }
@@ -0,0 +1,161 @@
+"""Process-wide provider adapters that keep their HTTP connections between jobs and requests.
+
+get_llm_provider() and get_embeddings_provider() build a fresh adapter, and with it a fresh
+AsyncAnthropic / AsyncOpenAI client, on every call, so each job or search request paid for
+a new connection pool, TLS handshake and DNS lookup. ProviderRegistry builds each adapter
+once per process, keyed by the settings it is built from and, for LLM adapters, by the
+taxonomy version. All adapters for one vendor share a single pooled httpx client sized by
+PROVIDER_HTTP_*. The API reaches it through FastAPI dependencies (api/deps.py) and the
+scheduler through get_provider_registry(); both close it on shutdown.
+
+Adapters hold no connections of their own, so replacing one (new taxonomy, changed
+settings) never interrupts a call still running on the old one.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, TypeVar, cast
+
+import structlog
+
+from core.config import settings
+from providers.embeddings import get_embeddings_provider
+from providers.llm import get_llm_batch_provider, get_llm_provider
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from anthropic import DefaultAsyncHttpxClient as AnthropicHttpClient
+    from openai import DefaultAsyncHttpxClient as OpenAIHttpClient
+
+    from models.types import TaxonomyTag
+    from providers.embeddings.interface import EmbeddingsProvider
+    from providers.llm.interface import LLMBatchProvider, LLMProvider
+
+logger = structlog.get_logger()
+
+T = TypeVar("T")
+
+# Settings an adapter is built from; a change to any of them builds a new adapter
+_LLM_SETTINGS = ("llm_", "anthropic_", "openai_")
+_EMBEDDINGS_SETTINGS = ("embeddings_", "openai_")
+# Adapters are cheap to keep; this only bounds taxonomy versions piling up
+_MAX_ADAPTERS = 8
+
+
+def taxonomy_version(taxonomy: list[TaxonomyTag] | None) -> str:
+    """Content hash of a taxonomy; "none" for adapters built without one."""
+    if taxonomy is None:
+        return "none"
+    canonical = json.dumps(
+        [tag.model_dump(mode="json") for tag in sorted(taxonomy, key=lambda t: t.id)],
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+def _settings_key(prefixes: tuple[str, ...]) -> str:
+    values = {k: v for k, v in settings.model_dump().items() if k.startswith(prefixes)}
+    return json.dumps(values, sort_keys=True, default=str)
+
+
+def _pool_limits() -> dict[str, Any]:
+    return {
+        "max_connections": settings.provider_http_max_connections,
+        "max_keepalive_connections": settings.provider_http_max_keepalive_connections,
+        "keepalive_expiry": settings.provider_http_keepalive_expiry_seconds,
+    }
+
+
+class ProviderRegistry:
+    def __init__(self) -> None:
+        self._adapters: OrderedDict[tuple[str, str, str], Any] = OrderedDict()
+        self._anthropic_http: AnthropicHttpClient | None = None
+        self._openai_http: OpenAIHttpClient | None = None
+
+    def llm(self, taxonomy: list[TaxonomyTag] | None = None) -> LLMProvider:
+        return self._get(
+            ("llm", _settings_key(_LLM_SETTINGS), taxonomy_version(taxonomy)),
+            lambda: get_llm_provider(
+                taxonomy,
+                anthropic_http_client=self.anthropic_http_client(),
+                openai_http_client=self.openai_http_client(),
+            ),
+        )
+
+    def llm_batch(self, taxonomy: list[TaxonomyTag] | None = None) -> LLMBatchProvider:
+        return self._get(
+            ("llm_batch", _settings_key(_LLM_SETTINGS), taxonomy_version(taxonomy)),
+            lambda: get_llm_batch_provider(
+                taxonomy,
+                anthropic_http_client=self.anthropic_http_client(),
+                openai_http_client=self.openai_http_client(),
+            ),
+        )
+
+    def embeddings(self) -> EmbeddingsProvider:
+        """Raises EmbeddingsProviderUnavailableError when the provider is not configured."""
+        return self._get(
+            ("embeddings", _settings_key(_EMBEDDINGS_SETTINGS), "none"),
+            lambda: get_embeddings_provider(http_client=self.openai_http_client()),
+        )
+
+    def anthropic_http_client(self) -> AnthropicHttpClient:
+        """The pooled client for the Anthropic SDK, built like its default one."""
+        if self._anthropic_http is None or self._anthropic_http.is_closed:
+            from anthropic import DEFAULT_CONNECTION_LIMITS, DefaultAsyncHttpxClient
+
+            self._anthropic_http = DefaultAsyncHttpxClient(
+                # The SDK's own Limits type: it is typed against the httpx it ships with
+                limits=type(DEFAULT_CONNECTION_LIMITS)(**_pool_limits())
+            )
+        return self._anthropic_http
+
+    def openai_http_client(self) -> OpenAIHttpClient:
+        """The pooled client for the OpenAI SDK, built like its default one."""
+        if self._openai_http is None or self._openai_http.is_closed:
+            from openai import DEFAULT_CONNECTION_LIMITS, DefaultAsyncHttpxClient
+
+            self._openai_http = DefaultAsyncHttpxClient(
+                limits=type(DEFAULT_CONNECTION_LIMITS)(**_pool_limits())
+            )
+        return self._openai_http
+
+    async def aclose(self) -> None:
+        """Close every pooled HTTP client; adapters are rebuilt on the next use."""
+        clients = [c for c in (self._anthropic_http, self._openai_http) if c is not None]
+        self._adapters.clear()
+        self._anthropic_http = self._openai_http = None
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception as exc:
+                logger.warning("Closing provider HTTP client failed", error=str(exc))
+        if clients:
+            logger.info("Provider HTTP clients closed", clients=len(clients))
+
+    def _get(self, key: tuple[str, str, str], build: Callable[[], T]) -> T:
+        adapter = self._adapters.get(key)
+        if adapter is None:
+            adapter = self._adapters[key] = build()
+            logger.info("Provider adapter created", kind=key[0], taxonomy_version=key[2])
+            while len(self._adapters) > _MAX_ADAPTERS:
+                self._adapters.popitem(last=False)
+        self._adapters.move_to_end(key)
+        return cast("T", adapter)
+
+
+_registry = ProviderRegistry()
+
+
+def get_provider_registry() -> ProviderRegistry:
+    """The process-wide registry; also usable as a FastAPI dependency."""
+    return _registry
+
+
+async def close_provider_registry() -> None:
+    await _registry.aclose()
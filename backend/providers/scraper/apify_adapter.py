@@ -1,7 +1,8 @@
 import asyncio
 import contextlib
+from collections.abc import AsyncGenerator
 from datetime import UTC, datetime, timedelta
-from typing import Any
+from typing import Any, cast
 
 import structlog
 from apify_client import ApifyClient
@@ -21,6 +22,10 @@ logger = structlog.get_logger()
 _ACTOR_ID = "compass/crawler-google-places"
 _PHOTO_MAX_AGE = timedelta(days=365 * 3)
 _PHOTO_CAP = 30
+# scrape_batch_stream: how often to poll the run's dataset, and the page size per read
+_STREAM_POLL_SECONDS = 5.0
+_STREAM_PAGE_SIZE = 100
+_TERMINAL_RUN_STATUSES = frozenset({"SUCCEEDED", "FAILED", "ABORTED", "TIMED-OUT"})
 
 _FEATURE_MAP: dict[str, str] = {
     "Outdoor seating": "outdoor_seating",
@@ -59,17 +64,7 @@ class ApifyScraperAdapter:
         if not shops:
             return []
 
-        url_to_shop_id: dict[str, str] = {}
-        for s in shops:
-            if s.google_maps_url in url_to_shop_id:
-                logger.warning(
-                    "scrape_batch: duplicate URL in input, skipping",
-                    url=s.google_maps_url[:80],
-                    kept_shop_id=url_to_shop_id[s.google_maps_url],
-                    dropped_shop_id=s.shop_id,
-                )
-            else:
-                url_to_shop_id[s.google_maps_url] = s.shop_id
+        url_to_shop_id = self._index_inputs(shops)
         start_urls = [{"url": url} for url in url_to_shop_id]
 
         results = await self._run_actor({**_ACTOR_BASE_INPUT, "startUrls": start_urls})
@@ -88,6 +83,52 @@ class ApifyScraperAdapter:
 
         return [BatchScrapeResult(shop_id=s.shop_id, data=matched.get(s.shop_id)) for s in shops]
 
+    async def scrape_batch_stream(
+        self, shops: list[BatchScrapeInput]
+    ) -> AsyncGenerator[BatchScrapeResult, None]:
+        """Scrape like scrape_batch, but yield each shop's result as its dataset item lands.
+
+        The actor is started rather than awaited, and its default dataset is read page by
+        page while it runs. Shops with no item are yielded with data=None once the run
+        has finished. Raises if the run ends in any status other than SUCCEEDED.
+        """
+        if not shops:
+            return
+
+        url_to_shop_id = self._index_inputs(shops)
+        start_urls = [{"url": url} for url in url_to_shop_id]
+        remaining = {s.shop_id for s in shops}
+
+        async for place in self._stream_actor({**_ACTOR_BASE_INPUT, "startUrls": start_urls}):
+            input_url = place.get("inputStartUrl", "")
+            shop_id = url_to_shop_id.get(input_url)
+            if not shop_id:
+                logger.warning("scrape_batch: no match for inputStartUrl", url=input_url[:80])
+            elif shop_id in remaining:
+                remaining.discard(shop_id)
+                yield BatchScrapeResult(shop_id=shop_id, data=self._parse_place(place))
+
+        for s in shops:
+            if s.shop_id in remaining:
+                remaining.discard(s.shop_id)
+                yield BatchScrapeResult(shop_id=s.shop_id, data=None)
+
+    @staticmethod
+    def _index_inputs(shops: list[BatchScrapeInput]) -> dict[str, str]:
+        """Map each distinct input URL to the first shop that requested it."""
+        url_to_shop_id: dict[str, str] = {}
+        for s in shops:
+            if s.google_maps_url in url_to_shop_id:
+                logger.warning(
+                    "scrape_batch: duplicate URL in input, skipping",
+                    url=s.google_maps_url[:80],
+                    kept_shop_id=url_to_shop_id[s.google_maps_url],
+                    dropped_shop_id=s.shop_id,
+                )
+            else:
+                url_to_shop_id[s.google_maps_url] = s.shop_id
+        return url_to_shop_id
+
     def _parse_place(self, place: dict[str, Any]) -> ScrapedShopData:
         """Parse a raw Apify place dict into ScrapedShopData."""
         location = place.get("location") or {}
@@ -211,5 +252,56 @@ class ApifyScraperAdapter:
         )
         return items
 
+    async def _stream_actor(
+        self,
+        run_input: dict[str, Any],
+        task_name: str = "scrape_batch",
+    ) -> AsyncGenerator[dict[str, Any], None]:
+        """Start the actor and yield dataset items while it runs (client calls in threads).
+
+        If the consumer stops early (e.g. the job is cancelled on shutdown) the run is
+        aborted so it stops spending compute units.
+        """
+        started = await asyncio.to_thread(self._client.actor(_ACTOR_ID).start, run_input=run_input)
+        run = cast("dict[str, Any]", started)
+        run_client = self._client.run(run["id"])
+        dataset = self._client.dataset(run["defaultDatasetId"])
+        offset = 0
+        info: dict[str, Any] | None = run
+        finished = False
+        try:
+            while True:
+                # Read the status before the items so nothing written in between is missed
+                latest = await asyncio.to_thread(run_client.get)
+                info = cast("dict[str, Any] | None", latest)
+                finished = info is None or info.get("status") in _TERMINAL_RUN_STATUSES
+                while True:
+                    page = await asyncio.to_thread(
+                        dataset.list_items, offset=offset, limit=_STREAM_PAGE_SIZE
+                    )
+                    for item in page.items:
+                        yield item
+                    offset += len(page.items)
+                    if len(page.items) < _STREAM_PAGE_SIZE:
+                        break
+                if finished:
+                    break
+                await asyncio.sleep(_STREAM_POLL_SECONDS)
+        finally:
+            if not finished:
+                with contextlib.suppress(Exception):
+                    await asyncio.to_thread(run_client.abort)
+            compute_units = (info or {}).get("stats", {}).get("computeUnits", 0.0)
+            log_api_usage(
+                provider="apify",
+                task=task_name,
+                compute_units=float(compute_units or 0.0),
+                cost_usd=None,
+            )
+
+        status = (info or {}).get("status")
+        if status != "SUCCEEDED":
+            raise RuntimeError(f"Apify run {run['id']} ended with status {status}")
+
     async def close(self) -> None:
         pass
@@ -1,3 +1,4 @@
+from collections.abc import AsyncGenerator
 from datetime import datetime
 from typing import Protocol, runtime_checkable
 
@@ -53,6 +54,12 @@ class ScraperProvider(Protocol):
         """Scrape multiple shops in a single Apify actor run."""
         ...
 
+    def scrape_batch_stream(
+        self, shops: list[BatchScrapeInput]
+    ) -> AsyncGenerator[BatchScrapeResult, None]:
+        """Like scrape_batch, but yield each shop's result as soon as it is scraped."""
+        ...
+
     async def close(self) -> None:
         """Clean up resources."""
         ...
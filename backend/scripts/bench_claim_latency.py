@@ -0,0 +1,163 @@
+"""Benchmark claim_jobs_multi latency as job_queue history grows.
+
+Seeds completed "history" rows in steps and, at each size, times the claim_jobs_multi call an
+idle worker process makes on each poll: every job type at its WORKER_CONCURRENCY_* limit, with
+provider-sharing types grouped at WORKER_PROVIDER_INITIAL_CONCURRENCY. With --backlog it seeds
+runnable pending jobs of other job types instead, which compete for the same pending indexes
+and are claimed alongside the bench's own jobs. The first claim at each step plans the
+statements and is not counted.
+
+Runs against the database in SUPABASE_URL and refuses to run in production. Timed claims use
+the admin_digest_email job type (a no-op if a worker happens to claim one). Every bench row
+carries payload.bench = <run id> and is deleted at the end unless --keep is passed. Backlog
+rows are real job types: stop the worker and the in-API scheduler before using --backlog.
+
+Usage (run from backend/, against local Supabase):
+    uv run python scripts/bench_claim_latency.py [--steps 0,10000,50000,100000] [--trials 30]
+    uv run python scripts/bench_claim_latency.py --backlog
+
+Recorded figures are in docs/ops/cron-jobs.md (Retention).
+"""
+
+import statistics
+import sys
+import time
+import uuid
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.config import settings
+from db.supabase_client import get_service_role_client
+from models.types import JobType
+from workers.concurrency import provider_key
+from workers.scheduler import _get_job_concurrency
+
+_JOB_TYPE = JobType.ADMIN_DIGEST_EMAIL.value
+_BACKLOG_TYPES = (
+    JobType.ENRICH_SHOP.value,
+    JobType.PUBLISH_SHOP.value,
+    JobType.GENERATE_EMBEDDING.value,
+)
+_INSERT_CHUNK = 1000
+_PENDING_PER_TRIAL = 5
+
+
+def _seed_history(db, run_id: str, count: int) -> None:
+    old = (datetime.now(UTC) - timedelta(days=1)).isoformat()
+    for start in range(0, count, _INSERT_CHUNK):
+        rows = [
+            {
+                "job_type": _JOB_TYPE,
+                "payload": {"bench": run_id},
+                "status": "completed",
+                "attempts": 1,
+                "scheduled_at": old,
+                "completed_at": old,
+            }
+            for _ in range(min(_INSERT_CHUNK, count - start))
+        ]
+        db.table("job_queue").insert(rows).execute()
+
+
+def _seed_backlog(db, run_id: str, count: int) -> None:
+    for start in range(0, count, _INSERT_CHUNK):
+        rows = [
+            {
+                "job_type": _BACKLOG_TYPES[i % len(_BACKLOG_TYPES)],
+                "payload": {"bench": run_id},
+                "status": "pending",
+            }
+            for i in range(start, start + min(_INSERT_CHUNK, count - start))
+        ]
+        db.table("job_queue").insert(rows).execute()
+
+
+def _claim_params() -> dict[str, Any]:
+    """Arguments of claim_all_job_types' claim_multi call with every slot free."""
+    job_types = list(JobType)
+    groups = {jt: provider_key(jt) for jt in job_types}
+    return {
+        "p_job_types": [jt.value for jt in job_types],
+        "p_limits": [_get_job_concurrency(jt) for jt in job_types],
+        "p_groups": [groups[jt] for jt in job_types],
+        "p_group_limits": {
+            key: settings.worker_provider_initial_concurrency
+            for key in groups.values()
+            if key is not None
+        },
+        "p_aging_seconds": settings.worker_priority_aging_seconds,
+        "p_aging_max": settings.worker_priority_aging_max,
+        "p_submission_share": settings.worker_submission_claim_share,
+    }
+
+
+def _time_claims(db, run_id: str, trials: int) -> list[float]:
+    params = _claim_params()
+    samples: list[float] = []
+    for trial in range(trials + 1):
+        db.table("job_queue").insert(
+            [
+                {"job_type": _JOB_TYPE, "payload": {"bench": run_id}, "status": "pending"}
+                for _ in range(_PENDING_PER_TRIAL)
+            ]
+        ).execute()
+        t0 = time.perf_counter()
+        db.rpc("claim_jobs_multi", params).execute()
+        if trial:
+            samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+def main(steps: list[int], trials: int, keep: bool, backlog: bool) -> None:
+    if settings.environment == "production":
+        print("Refusing to run against production.")
+        sys.exit(1)
+
+    db = get_service_role_client()
+    run_id = uuid.uuid4().hex[:8]
+    label = "backlog" if backlog else "history"
+    seed = _seed_backlog if backlog else _seed_history
+    print(f"\n=== claim_jobs_multi latency vs {label} size (run {run_id}) ===\n")
+    print(f"{label + ' rows':>14} {'p50 ms':>10} {'p95 ms':>10}")
+
+    seeded = 0
+    try:
+        for target in sorted(steps):
+            seed(db, run_id, target - seeded)
+            seeded = target
+            samples = _time_claims(db, run_id, trials)
+            p95 = statistics.quantiles(samples, n=20)[18] if len(samples) >= 2 else samples[0]
+            print(f"{seeded:>14,} {statistics.median(samples):>10.1f} {p95:>10.1f}")
+    finally:
+        if not keep:
+            db.table("job_queue").delete().eq("payload->>bench", run_id).execute()
+            print("\nBench rows deleted.")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--steps",
+        default="0,10000,50000,100000",
+        help="Comma-separated history sizes to measure at",
+    )
+    parser.add_argument("--trials", type=int, default=30, help="Claims timed per step")
+    parser.add_argument("--keep", action="store_true", help="Leave bench rows in place")
+    parser.add_argument(
+        "--backlog",
+        action="store_true",
+        help="Seed runnable pending jobs of other types instead of completed history",
+    )
+    args = parser.parse_args()
+
+    main(
+        steps=[int(s) for s in args.steps.split(",") if s],
+        trials=args.trials,
+        keep=args.keep,
+        backlog=args.backlog,
+    )
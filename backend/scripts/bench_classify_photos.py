@@ -0,0 +1,101 @@
+"""Benchmark photo classification: sequential loop vs concurrent vs multi-image requests.
+
+Runs classify_thumbnails against an in-process fake Vision provider, so it needs no API keys
+and spends nothing. Each fake request sleeps for a fixed round trip plus a per-image cost
+and reports token usage shaped like a Haiku Vision call: a fixed prompt + tool-schema
+overhead per request, ~120 input tokens per 400x225 thumbnail, and a short tool-call reply.
+The "sequential" row reproduces the old one-await-per-photo loop.
+
+Usage (run from backend/):
+    uv run python scripts/bench_classify_photos.py [--photos 30] [--rtt-ms 900]
+"""
+
+import asyncio
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.config import settings
+from models.types import PhotoCategory
+from workers.handlers.classify_shop_photos import classify_thumbnails, to_thumbnail_url
+
+_REQUEST_OVERHEAD_TOKENS = 350
+_IMAGE_TOKENS = 120
+_OUTPUT_TOKENS_BASE = 12
+_OUTPUT_TOKENS_PER_IMAGE = 14
+_PER_IMAGE_MS = 120
+
+
+@dataclass
+class _Usage:
+    requests: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+
+class FakeVisionLLM:
+    """Only the photo methods of LLMProvider; latency and tokens grow with images per call."""
+
+    def __init__(self, rtt_ms: int) -> None:
+        self._rtt = rtt_ms / 1000
+        self.usage = _Usage()
+
+    async def _call(self, n_images: int) -> None:
+        await asyncio.sleep(self._rtt + n_images * _PER_IMAGE_MS / 1000)
+        self.usage.requests += 1
+        self.usage.input_tokens += _REQUEST_OVERHEAD_TOKENS + n_images * _IMAGE_TOKENS
+        self.usage.output_tokens += _OUTPUT_TOKENS_BASE + n_images * _OUTPUT_TOKENS_PER_IMAGE
+
+    async def classify_photo(self, image_url: str) -> PhotoCategory:
+        await self._call(1)
+        return PhotoCategory.VIBE
+
+    async def classify_photos(self, image_urls: list[str]) -> list[PhotoCategory]:
+        await self._call(len(image_urls))
+        return [PhotoCategory.VIBE] * len(image_urls)
+
+
+async def _sequential(photos: list[dict], llm: FakeVisionLLM) -> None:
+    for photo in photos:
+        await llm.classify_photo(to_thumbnail_url(photo["url"]))
+
+
+async def _run(label: str, photos: list[dict], rtt_ms: int, per_request: int | None) -> None:
+    llm = FakeVisionLLM(rtt_ms)
+    t0 = time.perf_counter()
+    if per_request is None:
+        await _sequential(photos, llm)
+    else:
+        settings.worker_classify_photos_per_request = per_request
+        await classify_thumbnails(photos, llm)  # type: ignore[arg-type]
+    wall = time.perf_counter() - t0
+    u = llm.usage
+    print(f"{label:<28} {wall:>8.2f} {u.requests:>9} {u.input_tokens:>10,} {u.output_tokens:>10,}")
+
+
+async def main(n_photos: int, rtt_ms: int) -> None:
+    photos = [
+        {"id": f"p{i}", "url": f"https://lh5.googleusercontent.com/p/{i}=w1920-h1080-k-no"}
+        for i in range(n_photos)
+    ]
+    concurrency = settings.worker_classify_photo_concurrency
+    multi = settings.worker_classify_photos_per_request
+    print(f"\n=== Photo classification, {n_photos} photos, {rtt_ms}ms round trip ===\n")
+    print(f"{'mode':<28} {'wall s':>8} {'requests':>9} {'tokens in':>10} {'tokens out':>10}")
+    await _run("sequential (old loop)", photos, rtt_ms, None)
+    await _run(f"concurrent x{concurrency}, 1/request", photos, rtt_ms, 1)
+    await _run(f"concurrent x{concurrency}, {multi}/request", photos, rtt_ms, multi)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--photos", type=int, default=30, help="Photos per shop (scrape cap: 30)")
+    parser.add_argument("--rtt-ms", type=int, default=900, help="Fake request round trip")
+    args = parser.parse_args()
+
+    asyncio.run(main(n_photos=args.photos, rtt_ms=args.rtt_ms))
@@ -2,6 +2,8 @@
 
 Run against a set of shop IDs to measure whether the hybrid LLM routing
 meets the hard quality gates required before enabling OpenAI in production.
+The report also compares per-task latency (first call vs. warm prompt cache),
+cost, and prompt-cache hit ratio for both providers, read back from api_usage_log.
 
 Usage:
     uv run python -m scripts.eval_openai_routing --shops <id1> <id2> ...
@@ -12,9 +14,13 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import statistics
 import sys
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
@@ -22,10 +28,14 @@ from core.config import settings
 from core.lang import is_zh_dominant
 from core.tarot_vocabulary import TAROT_TITLES
 from db.supabase_client import get_service_role_client
-from models.types import ShopEnrichmentInput
+from models.types import ShopEnrichmentInput, TaxonomyTag
+from providers.api_usage_logger import cache_hit_ratio
 from providers.llm.anthropic_adapter import AnthropicLLMAdapter
 from providers.llm.openai_adapter import OpenAILLMAdapter
 
+if TYPE_CHECKING:
+    from collections.abc import Awaitable
+
 # Hard-gate thresholds
 SUMMARIZE_ZH_THRESHOLD = 0.95
 CLASSIFY_PHOTO_THRESHOLD = 0.90
@@ -41,6 +51,99 @@ class EvalResult:
     tarot_whitelist_rate: float
 
 
+@dataclass
+class CallStats:
+    """Latency and billed usage of one (provider, task) pair over the eval run."""
+
+    provider: str
+    task: str
+    latencies_ms: list[float] = field(default_factory=list)
+    cost_usd: float = 0.0
+    prompt_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+
+    @property
+    def cold_ms(self) -> float | None:
+        """First call — the prompt cache is empty (or expired) for this prefix."""
+        return self.latencies_ms[0] if self.latencies_ms else None
+
+    @property
+    def warm_p50_ms(self) -> float | None:
+        """Median of the remaining calls, which can be served from the prompt cache."""
+        return statistics.median(self.latencies_ms[1:]) if len(self.latencies_ms) > 1 else None
+
+    @property
+    def cache_hit_ratio(self) -> float | None:
+        uncached = self.prompt_tokens - self.cache_read_tokens - self.cache_write_tokens
+        return cache_hit_ratio(uncached, self.cache_write_tokens, self.cache_read_tokens)
+
+
+async def _timed[T](
+    stats: dict[tuple[str, str], CallStats], provider: str, task: str, call: Awaitable[T]
+) -> T:
+    t0 = time.perf_counter()
+    result = await call
+    entry = stats.setdefault((provider, task), CallStats(provider, task))
+    entry.latencies_ms.append((time.perf_counter() - t0) * 1000)
+    return result
+
+
+def add_usage(stats: dict[tuple[str, str], CallStats], rows: list[dict[str, Any]]) -> None:
+    """Fold api_usage_log rows written during the run into the matching CallStats."""
+    for row in rows:
+        key = (str(row["provider"]), str(row["task"]))
+        entry = stats.setdefault(key, CallStats(*key))
+        cache_read = int(row.get("tokens_cache_read") or 0)
+        cache_write = int(row.get("tokens_cache_write") or 0)
+        entry.cost_usd += float(row.get("cost_usd") or 0.0)
+        entry.cache_read_tokens += cache_read
+        entry.cache_write_tokens += cache_write
+        entry.prompt_tokens += int(row.get("tokens_input") or 0) + cache_read + cache_write
+
+
+def _fmt(value: float | None, spec: str) -> str:
+    return format(value, spec) if value is not None else "n/a"
+
+
+def render_latency_cost(stats: dict[tuple[str, str], CallStats]) -> list[str]:
+    """Markdown section: per-provider latency/cost/cache table, then OpenAI − Anthropic deltas."""
+    lines = [
+        "## Latency and cost",
+        "",
+        "| task | provider | calls | cold ms | warm p50 ms | cost usd | cache hit ratio |",
+        "| --- | --- | --- | --- | --- | --- | --- |",
+    ]
+    for (provider, task), entry in sorted(stats.items(), key=lambda kv: (kv[0][1], kv[0][0])):
+        lines.append(
+            f"| {task} | {provider} | {len(entry.latencies_ms)} | "
+            f"{_fmt(entry.cold_ms, '.0f')} | {_fmt(entry.warm_p50_ms, '.0f')} | "
+            f"{entry.cost_usd:.4f} | {_fmt(entry.cache_hit_ratio, '.2f')} |"
+        )
+    lines.extend(
+        [
+            "",
+            "| task | warm p50 delta ms (openai − anthropic) | cost delta usd |",
+            "| --- | --- | --- |",
+        ]
+    )
+    for task in sorted({task for _, task in stats}):
+        anthropic = stats.get(("anthropic", task))
+        openai = stats.get(("openai", task))
+        if anthropic is None or openai is None:
+            continue
+        latency_delta = (
+            openai.warm_p50_ms - anthropic.warm_p50_ms
+            if openai.warm_p50_ms is not None and anthropic.warm_p50_ms is not None
+            else None
+        )
+        lines.append(
+            f"| {task} | {_fmt(latency_delta, '+.0f')} | "
+            f"{openai.cost_usd - anthropic.cost_usd:+.4f} |"
+        )
+    return lines
+
+
 def evaluate_hard_gates(results: EvalResult) -> tuple[bool, list[str]]:
     """Check each metric against its threshold.
 
@@ -77,6 +180,8 @@ async def run_eval(shop_ids: list[str]) -> EvalResult:
     """Run the eval against the given shop IDs."""
 
     db = get_service_role_client()
+    started_at = datetime.now(UTC)
+    call_stats: dict[tuple[str, str], CallStats] = {}
     shop_fields = (
         "id, name, description, categories, price_range, socket, limited_time, "
         "rating, review_count, google_maps_features"
@@ -105,18 +210,23 @@ async def run_eval(shop_ids: list[str]) -> EvalResult:
         shop_ids = [row["id"] for row in rows]
         prefetched_rows = {row["id"]: row for row in rows}
 
+    # Real taxonomy so enrich_shop prompts (and their cached prefix) match production
+    taxonomy_rows = await asyncio.to_thread(
+        lambda: db.table("taxonomy_tags").select("*").execute().data
+    )
+    taxonomy = [TaxonomyTag(**row) for row in taxonomy_rows]
     anthropic_adapter = AnthropicLLMAdapter(
         api_key=settings.anthropic_api_key,
         model=settings.anthropic_model,
         classify_model=settings.anthropic_classify_model,
-        taxonomy=[],
+        taxonomy=taxonomy,
     )
     openai_adapter = OpenAILLMAdapter(
         api_key=settings.openai_api_key,
         model=settings.openai_llm_model,
         classify_model=settings.openai_llm_classify_model,
         nano_model=settings.openai_llm_nano_model,
-        taxonomy=[],
+        taxonomy=taxonomy,
     )
 
     def _rate(lst: list[bool]) -> float:
@@ -191,9 +301,20 @@ async def run_eval(shop_ids: list[str]) -> EvalResult:
         shop_menu_recalls: list[float] = []
         shop_tarot_results: list[bool] = []
 
+        for provider, adapter in (("anthropic", anthropic_adapter), ("openai", openai_adapter)):
+            try:
+                await _timed(call_stats, provider, "enrich_shop", adapter.enrich_shop(shop_input))
+            except Exception as exc:
+                print(f"Warning: {provider} enrich_shop failed for {shop['name']}: {exc}")
+
         if reviews:
             try:
-                summary = await openai_adapter.summarize_reviews(reviews)
+                summary = await _timed(
+                    call_stats,
+                    "openai",
+                    "summarize_reviews",
+                    openai_adapter.summarize_reviews(reviews),
+                )
                 zh_ok = is_zh_dominant(summary)
                 zh_pass_list.append(zh_ok)
                 shop_zh_results.append(zh_ok)
@@ -202,8 +323,15 @@ async def run_eval(shop_ids: list[str]) -> EvalResult:
 
         for image_url in vibe_photo_urls:
             try:
-                openai_label = await openai_adapter.classify_photo(image_url)
-                anthropic_label = await anthropic_adapter.classify_photo(image_url)
+                openai_label = await _timed(
+                    call_stats, "openai", "classify_photo", openai_adapter.classify_photo(image_url)
+                )
+                anthropic_label = await _timed(
+                    call_stats,
+                    "anthropic",
+                    "classify_photo",
+                    anthropic_adapter.classify_photo(image_url),
+                )
                 agreed = openai_label == anthropic_label
                 classify_agree_list.append(agreed)
                 shop_photo_results.append(agreed)
@@ -212,8 +340,18 @@ async def run_eval(shop_ids: list[str]) -> EvalResult:
 
         for image_url in menu_photo_urls:
             try:
-                openai_result = await openai_adapter.extract_menu_data(image_url)
-                anthropic_result = await anthropic_adapter.extract_menu_data(image_url)
+                openai_result = await _timed(
+                    call_stats,
+                    "openai",
+                    "extract_menu_data",
+                    openai_adapter.extract_menu_data(image_url),
+                )
+                anthropic_result = await _timed(
+                    call_stats,
+                    "anthropic",
+                    "extract_menu_data",
+                    anthropic_adapter.extract_menu_data(image_url),
+                )
                 openai_count = len(openai_result.items)
                 anthropic_count = len(anthropic_result.items)
                 # Both models returned nothing — no signal, skip sample.
@@ -240,7 +378,9 @@ async def run_eval(shop_ids: list[str]) -> EvalResult:
                 print(f"Warning: extract_menu_data failed for {shop['name']}: {exc}")
 
         try:
-            tarot_result = await openai_adapter.assign_tarot(shop_input)
+            tarot_result = await _timed(
+                call_stats, "openai", "assign_tarot", openai_adapter.assign_tarot(shop_input)
+            )
             tarot_ok = tarot_result.tarot_title in TAROT_TITLES
             tarot_list.append(tarot_ok)
             shop_tarot_results.append(tarot_ok)
@@ -268,6 +408,18 @@ async def run_eval(shop_ids: list[str]) -> EvalResult:
         tarot_whitelist_rate=_rate(tarot_list),
     )
 
+    usage_rows = await asyncio.to_thread(
+        lambda: (
+            db.table("api_usage_log")
+            .select("provider, task, tokens_input, tokens_cache_write, tokens_cache_read, cost_usd")
+            .in_("provider", ["anthropic", "openai"])
+            .gte("created_at", started_at.isoformat())
+            .execute()
+            .data
+        )
+    )
+    add_usage(call_stats, usage_rows)
+
     report_path = (
         Path(__file__).parent.parent.parent / "docs" / "evals" / "2026-04-10-openai-routing-eval.md"
     )
@@ -292,6 +444,8 @@ async def run_eval(shop_ids: list[str]) -> EvalResult:
             f"- classify_photo_agreement: {result.classify_photo_agreement:.3f}",
             f"- extract_menu_item_recall: {result.extract_menu_item_recall:.3f}",
             f"- tarot_whitelist_rate: {result.tarot_whitelist_rate:.3f}",
+            "",
+            *render_latency_cost(call_stats),
         ]
     )
     report_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
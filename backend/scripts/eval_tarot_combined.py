@@ -0,0 +1,325 @@
+"""Eval gate for combined enrichment (LLM_ENRICH_WITH_TAROT).
+
+Runs the same shops through both paths and compares tarot quality:
+  separate — enrich_shop, then assign_tarot on the provider production routes it to
+  combined — one enrich_shop call whose classify_shop tool also returns the tarot fields
+
+Per path it reports the whitelist rate (title in TAROT_TITLES), tag fit (the title's
+TITLE_TO_TAGS overlaps the tags the shop was enriched with), flavor-text validity
+(non-empty, at most 80 characters) and the billed tokens/cost read back from
+api_usage_log. It also checks that adding the tarot fields leaves the enrichment itself
+intact (tag Jaccard between the two enrich_shop calls) and how often both paths pick the
+same title. The separate path runs for every shop before the combined one so the usage
+rows of each phase can be told apart by time.
+
+Usage:
+    uv run python -m scripts.eval_tarot_combined --shops <id1> <id2> ...
+    uv run python -m scripts.eval_tarot_combined --auto
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.config import settings
+from core.tarot_vocabulary import TAROT_TITLES, TITLE_TO_TAGS
+from db.supabase_client import get_service_role_client
+from models.types import TaxonomyTag
+from providers.llm.anthropic_adapter import AnthropicLLMAdapter
+from providers.llm.openai_adapter import OpenAILLMAdapter
+from workers.handlers.enrich_shop import load_enrichment_input
+
+if TYPE_CHECKING:
+    from models.types import EnrichmentResult, ShopEnrichmentInput, TarotEnrichmentResult
+    from providers.llm.interface import LLMProvider
+
+# Hard-gate thresholds
+TAROT_WHITELIST_THRESHOLD = 1.0
+FLAVOR_VALID_THRESHOLD = 0.95
+TAG_FIT_MAX_DROP = 0.05
+ENRICH_TAG_JACCARD_THRESHOLD = 0.8
+
+_FLAVOR_MAX_CHARS = 80
+
+
+@dataclass
+class PathStats:
+    """Tarot quality and billed usage of one path (separate or combined) over the run."""
+
+    whitelisted: list[bool] = field(default_factory=list)
+    tag_fit: list[bool] = field(default_factory=list)
+    flavor_valid: list[bool] = field(default_factory=list)
+    tokens_input: int = 0
+    tokens_output: int = 0
+    cost_usd: float = 0.0
+
+    def add(self, tarot: TarotEnrichmentResult | None, tag_ids: set[str]) -> None:
+        title = tarot.tarot_title if tarot else None
+        flavor = tarot.flavor_text if tarot else ""
+        self.whitelisted.append(title in TAROT_TITLES)
+        self.tag_fit.append(bool(title) and bool(set(TITLE_TO_TAGS.get(str(title), [])) & tag_ids))
+        self.flavor_valid.append(0 < len(flavor) <= _FLAVOR_MAX_CHARS)
+
+    def add_usage(self, rows: list[dict[str, Any]]) -> None:
+        for row in rows:
+            self.tokens_input += int(row.get("tokens_input") or 0)
+            self.tokens_input += int(row.get("tokens_cache_write") or 0)
+            self.tokens_input += int(row.get("tokens_cache_read") or 0)
+            self.tokens_output += int(row.get("tokens_output") or 0)
+            self.cost_usd += float(row.get("cost_usd") or 0.0)
+
+
+@dataclass
+class EvalResult:
+    separate: PathStats
+    combined: PathStats
+    title_agreement: float
+    enrich_tag_jaccard: float
+
+
+def _rate(values: list[bool]) -> float:
+    return sum(values) / len(values) if values else 1.0
+
+
+def tag_jaccard(a: EnrichmentResult, b: EnrichmentResult) -> float:
+    ids_a = {tag.id for tag in a.tags}
+    ids_b = {tag.id for tag in b.tags}
+    if not ids_a and not ids_b:
+        return 1.0
+    return len(ids_a & ids_b) / len(ids_a | ids_b)
+
+
+def evaluate_hard_gates(result: EvalResult) -> tuple[bool, list[str]]:
+    """Combined mode must match the separate call's tarot quality and leave enrichment intact.
+
+    Returns:
+        (passed, failures) where failures is a list of descriptive failure strings.
+    """
+    failures: list[str] = []
+    combined = result.combined
+
+    whitelist = _rate(combined.whitelisted)
+    if whitelist < TAROT_WHITELIST_THRESHOLD:
+        failures.append(
+            f"combined tarot_whitelist_rate {whitelist:.3f} < threshold {TAROT_WHITELIST_THRESHOLD}"
+        )
+    flavor = _rate(combined.flavor_valid)
+    if flavor < FLAVOR_VALID_THRESHOLD:
+        failures.append(
+            f"combined flavor_valid_rate {flavor:.3f} < threshold {FLAVOR_VALID_THRESHOLD}"
+        )
+    fit_drop = _rate(result.separate.tag_fit) - _rate(combined.tag_fit)
+    if fit_drop > TAG_FIT_MAX_DROP:
+        failures.append(f"combined tag_fit_rate drops {fit_drop:.3f} > max {TAG_FIT_MAX_DROP}")
+    if result.enrich_tag_jaccard < ENRICH_TAG_JACCARD_THRESHOLD:
+        failures.append(
+            f"enrich_tag_jaccard {result.enrich_tag_jaccard:.3f} "
+            f"< threshold {ENRICH_TAG_JACCARD_THRESHOLD}"
+        )
+
+    return len(failures) == 0, failures
+
+
+def render_report(result: EvalResult, rows: list[dict[str, str]]) -> list[str]:
+    lines = [
+        "# Combined Tarot Enrichment Eval",
+        "",
+        "| shop_name | separate title | combined title |",
+        "| --- | --- | --- |",
+    ]
+    lines.extend(f"| {r['shop_name']} | {r['separate']} | {r['combined']} |" for r in rows)
+    lines.extend(
+        [
+            "",
+            "## Summary",
+            "",
+            "| path | whitelist | tag fit | flavor valid | tokens in | tokens out | cost usd |",
+            "| --- | --- | --- | --- | --- | --- | --- |",
+        ]
+    )
+    for name, stats in (("separate", result.separate), ("combined", result.combined)):
+        lines.append(
+            f"| {name} | {_rate(stats.whitelisted):.3f} | {_rate(stats.tag_fit):.3f} | "
+            f"{_rate(stats.flavor_valid):.3f} | {stats.tokens_input:,} | "
+            f"{stats.tokens_output:,} | {stats.cost_usd:.4f} |"
+        )
+    lines.extend(
+        [
+            "",
+            f"- title_agreement: {result.title_agreement:.3f}",
+            f"- enrich_tag_jaccard: {result.enrich_tag_jaccard:.3f}",
+        ]
+    )
+    return lines
+
+
+def _tarot_provider(taxonomy: list[TaxonomyTag]) -> LLMProvider:
+    """Provider production sends assign_tarot to: OpenAI unless LLM_PROVIDER=anthropic."""
+    if settings.llm_provider == "anthropic":
+        return AnthropicLLMAdapter(
+            api_key=settings.anthropic_api_key,
+            model=settings.anthropic_model,
+            classify_model=settings.anthropic_classify_model,
+            taxonomy=taxonomy,
+        )
+    return OpenAILLMAdapter(
+        api_key=settings.openai_api_key,
+        model=settings.openai_llm_model,
+        classify_model=settings.openai_llm_classify_model,
+        nano_model=settings.openai_llm_nano_model,
+        taxonomy=taxonomy,
+    )
+
+
+def _usage_rows(db: Any, start: datetime, end: datetime) -> list[dict[str, Any]]:
+    return (
+        db.table("api_usage_log")
+        .select("tokens_input, tokens_output, tokens_cache_write, tokens_cache_read, cost_usd")
+        .in_("task", ["enrich_shop", "assign_tarot"])
+        .gte("created_at", start.isoformat())
+        .lt("created_at", end.isoformat())
+        .execute()
+        .data
+    )
+
+
+async def run_eval(shop_ids: list[str]) -> EvalResult:
+    """Run both paths against the given shop IDs (or 20 live shops) and write the report."""
+    db = get_service_role_client()
+    if not shop_ids:
+        rows = await asyncio.to_thread(
+            lambda: (
+                db.table("shops")
+                .select("id")
+                .not_.is_("enriched_at", "null")
+                .eq("processing_status", "live")
+                .limit(20)
+                .execute()
+                .data
+            )
+        )
+        shop_ids = [row["id"] for row in rows]
+
+    # Real taxonomy so enrich_shop prompts match production
+    taxonomy_rows = await asyncio.to_thread(
+        lambda: db.table("taxonomy_tags").select("*").execute().data
+    )
+    taxonomy = [TaxonomyTag(**row) for row in taxonomy_rows]
+    enrich_kwargs = {
+        "api_key": settings.anthropic_api_key,
+        "model": settings.anthropic_model,
+        "classify_model": settings.anthropic_classify_model,
+        "taxonomy": taxonomy,
+    }
+    separate_llm = AnthropicLLMAdapter(**enrich_kwargs)
+    combined_llm = AnthropicLLMAdapter(**enrich_kwargs, enrich_with_tarot=True)
+    tarot_llm = _tarot_provider(taxonomy)
+
+    inputs: dict[str, ShopEnrichmentInput] = {}
+    for shop_id in shop_ids:
+        inputs[shop_id] = await asyncio.to_thread(load_enrichment_input, db, shop_id)
+
+    separate: dict[str, tuple[EnrichmentResult, TarotEnrichmentResult]] = {}
+    separate_start = datetime.now(UTC)
+    for shop_id, shop in inputs.items():
+        try:
+            enrichment = await separate_llm.enrich_shop(shop)
+            separate[shop_id] = (enrichment, await tarot_llm.assign_tarot(shop))
+        except Exception as exc:
+            print(f"Warning: separate path failed for {shop.name}: {exc}")
+
+    combined: dict[str, EnrichmentResult] = {}
+    combined_start = datetime.now(UTC)
+    for shop_id, shop in inputs.items():
+        try:
+            combined[shop_id] = await combined_llm.enrich_shop(shop)
+        except Exception as exc:
+            print(f"Warning: combined path failed for {shop.name}: {exc}")
+    combined_end = datetime.now(UTC)
+
+    result = EvalResult(
+        separate=PathStats(), combined=PathStats(), title_agreement=1.0, enrich_tag_jaccard=1.0
+    )
+    report_rows: list[dict[str, str]] = []
+    agreements: list[bool] = []
+    jaccards: list[float] = []
+    for shop_id in shop_ids:
+        if shop_id not in separate or shop_id not in combined:
+            continue
+        base_enrichment, base_tarot = separate[shop_id]
+        enrichment = combined[shop_id]
+        result.separate.add(base_tarot, {tag.id for tag in base_enrichment.tags})
+        result.combined.add(enrichment.tarot, {tag.id for tag in enrichment.tags})
+        combined_title = enrichment.tarot.tarot_title if enrichment.tarot else None
+        agreements.append(combined_title == base_tarot.tarot_title)
+        jaccards.append(tag_jaccard(base_enrichment, enrichment))
+        report_rows.append(
+            {
+                "shop_name": inputs[shop_id].name,
+                "separate": str(base_tarot.tarot_title),
+                "combined": str(combined_title),
+            }
+        )
+    result.title_agreement = _rate(agreements)
+    result.enrich_tag_jaccard = sum(jaccards) / len(jaccards) if jaccards else 1.0
+
+    result.separate.add_usage(
+        await asyncio.to_thread(_usage_rows, db, separate_start, combined_start)
+    )
+    result.combined.add_usage(
+        await asyncio.to_thread(_usage_rows, db, combined_start, combined_end)
+    )
+
+    report_path = (
+        Path(__file__).parent.parent.parent
+        / "docs"
+        / "evals"
+        / f"{date.today().isoformat()}-tarot-combined-eval.md"
+    )
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text("\n".join(render_report(result, report_rows)) + "\n", encoding="utf-8")
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Eval gate for combined tarot enrichment")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument(
+        "--shops",
+        nargs="+",
+        metavar="SHOP_ID",
+        help="Explicit list of shop IDs to evaluate",
+    )
+    group.add_argument(
+        "--auto",
+        action="store_true",
+        help="Auto-select 20 enriched live shops",
+    )
+    args = parser.parse_args()
+
+    try:
+        result = asyncio.run(run_eval(args.shops or []))
+    except Exception as exc:
+        print(f"Unexpected eval error: {exc}")
+        return 1
+    passed, failures = evaluate_hard_gates(result)
+
+    if passed:
+        print("PASS — combined enrichment matches separate tarot quality")
+        return 0
+    print("FAIL — hard gate failures:")
+    for f in failures:
+        print(f"  - {f}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,8 +3,12 @@
 Finds all shops where description exists but contains no CJK characters,
 then runs enrich → embed → publish on each (no scraping — data already exists).
 
+With --batch, every shop goes into one provider batch (half price, results within 24h)
+instead of one interactive call each. The script returns once the batch is submitted;
+the worker's LLM_BATCH_POLL job writes the results and chains summarize → embed → publish.
+
 Usage (run from backend/):
-    uv run python scripts/reenrich_english_only.py [--dry-run] [--concurrency 3]
+    uv run python scripts/reenrich_english_only.py [--dry-run] [--concurrency 3] [--batch]
 """
 
 import asyncio
@@ -17,9 +21,10 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from db.supabase_client import get_service_role_client
 from models.types import TaxonomyTag
 from providers.embeddings import get_embeddings_provider
-from providers.llm import get_llm_provider
+from providers.llm import get_llm_batch_provider, get_llm_provider
 from workers.handlers.enrich_shop import handle_enrich_shop
 from workers.handlers.generate_embedding import handle_generate_embedding
+from workers.handlers.llm_batch_poll import submit_llm_batch
 from workers.handlers.publish_shop import handle_publish_shop
 from workers.queue import JobQueue
 
@@ -87,7 +92,7 @@ async def reenrich_shop(
     return result
 
 
-async def main(dry_run: bool, concurrency: int) -> None:
+async def main(dry_run: bool, concurrency: int, batch: bool) -> None:
     print("\n=== Re-enrich English-only shop descriptions ===\n")
 
     db = get_service_role_client()
@@ -106,10 +111,21 @@ async def main(dry_run: bool, concurrency: int) -> None:
         print("\nDry-run — stopping here.")
         return
 
-    print(f"\nStarting re-enrichment (concurrency={concurrency})…\n")
-
     taxonomy = [TaxonomyTag(**t) for t in db.table("taxonomy_tags").select("*").execute().data]
     queue = JobQueue(db)
+
+    if batch:
+        batch_id = await submit_llm_batch(
+            "enrich_shop",
+            [s["id"] for s in shops],
+            db,
+            get_llm_batch_provider(taxonomy=taxonomy),
+            queue,
+        )
+        print(f"\nSubmitted LLM batch {batch_id}; the worker collects it via llm_batch_poll.\n")
+        return
+
+    print(f"\nStarting re-enrichment (concurrency={concurrency})…\n")
     sem = asyncio.Semaphore(concurrency)
     t_start = time.monotonic()
 
@@ -138,6 +154,9 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--dry-run", action="store_true", help="List shops without re-enriching")
     parser.add_argument("--concurrency", type=int, default=3, help="Parallel workers (default 3)")
+    parser.add_argument(
+        "--batch", action="store_true", help="Submit one provider batch instead of live calls"
+    )
     args = parser.parse_args()
 
-    asyncio.run(main(dry_run=args.dry_run, concurrency=args.concurrency))
+    asyncio.run(main(dry_run=args.dry_run, concurrency=args.concurrency, batch=args.batch))
@@ -4,8 +4,7 @@ from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 from api.admin_shops import router
-from api.deps import get_current_user
-from providers.embeddings import get_embeddings_provider
+from api.deps import get_current_user, get_embeddings
 from tests.factories import make_shop_row
 
 # Create a test app with just this router
@@ -274,6 +273,37 @@ class TestAdminShopEnqueue:
         finally:
             test_app.dependency_overrides.clear()
 
+    def test_enqueue_can_bypass_the_llm_result_cache(self):
+        """bypass_llm_cache=true is carried on the job payload so the worker asks the model again."""
+        test_app.dependency_overrides[get_current_user] = _admin_user
+        try:
+            mock_db = MagicMock()
+            select_rv = mock_db.table.return_value.select.return_value
+            eq3_rv = select_rv.eq.return_value.eq.return_value.eq.return_value
+            eq3_rv.execute.return_value = MagicMock(data=[])
+            mock_db.table.return_value.insert.return_value.execute.return_value = MagicMock(
+                data=[{"id": "job-1"}]
+            )
+            with (
+                patch("api.admin_shops.get_service_role_client", return_value=mock_db),
+                patch("middleware.admin_audit.get_service_role_client", return_value=mock_db),
+                patch("api.deps.settings") as mock_settings,
+            ):
+                mock_settings.admin_user_ids = [_ADMIN_ID]
+                response = client.post(
+                    "/admin/shops/shop-1/enqueue",
+                    json={"job_type": "enrich_shop", "bypass_llm_cache": True},
+                )
+            assert response.status_code == 200
+            job_rows = [
+                c.args[0]
+                for c in mock_db.table.return_value.insert.call_args_list
+                if isinstance(c.args[0], dict) and c.args[0].get("job_type") == "enrich_shop"
+            ]
+            assert job_rows[0]["payload"] == {"shop_id": "shop-1", "bypass_llm_cache": True}
+        finally:
+            test_app.dependency_overrides.clear()
+
     def test_admin_can_trigger_scrape_batch_job(self):
         """Admin can manually trigger a SCRAPE_BATCH job for a single shop."""
         test_app.dependency_overrides[get_current_user] = _admin_user
@@ -494,7 +524,7 @@ class TestAdminShopSearchRank:
         mock_provider = MagicMock()
         mock_provider.embed = AsyncMock(return_value=[0.1] * 1536)
         test_app.dependency_overrides[get_current_user] = _admin_user
-        test_app.dependency_overrides[get_embeddings_provider] = lambda: mock_provider
+        test_app.dependency_overrides[get_embeddings] = lambda: mock_provider
         try:
             mock_db = MagicMock()
             search_results = [
@@ -256,7 +256,7 @@ class TestBulkApprove:
         test_app.dependency_overrides.clear()
 
     def test_bulk_approve_transitions_shops_and_queues_jobs(self):
-        """Approved shops transition to pending and a single SCRAPE_BATCH job is queued."""
+        """Approved shops transition to pending and SCRAPE_BATCH shard jobs are queued."""
         shop_id = "a1b2c3d4-e5f6-7890-abcd-ef1234567890"
         maps_url = "https://maps.google.com/?cid=11111111111111111"
         mock_db = MagicMock()
@@ -290,9 +290,11 @@ class TestBulkApprove:
 
         # Verify enqueued job is SCRAPE_BATCH with correct shops payload
         job_inserts = [
-            c.args[0]
+            row
             for c in mock_db.table.return_value.insert.call_args_list
-            if isinstance(c.args[0], dict) and "job_type" in c.args[0]
+            if isinstance(c.args[0], list)
+            for row in c.args[0]
+            if "job_type" in row
         ]
         assert job_inserts, "Expected a job_queue insert"
         assert job_inserts[0]["job_type"] == "scrape_batch"
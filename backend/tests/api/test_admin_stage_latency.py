@@ -0,0 +1,57 @@
+from datetime import UTC, datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from fastapi.testclient import TestClient
+
+from api.deps import get_current_user
+from main import app
+
+client = TestClient(app)
+
+_ADMIN_ID = "a7f3c2e1-4b58-4d9a-8c6e-123456789abc"
+
+
+def _admin_user():
+    return {"id": _ADMIN_ID}
+
+
+def _stage(p95: float, **extra) -> dict:
+    return {
+        "job_type": "enrich_shop",
+        "step": "llm_call",
+        "samples": 40,
+        "p50_ms": p95 / 2,
+        "p95_ms": p95,
+        "p99_ms": p95,
+        "max_ms": p95,
+        **extra,
+    }
+
+
+def test_stage_latency_returns_rolling_daily_and_regressions():
+    """The endpoint reports the rolling window, stored rollups, and stages that doubled."""
+    yesterday = (datetime.now(UTC).date() - timedelta(days=1)).isoformat()
+    mock_db = MagicMock()
+    mock_db.rpc.return_value.execute.return_value = MagicMock(data=[_stage(5000)])
+    mock_db.table.return_value.select.return_value.gte.return_value.lt.return_value.order.return_value.execute.return_value = MagicMock(
+        data=[_stage(2000, day=yesterday)]
+    )
+    app.dependency_overrides[get_current_user] = _admin_user
+    try:
+        with (
+            patch("api.admin.get_service_role_client", return_value=mock_db),
+            patch("api.deps.settings") as mock_deps_settings,
+        ):
+            mock_deps_settings.admin_user_ids = [_ADMIN_ID]
+            response = client.get("/admin/pipeline/stage-latency?hours=6")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["window_hours"] == 6
+    assert data["rolling"][0]["p95_ms"] == 5000
+    assert data["daily"][0]["day"] == yesterday
+    assert data["regressions"][0]["ratio"] == 2.5
+    mock_db.rpc.assert_called_once()
+    assert mock_db.rpc.call_args.args[0] == "job_stage_latency"
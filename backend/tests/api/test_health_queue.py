@@ -0,0 +1,125 @@
+from unittest.mock import MagicMock, patch
+
+from fastapi.testclient import TestClient
+
+import main
+from api.deps import require_admin
+from workers.metrics import reset_metrics
+
+
+def _depth_client(rows: list[dict], workers: list[dict] | None = None) -> MagicMock:
+    db = MagicMock()
+    db.rpc.return_value.execute.return_value = MagicMock(data=rows)
+    db.table.return_value.select.return_value.gte.return_value.execute.return_value = MagicMock(
+        data=workers or []
+    )
+    return db
+
+
+def _worker(holder_id: str, enrich: dict) -> dict:
+    return {
+        "holder_id": holder_id,
+        "updated_at": "2026-04-15T00:00:00+00:00",
+        "snapshot": {
+            "last_poll_at": "2026-04-15T00:00:00+00:00",
+            "job_types": {"enrich_shop": enrich},
+            "provider_throttles": {},
+        },
+    }
+
+
+class TestHealthQueue:
+    def setup_method(self):
+        reset_metrics()
+        main.app.dependency_overrides[require_admin] = lambda: {"id": "test-admin"}
+
+    def teardown_method(self):
+        main.app.dependency_overrides.pop(require_admin, None)
+
+    def test_reports_depth_and_limits_per_job_type(self):
+        """The JSON view merges queue depth from the RPC with published worker limits."""
+        db = _depth_client(
+            [
+                {
+                    "job_type": "enrich_shop",
+                    "pending": 7,
+                    "claimed": 2,
+                    "oldest_pending_age_seconds": 42.5,
+                }
+            ],
+            [_worker("worker-a", {"in_flight": 1, "limit": 3, "backing_off": False})],
+        )
+        with patch("workers.scheduler.get_service_role_client", return_value=db):
+            response = TestClient(main.app).get("/health/queue")
+
+        assert response.status_code == 200
+        enrich = response.json()["job_types"]["enrich_shop"]
+        assert enrich["pending"] == 7
+        assert enrich["claimed"] == 2
+        assert enrich["oldest_pending_age_seconds"] == 42.5
+        assert enrich["limit"] == 3
+        assert enrich["backing_off"] is False
+        assert response.json()["job_types"]["publish_shop"]["pending"] == 0
+        db.rpc.assert_called_once_with("get_job_queue_depth", {})
+
+    def test_sums_every_worker_snapshot(self):
+        """Counts, in-flight and limits add up across worker processes; backoff is any-of."""
+        db = _depth_client(
+            [],
+            [
+                _worker(
+                    "worker-a",
+                    {
+                        "in_flight": 2,
+                        "limit": 3,
+                        "backing_off": False,
+                        "claimed": 5,
+                        "completed": 4,
+                        "run_seconds": [1.0, 2.0],
+                    },
+                ),
+                _worker(
+                    "worker-b",
+                    {
+                        "in_flight": 1,
+                        "limit": 3,
+                        "backing_off": True,
+                        "claimed": 2,
+                        "completed": 2,
+                        "run_seconds": [9.0],
+                    },
+                ),
+            ],
+        )
+        with patch("workers.scheduler.get_service_role_client", return_value=db):
+            response = TestClient(main.app).get("/health/queue")
+
+        body = response.json()
+        enrich = body["job_types"]["enrich_shop"]
+        assert enrich["in_flight"] == 3
+        assert enrich["limit"] == 6
+        assert enrich["backing_off"] is True
+        assert enrich["claimed_total"] == 7
+        assert enrich["completed_total"] == 6
+        assert enrich["run_seconds_p95"] == 9.0
+        assert set(body["workers"]) == {"worker-a", "worker-b"}
+        assert body["workers"]["worker-b"]["job_types"]["enrich_shop"]["completed_total"] == 2
+        db.table.assert_called_once_with("worker_metrics")
+
+    def test_prometheus_format(self):
+        """format=prometheus returns the text exposition format with a job_type label."""
+        db = _depth_client(
+            [{"job_type": "generate_embedding", "pending": 3, "claimed": 0}],
+            [_worker("worker-a", {"completed": 4})],
+        )
+        with patch("workers.scheduler.get_service_role_client", return_value=db):
+            response = TestClient(main.app).get("/health/queue?format=prometheus")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'caferoam_jobs_pending{job_type="generate_embedding"} 3.0' in response.text
+        assert "# TYPE caferoam_jobs_completed_total counter" in response.text
+        assert (
+            'caferoam_jobs_completed_total{job_type="enrich_shop",worker="worker-a"} 4.0'
+            in response.text
+        )
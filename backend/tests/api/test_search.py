@@ -1,3 +1,5 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -11,6 +13,7 @@ from api.deps import (
 from main import app
 from providers.analytics import get_analytics_provider
 from providers.cache.null_adapter import NullSearchCacheAdapter
+from providers.registry import get_provider_registry
 
 client = TestClient(app)
 
@@ -21,6 +24,14 @@ def _mock_admin_db():
     return mock
 
 
+@contextmanager
+def _embeddings_factory() -> Iterator[MagicMock]:
+    """Serve /search a mock provider registry; yields its embeddings() to configure."""
+    registry = MagicMock()
+    app.dependency_overrides[get_provider_registry] = lambda: registry
+    yield registry.embeddings
+
+
 class TestSearchAPI:
     @pytest.fixture(autouse=True)
     def patch_cache(self):
@@ -38,7 +49,7 @@ class TestSearchAPI:
         app.dependency_overrides[get_optional_user_db] = lambda: mock_db
         app.dependency_overrides[get_admin_db] = lambda: _mock_admin_db()
         try:
-            with patch("api.search.get_embeddings_provider") as mock_emb_factory:
+            with _embeddings_factory() as mock_emb_factory:
                 mock_emb = AsyncMock()
                 mock_emb.embed = AsyncMock(return_value=[0.1] * 1536)
                 mock_emb.dimensions = 1536
@@ -58,7 +69,7 @@ class TestSearchAPI:
         app.dependency_overrides[get_optional_user_db] = lambda: mock_db
         app.dependency_overrides[get_admin_db] = lambda: _mock_admin_db()
         try:
-            with patch("api.search.get_embeddings_provider") as mock_emb_factory:
+            with _embeddings_factory() as mock_emb_factory:
                 mock_emb = AsyncMock()
                 mock_emb.embed = AsyncMock(return_value=[0.1] * 1536)
                 mock_emb.dimensions = 1536
@@ -86,7 +97,7 @@ class TestSearchAPI:
         app.dependency_overrides[get_optional_user_db] = lambda: mock_db
         app.dependency_overrides[get_admin_db] = lambda: mock_admin_db
         try:
-            with patch("api.search.get_embeddings_provider") as mock_emb_factory:
+            with _embeddings_factory() as mock_emb_factory:
                 mock_emb = AsyncMock()
                 mock_emb.embed = AsyncMock(return_value=[0.1] * 1536)
                 mock_emb_factory.return_value = mock_emb
@@ -119,7 +130,7 @@ class TestSearchAPI:
         app.dependency_overrides[get_optional_user_db] = lambda: mock_db
         app.dependency_overrides[get_admin_db] = lambda: _mock_admin_db()
         try:
-            with patch("api.search.get_embeddings_provider") as mock_emb_factory:
+            with _embeddings_factory() as mock_emb_factory:
                 mock_emb = AsyncMock()
                 mock_emb.embed = AsyncMock(return_value=[0.1] * 1536)
                 mock_emb_factory.return_value = mock_emb
@@ -169,7 +180,7 @@ class TestSearchAPI:
         app.dependency_overrides[get_optional_user_db] = lambda: mock_db
         app.dependency_overrides[get_admin_db] = lambda: _mock_admin_db()
         try:
-            with patch("api.search.get_embeddings_provider") as mock_emb_factory:
+            with _embeddings_factory() as mock_emb_factory:
                 mock_emb = AsyncMock()
                 mock_emb.embed = AsyncMock(return_value=[0.1] * 1536)
                 mock_emb.dimensions = 1536
@@ -199,7 +210,7 @@ class TestSearchAPI:
         app.dependency_overrides[get_optional_user_db] = lambda: mock_db
         app.dependency_overrides[get_admin_db] = lambda: _mock_admin_db()
         try:
-            with patch("api.search.get_embeddings_provider") as mock_emb_factory:
+            with _embeddings_factory() as mock_emb_factory:
                 mock_emb = AsyncMock()
                 mock_emb.embed = AsyncMock(return_value=[0.1] * 1536)
                 mock_emb_factory.return_value = mock_emb
@@ -226,7 +237,7 @@ class TestSearchAPI:
         app.dependency_overrides[get_admin_db] = lambda: _mock_admin_db()
         app.dependency_overrides[get_analytics_provider] = lambda: mock_analytics
         try:
-            with patch("api.search.get_embeddings_provider") as mock_emb_factory:
+            with _embeddings_factory() as mock_emb_factory:
                 mock_emb = AsyncMock()
                 mock_emb.embed = AsyncMock(return_value=[0.1] * 1536)
                 mock_emb_factory.return_value = mock_emb
@@ -246,7 +257,7 @@ class TestSearchAPI:
         app.dependency_overrides[get_optional_user_db] = lambda: MagicMock()
         app.dependency_overrides[get_admin_db] = lambda: _mock_admin_db()
         try:
-            with patch("api.search.get_embeddings_provider") as mock_emb_factory:
+            with _embeddings_factory() as mock_emb_factory:
                 mock_emb_factory.side_effect = EmbeddingsProviderUnavailableError(
                     "OPENAI_API_KEY is not set"
                 )
@@ -271,7 +282,7 @@ class TestSearchCacheAPI:
         app.dependency_overrides[get_admin_db] = lambda: mock_admin
         try:
             with (
-                patch("api.search.get_embeddings_provider") as mock_emb_factory,
+                _embeddings_factory() as mock_emb_factory,
                 patch("api.search.get_search_cache_provider") as mock_cache_factory,
             ):
                 mock_emb = AsyncMock()
@@ -324,7 +335,7 @@ class TestUnauthenticatedSearch:
         app.dependency_overrides[get_optional_user_db] = lambda: mock_db
         app.dependency_overrides[get_admin_db] = lambda: _mock_admin_db()
         try:
-            with patch("api.search.get_embeddings_provider") as mock_emb_factory:
+            with _embeddings_factory() as mock_emb_factory:
                 mock_emb = AsyncMock()
                 mock_emb.embed = AsyncMock(return_value=[0.1] * 1536)
                 mock_emb.dimensions = 1536
@@ -345,7 +356,7 @@ class TestUnauthenticatedSearch:
         app.dependency_overrides[get_optional_user_db] = lambda: mock_db
         app.dependency_overrides[get_admin_db] = lambda: _mock_admin_db()
         try:
-            with patch("api.search.get_embeddings_provider") as mock_emb_factory:
+            with _embeddings_factory() as mock_emb_factory:
                 mock_emb = AsyncMock()
                 mock_emb.embed = AsyncMock(return_value=[0.1] * 1536)
                 mock_emb.dimensions = 1536
@@ -367,7 +378,7 @@ class TestUnauthenticatedSearch:
         app.dependency_overrides[get_optional_user_db] = lambda: mock_db
         app.dependency_overrides[get_admin_db] = lambda: _mock_admin_db()
         try:
-            with patch("api.search.get_embeddings_provider") as mock_emb_factory:
+            with _embeddings_factory() as mock_emb_factory:
                 mock_emb = AsyncMock()
                 mock_emb.embed = AsyncMock(return_value=[0.1] * 1536)
                 mock_emb.dimensions = 1536
@@ -2,7 +2,15 @@ from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
-from models.types import ReviewSummaryResult, ShopEnrichmentInput, ShopModeScores, TaxonomyTag
+from models.types import (
+    PhotoCategory,
+    ReviewSummaryResult,
+    ReviewTopic,
+    ShopEnrichmentInput,
+    ShopModeScores,
+    TaxonomyTag,
+)
+from providers.llm._packing import PromptPacker
 from providers.llm._tool_schemas import SUMMARIZE_REVIEWS_TOOL_SCHEMA
 from providers.llm.anthropic_adapter import AnthropicLLMAdapter
 
@@ -203,16 +211,15 @@ class TestAnthropicEnrichShop:
 
         await adapter.enrich_shop(SAMPLE_SHOP)
 
-        call_args = adapter._client.messages.create.call_args
-        messages = call_args.kwargs.get("messages") or call_args[1].get("messages")
-        user_msg = messages[0]["content"]
+        system = adapter._client.messages.create.call_args.kwargs["system"]
+        reference = system[-1]["text"]
 
-        assert "巴斯克蛋糕" in user_msg  # food zh (only in ITEM_TERMS)
-        assert "愛樂壓" in user_msg  # drink zh (only in ITEM_TERMS, not in taxonomy)
-        assert "古吉" in user_msg  # Ethiopian sub-origin zh (only in SPECIALTY_TERMS)
-        assert "耶加雪菲" in user_msg  # origin zh (only in SPECIALTY_TERMS)
-        assert "日曬" in user_msg  # processing zh (only in SPECIALTY_TERMS)
-        assert "Traditional Chinese" in user_msg  # instruction present
+        assert "巴斯克蛋糕" in reference  # food zh (only in ITEM_TERMS)
+        assert "愛樂壓" in reference  # drink zh (only in ITEM_TERMS, not in taxonomy)
+        assert "古吉" in reference  # Ethiopian sub-origin zh (only in SPECIALTY_TERMS)
+        assert "耶加雪菲" in reference  # origin zh (only in SPECIALTY_TERMS)
+        assert "日曬" in reference  # processing zh (only in SPECIALTY_TERMS)
+        assert "Traditional Chinese" in reference  # instruction present
 
     async def test_prompt_includes_taxonomy(self, adapter):
         mock_response = _make_tool_use_response(
@@ -228,15 +235,32 @@ class TestAnthropicEnrichShop:
 
         await adapter.enrich_shop(SAMPLE_SHOP)
 
-        call_args = adapter._client.messages.create.call_args
-        messages = call_args.kwargs.get("messages") or call_args[1].get("messages")
-        user_msg = messages[0]["content"]
+        reference = adapter._client.messages.create.call_args.kwargs["system"][-1]["text"]
 
         # All 4 taxonomy tags should appear
-        assert "quiet" in user_msg
-        assert "deep_work" in user_msg
-        assert "wifi_available" in user_msg
-        assert "pour_over" in user_msg
+        assert "quiet" in reference
+        assert "deep_work" in reference
+        assert "wifi_available" in reference
+        assert "pour_over" in reference
+
+    async def test_static_reference_is_a_cached_system_block(self, adapter):
+        """Taxonomy and vocabulary sit behind a cache breakpoint, identical for every shop."""
+        mock_response = _make_tool_use_response(
+            {"tags": [], "summary": "Test.", "topReviews": [], "mode": "mixed"}
+        )
+        adapter._client = AsyncMock()
+        adapter._client.messages.create = AsyncMock(return_value=mock_response)
+        other_shop = SAMPLE_SHOP.model_copy(update={"name": "Other Cafe", "reviews": ["不錯"]})
+
+        await adapter.enrich_shop(SAMPLE_SHOP)
+        await adapter.enrich_shop(other_shop)
+
+        first, second = (c.kwargs for c in adapter._client.messages.create.call_args_list)
+        assert first["system"] == second["system"]
+        assert first["system"][-1]["cache_control"] == {"type": "ephemeral"}
+        user_msg = first["messages"][0]["content"]
+        assert "deep_work" not in user_msg
+        assert "巴斯克蛋糕" not in user_msg
 
     async def test_uses_forced_tool_choice(self, adapter):
         mock_response = _make_tool_use_response(
@@ -256,6 +280,69 @@ class TestAnthropicEnrichShop:
         tool_choice = call_args.kwargs.get("tool_choice") or call_args[1].get("tool_choice")
         assert tool_choice == {"type": "tool", "name": "classify_shop"}
 
+    async def test_combined_mode_returns_validated_tarot_from_classify_shop(self):
+        """With enrich_with_tarot, one classify_shop call carries the tarot fields too."""
+        adapter = AnthropicLLMAdapter(
+            api_key="test-key",
+            model="claude-sonnet-4-6",
+            classify_model="claude-haiku-4-5-20251001",
+            taxonomy=SAMPLE_TAXONOMY,
+            enrich_with_tarot=True,
+        )
+        mock_response = _make_tool_use_response(
+            {
+                "tags": [{"id": "quiet", "confidence": 0.9}],
+                "summary": "安靜的咖啡廳",
+                "mode": "work",
+                "tarot_title": "The Scholar's Refuge",
+                "flavor_text": "Where quiet minds gather.",
+            }
+        )
+        adapter._client = AsyncMock()
+        adapter._client.messages.create = AsyncMock(return_value=mock_response)
+
+        result = await adapter.enrich_shop(SAMPLE_SHOP)
+
+        assert result.tarot is not None
+        assert result.tarot.tarot_title == "The Scholar's Refuge"
+        kwargs = adapter._client.messages.create.call_args.kwargs
+        assert "tarot_title" in kwargs["tools"][0]["input_schema"]["required"]
+        assert "The Scholar's Refuge: quiet" in kwargs["system"][-1]["text"]
+
+    async def test_combined_mode_drops_title_not_in_whitelist(self):
+        """A combined-mode tarot title outside TAROT_TITLES is discarded like assign_tarot's."""
+        adapter = AnthropicLLMAdapter(
+            api_key="test-key",
+            model="claude-sonnet-4-6",
+            classify_model="claude-haiku-4-5-20251001",
+            taxonomy=SAMPLE_TAXONOMY,
+            enrich_with_tarot=True,
+        )
+        adapter._client = AsyncMock()
+        adapter._client.messages.create = AsyncMock(
+            return_value=_make_tool_use_response(
+                {"tags": [], "summary": "測試", "mode": "mixed", "tarot_title": "The Fool"}
+            )
+        )
+
+        result = await adapter.enrich_shop(SAMPLE_SHOP)
+
+        assert result.tarot is not None
+        assert result.tarot.tarot_title is None
+
+    async def test_default_mode_leaves_tarot_unset(self, adapter):
+        """Without combined mode the classify_shop tool has no tarot fields."""
+        adapter._client = AsyncMock()
+        adapter._client.messages.create = AsyncMock(
+            return_value=_make_tool_use_response({"tags": [], "summary": "測試", "mode": "mixed"})
+        )
+
+        result = await adapter.enrich_shop(SAMPLE_SHOP)
+
+        assert result.tarot is None
+        tool = adapter._client.messages.create.call_args.kwargs["tools"][0]
+        assert "tarot_title" not in tool["input_schema"]["properties"]
+
     async def test_empty_tags_returns_zero_confidence(self, adapter):
         mock_response = _make_tool_use_response(
             {
@@ -359,6 +446,34 @@ def _make_menu_tool_response(tool_input: dict) -> MagicMock:
     return response
 
 
+class TestAnthropicPromptPacking:
+    async def test_enrich_prompt_sends_packed_reviews(self):
+        """With a PromptPacker, duplicate reviews never reach the enrich_shop prompt."""
+        adapter = AnthropicLLMAdapter(
+            api_key="test-key",
+            model="claude-sonnet-4-6",
+            classify_model="claude-haiku-4-5-20251001",
+            taxonomy=SAMPLE_TAXONOMY,
+            prompt_packer=PromptPacker(
+                budgets={"enrich_shop": 1000}, max_text_tokens=200, duplicate_threshold=0.7
+            ),
+        )
+        adapter._client = AsyncMock()
+        adapter._client.messages.create = AsyncMock(
+            return_value=_make_tool_use_response(
+                {"tags": [], "summary": "安靜", "topReviews": [], "mode": "work"}
+            )
+        )
+        shop = SAMPLE_SHOP.model_copy(
+            update={"reviews": ["很安靜適合工作", "很安靜，適合工作！", "咖啡很好喝"]}
+        )
+
+        await adapter.enrich_shop(shop)
+
+        prompt = adapter._client.messages.create.call_args.kwargs["messages"][0]["content"]
+        assert "Reviews (2):\n[1] 很安靜適合工作\n[2] 咖啡很好喝" in prompt
+
+
 class TestAnthropicExtractMenuData:
     @pytest.fixture
     def adapter(self):
@@ -424,6 +539,19 @@ class TestAnthropicExtractMenuData:
         assert result.items == []
         assert result.raw_text is None
 
+    async def test_menu_vocabulary_is_a_cached_system_block(self, adapter):
+        """The menu vocabulary moves out of the per-photo message into the cached system prompt."""
+        mock_response = _make_menu_tool_response({"items": []})
+        adapter._client = AsyncMock()
+        adapter._client.messages.create = AsyncMock(return_value=mock_response)
+
+        await adapter.extract_menu_data("https://example.com/menu.jpg")
+
+        kwargs = adapter._client.messages.create.call_args.kwargs
+        assert kwargs["system"][0]["cache_control"] == {"type": "ephemeral"}
+        assert "手沖" in kwargs["system"][0]["text"]
+        assert "手沖" not in kwargs["messages"][0]["content"][1]["text"]
+
     async def test_uses_forced_tool_choice(self, adapter):
         mock_response = _make_menu_tool_response({"items": []})
         adapter._client = AsyncMock()
@@ -449,6 +577,37 @@ def _make_summarize_tool_response(tool_input: dict) -> MagicMock:
     return response
 
 
+class TestAnthropicClassifyPhotos:
+    @pytest.fixture
+    def adapter(self):
+        return AnthropicLLMAdapter(
+            api_key="test-key",
+            model="claude-sonnet-4-6",
+            classify_model="claude-haiku-4-5-20251001",
+            taxonomy=SAMPLE_TAXONOMY,
+        )
+
+    async def test_labels_each_image_and_maps_categories_back(self, adapter):
+        """Each image follows a "Photo N:" label; categories come back in input order."""
+        tool_block = MagicMock(
+            type="tool_use",
+            input={"photos": [{"index": 1, "category": "VIBE"}, {"index": 2, "category": "MENU"}]},
+        )
+        tool_block.name = "classify_photos"
+        adapter._client = AsyncMock()
+        adapter._client.messages.create = AsyncMock(return_value=MagicMock(content=[tool_block]))
+
+        result = await adapter.classify_photos(["https://cdn/a.jpg", "https://cdn/b.jpg"])
+
+        assert result == [PhotoCategory.VIBE, PhotoCategory.MENU]
+        call_kwargs = adapter._client.messages.create.call_args.kwargs
+        content = call_kwargs["messages"][0]["content"]
+        assert content[0] == {"type": "text", "text": "Photo 1:"}
+        assert content[1]["source"]["url"] == "https://cdn/a.jpg"
+        assert call_kwargs["model"] == "claude-haiku-4-5-20251001"
+        assert call_kwargs["tool_choice"] == {"type": "tool", "name": "classify_photos"}
+
+
 class TestAnthropicSummarizeReviews:
     @pytest.fixture
     def adapter(self):
@@ -520,6 +679,31 @@ class TestAnthropicSummarizeReviews:
         assert "社群筆記" in user_message
         assert "Google 評論" in user_message
 
+    async def test_summarize_reviews_with_previous_sends_an_update_prompt(self, adapter):
+        """An incremental call lists the stored summary and topics, then only the new texts."""
+        adapter._client = AsyncMock()
+        adapter._client.messages.create = AsyncMock(
+            return_value=_make_summarize_tool_response(
+                {"summary_zh_tw": "手沖與甜點出色", "review_topics": []}
+            )
+        )
+
+        await adapter.summarize_reviews(
+            google_reviews=[],
+            checkin_texts=["甜點很好吃"],
+            previous=ReviewSummaryResult(
+                summary_zh_tw="手沖出色，適合工作",
+                review_topics=[ReviewTopic(topic="手沖", count=6)],
+            ),
+        )
+
+        call_kwargs = adapter._client.messages.create.call_args[1]
+        user_message = call_kwargs["messages"][0]["content"]
+        assert "現有摘要：\n手沖出色，適合工作" in user_message
+        assert "手沖（6）" in user_message
+        assert "新增社群筆記（請優先參考）：\n[1] 甜點很好吃" in user_message
+        assert "更新規則" in call_kwargs["system"]
+
 
 class TestAnthropicUsageLogging:
     @pytest.fixture
@@ -649,3 +833,70 @@ class TestParseEnrichmentPayloadMenuItems:
         result = _parse_enrichment_payload(payload, taxonomy_by_id)
 
         assert result.menu_items == [{"name": "巴斯克蛋糕", "category": "dessert"}]
+
+
+class TestAnthropicMessageBatches:
+    @pytest.fixture
+    def adapter(self):
+        return AnthropicLLMAdapter(
+            api_key="test-key",
+            model="claude-sonnet-4-6",
+            classify_model="claude-haiku-4-5-20251001",
+            taxonomy=SAMPLE_TAXONOMY,
+        )
+
+    async def test_submit_batch_reuses_interactive_request_params(self, adapter):
+        """Batch params match what enrich_shop would send, including the cached system prefix."""
+        from providers.llm.interface import LLMBatchRequest
+
+        adapter._client = AsyncMock()
+        adapter._client.messages.batches.create = AsyncMock(return_value=MagicMock(id="msgbatch_1"))
+
+        batch_id = await adapter.submit_batch(
+            [LLMBatchRequest(custom_id="shop-1", method="enrich_shop", shop=SAMPLE_SHOP)]
+        )
+
+        assert batch_id == "msgbatch_1"
+        (entry,) = adapter._client.messages.batches.create.call_args.kwargs["requests"]
+        assert entry["custom_id"] == "enrich_shop-shop-1"
+        assert entry["params"]["system"] == adapter._enrich_system
+        assert entry["params"]["tool_choice"] == {"type": "tool", "name": "classify_shop"}
+
+    async def test_batch_results_map_succeeded_and_errored_entries(self, adapter):
+        """Succeeded entries are parsed and logged at the batch rate; others carry an error."""
+        from unittest.mock import patch
+
+        tool_block = MagicMock(
+            type="tool_use", input={"summary_zh_tw": "安靜", "review_topics": []}
+        )
+        tool_block.name = "summarize_reviews"
+        message = MagicMock(content=[tool_block])
+        message.usage.input_tokens = 100
+        message.usage.output_tokens = 10
+        message.usage.cache_creation_input_tokens = 0
+        message.usage.cache_read_input_tokens = 0
+        ok = MagicMock(custom_id="summarize_reviews-shop-1")
+        ok.result.type = "succeeded"
+        ok.result.message = message
+        bad = MagicMock(custom_id="summarize_reviews-shop-2")
+        bad.result.type = "expired"
+        bad.result.error = None
+
+        async def _entries():
+            for entry in (ok, bad):
+                yield entry
+
+        adapter._client = AsyncMock()
+        adapter._client.messages.batches.results = AsyncMock(return_value=_entries())
+        adapter._client.messages.batches.retrieve = AsyncMock(
+            return_value=MagicMock(processing_status="ended")
+        )
+
+        with patch("providers.llm.anthropic_adapter.log_api_usage") as mock_log:
+            assert await adapter.batch_finished("msgbatch_1") is True
+            results = await adapter.batch_results("msgbatch_1")
+
+        assert results[0].custom_id == "shop-1"
+        assert isinstance(results[0].result, ReviewSummaryResult)
+        assert results[1].error == "expired"
+        assert mock_log.call_args.kwargs["task"] == "summarize_reviews_batch"
@@ -29,6 +29,7 @@ def test_log_inserts_correct_row():
     assert inserted["tokens_cache_read"] == 50
     assert inserted["cost_usd"] == 0.0105
     assert inserted["compute_units"] is None
+    assert inserted["cache_hit_ratio"] == round(50 / 1250, 4)
 
 
 def test_log_apify_row_has_compute_units():
@@ -45,6 +46,7 @@ def test_log_apify_row_has_compute_units():
     assert inserted["compute_units"] == 3.5
     assert inserted["cost_usd"] is None
     assert inserted["tokens_input"] is None
+    assert inserted["cache_hit_ratio"] is None
 
 
 def test_log_never_raises_on_db_error():
@@ -63,3 +65,14 @@ def test_log_never_raises_on_client_error():
     ):
         # Must not raise even if client construction fails
         usage_logger.log_api_usage(provider="openai", task="embed", tokens_input=100)
+
+
+def test_task_suffix_applies_inside_the_block_only():
+    mock_db = MagicMock()
+    with patch.object(usage_logger, "get_service_role_client", return_value=mock_db):
+        with usage_logger.usage_task_suffix("_hedge"):
+            usage_logger.log_api_usage(provider="openai", task="classify_photo")
+        usage_logger.log_api_usage(provider="openai", task="classify_photo")
+
+    tasks = [c.args[0]["task"] for c in mock_db.table.return_value.insert.call_args_list]
+    assert tasks == ["classify_photo_hedge", "classify_photo"]
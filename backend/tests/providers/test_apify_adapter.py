@@ -409,3 +409,65 @@ async def test_scrape_batch_logs_compute_units(adapter):
     assert call_kwargs["task"] == "scrape_batch"
     assert call_kwargs["compute_units"] == pytest.approx(4.75, abs=0.01)
     assert call_kwargs["cost_usd"] is None
+
+
+# ---------------------------------------------------------------------------
+# scrape_batch_stream
+# ---------------------------------------------------------------------------
+
+
+def _streaming_client(statuses: list[dict], pages: list[list[dict]]) -> MagicMock:
+    client = MagicMock()
+    client.actor.return_value.start.return_value = {"id": "run-1", "defaultDatasetId": "ds-1"}
+    client.run.return_value.get.side_effect = statuses
+    client.dataset.return_value.list_items.side_effect = [MagicMock(items=p) for p in pages]
+    return client
+
+
+@pytest.mark.asyncio
+async def test_scrape_batch_stream_yields_items_while_the_run_is_active(adapter):
+    """Items are yielded as they land; unmatched shops come last with data=None."""
+    shops = [
+        BatchScrapeInput(shop_id="shop-1", google_maps_url="https://maps.google.com/?cid=1"),
+        BatchScrapeInput(shop_id="shop-2", google_maps_url="https://maps.google.com/?cid=2"),
+    ]
+    adapter._client = _streaming_client(
+        statuses=[{"status": "RUNNING"}, {"status": "SUCCEEDED", "stats": {"computeUnits": 1.5}}],
+        pages=[[_place({"inputStartUrl": "https://maps.google.com/?cid=1"})], []],
+    )
+
+    with (
+        patch("providers.scraper.apify_adapter._STREAM_POLL_SECONDS", 0),
+        patch("providers.scraper.apify_adapter.log_api_usage") as mock_log,
+    ):
+        results = [r async for r in adapter.scrape_batch_stream(shops)]
+
+    assert [r.shop_id for r in results] == ["shop-1", "shop-2"]
+    assert results[0].data is not None and results[0].data.name == "Fika Fika"
+    assert results[1].data is None
+    # Second page read starts after the item already yielded
+    assert adapter._client.dataset.return_value.list_items.call_args.kwargs["offset"] == 1
+    assert mock_log.call_args.kwargs["compute_units"] == pytest.approx(1.5)
+
+
+@pytest.mark.asyncio
+async def test_scrape_batch_stream_raises_when_the_run_fails(adapter):
+    """Items scraped before a failed run are still yielded, then the failure surfaces."""
+    shops = [
+        BatchScrapeInput(shop_id="shop-1", google_maps_url="https://maps.google.com/?cid=1"),
+        BatchScrapeInput(shop_id="shop-2", google_maps_url="https://maps.google.com/?cid=2"),
+    ]
+    adapter._client = _streaming_client(
+        statuses=[{"status": "ABORTED"}],
+        pages=[[_place({"inputStartUrl": "https://maps.google.com/?cid=1"})]],
+    )
+    seen: list[str] = []
+
+    with (
+        patch("providers.scraper.apify_adapter.log_api_usage"),
+        pytest.raises(RuntimeError, match="ABORTED"),
+    ):
+        async for result in adapter.scrape_batch_stream(shops):
+            seen.append(result.shop_id)
+
+    assert seen == ["shop-1"]
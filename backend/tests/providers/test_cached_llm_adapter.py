@@ -0,0 +1,176 @@
+"""Tests for CachedLLMAdapter — content-addressed replay of LLM results."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from models.types import (
+    EnrichmentResult,
+    MenuExtractionResult,
+    PhotoCategory,
+    ReviewSummaryResult,
+    ShopEnrichmentInput,
+    TaxonomyTag,
+)
+from providers.llm import cached_adapter
+from providers.llm.cached_adapter import CachedLLMAdapter, llm_cache_bypass, llm_cache_key
+
+_SHOP = ShopEnrichmentInput(name="Fika Fika", reviews=["手沖很好喝", "安靜適合工作"])
+_TAXONOMY = [TaxonomyTag(id="quiet", dimension="ambience", label="Quiet", label_zh="安靜")]
+
+
+@pytest.fixture(autouse=True)
+def _clear_memory():
+    cached_adapter._memory.clear()
+    yield
+    cached_adapter._memory.clear()
+
+
+@pytest.fixture
+def inner():
+    llm = MagicMock()
+    llm.enrich_shop = AsyncMock(
+        return_value=EnrichmentResult(tags=[], summary="安靜的自家烘焙咖啡廳", confidence=0.9)
+    )
+    llm.summarize_reviews = AsyncMock(
+        return_value=ReviewSummaryResult(summary_zh_tw="顧客喜歡手沖與安靜的氛圍", review_topics=[])
+    )
+    llm.extract_menu_data = AsyncMock(
+        return_value=MenuExtractionResult(items=[{"name": "拿鐵", "price": 150}])
+    )
+    llm.classify_photo = AsyncMock(return_value=PhotoCategory.MENU)
+    return llm
+
+
+@pytest.fixture
+def db():
+    db = MagicMock()
+    db.table.return_value.select.return_value.eq.return_value.gt.return_value.limit.return_value.execute.return_value = MagicMock(
+        data=[]
+    )
+    return db
+
+
+def _adapter(inner, db, **overrides):
+    kwargs = {
+        "model": "anthropic:claude-sonnet-4-6",
+        "taxonomy": _TAXONOMY,
+        "ttl_seconds": 3600,
+        "memory_entries": 16,
+        "db": db,
+    }
+    return CachedLLMAdapter(inner, **(kwargs | overrides))
+
+
+class TestCacheKey:
+    def test_key_ignores_dict_ordering(self):
+        """Canonical JSON: the same inputs in a different key order hash the same."""
+        assert llm_cache_key("extract_menu_data", "m", {"a": 1, "b": [1, 2]}) == llm_cache_key(
+            "extract_menu_data", "m", {"b": [1, 2], "a": 1}
+        )
+
+    def test_key_changes_with_model_and_prompt_version(self, monkeypatch):
+        """A different model or a bumped prompt version never replays old results."""
+        inputs = {"image_url": "https://example.com/menu.jpg"}
+        base = llm_cache_key("extract_menu_data", "m1", inputs)
+        assert llm_cache_key("extract_menu_data", "m2", inputs) != base
+        monkeypatch.setitem(cached_adapter.PROMPT_VERSIONS, "extract_menu_data", 2)
+        assert llm_cache_key("extract_menu_data", "m1", inputs) != base
+
+
+class TestCachedLLMAdapter:
+    async def test_identical_call_replays_from_memory(self, inner, db):
+        """The second call with identical inputs returns the stored result without the model."""
+        adapter = _adapter(inner, db)
+
+        first = await adapter.enrich_shop(_SHOP)
+        second = await adapter.enrich_shop(_SHOP.model_copy())
+
+        assert second == first
+        inner.enrich_shop.assert_awaited_once()
+        upsert = db.table.return_value.upsert
+        upsert.assert_called_once()
+        row = upsert.call_args.args[0]
+        assert row["method"] == "enrich_shop"
+        assert row["result"]["summary"] == "安靜的自家烘焙咖啡廳"
+
+    async def test_hit_from_table_when_memory_is_cold(self, inner, db):
+        """Another worker process's result is read back from llm_result_cache."""
+        db.table.return_value.select.return_value.eq.return_value.gt.return_value.limit.return_value.execute.return_value = MagicMock(
+            data=[
+                {
+                    "result": {"items": [{"name": "可頌"}], "raw_text": None},
+                    "expires_at": "2099-01-01T00:00:00+00:00",
+                }
+            ]
+        )
+        adapter = _adapter(inner, db)
+
+        result = await adapter.extract_menu_data("https://example.com/menu.jpg")
+
+        assert result.items == [{"name": "可頌"}]
+        inner.extract_menu_data.assert_not_called()
+
+    async def test_changed_inputs_or_taxonomy_call_the_model(self, inner, db):
+        """Different reviews or a different taxonomy are different cache keys."""
+        await _adapter(inner, db).enrich_shop(_SHOP)
+        await _adapter(inner, db).enrich_shop(_SHOP.model_copy(update={"reviews": ["新評論"]}))
+        await _adapter(inner, db, taxonomy=[]).enrich_shop(_SHOP)
+
+        assert inner.enrich_shop.await_count == 3
+
+    async def test_bypass_skips_reads_but_refreshes_the_entry(self, inner, db):
+        """Inside llm_cache_bypass the model is called again and its result overwrites the entry."""
+        adapter = _adapter(inner, db)
+        await adapter.summarize_reviews(["好喝"], [])
+
+        with llm_cache_bypass():
+            await adapter.summarize_reviews(["好喝"], [])
+
+        assert inner.summarize_reviews.await_count == 2
+        assert db.table.return_value.upsert.call_count == 2
+
+    async def test_incremental_summaries_are_keyed_by_the_previous_summary(self, inner, db):
+        """The same new texts revising a different stored summary is a different call."""
+        adapter = _adapter(inner, db)
+        previous = ReviewSummaryResult(summary_zh_tw="手沖出色", review_topics=[])
+
+        await adapter.summarize_reviews(["好喝"], [])
+        await adapter.summarize_reviews(["好喝"], [], previous=previous)
+        await adapter.summarize_reviews(["好喝"], [], previous=previous)
+
+        assert inner.summarize_reviews.await_count == 2
+        assert inner.summarize_reviews.call_args.kwargs["previous"] == previous
+
+    async def test_rejected_results_are_not_stored(self, inner, db):
+        """A non-zh-TW summary would fail the handler; its retry must reach the model again."""
+        inner.summarize_reviews = AsyncMock(
+            return_value=ReviewSummaryResult(summary_zh_tw="Great coffee", review_topics=[])
+        )
+        adapter = _adapter(inner, db)
+
+        await adapter.summarize_reviews(["good"], [])
+        await adapter.summarize_reviews(["good"], [])
+
+        assert inner.summarize_reviews.await_count == 2
+        db.table.return_value.upsert.assert_not_called()
+
+    async def test_cache_errors_fall_through_to_the_model(self, inner):
+        """An unreachable cache table never fails the LLM call."""
+        db = MagicMock()
+        db.table.side_effect = RuntimeError("connection refused")
+
+        result = await _adapter(inner, db).extract_menu_data("https://example.com/menu.jpg")
+
+        assert result.items == [{"name": "拿鐵", "price": 150}]
+        inner.extract_menu_data.assert_awaited_once()
+
+    async def test_photo_classification_is_not_cached(self, inner, db):
+        """classify_photo passes straight through to the wrapped provider."""
+        adapter = _adapter(inner, db)
+
+        await adapter.classify_photo("https://example.com/a.jpg")
+        await adapter.classify_photo("https://example.com/a.jpg")
+
+        assert inner.classify_photo.await_count == 2
+        db.table.assert_not_called()
@@ -40,3 +40,11 @@ def test_gpt4o_mini_cost():
     # 1M input @ $0.15 + 1M output @ $0.60 = $0.75
     cost = compute_llm_cost("gpt-4o-mini", tokens_input=1_000_000, tokens_output=1_000_000)
     assert cost == pytest.approx(0.75)
+
+
+def test_batch_calls_bill_at_half_price():
+    # Provider batch APIs: 1M input @ $3 + 1M output @ $15, halved = $9
+    cost = compute_llm_cost(
+        "claude-sonnet-4-6", tokens_input=1_000_000, tokens_output=1_000_000, batch=True
+    )
+    assert cost == pytest.approx(9.0)
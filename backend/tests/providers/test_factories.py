@@ -44,6 +44,7 @@ class TestProviderFactories:
             mock.llm_provider = "anthropic"
             mock.anthropic_api_key = "test-key"
             mock.anthropic_model = "claude-sonnet-4-6"
+            mock.llm_cache_enabled = False
             from providers.llm import get_llm_provider
 
             provider = get_llm_provider()
@@ -59,6 +60,7 @@ class TestProviderFactories:
             mock.llm_provider = "anthropic"
             mock.anthropic_api_key = "test-key"
             mock.anthropic_model = "claude-sonnet-4-6"
+            mock.llm_cache_enabled = False
             from providers.llm import get_llm_provider
 
             provider = get_llm_provider(taxonomy=taxonomy)
@@ -71,6 +73,7 @@ class TestProviderFactories:
             mock.llm_provider = "anthropic"
             mock.anthropic_api_key = "test-key"
             mock.anthropic_model = "claude-sonnet-4-6"
+            mock.llm_cache_enabled = False
             from providers.llm import get_llm_provider
 
             provider = get_llm_provider()
@@ -173,8 +176,70 @@ def test_get_llm_provider_returns_hybrid_adapter(monkeypatch):
     monkeypatch.setattr(config_module.settings, "llm_provider", "hybrid")
     monkeypatch.setattr(config_module.settings, "anthropic_api_key", "sk-ant-test")
     monkeypatch.setattr(config_module.settings, "openai_api_key", "sk-test")
+    monkeypatch.setattr(config_module.settings, "llm_cache_enabled", False)
 
     provider = get_llm_provider(taxonomy=[])
     assert isinstance(provider, HybridLLMAdapter)
     assert isinstance(provider._anthropic, AnthropicLLMAdapter)
     assert isinstance(provider._openai, OpenAILLMAdapter)
+
+
+def test_get_llm_provider_wraps_adapter_in_result_cache(monkeypatch):
+    """With llm_cache_enabled the adapter sits behind CachedLLMAdapter; batch calls do not."""
+    from core import config as config_module
+    from providers.llm import get_llm_batch_provider, get_llm_provider
+    from providers.llm.anthropic_adapter import AnthropicLLMAdapter
+    from providers.llm.cached_adapter import CachedLLMAdapter
+
+    monkeypatch.setattr(config_module.settings, "llm_provider", "anthropic")
+    monkeypatch.setattr(config_module.settings, "anthropic_api_key", "sk-ant-test")
+    monkeypatch.setattr(config_module.settings, "llm_cache_enabled", True)
+
+    provider = get_llm_provider(taxonomy=[])
+    assert isinstance(provider, CachedLLMAdapter)
+    assert isinstance(provider._inner, AnthropicLLMAdapter)
+    assert isinstance(get_llm_batch_provider(taxonomy=[]), AnthropicLLMAdapter)
+
+
+def test_get_llm_provider_shares_one_prompt_packer(monkeypatch):
+    """Both hybrid adapters pack reviews with the configured budgets; LLM_PACK_ENABLED=false skips it."""
+    from core import config as config_module
+    from providers.llm import get_llm_provider
+    from providers.llm._packing import PromptPacker
+
+    monkeypatch.setattr(config_module.settings, "llm_provider", "hybrid")
+    monkeypatch.setattr(config_module.settings, "anthropic_api_key", "sk-ant-test")
+    monkeypatch.setattr(config_module.settings, "openai_api_key", "sk-test")
+    monkeypatch.setattr(config_module.settings, "llm_cache_enabled", False)
+
+    provider = get_llm_provider(taxonomy=[])
+    assert isinstance(provider._anthropic._packer, PromptPacker)  # type: ignore[attr-defined]
+    assert provider._openai._packer is provider._anthropic._packer  # type: ignore[attr-defined]
+
+    monkeypatch.setattr(config_module.settings, "llm_pack_enabled", False)
+    assert get_llm_provider(taxonomy=[])._anthropic._packer is None  # type: ignore[attr-defined]
+
+
+def test_cache_model_id_changes_with_prompt_packer_config(monkeypatch):
+    """Toggling packing or changing any packer limit misses results cached under the old prompt."""
+    from core import config as config_module
+    from providers.llm import _cache_model_id
+
+    monkeypatch.setattr(config_module.settings, "llm_provider", "anthropic")
+    monkeypatch.setattr(config_module.settings, "llm_pack_enabled", True)
+    seen = {_cache_model_id()}
+
+    monkeypatch.setattr(
+        config_module.settings,
+        "llm_pack_budget_tokens",
+        {"enrich_shop": 8000, "summarize_reviews": 4000},
+    )
+    seen.add(_cache_model_id())
+    monkeypatch.setattr(config_module.settings, "llm_pack_max_review_tokens", 400)
+    seen.add(_cache_model_id())
+    monkeypatch.setattr(config_module.settings, "llm_pack_duplicate_threshold", 0.9)
+    seen.add(_cache_model_id())
+    monkeypatch.setattr(config_module.settings, "llm_pack_enabled", False)
+    seen.add(_cache_model_id())
+
+    assert len(seen) == 5
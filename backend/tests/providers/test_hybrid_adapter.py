@@ -1,5 +1,6 @@
 """Tests for HybridLLMAdapter — verifies per-method routing to anthropic vs openai."""
 
+import asyncio
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
@@ -13,6 +14,8 @@ from models.types import (
     ShopEnrichmentInput,
     TarotEnrichmentResult,
 )
+from providers import api_usage_logger
+from providers.llm import hybrid_adapter
 from providers.llm.hybrid_adapter import HybridLLMAdapter
 
 
@@ -123,6 +126,7 @@ async def test_summarize_reviews_goes_to_openai(hybrid, anthropic_mock, openai_m
     openai_mock.summarize_reviews.assert_called_once_with(
         google_reviews=google_reviews,
         checkin_texts=checkin_texts,
+        previous=None,
     )
     anthropic_mock.summarize_reviews.assert_not_called()
     assert isinstance(result, ReviewSummaryResult)
@@ -134,3 +138,145 @@ async def test_assign_tarot_goes_to_openai(hybrid, anthropic_mock, openai_mock,
     openai_mock.assign_tarot.assert_called_once_with(shop)
     anthropic_mock.assign_tarot.assert_not_called()
     assert result.tarot_title == "The Star"
+
+
+@pytest.mark.asyncio
+async def test_batch_requests_are_routed_per_method(hybrid, anthropic_mock, openai_mock, shop):
+    """A mixed batch splits by method; finished and results span both provider batches."""
+    from providers.llm.interface import LLMBatchRequest, LLMBatchResult
+
+    anthropic_mock.submit_batch = AsyncMock(return_value="msgbatch_1")
+    openai_mock.submit_batch = AsyncMock(return_value="batch_2")
+    anthropic_mock.batch_finished = AsyncMock(return_value=True)
+    openai_mock.batch_finished = AsyncMock(return_value=False)
+    anthropic_mock.batch_results = AsyncMock(
+        return_value=[LLMBatchResult(custom_id="s1", method="enrich_shop", error="x")]
+    )
+    openai_mock.batch_results = AsyncMock(
+        return_value=[LLMBatchResult(custom_id="s1", method="assign_tarot", error="y")]
+    )
+    enrich = LLMBatchRequest(custom_id="s1", method="enrich_shop", shop=shop)
+    tarot = LLMBatchRequest(custom_id="s1", method="assign_tarot", shop=shop)
+
+    batch_id = await hybrid.submit_batch([enrich, tarot])
+
+    assert batch_id == "anthropic:msgbatch_1,openai:batch_2"
+    anthropic_mock.submit_batch.assert_awaited_once_with([enrich])
+    openai_mock.submit_batch.assert_awaited_once_with([tarot])
+    assert await hybrid.batch_finished(batch_id) is False
+    results = await hybrid.batch_results(batch_id)
+    assert [r.method for r in results] == ["enrich_shop", "assign_tarot"]
+
+    anthropic_mock.cancel_batch = AsyncMock()
+    openai_mock.cancel_batch = AsyncMock()
+    await hybrid.cancel_batch(batch_id)
+    anthropic_mock.cancel_batch.assert_awaited_once_with("msgbatch_1")
+    openai_mock.cancel_batch.assert_awaited_once_with("batch_2")
+
+
+@pytest.mark.asyncio
+async def test_classify_photos_goes_to_openai(hybrid, anthropic_mock, openai_mock):
+    """Multi-image classification follows classify_photo to OpenAI."""
+    openai_mock.classify_photos = AsyncMock(return_value=[PhotoCategory.MENU, PhotoCategory.VIBE])
+    urls = ["https://storage.example.com/1.jpg", "https://storage.example.com/2.jpg"]
+
+    result = await hybrid.classify_photos(urls)
+
+    openai_mock.classify_photos.assert_called_once_with(urls)
+    anthropic_mock.classify_photos.assert_not_called()
+    assert result == [PhotoCategory.MENU, PhotoCategory.VIBE]
+
+
+def _slow(result, seconds: float, tasks: list[str] | None = None):
+    """An AsyncMock that answers after `seconds`, recording the usage task suffix it ran under."""
+
+    async def _call(*args, **kwargs):
+        await asyncio.sleep(seconds)
+        if tasks is not None:
+            tasks.append(api_usage_logger._task_suffix.get())
+        return result
+
+    return AsyncMock(side_effect=_call)
+
+
+def _hedged(anthropic_mock, openai_mock, **overrides):
+    kwargs = {
+        "deadline_seconds": {"classify_photo": 1.0, "summarize_reviews": 1.0},
+        "hedge_after_seconds": {"classify_photo": 0.02, "summarize_reviews": 0.02},
+    }
+    return HybridLLMAdapter(anthropic=anthropic_mock, openai=openai_mock, **(kwargs | overrides))
+
+
+@pytest.mark.asyncio
+async def test_call_past_its_deadline_raises_timeout(anthropic_mock, openai_mock):
+    """A stalled provider call is cut off at the method deadline instead of the SDK default."""
+    openai_mock.classify_photo = _slow(PhotoCategory.MENU, 5)
+    hybrid = _hedged(
+        anthropic_mock,
+        openai_mock,
+        deadline_seconds={"classify_photo": 0.02},
+        hedge_after_seconds={},
+    )
+
+    with pytest.raises(TimeoutError):
+        await hybrid.classify_photo("https://storage.example.com/photo.jpg")
+
+    anthropic_mock.classify_photo.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_fast_call_is_not_hedged(anthropic_mock, openai_mock):
+    """A call answering within its p95 budget never reaches the alternate provider."""
+    result = await _hedged(anthropic_mock, openai_mock).classify_photo("https://x/photo.jpg")
+
+    assert result == PhotoCategory.MENU
+    anthropic_mock.classify_photo.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged_and_the_first_result_wins(anthropic_mock, openai_mock):
+    """Past the budget the alternate provider is asked too; its usage is logged as a hedge."""
+    suffixes: list[str] = []
+    openai_mock.classify_photo = _slow(PhotoCategory.MENU, 0.2, suffixes)
+    anthropic_mock.classify_photo = _slow(PhotoCategory.VIBE, 0, suffixes)
+
+    result = await _hedged(anthropic_mock, openai_mock).classify_photo("https://x/photo.jpg")
+
+    assert result == PhotoCategory.VIBE
+    assert suffixes == ["_hedge"]
+    # The losing call runs on in the background so its usage is still logged
+    await asyncio.gather(*hybrid_adapter._detached)
+    assert suffixes == ["_hedge", ""]
+
+
+@pytest.mark.asyncio
+async def test_rejected_hedge_result_waits_for_the_primary(anthropic_mock, openai_mock):
+    """A summary the handler would reject (not zh-TW) does not win the race."""
+    primary = ReviewSummaryResult(summary_zh_tw="安靜適合工作的咖啡廳", review_topics=[])
+    openai_mock.summarize_reviews = _slow(primary, 0.1)
+    anthropic_mock.summarize_reviews = _slow(
+        ReviewSummaryResult(summary_zh_tw="Quiet cafe", review_topics=[]), 0
+    )
+
+    result = await _hedged(anthropic_mock, openai_mock).summarize_reviews(["好喝"], [])
+
+    assert result == primary
+    anthropic_mock.summarize_reviews.assert_awaited_once()
+
+
+def test_factory_passes_hedge_budgets_only_when_enabled(monkeypatch):
+    """LLM_HEDGE_ENABLED=false keeps the deadlines but drops the hedge budgets."""
+    from core import config as config_module
+    from providers.llm import get_llm_provider
+
+    monkeypatch.setattr(config_module.settings, "llm_provider", "hybrid")
+    monkeypatch.setattr(config_module.settings, "anthropic_api_key", "sk-ant-test")
+    monkeypatch.setattr(config_module.settings, "openai_api_key", "sk-test")
+    monkeypatch.setattr(config_module.settings, "llm_cache_enabled", False)
+
+    provider = get_llm_provider(taxonomy=[])
+    assert provider._deadlines["enrich_shop"] > 0  # type: ignore[attr-defined]
+    assert provider._hedge_after == {}  # type: ignore[attr-defined]
+
+    monkeypatch.setattr(config_module.settings, "llm_hedge_enabled", True)
+    assert "enrich_shop" not in get_llm_provider(taxonomy=[])._hedge_after  # type: ignore[attr-defined]
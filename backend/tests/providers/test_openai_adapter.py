@@ -196,6 +196,39 @@ async def test_classify_photo_returns_enum(adapter, category_value, expected):
     assert result == expected
 
 
+async def test_classify_photos_returns_categories_in_input_order(adapter):
+    """Photos are numbered in the request; the reply is mapped back by index."""
+    adapter._client = AsyncMock()
+    adapter._client.chat.completions.create = AsyncMock(
+        return_value=_openai_tool_call_response(
+            "classify_photos",
+            {"photos": [{"index": 2, "category": "MENU"}, {"index": 1, "category": "SKIP"}]},
+        )
+    )
+
+    result = await adapter.classify_photos(["https://cdn/1.jpg", "https://cdn/2.jpg"])
+
+    assert result == [PhotoCategory.SKIP, PhotoCategory.MENU]
+    content = adapter._client.chat.completions.create.call_args.kwargs["messages"][0]["content"]
+    assert [c["image_url"]["url"] for c in content if c["type"] == "image_url"] == [
+        "https://cdn/1.jpg",
+        "https://cdn/2.jpg",
+    ]
+
+
+async def test_classify_photos_raises_when_a_photo_is_missing(adapter):
+    """A reply that skips a photo is an error, so the caller can fall back per photo."""
+    adapter._client = AsyncMock()
+    adapter._client.chat.completions.create = AsyncMock(
+        return_value=_openai_tool_call_response(
+            "classify_photos", {"photos": [{"index": 1, "category": "VIBE"}]}
+        )
+    )
+
+    with pytest.raises(ValueError, match="missing photos"):
+        await adapter.classify_photos(["https://cdn/1.jpg", "https://cdn/2.jpg"])
+
+
 async def test_summarize_reviews_returns_structured_result(adapter):
     """summarize_reviews now uses tool calling and returns ReviewSummaryResult."""
     adapter._client = AsyncMock()
@@ -365,3 +398,162 @@ class TestOpenAIUsageLogging:
         assert call_kwargs["task"] == "enrich_shop"
         assert call_kwargs["tokens_input"] == 600
         assert call_kwargs["tokens_output"] == 120
+
+    async def test_cached_prompt_tokens_are_logged_apart(self, adapter, enrich_input):
+        """Prompt tokens served from OpenAI's cache are logged as cache reads, not input."""
+        from unittest.mock import patch
+
+        response = _openai_tool_call_response(
+            "classify_shop", {"tags": [], "summary": "ok", "mode": "work"}
+        )
+        response.usage = MagicMock(prompt_tokens=2000, completion_tokens=100)
+        response.usage.prompt_tokens_details.cached_tokens = 1536
+        adapter._client = AsyncMock()
+        adapter._client.chat.completions.create = AsyncMock(return_value=response)
+
+        with patch("providers.llm.openai_adapter.log_api_usage") as mock_log:
+            await adapter.enrich_shop(enrich_input)
+
+        call_kwargs = mock_log.call_args.kwargs
+        assert call_kwargs["tokens_input"] == 464
+        assert call_kwargs["tokens_cache_read"] == 1536
+
+
+async def test_enrich_shop_puts_static_reference_first(adapter, enrich_input):
+    """Taxonomy and vocabulary live in the system message so the cached prefix is shared."""
+    adapter._client = AsyncMock()
+    adapter._client.chat.completions.create = AsyncMock(
+        return_value=_openai_tool_call_response(
+            "classify_shop", {"tags": [], "summary": "ok", "mode": "work"}
+        )
+    )
+
+    await adapter.enrich_shop(enrich_input)
+
+    call = adapter._client.chat.completions.create.await_args
+    system, user = call.kwargs["messages"]
+    assert "laptop_friendly" in system["content"]
+    assert "laptop_friendly" not in user["content"]
+    assert "Test Cafe" in user["content"]
+    assert call.kwargs["prompt_cache_key"] == "caferoam:enrich_shop"
+
+
+async def test_enrich_shop_combined_mode_returns_tarot(taxonomy, enrich_input):
+    """enrich_with_tarot adds the tarot fields to classify_shop and parses them."""
+    adapter = OpenAILLMAdapter(
+        api_key="sk-test",
+        model="gpt-5.4",
+        classify_model="gpt-5.4-mini",
+        nano_model="gpt-5.4-nano",
+        taxonomy=taxonomy,
+        enrich_with_tarot=True,
+    )
+    adapter._client = AsyncMock()
+    adapter._client.chat.completions.create = AsyncMock(
+        return_value=_openai_tool_call_response(
+            "classify_shop",
+            {
+                "tags": [],
+                "summary": "安靜",
+                "mode": "work",
+                "tarot_title": "The Silent Chapel",
+                "flavor_text": "Silence brews here.",
+            },
+        )
+    )
+
+    result = await adapter.enrich_shop(enrich_input)
+
+    assert result.tarot is not None
+    assert result.tarot.tarot_title == "The Silent Chapel"
+    call = adapter._client.chat.completions.create.await_args
+    params = call.kwargs["tools"][0]["function"]["parameters"]
+    assert "flavor_text" in params["required"]
+    assert "The Silent Chapel" in call.kwargs["messages"][0]["content"]
+
+
+class TestOpenAIBatch:
+    async def test_submit_batch_uploads_jsonl_for_chat_completions(self, adapter, enrich_input):
+        """Each request becomes one JSONL line whose body is the interactive call's kwargs."""
+        from providers.llm.interface import LLMBatchRequest
+
+        adapter._client = AsyncMock()
+        adapter._client.files.create = AsyncMock(return_value=MagicMock(id="file_in"))
+        adapter._client.batches.create = AsyncMock(return_value=MagicMock(id="batch_1"))
+
+        batch_id = await adapter.submit_batch(
+            [LLMBatchRequest(custom_id="shop-1", method="assign_tarot", shop=enrich_input)]
+        )
+
+        assert batch_id == "batch_1"
+        _, content = adapter._client.files.create.call_args.kwargs["file"]
+        line = json.loads(content.decode())
+        assert line["custom_id"] == "assign_tarot-shop-1"
+        assert line["url"] == "/v1/chat/completions"
+        assert line["body"]["model"] == "gpt-5.4-nano"
+        assert adapter._client.batches.create.call_args.kwargs["input_file_id"] == "file_in"
+
+    async def test_batch_results_parse_successes_and_errors(self, adapter):
+        """Output lines are parsed like interactive responses; failed lines carry their error."""
+        from unittest.mock import patch
+
+        body = {
+            "id": "chatcmpl-1",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "gpt-5.4-mini-2026-03-17",
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "tool_calls",
+                    "message": {
+                        "role": "assistant",
+                        "content": None,
+                        "tool_calls": [
+                            {
+                                "id": "call_1",
+                                "type": "function",
+                                "function": {
+                                    "name": "summarize_reviews",
+                                    "arguments": json.dumps(
+                                        {"summary_zh_tw": "安靜好坐", "review_topics": []}
+                                    ),
+                                },
+                            }
+                        ],
+                    },
+                }
+            ],
+            "usage": {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120},
+        }
+        lines = [
+            {
+                "custom_id": "summarize_reviews-shop-1",
+                "response": {"status_code": 200, "body": body},
+                "error": None,
+            },
+            {
+                "custom_id": "summarize_reviews-shop-2",
+                "response": None,
+                "error": {"code": "server_error", "message": "boom"},
+            },
+        ]
+        adapter._client = AsyncMock()
+        adapter._client.batches.retrieve = AsyncMock(
+            return_value=MagicMock(status="completed", output_file_id="out", error_file_id=None)
+        )
+        adapter._client.files.content = AsyncMock(
+            return_value=MagicMock(text="\n".join(json.dumps(line) for line in lines))
+        )
+
+        with patch("providers.llm.openai_adapter.log_api_usage") as mock_log:
+            assert await adapter.batch_finished("batch_1") is True
+            results = await adapter.batch_results("batch_1")
+
+        assert results[0].custom_id == "shop-1"
+        assert isinstance(results[0].result, ReviewSummaryResult)
+        assert results[1].result is None
+        assert "boom" in (results[1].error or "")
+        assert mock_log.call_args.kwargs["task"] == "summarize_reviews_batch"
+        # Priced by the configured model, not the dated snapshot name in the response
+        assert mock_log.call_args.kwargs["model"] == "gpt-5.4-mini"
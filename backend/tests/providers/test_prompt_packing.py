@@ -0,0 +1,97 @@
+"""Tests for PromptPacker — review dedupe, truncation and budgeted selection."""
+
+from providers.llm._packing import (
+    PromptPacker,
+    estimate_tokens,
+    jaccard,
+    shingles,
+    truncate_to_tokens,
+)
+
+
+def _packer(**overrides) -> PromptPacker:
+    kwargs = {
+        "budgets": {"enrich_shop": 1000, "summarize_reviews": 1000},
+        "max_text_tokens": 200,
+        "duplicate_threshold": 0.7,
+    }
+    return PromptPacker(**(kwargs | overrides))
+
+
+class TestShingles:
+    def test_cjk_bigrams_ignore_punctuation_and_width(self):
+        """Punctuation, fullwidth forms and case do not change a review's shingles."""
+        assert shingles("很安靜，適合工作！") == shingles("很安靜 適合工作!")
+        assert shingles("Great LATTE") == shingles("great latte")
+
+    def test_near_duplicates_score_high_and_distinct_reviews_low(self):
+        """A reworded review is similar; a review about something else is not."""
+        base = shingles("環境很安靜，插座很多，適合工作")
+        assert jaccard(base, shingles("環境很安靜插座很多，很適合工作")) >= 0.7
+        assert jaccard(base, shingles("甜點普通，拿鐵偏甜")) < 0.1
+
+
+class TestTruncation:
+    def test_long_text_is_cut_at_a_sentence_break(self):
+        """Truncation stays within the budget and ends on a full sentence."""
+        text = "手沖咖啡很好喝。" * 50
+
+        short = truncate_to_tokens(text, 40)
+
+        assert estimate_tokens(short) <= 41
+        assert short.endswith("。…")
+
+    def test_short_text_is_unchanged(self):
+        assert truncate_to_tokens("拿鐵好喝", 40) == "拿鐵好喝"
+
+
+class TestPromptPacker:
+    def test_duplicates_are_dropped_and_savings_reported(self):
+        """Repeated reviews go; the first copy stays, and the saved tokens are counted."""
+        result = _packer().pack(
+            "enrich_shop", ["很好喝！推薦拿鐵", "很好喝，推薦拿鐵", "環境安靜適合工作"]
+        )
+
+        assert result.groups == [["很好喝！推薦拿鐵", "環境安靜適合工作"]]
+        assert result.duplicates == 1
+        assert result.tokens_saved == estimate_tokens("很好喝，推薦拿鐵")
+
+    def test_over_budget_keeps_the_most_informative_reviews_in_order(self):
+        """Within the budget, reviews adding new content win over ones repeating covered content."""
+        reviews = [
+            "拿鐵好喝，拿鐵推薦",
+            "插座很多，網路穩定，適合帶電腦工作",
+            "拿鐵推薦",
+            "甜點很好吃，肉桂捲必點",
+        ]
+        budget = estimate_tokens(reviews[1]) + estimate_tokens(reviews[3]) + 2
+
+        result = _packer(budgets={"enrich_shop": budget}).pack("enrich_shop", reviews)
+
+        assert result.groups == [[reviews[1], reviews[3]]]
+        assert result.dropped == 2
+        assert result.tokens_after <= budget
+
+    def test_earlier_groups_take_the_budget_first(self):
+        """Check-in notes packed first are kept; Google reviews get what is left."""
+        notes = ["店貓很可愛，常常睡在窗邊"]
+        reviews = ["The pour-over is excellent and the staff are friendly", "豆子選擇多"]
+        budget = estimate_tokens(notes[0]) + estimate_tokens(reviews[1])
+
+        result = _packer(budgets={"summarize_reviews": budget}).pack(
+            "summarize_reviews", notes, reviews
+        )
+
+        assert result.groups == [notes, ["豆子選擇多"]]
+
+    def test_pack_shop_replaces_only_the_reviews(self):
+        """pack_shop returns a copy of the enrichment input with packed reviews."""
+        from models.types import ShopEnrichmentInput
+
+        shop = ShopEnrichmentInput(name="Fika", reviews=["好喝", "好喝", "安靜"])
+
+        packed = _packer().pack_shop(shop)
+
+        assert packed.reviews == ["好喝", "安靜"]
+        assert packed.name == "Fika"
+        assert shop.reviews == ["好喝", "好喝", "安靜"]
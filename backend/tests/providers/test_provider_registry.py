@@ -0,0 +1,76 @@
+"""Tests for ProviderRegistry — process-wide adapters over pooled HTTP clients."""
+
+import pytest
+
+from core import config as config_module
+from models.types import TaxonomyTag
+from providers.registry import ProviderRegistry, taxonomy_version
+
+_TAXONOMY = [TaxonomyTag(id="quiet", dimension="ambience", label="Quiet", label_zh="安靜")]
+
+
+@pytest.fixture
+def hybrid_settings(monkeypatch):
+    monkeypatch.setattr(config_module.settings, "llm_provider", "hybrid")
+    monkeypatch.setattr(config_module.settings, "anthropic_api_key", "sk-ant-test")
+    monkeypatch.setattr(config_module.settings, "openai_api_key", "sk-test")
+    monkeypatch.setattr(config_module.settings, "llm_cache_enabled", False)
+    monkeypatch.setattr(config_module.settings, "embeddings_provider", "openai")
+
+
+class TestProviderRegistry:
+    async def test_adapters_are_built_once_per_taxonomy(self, hybrid_settings):
+        """Repeated calls reuse the adapter; a different taxonomy builds a new one."""
+        registry = ProviderRegistry()
+
+        first = registry.llm(taxonomy=_TAXONOMY)
+        assert registry.llm(taxonomy=list(_TAXONOMY)) is first
+        assert registry.llm(taxonomy=[]) is not first
+        assert registry.embeddings() is registry.embeddings()
+
+        await registry.aclose()
+
+    async def test_changed_settings_build_a_new_adapter(self, hybrid_settings, monkeypatch):
+        """A different model or key in settings is never served by the stale adapter."""
+        registry = ProviderRegistry()
+        first = registry.llm()
+
+        monkeypatch.setattr(config_module.settings, "anthropic_model", "claude-haiku-4-5")
+
+        assert registry.llm() is not first
+        await registry.aclose()
+
+    async def test_adapters_share_one_pooled_client_per_vendor(self, hybrid_settings, monkeypatch):
+        """LLM and embeddings adapters ride the same httpx client, sized by PROVIDER_HTTP_*."""
+        monkeypatch.setattr(config_module.settings, "provider_http_max_connections", 7)
+        registry = ProviderRegistry()
+
+        llm = registry.llm()
+        embeddings = registry.embeddings()
+        openai_client = registry.openai_http_client()
+
+        assert llm._openai._client._client is openai_client  # type: ignore[attr-defined]
+        assert embeddings._client._client is openai_client  # type: ignore[attr-defined]
+        assert llm._anthropic._client._client is registry.anthropic_http_client()  # type: ignore[attr-defined]
+        assert openai_client._transport._pool._max_connections == 7  # type: ignore[attr-defined]
+        await registry.aclose()
+
+    async def test_aclose_closes_clients_and_resets(self, hybrid_settings):
+        """Shutdown closes every pooled client; a later call starts over with fresh ones."""
+        registry = ProviderRegistry()
+        first = registry.llm()
+        client = registry.anthropic_http_client()
+
+        await registry.aclose()
+
+        assert client.is_closed
+        assert registry.llm() is not first
+        assert not registry.anthropic_http_client().is_closed
+        await registry.aclose()
+
+
+def test_taxonomy_version_ignores_tag_order():
+    """The cache key is a content hash, not the identity of the list."""
+    other = TaxonomyTag(id="wifi", dimension="functionality", label="WiFi", label_zh="網路")
+    assert taxonomy_version([_TAXONOMY[0], other]) == taxonomy_version([other, _TAXONOMY[0]])
+    assert taxonomy_version(None) == "none"
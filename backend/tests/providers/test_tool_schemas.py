@@ -4,6 +4,7 @@ from providers.llm._tool_schemas import (
     ASSIGN_TAROT_SCHEMA,
     CLASSIFY_PHOTO_SCHEMA,
     CLASSIFY_SHOP_SCHEMA,
+    CLASSIFY_SHOP_WITH_TAROT_SCHEMA,
     EXTRACT_MENU_SCHEMA,
     SUMMARIZE_REVIEWS_TOOL_SCHEMA,
 )
@@ -15,6 +16,16 @@ def test_classify_shop_schema_exposes_required_fields():
     assert {"tags", "summary", "mode", "menu_highlights", "coffee_origins"}.issubset(props.keys())
 
 
+def test_classify_shop_with_tarot_schema_extends_classify_shop():
+    from core.tarot_vocabulary import TAROT_TITLES
+
+    assert CLASSIFY_SHOP_WITH_TAROT_SCHEMA["name"] == "classify_shop"
+    schema = CLASSIFY_SHOP_WITH_TAROT_SCHEMA["input_schema"]
+    assert schema["properties"]["tarot_title"]["enum"] == list(TAROT_TITLES)
+    assert {"tags", "summary", "mode", "tarot_title", "flavor_text"} == set(schema["required"])
+    assert "tarot_title" not in CLASSIFY_SHOP_SCHEMA["input_schema"]["properties"]
+
+
 def test_extract_menu_schema_expects_items_array():
     assert EXTRACT_MENU_SCHEMA["name"] == "extract_menu"
     props = EXTRACT_MENU_SCHEMA["input_schema"]["properties"]
@@ -1,6 +1,12 @@
 """Smoke test for the eval script: verify it can compute pass/fail gates from a fake result set."""
 
-from scripts.eval_openai_routing import EvalResult, evaluate_hard_gates
+from scripts.eval_openai_routing import (
+    CallStats,
+    EvalResult,
+    add_usage,
+    evaluate_hard_gates,
+    render_latency_cost,
+)
 
 
 def test_evaluate_hard_gates_passes_when_thresholds_met():
@@ -36,3 +42,40 @@ def test_evaluate_hard_gates_fails_on_tarot_whitelist_below_100():
     )
     passed, failures = evaluate_hard_gates(results)
     assert passed is False
+
+
+def test_latency_cost_report_shows_cache_hits_and_provider_deltas():
+    stats = {
+        ("anthropic", "enrich_shop"): CallStats(
+            "anthropic", "enrich_shop", latencies_ms=[4000, 2000, 2400]
+        ),
+        ("openai", "enrich_shop"): CallStats("openai", "enrich_shop", latencies_ms=[3000, 1500]),
+    }
+    add_usage(
+        stats,
+        [
+            {
+                "provider": "anthropic",
+                "task": "enrich_shop",
+                "tokens_input": 500,
+                "tokens_cache_write": 3000,
+                "cost_usd": 0.02,
+            },
+            {
+                "provider": "anthropic",
+                "task": "enrich_shop",
+                "tokens_input": 500,
+                "tokens_cache_read": 3000,
+                "cost_usd": 0.005,
+            },
+            {"provider": "openai", "task": "enrich_shop", "tokens_input": 3500, "cost_usd": 0.01},
+        ],
+    )
+
+    anthropic = stats[("anthropic", "enrich_shop")]
+    assert anthropic.cold_ms == 4000
+    assert anthropic.warm_p50_ms == 2200
+    assert anthropic.cache_hit_ratio == round(3000 / 7000, 4)
+    lines = render_latency_cost(stats)
+    assert "| enrich_shop | anthropic | 3 | 4000 | 2200 | 0.0250 | 0.43 |" in lines
+    assert "| enrich_shop | -700 | -0.0150 |" in lines
@@ -0,0 +1,72 @@
+"""Smoke tests for the combined-tarot eval: scoring and pass/fail gates on fake results."""
+
+from models.types import EnrichmentResult, TarotEnrichmentResult, TaxonomyTag
+from scripts.eval_tarot_combined import (
+    EvalResult,
+    PathStats,
+    evaluate_hard_gates,
+    render_report,
+    tag_jaccard,
+)
+
+
+def _stats(*tarots: tuple[str | None, str, set[str]]) -> PathStats:
+    stats = PathStats()
+    for title, flavor, tags in tarots:
+        stats.add(TarotEnrichmentResult(tarot_title=title, flavor_text=flavor), tags)
+    return stats
+
+
+def test_path_stats_scores_whitelist_tag_fit_and_flavor():
+    stats = _stats(
+        ("The Scholar's Refuge", "Quiet minds gather here.", {"quiet"}),
+        ("The Open Sky", "x" * 81, {"quiet"}),
+        (None, "", set()),
+    )
+    assert stats.whitelisted == [True, True, False]
+    assert stats.tag_fit == [True, False, False]
+    assert stats.flavor_valid == [True, False, False]
+
+
+def test_gates_pass_when_combined_matches_separate():
+    separate = _stats(("The Silent Chapel", "Hush.", {"quiet"}))
+    combined = _stats(("The Silent Chapel", "Silence brews.", {"quiet"}))
+    result = EvalResult(
+        separate=separate, combined=combined, title_agreement=1.0, enrich_tag_jaccard=0.9
+    )
+
+    passed, failures = evaluate_hard_gates(result)
+
+    assert passed is True
+    assert failures == []
+
+
+def test_gates_fail_on_tag_fit_drop_and_enrichment_drift():
+    separate = _stats(("The Silent Chapel", "Hush.", {"quiet"}))
+    combined = _stats(("The Open Sky", "Wide open.", {"quiet"}))
+    result = EvalResult(
+        separate=separate, combined=combined, title_agreement=0.0, enrich_tag_jaccard=0.5
+    )
+
+    passed, failures = evaluate_hard_gates(result)
+
+    assert passed is False
+    assert any("tag_fit" in f for f in failures)
+    assert any("enrich_tag_jaccard" in f for f in failures)
+
+
+def test_tag_jaccard_and_report():
+    quiet = TaxonomyTag(id="quiet", dimension="ambience", label="Quiet", label_zh="安靜")
+    cozy = TaxonomyTag(id="cozy", dimension="ambience", label="Cozy", label_zh="溫馨")
+    a = EnrichmentResult(tags=[quiet, cozy], summary="", confidence=0.9)
+    b = EnrichmentResult(tags=[quiet], summary="", confidence=0.9)
+    assert tag_jaccard(a, b) == 0.5
+
+    stats = _stats(("The Library", "Pages turn.", {"quiet"}))
+    stats.add_usage([{"tokens_input": 100, "tokens_cache_read": 900, "cost_usd": 0.01}])
+    lines = render_report(
+        EvalResult(separate=stats, combined=stats, title_agreement=1.0, enrich_tag_jaccard=0.5),
+        [{"shop_name": "Fika", "separate": "The Library", "combined": "The Library"}],
+    )
+    assert "| Fika | The Library | The Library |" in lines
+    assert any(line.startswith("| combined | 1.000 |") and "1,000" in line for line in lines)
@@ -546,3 +546,71 @@ async def test_classify_shop_photos_writes_step_timings_to_db():
     for v in timings.values():
         assert isinstance(v["duration_ms"], int)
         assert v["duration_ms"] >= 0
+
+
+class TestClassifyThumbnails:
+    @staticmethod
+    def _photos(n: int) -> list[dict]:
+        return [{"id": f"p{i}", "url": f"https://cdn/{i}.jpg=w1920-h1080-k-no"} for i in range(n)]
+
+    async def test_groups_thumbnails_into_multi_image_requests(self, monkeypatch):
+        """Photos are labelled several per request; the single-photo method is not used."""
+        from core.config import settings
+        from workers.handlers.classify_shop_photos import classify_thumbnails
+
+        monkeypatch.setattr(settings, "worker_classify_photos_per_request", 5)
+        llm = AsyncMock()
+        llm.classify_photos = AsyncMock(side_effect=lambda urls: [PhotoCategory.VIBE] * len(urls))
+
+        classified = await classify_thumbnails(self._photos(7), llm)
+
+        assert [len(c.args[0]) for c in llm.classify_photos.call_args_list] == [5, 2]
+        assert all("w400-h225" in url for url in llm.classify_photos.call_args_list[0].args[0])
+        llm.classify_photo.assert_not_called()
+        assert [c["id"] for c in classified] == [f"p{i}" for i in range(7)]
+
+    async def test_failed_group_falls_back_to_one_request_per_photo(self, monkeypatch):
+        """A failed multi-image request is retried per photo, and only the failing photo is dropped."""
+        from core.config import settings
+        from workers.handlers.classify_shop_photos import classify_thumbnails
+
+        monkeypatch.setattr(settings, "worker_classify_photos_per_request", 3)
+        llm = AsyncMock()
+        llm.classify_photos = AsyncMock(side_effect=RuntimeError("Vision API error"))
+        llm.classify_photo = AsyncMock(
+            side_effect=[PhotoCategory.MENU, Exception("bad image"), PhotoCategory.VIBE]
+        )
+
+        classified = await classify_thumbnails(self._photos(3), llm)
+
+        assert [(c["id"], c["category"]) for c in classified] == [
+            ("p0", PhotoCategory.MENU),
+            ("p2", PhotoCategory.VIBE),
+        ]
+
+    async def test_requests_run_concurrently_up_to_the_per_shop_limit(self, monkeypatch):
+        """Requests overlap, but never more than worker_classify_photo_concurrency at once."""
+        import asyncio
+
+        from core.config import settings
+        from workers.handlers.classify_shop_photos import classify_thumbnails
+
+        monkeypatch.setattr(settings, "worker_classify_photos_per_request", 1)
+        monkeypatch.setattr(settings, "worker_classify_photo_concurrency", 3)
+        in_flight = peak = 0
+
+        async def _classify(url):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return PhotoCategory.VIBE
+
+        llm = AsyncMock()
+        llm.classify_photo = AsyncMock(side_effect=_classify)
+
+        classified = await classify_thumbnails(self._photos(10), llm)
+
+        assert len(classified) == 10
+        assert peak == 3
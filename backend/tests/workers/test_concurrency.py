@@ -0,0 +1,148 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+import workers.concurrency as concurrency
+from models.types import JobType
+from workers.concurrency import ProviderThrottle, TokenBucket, get_provider_throttle, provider_key
+from workers.scheduler import _run_job
+
+
+@pytest.fixture(autouse=True)
+def reset_throttles():
+    concurrency._throttles.clear()
+    yield
+    concurrency._throttles.clear()
+
+
+class TestProviderThrottle:
+    def test_grows_limit_while_latency_stays_healthy(self):
+        """Steady, fast completions raise in-flight capacity toward the max."""
+        throttle = ProviderThrottle("anthropic:m", initial_limit=2, min_limit=1, max_limit=10)
+        for _ in range(20):
+            assert throttle.reserve(1, now=0.0) == 1
+            throttle.on_success(latency_seconds=1.0)
+
+        assert throttle.limit > 4
+
+    def test_stops_growing_when_latency_degrades(self):
+        """Jobs far slower than the baseline signal congestion, so the limit holds."""
+        throttle = ProviderThrottle("anthropic:m", initial_limit=4, min_limit=1, max_limit=10)
+        throttle.reserve(1, now=0.0)
+        throttle.on_success(latency_seconds=1.0)
+        limit_before = throttle.limit
+
+        throttle.reserve(1, now=0.0)
+        throttle.on_success(latency_seconds=10.0)
+
+        assert throttle.limit == limit_before
+
+    def test_halves_limit_once_per_throttle_burst(self):
+        """A burst of 429s from one window cuts capacity once, not once per failed job."""
+        throttle = ProviderThrottle("anthropic:m", initial_limit=8, min_limit=1, max_limit=10)
+        assert throttle.reserve(3, now=0.0) == 3
+
+        throttle.on_throttle(now=1.0)
+        throttle.on_throttle(now=1.5)
+        throttle.on_throttle(now=2.0)
+
+        assert throttle.limit == 4
+        assert throttle.in_flight == 0
+
+    def test_no_new_reservations_during_cooldown(self):
+        throttle = ProviderThrottle("anthropic:m", initial_limit=8, min_limit=1, max_limit=10)
+        throttle.reserve(1, now=0.0)
+        throttle.on_throttle(now=1.0)
+
+        assert throttle.reserve(4, now=2.0) == 0
+        assert throttle.reserve(4, now=100.0) == 4
+
+    def test_never_drops_below_min_limit(self):
+        throttle = ProviderThrottle("anthropic:m", initial_limit=2, min_limit=1, max_limit=10)
+        for i in range(5):
+            throttle.reserve(1, now=i * 100.0)
+            throttle.on_throttle(now=i * 100.0)
+
+        assert throttle.limit == 1
+
+    def test_reservations_limited_by_token_bucket(self):
+        """The shared token bucket caps job starts even when the AIMD limit has headroom."""
+        bucket = TokenBucket(rate_per_second=1.0, capacity=2)
+        throttle = ProviderThrottle(
+            "anthropic:m", initial_limit=10, min_limit=1, max_limit=10, bucket=bucket
+        )
+        start = bucket._updated_at
+
+        assert throttle.reserve(5, now=start) == 2
+        assert throttle.reserve(5, now=start) == 0
+        assert throttle.reserve(5, now=start + 1.0) == 1
+
+    def test_unreserve_returns_slots_and_tokens(self):
+        bucket = TokenBucket(rate_per_second=0.0, capacity=3)
+        throttle = ProviderThrottle(
+            "anthropic:m", initial_limit=10, min_limit=1, max_limit=10, bucket=bucket
+        )
+        throttle.reserve(3, now=0.0)
+        throttle.unreserve(2)
+
+        assert throttle.in_flight == 1
+        assert bucket.tokens == 2
+
+
+class TestProviderKey:
+    def test_llm_job_types_share_one_key_on_anthropic(self):
+        """Classify and summarize hit the same model quota, so they share one throttle."""
+        with patch("workers.concurrency.settings") as mock_settings:
+            mock_settings.llm_provider = "anthropic"
+            mock_settings.anthropic_model = "sonnet"
+            mock_settings.anthropic_classify_model = "haiku"
+            assert provider_key(JobType.CLASSIFY_SHOP_PHOTOS) == "anthropic:haiku"
+            assert provider_key(JobType.SUMMARIZE_REVIEWS) == "anthropic:haiku"
+            assert provider_key(JobType.ENRICH_SHOP) == "anthropic:sonnet"
+
+    def test_hybrid_routes_enrich_to_anthropic_and_rest_to_openai(self):
+        with patch("workers.concurrency.settings") as mock_settings:
+            mock_settings.llm_provider = "hybrid"
+            mock_settings.anthropic_model = "sonnet"
+            mock_settings.openai_llm_classify_model = "mini"
+            assert provider_key(JobType.ENRICH_SHOP) == "anthropic:sonnet"
+            assert provider_key(JobType.SUMMARIZE_REVIEWS) == "openai:mini"
+
+    def test_non_provider_job_types_have_no_key(self):
+        assert provider_key(JobType.PUBLISH_SHOP) is None
+        assert get_provider_throttle(JobType.PUBLISH_SHOP) is None
+
+    def test_scrape_batch_shards_share_the_apify_limit(self):
+        """Concurrent scrape shards are throttled together against the Apify account."""
+        assert provider_key(JobType.SCRAPE_BATCH) == "apify:google-places"
+
+
+class TestSchedulerIntegration:
+    async def test_rate_limited_job_shrinks_shared_provider_limit(self):
+        """A 429 from one job type backs off every job type on the same provider model."""
+        throttle = get_provider_throttle(JobType.SUMMARIZE_REVIEWS)
+        assert throttle is not None
+        throttle.limit = 8.0
+        throttle.reserve(1)
+
+        mock_queue = MagicMock()
+        mock_queue.fail = AsyncMock()
+        job = MagicMock()
+        job.id = "job-1"
+        job.job_type = JobType.SUMMARIZE_REVIEWS
+
+        with (
+            patch("workers.scheduler.get_service_role_client"),
+            patch("workers.scheduler.JobQueue", return_value=mock_queue),
+            patch("workers.scheduler._dispatch_job", side_effect=RuntimeError("rate limit hit")),
+            patch("workers.scheduler._in_flight", {JobType.SUMMARIZE_REVIEWS: 1}),
+            patch("workers.scheduler.sentry_sdk"),
+        ):
+            await _run_job(job)
+
+        assert throttle.limit == 4.0
+        assert throttle.in_flight == 0
+        # Photo classification shares the summarize model on every provider setting
+        sibling = get_provider_throttle(JobType.CLASSIFY_SHOP_PHOTOS)
+        assert sibling is throttle
+        assert sibling.reserve(1) == 0
@@ -15,7 +15,7 @@ _USER_1 = "e5f6a7b8-c9d0-1234-efab-345678901234"
 
 @pytest.mark.asyncio
 async def test_daily_batch_scrape_enqueues_pending_shops():
-    """Given 3 pending shops with URLs, enqueues a single SCRAPE_BATCH job."""
+    """Given 3 pending shops with URLs, enqueues one SCRAPE_BATCH shard holding all three."""
     mock_db = MagicMock()
     mock_shops = [
         {"id": _SHOP_1, "google_maps_url": "https://maps.google.com/?cid=1"},
@@ -44,10 +44,11 @@ async def test_daily_batch_scrape_enqueues_pending_shops():
 
         await run_daily_batch_scrape.__wrapped__()
 
-    mock_queue.enqueue.assert_called_once()
-    call_args = mock_queue.enqueue.call_args
-    assert call_args.kwargs["job_type"] == JobType.SCRAPE_BATCH
-    payload = call_args.kwargs["payload"]
+    mock_queue.enqueue_batch.assert_called_once()
+    job_type, payloads = mock_queue.enqueue_batch.call_args.args
+    assert job_type == JobType.SCRAPE_BATCH
+    assert len(payloads) == 1
+    payload = payloads[0]
     assert len(payload["shops"]) == 3
     assert "batch_id" in payload
     shop1 = next(s for s in payload["shops"] if s["shop_id"] == _SHOP_1)
@@ -75,4 +76,34 @@ async def test_daily_batch_scrape_skips_when_no_pending_shops():
 
         await run_daily_batch_scrape.__wrapped__()
 
-    mock_queue.enqueue.assert_not_called()
+    mock_queue.enqueue_batch.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_daily_batch_scrape_splits_large_sets_into_shards():
+    """Pending shops beyond the shard size become several SCRAPE_BATCH jobs sharing a batch_id."""
+    mock_db = MagicMock()
+    shops_response = MagicMock()
+    shops_response.data = [
+        {"id": f"shop-{i}", "google_maps_url": f"https://maps.google.com/?cid={i}"}
+        for i in range(5)
+    ]
+    mock_db.table.return_value.select.return_value.eq.return_value.not_.is_.return_value.execute.return_value = shops_response
+    mock_db.table.return_value.select.return_value.in_.return_value.eq.return_value.execute.return_value = MagicMock(
+        data=[]
+    )
+    mock_queue = AsyncMock()
+
+    with (
+        patch("workers.scheduler.get_service_role_client", return_value=mock_db),
+        patch("workers.scheduler.JobQueue", return_value=mock_queue),
+        patch("workers.handlers.scrape_batch.settings.worker_scrape_shard_size", 2),
+    ):
+        from workers.scheduler import run_daily_batch_scrape
+
+        await run_daily_batch_scrape.__wrapped__()
+
+    payloads = mock_queue.enqueue_batch.call_args.args[1]
+    assert [len(p["shops"]) for p in payloads] == [2, 2, 1]
+    assert len({p["batch_id"] for p in payloads}) == 1
+    assert [(p["shard"], p["shards"]) for p in payloads] == [(1, 3), (2, 3), (3, 3)]
@@ -1,7 +1,9 @@
+import asyncio
 from unittest.mock import AsyncMock, MagicMock, call
 
 import pytest
 
+from core.config import settings
 from models.types import JobType, MenuExtractionResult
 from workers.handlers.enrich_menu_photo import handle_enrich_menu_photo
 from workers.handlers.enrich_shop import handle_enrich_shop
@@ -138,11 +140,14 @@ class TestEnrichShopHandler:
                 job_type=JobType.SUMMARIZE_REVIEWS,
                 payload={"shop_id": "shop-1"},
                 priority=5,
+                dedupe_key="shop-1",
             ),
             call(
                 job_type=JobType.SYNC_MENU_HIGHLIGHTS,
                 payload={"shop_id": "shop-1"},
                 priority=5,
+                dedupe_key="shop-1",
+                debounce_seconds=settings.worker_enqueue_debounce_seconds,
             ),
         ]
 
@@ -197,6 +202,39 @@ class TestEnrichShopHandler:
         written = shop_update_payloads[0]
         assert written["coffee_origins"] == ["耶加雪菲", "哥倫比亞"]
 
+    async def test_combined_enrichment_tarot_skips_assign_tarot(self):
+        """When enrich_shop already returned the tarot (combined mode), no second LLM call is made."""
+        from models.types import EnrichmentResult, TarotEnrichmentResult
+
+        db = MagicMock()
+        llm = AsyncMock()
+        queue = AsyncMock()
+        queue.get_status.return_value = "claimed"
+        llm.enrich_shop = AsyncMock(
+            return_value=EnrichmentResult(
+                tags=[],
+                summary="安靜的閱讀咖啡廳",
+                confidence=0.9,
+                tarot=TarotEnrichmentResult(
+                    tarot_title="The Library", flavor_text="Pages turn slowly here."
+                ),
+            )
+        )
+        db.table.return_value.select.return_value.eq.return_value.single.return_value.execute.return_value = MagicMock(
+            data={"id": SHOP_ID, "name": "晨光咖啡"}
+        )
+        db.table.return_value.select.return_value.eq.return_value.execute.return_value = MagicMock(
+            data=[{"text": "很安靜"}]
+        )
+
+        await handle_enrich_shop(
+            payload={"shop_id": SHOP_ID}, db=db, llm=llm, queue=queue, job_id="job-tarot-01"
+        )
+
+        llm.assign_tarot.assert_not_called()
+        updates = [c.args[0] for c in db.table.return_value.update.call_args_list]
+        assert {"tarot_title": "The Library", "flavor_text": "Pages turn slowly here."} in updates
+
     @pytest.mark.asyncio
     async def test_review_extraction_writes_menu_items_with_source_review(self):
         """Given LLM returns menu_items in enrichment result, when handler runs, then items are written with source='review'."""
@@ -837,6 +875,64 @@ class TestEnrichMenuPhotoHandler:
         mock_db.table.assert_not_called()
         mock_queue.enqueue.assert_not_called()
 
+    async def test_extracts_photos_concurrently_up_to_the_setting(
+        self, mock_db, mock_llm, mock_queue, monkeypatch
+    ):
+        """Photos are extracted in parallel, never more than worker_menu_extract_concurrency at once."""
+        monkeypatch.setattr(settings, "worker_menu_extract_concurrency", 2)
+        in_flight = 0
+        peak = 0
+
+        async def _extract(image_url):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return MenuExtractionResult(items=[{"name": image_url[-5:]}], raw_text=None)
+
+        mock_llm.extract_menu_data = AsyncMock(side_effect=_extract)
+        payload = {
+            "shop_id": SHOP_ID,
+            "photos": [
+                {"photo_id": f"photo-{i}", "image_url": f"https://example.com/menu{i}.jpg"}
+                for i in range(5)
+            ],
+        }
+
+        await handle_enrich_menu_photo(payload, mock_db, mock_llm, mock_queue)
+
+        assert peak == 2
+        mock_db.table.return_value.insert.assert_called_once()
+        rows = mock_db.table.return_value.insert.call_args.args[0]
+        assert [row["source_photo_id"] for row in rows] == [f"photo-{i}" for i in range(5)]
+
+    async def test_records_photo_extraction_as_one_step(self, mock_db, mock_llm, mock_queue):
+        """With a job_id, photo extraction is one step: the slowest photo plus each photo's time."""
+        mock_llm.extract_menu_data = AsyncMock(
+            side_effect=[
+                RuntimeError("Vision API down"),
+                MenuExtractionResult(items=[{"name": "拿鐵"}], raw_text=None),
+            ]
+        )
+        payload = {
+            "shop_id": SHOP_ID,
+            "photos": [
+                {"photo_id": "photo-1", "image_url": "https://example.com/menu1.jpg"},
+                {"photo_id": "photo-2", "image_url": "https://example.com/menu2.jpg"},
+            ],
+        }
+
+        await handle_enrich_menu_photo(payload, mock_db, mock_llm, mock_queue, job_id="job-1")
+
+        update = mock_db.table.return_value.update
+        timings = update.call_args.args[0]["step_timings"]
+        assert set(timings) == {"extract_menu_photo", "db_write"}
+        extract = timings["extract_menu_photo"]
+        assert len(extract["photo_ms"]) == 2
+        assert extract["duration_ms"] == max(extract["photo_ms"])
+        update.return_value.eq.assert_called_with("id", "job-1")
+
 
 class TestWeeklyEmailHandler:
     async def test_sends_email_to_all_opted_in_users(self):
@@ -1027,6 +1123,10 @@ class TestSummarizeReviewsHandlerGuard:
         db.table.return_value.update.return_value.eq.return_value.execute.return_value = MagicMock(
             data=[]
         )
+        # No stored summary yet: a full rebuild
+        db.table.return_value.select.return_value.eq.return_value.single.return_value.execute.return_value = MagicMock(
+            data={}
+        )
 
         llm = AsyncMock()
         llm.summarize_reviews = AsyncMock(
@@ -1197,6 +1297,10 @@ class TestSummarizeReviewsMilestoneLogs:
         db.table.return_value.update.return_value.eq.return_value.execute.return_value = MagicMock(
             data=[]
         )
+        # No stored summary yet: a full rebuild
+        db.table.return_value.select.return_value.eq.return_value.single.return_value.execute.return_value = MagicMock(
+            data={}
+        )
 
         llm = AsyncMock()
         llm.summarize_reviews = AsyncMock(
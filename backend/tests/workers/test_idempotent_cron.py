@@ -18,7 +18,10 @@ class TestIdempotentCron:
 
         wrapped = idempotent_cron("test_job", window="day")(mock_handler)
 
-        with patch("workers.scheduler.get_service_role_client", return_value=mock_db):
+        with (
+            patch("workers.scheduler.get_service_role_client", return_value=mock_db),
+            patch("workers.scheduler.is_leader", return_value=True),
+        ):
             await wrapped()
 
         mock_handler.assert_awaited_once()
@@ -33,7 +36,10 @@ class TestIdempotentCron:
 
         wrapped = idempotent_cron("test_job", window="day")(mock_handler)
 
-        with patch("workers.scheduler.get_service_role_client", return_value=mock_db):
+        with (
+            patch("workers.scheduler.get_service_role_client", return_value=mock_db),
+            patch("workers.scheduler.is_leader", return_value=True),
+        ):
             await wrapped()
 
         mock_handler.assert_not_awaited()
@@ -49,10 +55,30 @@ class TestIdempotentCron:
 
         wrapped = idempotent_cron("weekly_email", window="week")(mock_handler)
 
-        with patch("workers.scheduler.get_service_role_client", return_value=mock_db):
+        with (
+            patch("workers.scheduler.get_service_role_client", return_value=mock_db),
+            patch("workers.scheduler.is_leader", return_value=True),
+        ):
             await wrapped()
 
         # Verify the upsert was called with the cron_locks table
         mock_db.table.assert_called_with("cron_locks")
         upsert_call = mock_db.table.return_value.upsert.call_args
         assert upsert_call[0][0]["job_name"] == "weekly_email"
+
+    @pytest.mark.asyncio
+    async def test_skips_handler_when_not_scheduler_leader(self):
+        """Replicas that don't hold the leader lease never fire cron handlers or touch cron_locks."""
+        mock_handler = AsyncMock()
+        mock_db = MagicMock()
+
+        wrapped = idempotent_cron("test_job", window="day")(mock_handler)
+
+        with (
+            patch("workers.scheduler.get_service_role_client", return_value=mock_db),
+            patch("workers.scheduler.is_leader", return_value=False),
+        ):
+            await wrapped()
+
+        mock_handler.assert_not_awaited()
+        mock_db.table.assert_not_called()
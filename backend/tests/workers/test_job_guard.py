@@ -193,6 +193,10 @@ def _make_summarize_db() -> MagicMock:
 
     shops_table = MagicMock()
     shops_table.update.return_value.eq.return_value.execute.return_value = MagicMock(data=[])
+    # No stored summary yet: a full rebuild
+    shops_table.select.return_value.eq.return_value.single.return_value.execute.return_value = (
+        MagicMock(data={})
+    )
 
     db.table.side_effect = lambda name: shops_table if name == "shops" else MagicMock()
     db._shops_table = shops_table
@@ -0,0 +1,136 @@
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+import workers.leader as leader
+from workers.queue import JobQueue
+from workers.scheduler import create_scheduler, reclaim_stuck_jobs
+
+
+@pytest.fixture(autouse=True)
+def reset_leader_state():
+    leader._is_leader = False
+    leader._lease_expires_at = None
+    yield
+    leader._is_leader = False
+    leader._lease_expires_at = None
+
+
+def _mock_queue(acquired: bool | Exception) -> MagicMock:
+    queue = MagicMock()
+    if isinstance(acquired, Exception):
+        queue.acquire_leader_lease = AsyncMock(side_effect=acquired)
+    else:
+        queue.acquire_leader_lease = AsyncMock(return_value=acquired)
+    queue.release_leader_lease = AsyncMock()
+    return queue
+
+
+class TestRenewLeadership:
+    async def test_becomes_leader_when_lease_acquired(self):
+        """The replica that wins the lease upsert becomes leader until the lease expires."""
+        with (
+            patch("workers.leader.get_service_role_client"),
+            patch("workers.leader.JobQueue", return_value=_mock_queue(True)),
+        ):
+            await leader.renew_leadership()
+
+        assert leader.is_leader()
+        assert leader.get_leader_status()["lease_expires_at"] is not None
+
+    async def test_stays_follower_when_another_replica_holds_lease(self):
+        with (
+            patch("workers.leader.get_service_role_client"),
+            patch("workers.leader.JobQueue", return_value=_mock_queue(False)),
+        ):
+            await leader.renew_leadership()
+
+        assert not leader.is_leader()
+
+    async def test_steps_down_when_lease_taken_over(self):
+        """A leader whose lease was taken over (e.g. after a long GC pause) stops running crons."""
+        leader._is_leader = True
+        leader._lease_expires_at = datetime.now(UTC) + timedelta(seconds=30)
+        with (
+            patch("workers.leader.get_service_role_client"),
+            patch("workers.leader.JobQueue", return_value=_mock_queue(False)),
+        ):
+            await leader.renew_leadership()
+
+        assert not leader.is_leader()
+
+    async def test_keeps_unexpired_lease_through_transient_db_error(self):
+        """One failed renewal does not drop leadership while the lease is still valid."""
+        leader._is_leader = True
+        leader._lease_expires_at = datetime.now(UTC) + timedelta(seconds=30)
+        with (
+            patch("workers.leader.get_service_role_client"),
+            patch("workers.leader.JobQueue", return_value=_mock_queue(ConnectionError("db"))),
+            patch("workers.leader.sentry_sdk"),
+        ):
+            await leader.renew_leadership()
+
+        assert leader.is_leader()
+
+    def test_leadership_lapses_when_renewals_stop(self):
+        """Failover: a leader that stops renewing is no longer leader once its lease expires."""
+        leader._is_leader = True
+        leader._lease_expires_at = datetime.now(UTC) - timedelta(seconds=1)
+
+        assert not leader.is_leader()
+
+
+class TestReleaseLeadership:
+    async def test_release_drops_lease_row(self):
+        leader._is_leader = True
+        leader._lease_expires_at = datetime.now(UTC) + timedelta(seconds=30)
+        queue = _mock_queue(True)
+        with (
+            patch("workers.leader.get_service_role_client"),
+            patch("workers.leader.JobQueue", return_value=queue),
+        ):
+            await leader.release_leadership()
+
+        queue.release_leader_lease.assert_awaited_once_with(leader.LEASE_NAME, leader.HOLDER_ID)
+        assert not leader.is_leader()
+
+    async def test_release_is_noop_for_followers(self):
+        queue = _mock_queue(True)
+        with patch("workers.leader.JobQueue", return_value=queue):
+            await leader.release_leadership()
+
+        queue.release_leader_lease.assert_not_awaited()
+
+
+class TestLeaseQueueMethods:
+    async def test_acquire_calls_rpc_with_holder_and_ttl(self):
+        mock_db = MagicMock()
+        mock_db.rpc.return_value.execute.return_value.data = True
+        queue = JobQueue(db=mock_db)
+
+        assert await queue.acquire_leader_lease("scheduler", "host:1:abc", ttl_seconds=60)
+        mock_db.rpc.assert_called_once_with(
+            "acquire_scheduler_lease",
+            {"p_name": "scheduler", "p_holder_id": "host:1:abc", "p_ttl_seconds": 60},
+        )
+
+    async def test_acquire_returns_false_when_lease_held_elsewhere(self):
+        mock_db = MagicMock()
+        mock_db.rpc.return_value.execute.return_value.data = False
+        queue = JobQueue(db=mock_db)
+
+        assert not await queue.acquire_leader_lease("scheduler", "host:1:abc", ttl_seconds=60)
+
+
+class TestLeaderGatedMaintenance:
+    def test_lease_renewal_is_registered_with_maintenance_jobs(self):
+        scheduler = create_scheduler()
+        assert scheduler.get_job("renew_leadership") is not None
+
+    async def test_reclaim_loop_skipped_on_followers(self):
+        """Only the leader reclaims stuck jobs, so replicas don't multiply reaper queries."""
+        with patch("workers.scheduler.get_service_role_client") as mock_get_client:
+            await reclaim_stuck_jobs()
+
+        mock_get_client.assert_not_called()
@@ -0,0 +1,229 @@
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from core.config import settings
+from models.types import (
+    EnrichmentResult,
+    JobType,
+    ReviewSummaryResult,
+    ShopEnrichmentInput,
+    TarotEnrichmentResult,
+)
+from providers.llm.fake_batch_adapter import FakeBatchLLMAdapter
+from workers.handlers.llm_batch_poll import handle_llm_batch_poll, submit_llm_batch
+from workers.handlers.summarize_reviews import ReviewSummaryInput
+
+_MODULE = "workers.handlers.llm_batch_poll"
+
+
+def _summary_llm() -> MagicMock:
+    llm = MagicMock()
+
+    async def _summarize(google_reviews, checkin_texts, previous=None):
+        if "fail" in google_reviews:
+            raise RuntimeError("provider error")
+        return ReviewSummaryResult(summary_zh_tw="安靜適合工作的咖啡廳", review_topics=[])
+
+    llm.summarize_reviews = AsyncMock(side_effect=_summarize)
+    return llm
+
+
+def _poll_payload(queue: AsyncMock) -> dict:
+    return next(
+        c.kwargs["payload"]
+        for c in queue.enqueue.await_args_list
+        if c.kwargs["job_type"] == JobType.LLM_BATCH_POLL
+    )
+
+
+def _stale_payload() -> dict:
+    return {
+        "batch_id": "batch_1",
+        "kind": "enrich_shop",
+        "shop_ids": ["shop-a", "shop-b"],
+        "submitted_at": (datetime.now(UTC) - timedelta(days=2)).isoformat(),
+    }
+
+
+@pytest.fixture
+def review_texts():
+    texts = {"shop-a": (["好喝"], []), "shop-b": (["fail"], []), "shop-empty": ([], [])}
+
+    def _load(db, shop_id):
+        google_reviews, checkin_texts = texts[shop_id]
+        return ReviewSummaryInput(google_reviews, checkin_texts, None, 0, datetime.now(UTC))
+
+    with patch(f"{_MODULE}.load_summary_input", side_effect=_load) as mock:
+        yield mock
+
+
+class TestSubmitLLMBatch:
+    async def test_submits_one_batch_and_schedules_a_poll(self, review_texts):
+        """Shops with review text go into one batch; shops without go straight to the interactive job."""
+        batch_llm = FakeBatchLLMAdapter(_summary_llm())
+        queue = AsyncMock()
+
+        batch_id = await submit_llm_batch(
+            "summarize_reviews", ["shop-a", "shop-b", "shop-empty"], MagicMock(), batch_llm, queue
+        )
+
+        assert batch_id is not None
+        assert [r.custom_id for r in batch_llm.batches[batch_id].requests] == ["shop-a", "shop-b"]
+        queue.enqueue_batch.assert_awaited_once()
+        assert queue.enqueue_batch.call_args.kwargs["job_type"] == JobType.SUMMARIZE_REVIEWS
+        assert queue.enqueue_batch.call_args.kwargs["payloads"] == [{"shop_id": "shop-empty"}]
+        poll_call = queue.enqueue.call_args.kwargs
+        assert poll_call["job_type"] == JobType.LLM_BATCH_POLL
+        assert poll_call["payload"]["shop_ids"] == ["shop-a", "shop-b"]
+        assert poll_call["scheduled_at"] > datetime.now(UTC)
+
+    async def test_enrich_batches_carry_a_tarot_request_per_shop(self):
+        """enrich_shop and assign_tarot for the same shop share one batch."""
+        batch_llm = FakeBatchLLMAdapter(MagicMock())
+        with patch(
+            f"{_MODULE}.load_enrichment_input",
+            return_value=ShopEnrichmentInput(name="Fika", reviews=["好喝"]),
+        ):
+            batch_id = await submit_llm_batch(
+                "enrich_shop", ["shop-a"], MagicMock(), batch_llm, AsyncMock()
+            )
+
+        methods = [r.method for r in batch_llm.batches[str(batch_id)].requests]
+        assert methods == ["enrich_shop", "assign_tarot"]
+
+    async def test_combined_enrichment_drops_the_tarot_requests(self, monkeypatch):
+        """With LLM_ENRICH_WITH_TAROT the enrich request returns the tarot; none is batched apart."""
+        monkeypatch.setattr(settings, "llm_enrich_with_tarot", True)
+        batch_llm = FakeBatchLLMAdapter(MagicMock())
+        with patch(
+            f"{_MODULE}.load_enrichment_input",
+            return_value=ShopEnrichmentInput(name="Fika", reviews=["好喝"]),
+        ):
+            batch_id = await submit_llm_batch(
+                "enrich_shop", ["shop-a"], MagicMock(), batch_llm, AsyncMock()
+            )
+
+        methods = [r.method for r in batch_llm.batches[str(batch_id)].requests]
+        assert methods == ["enrich_shop"]
+
+
+class TestHandleLLMBatchPoll:
+    async def test_unfinished_batch_re_enqueues_the_poll(self, review_texts):
+        """While the provider batch is running, the poll job schedules another poll."""
+        batch_llm = FakeBatchLLMAdapter(_summary_llm(), polls_until_done=2)
+        submit_queue = AsyncMock()
+        await submit_llm_batch(
+            "summarize_reviews", ["shop-a"], MagicMock(), batch_llm, submit_queue
+        )
+        queue = AsyncMock()
+
+        await handle_llm_batch_poll(_poll_payload(submit_queue), MagicMock(), batch_llm, queue)
+
+        assert queue.enqueue.call_args.kwargs["job_type"] == JobType.LLM_BATCH_POLL
+        queue.enqueue_batch.assert_not_called()
+
+    async def test_finished_batch_persists_results_and_falls_back_failures(self, review_texts):
+        """Summaries are written through the interactive helper; errored requests become regular jobs."""
+        batch_llm = FakeBatchLLMAdapter(_summary_llm())
+        submit_queue = AsyncMock()
+        await submit_llm_batch(
+            "summarize_reviews", ["shop-a", "shop-b"], MagicMock(), batch_llm, submit_queue
+        )
+        queue = AsyncMock()
+
+        with patch(f"{_MODULE}.persist_review_summary") as persist:
+            await handle_llm_batch_poll(_poll_payload(submit_queue), MagicMock(), batch_llm, queue)
+
+        persist.assert_called_once()
+        assert persist.call_args.args[1] == "shop-a"
+        assert queue.enqueue.call_args.kwargs["job_type"] == JobType.GENERATE_EMBEDDING
+        assert queue.enqueue.call_args.kwargs["payload"] == {"shop_id": "shop-a"}
+        assert queue.enqueue_batch.call_args.kwargs["job_type"] == JobType.SUMMARIZE_REVIEWS
+        assert queue.enqueue_batch.call_args.kwargs["payloads"] == [{"shop_id": "shop-b"}]
+
+    async def test_incremental_summary_state_is_persisted_on_collection(self):
+        """The previous summary goes into the batch; its load time and drift count reach persist."""
+        previous = ReviewSummaryResult(summary_zh_tw="手沖出色", review_topics=[])
+        as_of = datetime(2026, 10, 1, tzinfo=UTC)
+        batch_llm = FakeBatchLLMAdapter(_summary_llm())
+        submit_queue = AsyncMock()
+        with patch(
+            f"{_MODULE}.load_summary_input",
+            return_value=ReviewSummaryInput(["好喝"], [], previous, 7, as_of),
+        ):
+            batch_id = await submit_llm_batch(
+                "summarize_reviews", ["shop-a"], MagicMock(), batch_llm, submit_queue
+            )
+
+        assert batch_llm.batches[str(batch_id)].requests[0].previous == previous
+        with patch(f"{_MODULE}.persist_review_summary") as persist:
+            await handle_llm_batch_poll(
+                _poll_payload(submit_queue), MagicMock(), batch_llm, AsyncMock()
+            )
+
+        assert persist.call_args.kwargs == {"as_of": as_of, "incremental_texts": 7}
+
+    async def test_batch_past_max_wait_falls_back_to_interactive_jobs(self):
+        """A batch still running after llm_batch_max_wait_seconds is cancelled, then every
+        shop goes back to the queue — the provider would otherwise bill it a second time."""
+        batch_llm = AsyncMock()
+        batch_llm.batch_finished = AsyncMock(return_value=False)
+        queue = AsyncMock()
+        calls = MagicMock()
+        calls.attach_mock(batch_llm.cancel_batch, "cancel_batch")
+        calls.attach_mock(queue.enqueue_batch, "enqueue_batch")
+
+        await handle_llm_batch_poll(_stale_payload(), MagicMock(), batch_llm, queue)
+
+        assert [c[0] for c in calls.mock_calls] == ["cancel_batch", "enqueue_batch"]
+        batch_llm.cancel_batch.assert_awaited_once_with("batch_1")
+        queue.enqueue.assert_not_called()
+        assert queue.enqueue_batch.call_args.kwargs["job_type"] == JobType.ENRICH_SHOP
+        assert len(queue.enqueue_batch.call_args.kwargs["payloads"]) == 2
+        batch_llm.batch_results.assert_not_called()
+
+    async def test_failed_cancel_still_falls_back(self):
+        """A cancel error (e.g. the batch ended meanwhile) does not strand the shops."""
+        batch_llm = AsyncMock()
+        batch_llm.batch_finished = AsyncMock(return_value=False)
+        batch_llm.cancel_batch = AsyncMock(side_effect=RuntimeError("already ended"))
+        queue = AsyncMock()
+
+        await handle_llm_batch_poll(_stale_payload(), MagicMock(), batch_llm, queue)
+
+        assert len(queue.enqueue_batch.call_args.kwargs["payloads"]) == 2
+
+    async def test_enrich_results_write_shop_tags_and_tarot_then_chain(self):
+        """An enrich batch result goes through the enrich_shop writers and chains summarize/menu sync."""
+        llm = MagicMock()
+        llm.enrich_shop = AsyncMock(
+            return_value=EnrichmentResult(tags=[], summary="安靜的工作咖啡廳", confidence=0.9)
+        )
+        llm.assign_tarot = AsyncMock(
+            return_value=TarotEnrichmentResult(tarot_title="The Hermit", flavor_text="靜")
+        )
+        batch_llm = FakeBatchLLMAdapter(llm)
+        submit_queue = AsyncMock()
+        with patch(
+            f"{_MODULE}.load_enrichment_input",
+            return_value=ShopEnrichmentInput(name="Fika", reviews=["好喝"]),
+        ):
+            await submit_llm_batch("enrich_shop", ["shop-a"], MagicMock(), batch_llm, submit_queue)
+        queue = AsyncMock()
+
+        with (
+            patch(f"{_MODULE}.write_shop_enrichment") as write_shop,
+            patch(f"{_MODULE}.write_shop_tags") as write_tags,
+            patch(f"{_MODULE}.write_tarot") as write_tarot,
+            patch(f"{_MODULE}.write_review_menu_items"),
+        ):
+            await handle_llm_batch_poll(_poll_payload(submit_queue), MagicMock(), batch_llm, queue)
+
+        write_shop.assert_called_once()
+        write_tags.assert_called_once()
+        assert write_tarot.call_args.args[2].tarot_title == "The Hermit"
+        chained = {c.kwargs["job_type"] for c in queue.enqueue.await_args_list}
+        assert chained == {JobType.SUMMARIZE_REVIEWS, JobType.SYNC_MENU_HIGHLIGHTS}
+        queue.enqueue_batch.assert_not_called()
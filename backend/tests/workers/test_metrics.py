@@ -0,0 +1,108 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from models.types import Job, JobStatus, JobType
+from workers.metrics import (
+    export_metrics,
+    merge_job_type_metrics,
+    percentile,
+    record_claimed,
+    record_finished,
+    render_prometheus,
+    reset_metrics,
+)
+
+
+@pytest.fixture(autouse=True)
+def _clean_metrics():
+    reset_metrics()
+    yield
+    reset_metrics()
+
+
+def _job(scheduled_at: datetime, attempts: int = 1) -> Job:
+    return Job(
+        id="job-metrics-01",
+        job_type=JobType.ENRICH_SHOP,
+        payload={"shop_id": "shop-1"},
+        status=JobStatus.CLAIMED,
+        attempts=attempts,
+        scheduled_at=scheduled_at,
+        created_at=scheduled_at,
+    )
+
+
+class TestJobMetrics:
+    def test_percentile_uses_nearest_rank(self):
+        """p50 and p95 of 1..100 are the 50th and 95th values."""
+        samples = [float(i) for i in range(1, 101)]
+        assert percentile(samples, 50) == 50.0
+        assert percentile(samples, 95) == 95.0
+        assert percentile([], 95) is None
+
+    def test_claims_record_wait_time_and_retries(self):
+        """Wait time runs from scheduled_at to the claim; re-attempted jobs count toward retry rate."""
+        now = datetime.now(UTC)
+        record_claimed(_job(now - timedelta(seconds=30)), now=now)
+        record_claimed(_job(now - timedelta(seconds=10), attempts=2), now=now)
+
+        metrics = merge_job_type_metrics([export_metrics()["enrich_shop"]])
+        assert metrics["claimed_total"] == 2
+        assert metrics["retry_rate"] == 0.5
+        assert metrics["wait_seconds_p50"] == 10.0
+        assert metrics["wait_seconds_p95"] == 30.0
+
+    def test_finished_jobs_update_counters_and_throughput(self):
+        """Completions feed run-time percentiles and throughput; 429 failures are counted separately."""
+        record_finished(JobType.ENRICH_SHOP, 2.0, ok=True)
+        record_finished(JobType.ENRICH_SHOP, 4.0, ok=True)
+        record_finished(JobType.ENRICH_SHOP, 1.0, ok=False, rate_limited=True)
+
+        metrics = merge_job_type_metrics([export_metrics()["enrich_shop"]])
+        assert metrics["completed_total"] == 2
+        assert metrics["failed_total"] == 1
+        assert metrics["rate_limited_total"] == 1
+        assert metrics["run_seconds_p95"] == 4.0
+        assert metrics["throughput_per_minute"] == 0.4
+
+    def test_merge_combines_processes(self):
+        """Counters add up across processes and percentiles cover every process's samples."""
+        now = datetime.now(UTC)
+        record_claimed(_job(now - timedelta(seconds=10)), now=now)
+        record_finished(JobType.ENRICH_SHOP, 2.0, ok=True)
+        local = export_metrics()["enrich_shop"]
+        other = {
+            "claimed": 3,
+            "completed": 1,
+            "retried": 3,
+            "completed_recent": 4,
+            "wait_seconds": [40.0, 50.0, 60.0],
+            "run_seconds": [8.0],
+        }
+
+        metrics = merge_job_type_metrics([local, other])
+        assert metrics["claimed_total"] == 4
+        assert metrics["completed_total"] == 2
+        assert metrics["retry_rate"] == 0.75
+        assert metrics["throughput_per_minute"] == 1.0
+        assert metrics["wait_seconds_p50"] == 40.0
+        assert metrics["run_seconds_p95"] == 8.0
+
+    def test_render_prometheus_skips_missing_values(self):
+        """Series with no samples are omitted rather than exported as zero."""
+        text = render_prometheus({"enrich_shop": {"pending": 1, "wait_seconds_p95": None}}, {})
+        assert 'caferoam_jobs_pending{job_type="enrich_shop"} 1.0' in text
+        assert "caferoam_jobs_wait_seconds_p95{" not in text
+
+    def test_render_prometheus_exports_counters_per_worker(self):
+        """Counters carry a worker label, so a restarted process reads as that series resetting."""
+        workers = {
+            "worker-a": {"job_types": {"enrich_shop": {"completed_total": 4}}},
+            "worker-b": {"job_types": {"enrich_shop": {"completed_total": 2}}},
+        }
+        text = render_prometheus({"enrich_shop": {"pending": 1}}, workers)
+        assert "# TYPE caferoam_jobs_completed_total counter" in text
+        assert 'caferoam_jobs_completed_total{job_type="enrich_shop",worker="worker-a"} 4.0' in text
+        assert 'caferoam_jobs_completed_total{job_type="enrich_shop",worker="worker-b"} 2.0' in text
+        assert 'caferoam_jobs_completed_total{job_type="enrich_shop"}' not in text
@@ -1,11 +1,18 @@
 from datetime import UTC, datetime
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from core.config import settings
 from models.types import JobType
 from providers.scraper.interface import ScrapedPhotoData, ScrapedShopData
-from workers.persist import persist_scraped_data
+from workers.persist import (
+    ScrapeBaseline,
+    ScrapedShop,
+    persist_scraped_batch,
+    persist_scraped_data,
+    scrape_fingerprints,
+)
 
 
 def _make_shop_data(**overrides) -> ScrapedShopData:
@@ -82,15 +89,16 @@ async def test_persist_enqueues_enrich_shop_when_no_photos(mock_db, mock_queue):
     """When a shop has no photos, ENRICH_SHOP is enqueued directly so it is not stuck in enriching."""
     data = _make_shop_data(photos=[])
 
-    await persist_scraped_data(
-        shop_id="shop-02",
-        data=data,
-        db=mock_db,
-        queue=mock_queue,
-        submission_id="sub-abc",
-        submitted_by="user-xyz",
-        batch_id="batch-001",
-    )
+    with patch("workers.persist.settings.worker_pipeline_fast_path", False):
+        await persist_scraped_data(
+            shop_id="shop-02",
+            data=data,
+            db=mock_db,
+            queue=mock_queue,
+            submission_id="sub-abc",
+            submitted_by="user-xyz",
+            batch_id="batch-001",
+        )
 
     enqueue_calls = mock_queue.enqueue.call_args_list
     enrich_calls = [c for c in enqueue_calls if c.kwargs.get("job_type") == JobType.ENRICH_SHOP]
@@ -102,6 +110,31 @@ async def test_persist_enqueues_enrich_shop_when_no_photos(mock_db, mock_queue):
     assert payload["batch_id"] == "batch-001"
 
 
+@pytest.mark.asyncio
+async def test_persist_enqueues_shop_pipeline_for_user_submissions(mock_db, mock_queue):
+    """A user submission gets one SHOP_PIPELINE job starting at classification instead of per-stage jobs."""
+    data = _make_shop_data(photos=[ScrapedPhotoData(url="https://cdn/p1.jpg")])
+
+    await persist_scraped_data(
+        shop_id="shop-03",
+        data=data,
+        db=mock_db,
+        queue=mock_queue,
+        submission_id="sub-abc",
+        submitted_by="user-xyz",
+    )
+
+    mock_queue.enqueue.assert_called_once()
+    kwargs = mock_queue.enqueue.call_args.kwargs
+    assert kwargs["job_type"] == JobType.SHOP_PIPELINE
+    assert kwargs["payload"] == {
+        "shop_id": "shop-03",
+        "start_stage": "classify_shop_photos",
+        "submission_id": "sub-abc",
+        "submitted_by": "user-xyz",
+    }
+
+
 @pytest.mark.asyncio
 async def test_persist_stores_google_maps_features(mock_db, mock_queue):
     """google_maps_features from ScrapedShopData is persisted to the shops table."""
@@ -159,3 +192,164 @@ async def test_persist_writes_threads_url(mock_db, mock_queue):
     shop_updates = [c for c in update_calls if "threads_url" in (c.args[0] if c.args else {})]
     assert len(shop_updates) == 1
     assert shop_updates[0].args[0]["threads_url"] == "https://www.threads.net/@rufous"
+
+
+@pytest.mark.asyncio
+async def test_persist_batch_writes_all_shops_in_one_rpc(mock_db, mock_queue):
+    """A batch is persisted with one RPC, and next-step jobs are inserted once per job type."""
+    shops = [
+        ScrapedShop("shop-10", _make_shop_data(photos=[ScrapedPhotoData(url="https://cdn/a.jpg")])),
+        ScrapedShop("shop-11", _make_shop_data(photos=[ScrapedPhotoData(url="https://cdn/b.jpg")])),
+        ScrapedShop("shop-12", _make_shop_data(permanently_closed=True)),
+    ]
+
+    failures = await persist_scraped_batch(shops, mock_db, mock_queue, batch_id="batch-9")
+
+    assert failures == {}
+    mock_db.rpc.assert_called_once()
+    name, params = mock_db.rpc.call_args.args
+    assert name == "persist_scraped_shops"
+    assert [row["shop_id"] for row in params["p_shops"]] == ["shop-10", "shop-11", "shop-12"]
+    assert params["p_shops"][2]["shop"]["processing_status"] == "failed"
+    mock_db.table.assert_not_called()
+    # Closed shop-12 does not advance; the other two share one insert
+    mock_queue.enqueue_batch.assert_awaited_once_with(
+        JobType.CLASSIFY_SHOP_PHOTOS, [{"shop_id": "shop-10"}, {"shop_id": "shop-11"}], priority=2
+    )
+
+
+@pytest.mark.asyncio
+async def test_persist_batch_falls_back_per_shop_and_reports_failures(mock_db, mock_queue):
+    """When the bulk RPC fails, each shop is retried alone and only the bad one is reported."""
+    mock_db.rpc.return_value.execute.side_effect = Exception("bulk failed")
+    mock_db.table.return_value.update.return_value.eq.return_value.execute.side_effect = [
+        MagicMock(),
+        Exception("row locked"),
+    ]
+    shops = [ScrapedShop("shop-20", _make_shop_data()), ScrapedShop("shop-21", _make_shop_data())]
+
+    failures = await persist_scraped_batch(shops, mock_db, mock_queue)
+
+    assert list(failures) == ["shop-21"]
+    assert str(failures["shop-21"]) == "row locked"
+    mock_queue.enqueue.assert_awaited_once()
+    assert mock_queue.enqueue.call_args.kwargs["payload"]["shop_id"] == "shop-20"
+
+
+_REVIEWS = [{"text": "Great pour-over", "stars": 5, "published_at": "2025-05-01T00:00:00Z"}]
+
+
+def _baseline_for(data: ScrapedShopData, status: str = "live") -> ScrapeBaseline:
+    return ScrapeBaseline(processing_status=status, fingerprints=scrape_fingerprints(data))
+
+
+def test_fingerprints_ignore_ordering_and_rating_drift():
+    """Reordered photos/reviews and a new rating do not change any fingerprint."""
+    photos = [ScrapedPhotoData(url="https://cdn/a.jpg"), ScrapedPhotoData(url="https://cdn/b.jpg")]
+    reviews = [*_REVIEWS, {"text": "Cosy", "stars": 4, "published_at": None}]
+    before = _make_shop_data(photos=photos, reviews=reviews, rating=4.5)
+    after = _make_shop_data(photos=photos[::-1], reviews=reviews[::-1], rating=4.6)
+
+    assert scrape_fingerprints(before) == scrape_fingerprints(after)
+    changed = scrape_fingerprints(_make_shop_data(photos=photos, reviews=reviews, phone="02-1234"))
+    assert {k for k, v in changed.items() if v != scrape_fingerprints(before)[k]} == {"attributes"}
+
+
+@pytest.mark.asyncio
+async def test_persist_unchanged_rescrape_is_a_noop(mock_db, mock_queue):
+    """A settled shop re-scraped with identical content only gets its status restored."""
+    data = _make_shop_data(
+        reviews=_REVIEWS, photos=[ScrapedPhotoData(url="https://cdn/p1.jpg")], rating=4.4
+    )
+
+    await persist_scraped_data(
+        shop_id="shop-01",
+        data=data,
+        db=mock_db,
+        queue=mock_queue,
+        baseline=_baseline_for(data, status="pending_review"),
+    )
+
+    update = mock_db.table.return_value.update.call_args.args[0]
+    assert update["processing_status"] == "pending_review"
+    assert update["rating"] == 4.4
+    assert "opening_hours" not in update
+    mock_db.table.return_value.delete.assert_not_called()
+    mock_db.table.return_value.upsert.assert_not_called()
+    mock_queue.enqueue.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_persist_reviews_only_change_resummarizes(mock_db, mock_queue):
+    """New reviews on an otherwise unchanged shop replace reviews and enqueue only summarization."""
+    before = _make_shop_data(reviews=_REVIEWS, photos=[ScrapedPhotoData(url="https://cdn/p1.jpg")])
+    after = before.model_copy(
+        update={"reviews": [*_REVIEWS, {"text": "New oat latte", "stars": 5, "published_at": None}]}
+    )
+
+    await persist_scraped_data(
+        shop_id="shop-01", data=after, db=mock_db, queue=mock_queue, baseline=_baseline_for(before)
+    )
+
+    assert mock_db.table.return_value.update.call_args.args[0]["processing_status"] == "live"
+    inserted = mock_db.table.return_value.insert.call_args.args[0]
+    assert [r["text"] for r in inserted] == ["Great pour-over", "New oat latte"]
+    mock_db.table.return_value.upsert.assert_not_called()
+    mock_queue.enqueue.assert_awaited_once_with(
+        job_type=JobType.SUMMARIZE_REVIEWS,
+        payload={"shop_id": "shop-01"},
+        priority=2,
+        dedupe_key="shop-01",
+        debounce_seconds=settings.worker_enqueue_debounce_seconds,
+    )
+
+
+@pytest.mark.asyncio
+async def test_persist_material_change_runs_full_pipeline(mock_db, mock_queue):
+    """Changed hours send the shop back through classification like a first scrape."""
+    before = _make_shop_data(photos=[ScrapedPhotoData(url="https://cdn/p1.jpg")])
+    after = before.model_copy(update={"opening_hours": [{"day": 1, "open": 800, "close": 1700}]})
+
+    await persist_scraped_data(
+        shop_id="shop-01", data=after, db=mock_db, queue=mock_queue, baseline=_baseline_for(before)
+    )
+
+    update = mock_db.table.return_value.update.call_args.args[0]
+    assert update["processing_status"] == "enriching"
+    assert update["scrape_fingerprints"] == scrape_fingerprints(after)
+    assert mock_queue.enqueue.call_args.kwargs["job_type"] == JobType.CLASSIFY_SHOP_PHOTOS
+
+
+@pytest.mark.asyncio
+async def test_persist_batch_sends_minimal_rows_for_unchanged_shops(mock_db, mock_queue):
+    """In the bulk RPC an unchanged shop carries no reviews or photos and enqueues nothing."""
+    data = _make_shop_data(reviews=_REVIEWS, photos=[ScrapedPhotoData(url="https://cdn/a.jpg")])
+    shops = [ScrapedShop("shop-30", data, baseline=_baseline_for(data))]
+
+    failures = await persist_scraped_batch(shops, mock_db, mock_queue)
+
+    assert failures == {}
+    row = mock_db.rpc.call_args.args[1]["p_shops"][0]
+    assert row["reviews"] == [] and row["photos"] == []
+    assert row["shop"]["processing_status"] == "live"
+    mock_queue.enqueue_batch.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_persist_batch_dedupes_resummarize_jobs(mock_db, mock_queue):
+    """Reviews-only re-scrapes in a batch merge into any pending summary job, debounced."""
+    before = _make_shop_data(reviews=_REVIEWS)
+    after = before.model_copy(
+        update={"reviews": [*_REVIEWS, {"text": "New oat latte", "stars": 5, "published_at": None}]}
+    )
+    shops = [ScrapedShop("shop-40", after, baseline=_baseline_for(before))]
+
+    await persist_scraped_batch(shops, mock_db, mock_queue)
+
+    mock_queue.enqueue_batch.assert_awaited_once_with(
+        JobType.SUMMARIZE_REVIEWS,
+        [{"shop_id": "shop-40"}],
+        priority=2,
+        dedupe_field="shop_id",
+        debounce_seconds=settings.worker_enqueue_debounce_seconds,
+    )
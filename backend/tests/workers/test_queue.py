@@ -1,9 +1,9 @@
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 from unittest.mock import MagicMock
 
 import pytest
 
-from models.types import JobReasonCode, JobStatus, JobType
+from models.types import Job, JobReasonCode, JobStatus, JobType
 from workers.queue import JobQueue
 
 
@@ -144,91 +144,138 @@ class TestJobQueue:
         assert update_call["status"] == JobStatus.PENDING.value
         assert "scheduled_at" in update_call
 
-    async def test_claim_batch_returns_jobs_up_to_limit(self, job_queue, mock_supabase):
-        """claim_batch calls claim_jobs_batch RPC and returns a list of claimed jobs."""
-        now = datetime.now(UTC).isoformat()
+    async def test_claim_multi_sends_every_type_in_one_rpc(self, job_queue, mock_supabase):
+        """claim_multi passes per-type limits and shared group limits to claim_jobs_multi."""
+        mock_supabase.rpc = MagicMock(
+            return_value=MagicMock(execute=MagicMock(return_value=MagicMock(data=[])))
+        )
+        await job_queue.claim_multi(
+            {JobType.ENRICH_SHOP: 2, JobType.PUBLISH_SHOP: 0, JobType.SUMMARIZE_REVIEWS: 3},
+            groups={JobType.ENRICH_SHOP: "openai:m", JobType.SUMMARIZE_REVIEWS: "openai:m"},
+            group_capacity={"openai:m": 4},
+        )
+        mock_supabase.rpc.assert_called_once_with(
+            "claim_jobs_multi",
+            {
+                "p_job_types": ["enrich_shop", "summarize_reviews"],
+                "p_limits": [2, 3],
+                "p_groups": ["openai:m", "openai:m"],
+                "p_group_limits": {"openai:m": 4},
+                "p_aging_seconds": 300,
+                "p_aging_max": 5,
+                "p_submission_share": 0.5,
+            },
+        )
+
+    async def test_release_refunds_the_claim_attempt(self, job_queue, mock_supabase):
+        """release puts a claimed job back to pending and undoes the attempt the claim added."""
+        job = Job(
+            id="job-1",
+            job_type=JobType.ENRICH_SHOP,
+            payload={},
+            status=JobStatus.CLAIMED,
+            attempts=2,
+            scheduled_at=datetime.now(UTC),
+            created_at=datetime.now(UTC),
+        )
+        await job_queue.release(job, reason="Released during worker shutdown")
+
+        update = mock_supabase.table.return_value.update
+        values = update.call_args.args[0]
+        assert values["status"] == "pending"
+        assert values["attempts"] == 1
+        assert values["claimed_at"] is None
+        update.return_value.eq.return_value.eq.assert_called_once_with("status", "claimed")
+
+    async def test_claim_multi_skips_rpc_without_capacity(self, job_queue, mock_supabase):
+        """claim_multi makes no round trip when no type has spare capacity."""
+        mock_supabase.rpc = MagicMock()
+        assert await job_queue.claim_multi({JobType.ENRICH_SHOP: 0}) == []
+        mock_supabase.rpc.assert_not_called()
+
+    async def test_enqueue_with_dedupe_key_merges_via_rpc(self, job_queue, mock_supabase):
+        """A keyed enqueue goes through the dedupe RPC and returns the surviving job id."""
         mock_supabase.rpc = MagicMock(
             return_value=MagicMock(
                 execute=MagicMock(
-                    return_value=MagicMock(
-                        data=[
-                            {
-                                "id": "job-1",
-                                "job_type": "publish_shop",
-                                "payload": {"shop_id": "s1"},
-                                "status": "claimed",
-                                "priority": 0,
-                                "attempts": 1,
-                                "max_attempts": 3,
-                                "last_error": None,
-                                "scheduled_at": now,
-                                "claimed_at": now,
-                                "completed_at": None,
-                                "created_at": now,
-                            },
-                            {
-                                "id": "job-2",
-                                "job_type": "publish_shop",
-                                "payload": {"shop_id": "s2"},
-                                "status": "claimed",
-                                "priority": 0,
-                                "attempts": 1,
-                                "max_attempts": 3,
-                                "last_error": None,
-                                "scheduled_at": now,
-                                "claimed_at": now,
-                                "completed_at": None,
-                                "created_at": now,
-                            },
-                        ]
-                    )
+                    return_value=MagicMock(data=[{"id": "job-existing", "dedupe_key": "shop-1"}])
                 )
             )
         )
-        jobs = await job_queue.claim_batch(JobType.PUBLISH_SHOP, limit=5)
-        assert len(jobs) == 2
-        assert all(j.status == JobStatus.CLAIMED for j in jobs)
-        mock_supabase.rpc.assert_called_once_with(
-            "claim_jobs_batch", {"p_job_type": "publish_shop", "p_limit": 5}
+        job_id = await job_queue.enqueue(
+            job_type=JobType.GENERATE_EMBEDDING,
+            payload={"shop_id": "shop-1"},
+            priority=2,
+            dedupe_key="shop-1",
         )
+        assert job_id == "job-existing"
+        mock_supabase.table.assert_not_called()
+        name, params = mock_supabase.rpc.call_args.args
+        assert name == "enqueue_jobs_deduped"
+        assert params["p_job_type"] == "generate_embedding"
+        assert params["p_jobs"] == [{"dedupe_key": "shop-1", "payload": {"shop_id": "shop-1"}}]
+        assert params["p_debounce"] is False
 
-    async def test_claim_batch_returns_empty_when_no_jobs(self, job_queue, mock_supabase):
-        """claim_batch returns an empty list when no pending jobs exist."""
+    async def test_enqueue_debounce_delays_scheduled_at(self, job_queue, mock_supabase):
+        """debounce_seconds schedules the job in the future and asks the RPC to push back."""
         mock_supabase.rpc = MagicMock(
-            return_value=MagicMock(execute=MagicMock(return_value=MagicMock(data=[])))
+            return_value=MagicMock(
+                execute=MagicMock(return_value=MagicMock(data=[{"id": "job-1", "dedupe_key": "s"}]))
+            )
         )
-        jobs = await job_queue.claim_batch(JobType.PUBLISH_SHOP, limit=5)
-        assert jobs == []
+        before = datetime.now(UTC)
+        await job_queue.enqueue(
+            job_type=JobType.SYNC_MENU_HIGHLIGHTS,
+            payload={"shop_id": "s"},
+            dedupe_key="s",
+            debounce_seconds=30,
+        )
+        params = mock_supabase.rpc.call_args.args[1]
+        assert params["p_debounce"] is True
+        assert datetime.fromisoformat(params["p_scheduled_at"]) >= before + timedelta(seconds=30)
 
-    async def test_get_pending_job_types_returns_ready_types(self, job_queue, mock_supabase):
-        """get_pending_job_types returns job types from the get_pending_job_types RPC."""
+    async def test_enqueue_batch_dedupe_field_collapses_repeated_keys(
+        self, job_queue, mock_supabase
+    ):
+        """Payloads sharing a key are merged before the RPC so one statement never hits a row twice."""
         mock_supabase.rpc = MagicMock(
             return_value=MagicMock(
                 execute=MagicMock(
                     return_value=MagicMock(
-                        data=[
-                            {"job_type": "enrich_shop"},
-                            {"job_type": "generate_embedding"},
-                        ]
+                        data=[{"id": "j1", "dedupe_key": "a"}, {"id": "j2", "dedupe_key": "b"}]
                     )
                 )
             )
         )
-        result = await job_queue.get_pending_job_types()
-        assert len(result) == 2
-        assert JobType.ENRICH_SHOP in result
-        assert JobType.GENERATE_EMBEDDING in result
-        mock_supabase.rpc.assert_called_once_with("get_pending_job_types", {})
+        ids = await job_queue.enqueue_batch(
+            job_type=JobType.SUMMARIZE_REVIEWS,
+            payloads=[{"shop_id": "a"}, {"shop_id": "b"}, {"shop_id": "a", "batch_id": "x"}],
+            dedupe_field="shop_id",
+        )
+        assert ids == ["j1", "j2"]
+        params = mock_supabase.rpc.call_args.args[1]
+        assert params["p_jobs"] == [
+            {"dedupe_key": "a", "payload": {"shop_id": "a", "batch_id": "x"}},
+            {"dedupe_key": "b", "payload": {"shop_id": "b"}},
+        ]
 
-    async def test_get_pending_job_types_returns_empty_when_queue_is_idle(
-        self, job_queue, mock_supabase
-    ):
-        """get_pending_job_types returns an empty list when no jobs are ready."""
+    async def test_enqueue_batch_debounce_delays_scheduled_at(self, job_queue, mock_supabase):
+        """A deduped batch honours debounce_seconds like a single keyed enqueue."""
         mock_supabase.rpc = MagicMock(
-            return_value=MagicMock(execute=MagicMock(return_value=MagicMock(data=[])))
+            return_value=MagicMock(
+                execute=MagicMock(return_value=MagicMock(data=[{"id": "j1", "dedupe_key": "a"}]))
+            )
+        )
+        before = datetime.now(UTC)
+        await job_queue.enqueue_batch(
+            job_type=JobType.SUMMARIZE_REVIEWS,
+            payloads=[{"shop_id": "a"}],
+            dedupe_field="shop_id",
+            debounce_seconds=30,
         )
-        result = await job_queue.get_pending_job_types()
-        assert result == []
+        params = mock_supabase.rpc.call_args.args[1]
+        assert params["p_debounce"] is True
+        assert datetime.fromisoformat(params["p_scheduled_at"]) >= before + timedelta(seconds=30)
 
     async def test_fail_marks_permanently_failed_at_max_attempts(self, job_queue, mock_supabase):
         """At max_attempts: status is set to FAILED permanently."""
@@ -1,5 +1,6 @@
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
+from core.config import settings
 from workers.handlers.reembed_reviewed_shops import handle_reembed_reviewed_shops
 
 
@@ -52,3 +53,19 @@ class TestReembedReviewedShops:
         rpc_name, rpc_params = db.rpc.call_args[0]
         assert rpc_name == "find_shops_needing_review_reembed"
         assert rpc_params["p_min_text_length"] == 15
+
+    async def test_large_runs_go_through_a_provider_batch(self):
+        """At or above llm_batch_min_requests shops, summaries are submitted as one LLM batch."""
+        db = MagicMock()
+        queue = AsyncMock()
+        batch_llm = MagicMock()
+        shop_ids = [f"shop-{i}" for i in range(settings.llm_batch_min_requests)]
+        db.rpc.return_value.execute.return_value = MagicMock(data=[{"id": s} for s in shop_ids])
+
+        with patch(
+            "workers.handlers.reembed_reviewed_shops.submit_llm_batch", AsyncMock()
+        ) as submit:
+            await handle_reembed_reviewed_shops(db=db, queue=queue, batch_llm=batch_llm)
+
+        submit.assert_awaited_once_with("summarize_reviews", shop_ids, db, batch_llm, queue)
+        queue.enqueue_batch.assert_not_called()
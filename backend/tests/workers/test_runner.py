@@ -0,0 +1,69 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from workers.runner import run_worker, serve
+
+
+class TestServe:
+    async def test_primary_process_registers_maintenance_jobs(self):
+        """Process 0 owns the cron triggers and the stuck-job reaper."""
+        stop = asyncio.Event()
+        stop.set()
+        mock_scheduler = MagicMock()
+        with (
+            patch("workers.runner.create_scheduler", return_value=mock_scheduler) as mock_create,
+            patch("workers.runner.poll_pending_job_types", new_callable=AsyncMock),
+            patch("workers.runner.drain_jobs", new_callable=AsyncMock),
+        ):
+            await serve(0, stop=stop)
+
+        mock_create.assert_called_once_with(include_maintenance=True)
+
+    async def test_secondary_process_only_polls(self):
+        """Processes other than 0 skip cron triggers so they never double-fire."""
+        stop = asyncio.Event()
+        stop.set()
+        with (
+            patch("workers.runner.create_scheduler", return_value=MagicMock()) as mock_create,
+            patch("workers.runner.poll_pending_job_types", new_callable=AsyncMock),
+            patch("workers.runner.drain_jobs", new_callable=AsyncMock),
+        ):
+            await serve(1, stop=stop)
+
+        mock_create.assert_called_once_with(include_maintenance=False)
+
+    async def test_polls_immediately_then_shuts_down_scheduler_on_stop(self):
+        """A fresh worker picks up pending work right away and stops its scheduler on shutdown."""
+        stop = asyncio.Event()
+        stop.set()
+        mock_scheduler = MagicMock()
+        with (
+            patch("workers.runner.create_scheduler", return_value=mock_scheduler),
+            patch("workers.runner.poll_pending_job_types", new_callable=AsyncMock) as mock_poll,
+            patch("workers.runner.drain_jobs", new_callable=AsyncMock) as mock_drain,
+        ):
+            await serve(0, stop=stop)
+
+        mock_poll.assert_awaited_once()
+        mock_drain.assert_awaited_once()
+        mock_scheduler.start.assert_called_once()
+        mock_scheduler.shutdown.assert_called_once_with(wait=False)
+
+
+class TestRunWorker:
+    def test_rejects_non_positive_process_count(self):
+        with pytest.raises(ValueError, match="processes must be >= 1"):
+            run_worker(0)
+
+    def test_single_process_runs_in_current_interpreter(self):
+        """With one process there is no supervisor — the worker runs inline."""
+        with (
+            patch("workers.runner._process_main") as mock_main,
+            patch("workers.runner._spawn") as mock_spawn,
+        ):
+            run_worker(1)
+
+        mock_main.assert_called_once_with(0)
+        mock_spawn.assert_not_called()
@@ -1,13 +1,24 @@
 import asyncio
+import random
+from collections import Counter
+from datetime import UTC, datetime, timedelta
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from core.config import settings
 from models.types import JobReasonCode, JobType
+from workers.leader import HOLDER_ID
 from workers.scheduler import (
+    _claim_order,
     _run_job,
+    claim_all_job_types,
     create_scheduler,
+    drain_jobs,
     get_scheduler_status,
+    poll_pending_job_types,
+    publish_worker_metrics,
+    run_archive_old_jobs,
     run_sweep_timed_out,
 )
 
@@ -20,6 +31,7 @@ class TestScheduler:
         assert "daily_batch_scrape" in job_ids
         assert "weekly_email" in job_ids
         assert "delete_expired_accounts" in job_ids
+        assert "archive_old_jobs" in job_ids
 
     def test_single_consolidated_poller_is_registered(self):
         """A single interval poller replaces per-type jobs, eliminating N×12 empty DB polls."""
@@ -83,6 +95,7 @@ async def test_sweep_timed_out_marks_stuck_shops():
     with (
         patch("workers.scheduler.get_service_role_client", return_value=mock_db),
         patch("workers.scheduler.JobQueue", return_value=mock_queue),
+        patch("workers.scheduler.is_leader", return_value=True),
     ):
         await run_sweep_timed_out()
 
@@ -118,12 +131,37 @@ async def test_sweep_timed_out_skips_when_lock_not_acquired():
     with (
         patch("workers.scheduler.get_service_role_client", return_value=mock_db),
         patch("workers.scheduler.JobQueue", return_value=mock_queue),
+        patch("workers.scheduler.is_leader", return_value=True),
     ):
         await run_sweep_timed_out()
 
     mock_db.table.return_value.update.assert_not_called()
 
 
+async def test_archive_old_jobs_drains_in_batches_until_short_batch():
+    """Archival keeps calling the RPC while batches come back full, then stops."""
+    mock_queue = MagicMock()
+    mock_queue.acquire_cron_lock.return_value = True
+    mock_queue.archive_terminal_jobs = AsyncMock(side_effect=[(1000, 4200), (1000, 3900), (12, 30)])
+
+    with (
+        patch("workers.scheduler.get_service_role_client", return_value=MagicMock()),
+        patch("workers.scheduler.JobQueue", return_value=mock_queue),
+        patch("workers.scheduler.is_leader", return_value=True),
+        patch("workers.scheduler.settings") as mock_settings,
+    ):
+        mock_settings.worker_job_retention_days = 14
+        mock_settings.worker_failed_job_retention_days = 30
+        await run_archive_old_jobs()
+
+    assert mock_queue.archive_terminal_jobs.await_count == 3
+    assert mock_queue.archive_terminal_jobs.call_args.kwargs == {
+        "completed_days": 14,
+        "failed_days": 30,
+        "batch_size": 1000,
+    }
+
+
 def test_sweep_timed_out_registered_in_scheduler():
     from workers.scheduler import create_scheduler
 
@@ -191,3 +229,157 @@ class TestRunJobReasonCodes:
         assert call_kwargs[1].get("reason_code") == JobReasonCode.PROVIDER_ERROR or (
             len(call_kwargs[0]) >= 3 and call_kwargs[0][2] == JobReasonCode.PROVIDER_ERROR
         )
+
+
+class TestPollOnlyScheduler:
+    def test_secondary_worker_process_only_polls(self):
+        """Without maintenance jobs, a worker process only polls and publishes its metrics."""
+        scheduler = create_scheduler(include_maintenance=False)
+        job_ids = {job.id for job in scheduler.get_jobs()}
+        assert job_ids == {"poll_pending_jobs", "publish_worker_metrics"}
+
+    async def test_publishes_metrics_under_its_holder_id(self):
+        """Each process upserts its own snapshot, with limits for every job type."""
+        mock_queue = MagicMock()
+        mock_queue.publish_worker_metrics = AsyncMock()
+        with (
+            patch("workers.scheduler.get_service_role_client"),
+            patch("workers.scheduler.JobQueue", return_value=mock_queue),
+        ):
+            await publish_worker_metrics()
+
+        holder_id, snapshot = mock_queue.publish_worker_metrics.await_args.args
+        assert holder_id == HOLDER_ID
+        assert set(snapshot["job_types"]) == {jt.value for jt in JobType}
+        assert snapshot["job_types"]["enrich_shop"]["limit"] >= 1
+
+
+class TestClaimAllJobTypes:
+    async def test_claims_every_type_in_one_round_trip(self):
+        """One claim_multi call covers all types with spare capacity, skipping types in backoff."""
+        queue = MagicMock()
+        queue.claim_multi = AsyncMock(return_value=[])
+        in_flight = {jt: 0 for jt in JobType}
+        in_flight[JobType.PUBLISH_SHOP] = 100
+        backoff = {JobType.ENRICH_SHOP: datetime.now(UTC) + timedelta(minutes=1)}
+
+        with (
+            patch("workers.scheduler._in_flight", in_flight),
+            patch("workers.scheduler._rate_limit_backoff_until", backoff),
+            patch("workers.scheduler.get_provider_throttle", return_value=None),
+        ):
+            await claim_all_job_types(queue)
+
+        queue.claim_multi.assert_awaited_once()
+        capacity = queue.claim_multi.call_args.args[0]
+        assert JobType.ENRICH_SHOP not in capacity
+        assert JobType.PUBLISH_SHOP not in capacity
+        assert capacity[JobType.GENERATE_EMBEDDING] > 0
+
+    async def test_returns_unclaimed_throttle_slots(self):
+        """Slots reserved for a provider group but not filled by the claim are handed back."""
+        queue = MagicMock()
+        queue.claim_multi = AsyncMock(return_value=[])
+        throttle = MagicMock(key="openai:m")
+        throttle.reserve.return_value = 2
+
+        def _throttle_for(job_type):
+            return throttle if job_type == JobType.SUMMARIZE_REVIEWS else None
+
+        with (
+            patch("workers.scheduler._in_flight", {jt: 0 for jt in JobType}),
+            patch("workers.scheduler._rate_limit_backoff_until", {}),
+            patch("workers.scheduler.get_provider_throttle", side_effect=_throttle_for),
+        ):
+            await claim_all_job_types(queue)
+
+        kwargs = queue.claim_multi.call_args.kwargs
+        assert kwargs["groups"] == {JobType.SUMMARIZE_REVIEWS: "openai:m"}
+        assert kwargs["group_capacity"] == {"openai:m": 2}
+        throttle.unreserve.assert_called_once_with(2)
+
+    def test_claim_order_favours_heavier_types(self, monkeypatch):
+        """A type weighted 4 is served first about four times as often as a weight-1 type."""
+        monkeypatch.setattr(
+            settings,
+            "worker_claim_weights",
+            {JobType.SHOP_PIPELINE.value: 4.0, JobType.SUMMARIZE_REVIEWS.value: 1.0},
+        )
+        random.seed(7)
+        firsts = Counter()
+        for _ in range(2000):
+            order = [
+                jt
+                for jt in _claim_order()
+                if jt in (JobType.SHOP_PIPELINE, JobType.SUMMARIZE_REVIEWS)
+            ]
+            firsts[order[0]] += 1
+
+        assert sorted(_claim_order()) == sorted(JobType)
+        assert 3.0 < firsts[JobType.SHOP_PIPELINE] / firsts[JobType.SUMMARIZE_REVIEWS] < 5.0
+
+
+async def _hang(*args):
+    await asyncio.sleep(60)
+
+
+class TestDrainJobs:
+    def _job(self):
+        job = MagicMock()
+        job.id = "job-1"
+        job.job_type = JobType.ENRICH_SHOP
+        return job
+
+    async def test_unfinished_job_is_released_not_failed(self):
+        """A job still running when the grace period ends goes back to pending without a failure."""
+        mock_queue = MagicMock()
+        mock_queue.fail = AsyncMock()
+        mock_queue.release = AsyncMock()
+        tasks: set[asyncio.Task[None]] = set()
+        job = self._job()
+
+        with (
+            patch("workers.scheduler.get_service_role_client"),
+            patch("workers.scheduler.JobQueue", return_value=mock_queue),
+            patch("workers.scheduler._dispatch_job", side_effect=_hang),
+            patch("workers.scheduler._in_flight", {JobType.ENRICH_SHOP: 1}),
+            patch("workers.scheduler._tasks", tasks),
+            patch("workers.scheduler._draining", False),
+        ):
+            tasks.add(asyncio.create_task(_run_job(job)))
+            await asyncio.sleep(0)
+            await drain_jobs(grace_seconds=0.01)
+
+        mock_queue.release.assert_awaited_once_with(job, reason="Released during worker shutdown")
+        mock_queue.fail.assert_not_called()
+
+    async def test_jobs_finishing_within_grace_complete_normally(self):
+        """Jobs that finish inside the grace period are completed, not released."""
+        mock_queue = MagicMock()
+        mock_queue.complete = AsyncMock()
+        mock_queue.release = AsyncMock()
+        tasks: set[asyncio.Task[None]] = set()
+
+        with (
+            patch("workers.scheduler.get_service_role_client"),
+            patch("workers.scheduler.JobQueue", return_value=mock_queue),
+            patch("workers.scheduler._dispatch_job", new_callable=AsyncMock),
+            patch("workers.scheduler._in_flight", {JobType.ENRICH_SHOP: 1}),
+            patch("workers.scheduler._tasks", tasks),
+            patch("workers.scheduler._draining", False),
+        ):
+            tasks.add(asyncio.create_task(_run_job(self._job())))
+            await drain_jobs(grace_seconds=1)
+
+        mock_queue.complete.assert_awaited_once_with("job-1")
+        mock_queue.release.assert_not_called()
+
+    async def test_poll_stops_claiming_once_draining(self):
+        """After drain starts, the poller makes no further claims."""
+        with (
+            patch("workers.scheduler._draining", True),
+            patch("workers.scheduler.claim_all_job_types", new_callable=AsyncMock) as mock_claim,
+        ):
+            await poll_pending_job_types()
+
+        mock_claim.assert_not_called()
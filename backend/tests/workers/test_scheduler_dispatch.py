@@ -37,12 +37,12 @@ async def test_dispatch_classify_shop_photos():
     job = _make_job(JobType.CLASSIFY_SHOP_PHOTOS, {"shop_id": "shop-01"})
 
     with (
-        patch("workers.scheduler.get_llm_provider") as mock_get_llm,
+        patch("workers.scheduler.get_provider_registry") as mock_registry,
         patch(
             "workers.scheduler.handle_classify_shop_photos", new_callable=AsyncMock
         ) as mock_handler,
     ):
-        mock_get_llm.return_value = MagicMock()
+        mock_registry.return_value.llm.return_value = MagicMock()
         await _dispatch_job(job, MagicMock(), MagicMock())
 
     mock_handler.assert_called_once()
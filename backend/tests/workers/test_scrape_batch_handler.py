@@ -12,6 +12,7 @@ from providers.scraper.interface import (
     ScrapedShopData,
 )
 from workers.handlers.scrape_batch import handle_scrape_batch
+from workers.persist import scrape_fingerprints
 
 _BATCH_ID = "b1a2c3d4-e5f6-7890-abcd-ef1234567890"
 _SHOP_ID_A = "a1b2c3d4-e5f6-7890-abcd-ef1234567890"
@@ -20,6 +21,18 @@ _URL_A = "https://maps.google.com/?cid=11111111111111111"
 _URL_B = "https://maps.google.com/?cid=22222222222222222"
 
 
+def _streaming(results=(), error: Exception | None = None) -> MagicMock:
+    """scrape_batch_stream stand-in: yields results in order, then raises error if given."""
+
+    async def _gen(inputs):
+        for result in results:
+            yield result
+        if error is not None:
+            raise error
+
+    return MagicMock(side_effect=_gen)
+
+
 @pytest.fixture
 def scraped_data_a():
     return ScrapedShopData(
@@ -70,9 +83,23 @@ def mock_db():
 def mock_queue():
     queue = MagicMock()
     queue.enqueue = AsyncMock(return_value="job-enrich-001")
+    queue.enqueue_batch = AsyncMock(return_value=["job-batch-001"])
     return queue
 
 
+def _enqueued(queue: MagicMock, job_type: JobType) -> list[dict]:
+    """Payloads enqueued for job_type, whether one at a time or via enqueue_batch."""
+    payloads = [
+        c.kwargs["payload"]
+        for c in queue.enqueue.call_args_list
+        if c.kwargs.get("job_type") == job_type
+    ]
+    for c in queue.enqueue_batch.call_args_list:
+        if c.args[0] == job_type:
+            payloads.extend(c.args[1])
+    return payloads
+
+
 @pytest.mark.asyncio
 async def test_all_shops_scraped_successfully_enqueues_classification(
     mock_db, mock_queue, scraped_data_a, scraped_data_b
@@ -83,10 +110,12 @@ async def test_all_shops_scraped_successfully_enqueues_classification(
     ENRICH_SHOP is now triggered by classify_shop_photos, not directly by scrape.
     """
     mock_scraper = AsyncMock()
-    mock_scraper.scrape_batch.return_value = [
-        BatchScrapeResult(shop_id=_SHOP_ID_A, data=scraped_data_a),  # has photos
-        BatchScrapeResult(shop_id=_SHOP_ID_B, data=scraped_data_b),  # no photos
-    ]
+    mock_scraper.scrape_batch_stream = _streaming(
+        [
+            BatchScrapeResult(shop_id=_SHOP_ID_A, data=scraped_data_a),  # has photos
+            BatchScrapeResult(shop_id=_SHOP_ID_B, data=scraped_data_b),  # no photos
+        ]
+    )
     payload = {
         "batch_id": _BATCH_ID,
         "shops": [
@@ -101,26 +130,18 @@ async def test_all_shops_scraped_successfully_enqueues_classification(
     mock_db.table.return_value.update.return_value.in_.assert_called()
 
     # Shop A has photos → CLASSIFY_SHOP_PHOTOS enqueued
-    classify_calls = [
-        c
-        for c in mock_queue.enqueue.call_args_list
-        if c.kwargs.get("job_type") == JobType.CLASSIFY_SHOP_PHOTOS
-    ]
-    assert len(classify_calls) == 1
-    assert classify_calls[0].kwargs["payload"]["shop_id"] == _SHOP_ID_A
+    classify_payloads = _enqueued(mock_queue, JobType.CLASSIFY_SHOP_PHOTOS)
+    assert len(classify_payloads) == 1
+    assert classify_payloads[0]["shop_id"] == _SHOP_ID_A
 
     # Shop B has no photos → ENRICH_SHOP enqueued directly (bypasses classify step)
-    enrich_calls = [
-        c
-        for c in mock_queue.enqueue.call_args_list
-        if c.kwargs.get("job_type") == JobType.ENRICH_SHOP
-    ]
-    assert len(enrich_calls) == 1
-    assert enrich_calls[0].kwargs["payload"]["shop_id"] == _SHOP_ID_B
+    enrich_payloads = _enqueued(mock_queue, JobType.ENRICH_SHOP)
+    assert len(enrich_payloads) == 1
+    assert enrich_payloads[0]["shop_id"] == _SHOP_ID_B
 
     # Scraper was called once (one Apify actor run)
-    mock_scraper.scrape_batch.assert_called_once()
-    inputs = mock_scraper.scrape_batch.call_args.args[0]
+    mock_scraper.scrape_batch_stream.assert_called_once()
+    inputs = mock_scraper.scrape_batch_stream.call_args.args[0]
     assert len(inputs) == 2
     assert all(isinstance(i, BatchScrapeInput) for i in inputs)
 
@@ -134,10 +155,12 @@ async def test_shop_not_found_on_google_maps_marks_failed_without_aborting_batch
     scraped_data_b has no photos, so no queue calls expected for the successful shop.
     """
     mock_scraper = AsyncMock()
-    mock_scraper.scrape_batch.return_value = [
-        BatchScrapeResult(shop_id=_SHOP_ID_A, data=None),  # not found
-        BatchScrapeResult(shop_id=_SHOP_ID_B, data=scraped_data_b),  # no photos
-    ]
+    mock_scraper.scrape_batch_stream = _streaming(
+        [
+            BatchScrapeResult(shop_id=_SHOP_ID_A, data=None),  # not found
+            BatchScrapeResult(shop_id=_SHOP_ID_B, data=scraped_data_b),  # no photos
+        ]
+    )
     payload = {
         "batch_id": _BATCH_ID,
         "shops": [
@@ -149,13 +172,9 @@ async def test_shop_not_found_on_google_maps_marks_failed_without_aborting_batch
     await handle_scrape_batch(payload=payload, db=mock_db, scraper=mock_scraper, queue=mock_queue)
 
     # Shop B scraped successfully with no photos → ENRICH_SHOP enqueued directly
-    enrich_calls = [
-        c
-        for c in mock_queue.enqueue.call_args_list
-        if c.kwargs.get("job_type") == JobType.ENRICH_SHOP
-    ]
-    assert len(enrich_calls) == 1
-    assert enrich_calls[0].kwargs["payload"]["shop_id"] == _SHOP_ID_B
+    enrich_payloads = _enqueued(mock_queue, JobType.ENRICH_SHOP)
+    assert len(enrich_payloads) == 1
+    assert enrich_payloads[0]["shop_id"] == _SHOP_ID_B
 
     # Shop A should be marked "failed"
     update_calls = mock_db.table.return_value.update.call_args_list
@@ -185,12 +204,15 @@ async def test_persist_failure_marks_shop_failed_and_continues_remaining(
     scraped_data_b has no photos, so no queue calls for shop B either.
     """
     mock_scraper = AsyncMock()
-    mock_scraper.scrape_batch.return_value = [
-        BatchScrapeResult(shop_id=_SHOP_ID_A, data=scraped_data_a),
-        BatchScrapeResult(shop_id=_SHOP_ID_B, data=scraped_data_b),
-    ]
+    mock_scraper.scrape_batch_stream = _streaming(
+        [
+            BatchScrapeResult(shop_id=_SHOP_ID_A, data=scraped_data_a),
+            BatchScrapeResult(shop_id=_SHOP_ID_B, data=scraped_data_b),
+        ]
+    )
 
-    # Simulate: shop A's review insert fails
+    # Simulate: the bulk RPC fails, then shop A's review insert fails on the per-shop retry
+    mock_db.rpc.return_value.execute.side_effect = Exception("bulk persist failed")
     insert_mock = MagicMock()
     insert_mock.execute.side_effect = [Exception("DB constraint error"), MagicMock(), MagicMock()]
     mock_db.table.return_value.insert.return_value = insert_mock
@@ -211,13 +233,9 @@ async def test_persist_failure_marks_shop_failed_and_continues_remaining(
 
     # Shop A failed (review insert raised) → no enqueue for A
     # Shop B has no photos → ENRICH_SHOP enqueued directly
-    enrich_calls = [
-        c
-        for c in mock_queue.enqueue.call_args_list
-        if c.kwargs.get("job_type") == JobType.ENRICH_SHOP
-    ]
-    assert len(enrich_calls) == 1
-    assert enrich_calls[0].kwargs["payload"]["shop_id"] == _SHOP_ID_B
+    enrich_payloads = _enqueued(mock_queue, JobType.ENRICH_SHOP)
+    assert len(enrich_payloads) == 1
+    assert enrich_payloads[0]["shop_id"] == _SHOP_ID_B
     failed_updates = [
         c
         for c in mock_db.table.return_value.update.call_args_list
@@ -234,7 +252,7 @@ async def test_scraper_provider_failure_marks_entire_batch_failed(mock_db, mock_
     provider outage, etc.) before any results are returned.
     """
     mock_scraper = AsyncMock()
-    mock_scraper.scrape_batch.side_effect = RuntimeError("Apify actor timed out")
+    mock_scraper.scrape_batch_stream = _streaming(error=RuntimeError("Apify actor timed out"))
     payload = {
         "batch_id": _BATCH_ID,
         "shops": [
@@ -267,7 +285,7 @@ async def test_scraper_provider_failure_marks_entire_batch_failed(mock_db, mock_
 async def test_scraper_provider_failure_updates_submissions(mock_db, mock_queue):
     """When the scrape provider raises, submission records are also marked failed."""
     mock_scraper = AsyncMock()
-    mock_scraper.scrape_batch.side_effect = RuntimeError("Connection reset")
+    mock_scraper.scrape_batch_stream = _streaming(error=RuntimeError("Connection reset"))
     payload = {
         "batch_id": _BATCH_ID,
         "shops": [
@@ -298,7 +316,7 @@ async def test_empty_batch_payload_is_a_no_op(mock_db, mock_queue):
 
     await handle_scrape_batch(payload=payload, db=mock_db, scraper=mock_scraper, queue=mock_queue)
 
-    mock_scraper.scrape_batch.assert_not_called()
+    mock_scraper.scrape_batch_stream.assert_not_called()
     mock_queue.enqueue.assert_not_called()
 
 
@@ -306,16 +324,18 @@ async def test_empty_batch_payload_is_a_no_op(mock_db, mock_queue):
 async def test_submission_context_stored_and_photos_classification_enqueued(
     mock_db, mock_queue, scraped_data_a
 ):
-    """Submission context is linked to the shop; CLASSIFY_SHOP_PHOTOS is enqueued for shops with photos.
+    """Submission context is linked to the shop; a SHOP_PIPELINE job starting at photo
+    classification is enqueued for submitted shops with photos.
 
-    With the new pipeline (scrape → classify → enrich), ENRICH_SHOP is no longer directly enqueued
-    from the scrape handler. Submission context (submission_id, submitted_by) is stored in DB
-    via persist_scraped_data, not forwarded through the queue chain.
+    Submission context (submission_id, submitted_by) is linked in the DB by persist_scraped_shops
+    and also carried on the pipeline payload.
     """
     mock_scraper = AsyncMock()
-    mock_scraper.scrape_batch.return_value = [
-        BatchScrapeResult(shop_id=_SHOP_ID_A, data=scraped_data_a),
-    ]
+    mock_scraper.scrape_batch_stream = _streaming(
+        [
+            BatchScrapeResult(shop_id=_SHOP_ID_A, data=scraped_data_a),
+        ]
+    )
     payload = {
         "batch_id": _BATCH_ID,
         "shops": [
@@ -330,8 +350,80 @@ async def test_submission_context_stored_and_photos_classification_enqueued(
 
     await handle_scrape_batch(payload=payload, db=mock_db, scraper=mock_scraper, queue=mock_queue)
 
-    # scraped_data_a has photos → CLASSIFY_SHOP_PHOTOS is enqueued
-    assert mock_queue.enqueue.call_count == 1
-    classify_payload = mock_queue.enqueue.call_args.kwargs
-    assert classify_payload["job_type"] == JobType.CLASSIFY_SHOP_PHOTOS
-    assert classify_payload["payload"]["shop_id"] == _SHOP_ID_A
+    # scraped_data_a has photos → the pipeline starts at CLASSIFY_SHOP_PHOTOS
+    pipeline_payloads = _enqueued(mock_queue, JobType.SHOP_PIPELINE)
+    assert len(pipeline_payloads) == 1
+    assert pipeline_payloads[0]["shop_id"] == _SHOP_ID_A
+    assert pipeline_payloads[0]["start_stage"] == JobType.CLASSIFY_SHOP_PHOTOS.value
+    assert pipeline_payloads[0]["submission_id"] == "sub-00000001-0000-0000-0000-000000000001"
+
+
+@pytest.mark.asyncio
+async def test_provider_failure_mid_stream_only_fails_unfinished_shops(
+    mock_db, mock_queue, scraped_data_a
+):
+    """Shops persisted before the actor run failed keep their progress; only the rest fail."""
+    mock_scraper = AsyncMock()
+    mock_scraper.scrape_batch_stream = _streaming(
+        [BatchScrapeResult(shop_id=_SHOP_ID_A, data=scraped_data_a)],
+        error=RuntimeError("Apify run ended with status ABORTED"),
+    )
+    payload = {
+        "batch_id": _BATCH_ID,
+        "shops": [
+            {"shop_id": _SHOP_ID_A, "google_maps_url": _URL_A},
+            {"shop_id": _SHOP_ID_B, "google_maps_url": _URL_B},
+        ],
+    }
+
+    with pytest.raises(RuntimeError, match="ABORTED"):
+        await handle_scrape_batch(
+            payload=payload, db=mock_db, scraper=mock_scraper, queue=mock_queue
+        )
+
+    # Shop A was persisted and handed downstream before the failure
+    assert [p["shop_id"] for p in _enqueued(mock_queue, JobType.CLASSIFY_SHOP_PHOTOS)] == [
+        _SHOP_ID_A
+    ]
+    in_call = mock_db.table.return_value.update.return_value.in_
+    assert in_call.call_args_list[-1].args == ("id", [_SHOP_ID_B])
+
+
+@pytest.mark.asyncio
+async def test_unchanged_live_shop_is_not_re_enriched(
+    mock_db, mock_queue, scraped_data_a, scraped_data_b
+):
+    """Fingerprints read before the scrape let an unchanged live shop skip the LLM chain."""
+    select = mock_db.table.return_value.select.return_value
+    select.in_.return_value.in_.return_value.not_.is_.return_value.execute.return_value = MagicMock(
+        data=[
+            {
+                "id": _SHOP_ID_A,
+                "processing_status": "live",
+                "scrape_fingerprints": scrape_fingerprints(scraped_data_a),
+            }
+        ]
+    )
+    mock_scraper = AsyncMock()
+    mock_scraper.scrape_batch_stream = _streaming(
+        [
+            BatchScrapeResult(shop_id=_SHOP_ID_A, data=scraped_data_a),
+            BatchScrapeResult(shop_id=_SHOP_ID_B, data=scraped_data_b),
+        ]
+    )
+    payload = {
+        "batch_id": _BATCH_ID,
+        "shops": [
+            {"shop_id": _SHOP_ID_A, "google_maps_url": _URL_A},
+            {"shop_id": _SHOP_ID_B, "google_maps_url": _URL_B},
+        ],
+    }
+
+    await handle_scrape_batch(payload=payload, db=mock_db, scraper=mock_scraper, queue=mock_queue)
+
+    rows = {row["shop_id"]: row for row in mock_db.rpc.call_args.args[1]["p_shops"]}
+    assert rows[_SHOP_ID_A]["shop"]["processing_status"] == "live"
+    assert rows[_SHOP_ID_A]["reviews"] == []
+    assert _enqueued(mock_queue, JobType.CLASSIFY_SHOP_PHOTOS) == []
+    # Shop B had no baseline and goes through the full pipeline
+    assert [p["shop_id"] for p in _enqueued(mock_queue, JobType.ENRICH_SHOP)] == [_SHOP_ID_B]
@@ -0,0 +1,159 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from models.types import JobType
+from workers.handlers.shop_pipeline import handle_shop_pipeline
+
+_SHOP_ID = "shop-pipeline-01"
+_JOB_ID = "job-pipeline-01"
+
+
+def _advance(next_type: JobType, **extra):
+    """Stage stub that enqueues the next stage like the real handler does."""
+
+    async def _stage(*, payload, queue, **kwargs):
+        await queue.enqueue(
+            job_type=next_type, payload={"shop_id": payload["shop_id"], **extra}, priority=5
+        )
+
+    return _stage
+
+
+@pytest.fixture
+def db():
+    db = MagicMock()
+    db.table.return_value.select.return_value.eq.return_value.single.return_value.execute.return_value = MagicMock(
+        data={"step_timings": {"llm_call": {"duration_ms": 120}}}
+    )
+    return db
+
+
+@pytest.fixture
+def stages():
+    with (
+        patch(
+            "workers.handlers.shop_pipeline.handle_classify_shop_photos",
+            AsyncMock(side_effect=_advance(JobType.ENRICH_SHOP, submission_id="sub-1")),
+        ) as classify,
+        patch(
+            "workers.handlers.shop_pipeline.handle_enrich_shop",
+            AsyncMock(side_effect=_advance(JobType.SUMMARIZE_REVIEWS)),
+        ) as enrich,
+        patch(
+            "workers.handlers.shop_pipeline.handle_summarize_reviews",
+            AsyncMock(side_effect=_advance(JobType.GENERATE_EMBEDDING)),
+        ) as summarize,
+        patch(
+            "workers.handlers.shop_pipeline.handle_generate_embedding",
+            AsyncMock(side_effect=_advance(JobType.PUBLISH_SHOP, submission_id="sub-1")),
+        ) as embed,
+        patch("workers.handlers.shop_pipeline.handle_publish_shop", AsyncMock()) as publish,
+    ):
+        yield {
+            "classify": classify,
+            "enrich": enrich,
+            "summarize": summarize,
+            "embed": embed,
+            "publish": publish,
+        }
+
+
+def _payload(start_stage: JobType) -> dict:
+    return {"shop_id": _SHOP_ID, "start_stage": start_stage.value, "submission_id": "sub-1"}
+
+
+class TestShopPipeline:
+    async def test_runs_every_stage_inline_without_enqueueing(self, db, stages):
+        """A submission with photos runs classify through publish in one job; nothing hits the queue."""
+        queue = AsyncMock()
+
+        await handle_shop_pipeline(
+            payload=_payload(JobType.CLASSIFY_SHOP_PHOTOS),
+            db=db,
+            llm=MagicMock(),
+            embeddings=MagicMock(),
+            queue=queue,
+            job_id=_JOB_ID,
+        )
+
+        for stub in stages.values():
+            stub.assert_awaited_once()
+        queue.enqueue.assert_not_called()
+        publish_payload = stages["publish"].call_args.kwargs["payload"]
+        assert publish_payload == {"shop_id": _SHOP_ID, "submission_id": "sub-1"}
+        # Stages see the parent job id so claim guards and job_logs keep working
+        assert stages["enrich"].call_args.kwargs["job_id"] == _JOB_ID
+
+    async def test_records_step_timings_per_stage(self, db, stages):
+        """Each stage's own step_timings are folded into the parent job under a stage prefix."""
+        await handle_shop_pipeline(
+            payload=_payload(JobType.ENRICH_SHOP),
+            db=db,
+            llm=MagicMock(),
+            embeddings=MagicMock(),
+            queue=AsyncMock(),
+            job_id=_JOB_ID,
+        )
+
+        written = db.table.return_value.update.call_args.args[0]["step_timings"]
+        assert "enrich_shop.llm_call" in written
+        assert "generate_embedding" in written
+        assert "publish_shop.llm_call" not in written
+        stages["classify"].assert_not_awaited()
+
+    async def test_failed_stage_falls_back_to_its_own_job(self, db, stages):
+        """When a stage raises, it is enqueued as a regular job and later stages are not run inline."""
+        stages["summarize"].side_effect = RuntimeError("LLM timeout")
+        queue = AsyncMock()
+
+        await handle_shop_pipeline(
+            payload=_payload(JobType.ENRICH_SHOP),
+            db=db,
+            llm=MagicMock(),
+            embeddings=MagicMock(),
+            queue=queue,
+            job_id=_JOB_ID,
+        )
+
+        queue.enqueue.assert_awaited_once_with(
+            job_type=JobType.SUMMARIZE_REVIEWS, payload={"shop_id": _SHOP_ID}, priority=5
+        )
+        stages["embed"].assert_not_awaited()
+
+    async def test_retried_job_hands_start_stage_to_the_queue(self, db, stages):
+        """A pipeline job on its second attempt does not run inline again."""
+        queue = AsyncMock()
+
+        await handle_shop_pipeline(
+            payload=_payload(JobType.CLASSIFY_SHOP_PHOTOS),
+            db=db,
+            llm=MagicMock(),
+            embeddings=MagicMock(),
+            queue=queue,
+            job_id=_JOB_ID,
+            attempts=2,
+        )
+
+        queue.enqueue.assert_awaited_once_with(
+            job_type=JobType.CLASSIFY_SHOP_PHOTOS,
+            payload={"shop_id": _SHOP_ID, "submission_id": "sub-1"},
+            priority=5,
+        )
+        stages["classify"].assert_not_awaited()
+
+    async def test_stops_when_a_stage_does_not_advance(self, db, stages):
+        """If a stage does not enqueue its successor (e.g. aborted mid-flight), the pipeline ends."""
+        stages["enrich"].side_effect = None
+
+        await handle_shop_pipeline(
+            payload=_payload(JobType.ENRICH_SHOP),
+            db=db,
+            llm=MagicMock(),
+            embeddings=MagicMock(),
+            queue=AsyncMock(),
+            job_id=_JOB_ID,
+        )
+
+        stages["summarize"].assert_not_awaited()
+        stages["publish"].assert_not_awaited()
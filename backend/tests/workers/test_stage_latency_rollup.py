@@ -0,0 +1,80 @@
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+from workers.handlers.stage_latency_rollup import (
+    MIN_SAMPLES,
+    find_regressions,
+    handle_stage_latency_rollup,
+)
+
+
+def _row(p95: float, samples: int = 50, step: str = "classify", **extra) -> dict:
+    return {
+        "job_type": "classify_shop_photos",
+        "step": step,
+        "samples": samples,
+        "p50_ms": p95 / 2,
+        "p95_ms": p95,
+        "p99_ms": p95 * 1.2,
+        "max_ms": p95 * 1.5,
+        **extra,
+    }
+
+
+def _make_db(current: list[dict], history: list[dict]) -> MagicMock:
+    db = MagicMock()
+    db.rpc.return_value.execute.return_value = MagicMock(data=current)
+    db.table.return_value.select.return_value.gte.return_value.lt.return_value.order.return_value.execute.return_value = MagicMock(
+        data=history
+    )
+    return db
+
+
+class TestFindRegressions:
+    def test_flags_stage_whose_p95_doubles(self):
+        """A p95 at 2x the median of recent daily p95s is reported with its ratio."""
+        history = [_row(1000, day=f"2026-04-0{d}") for d in range(1, 8)]
+        regressions = find_regressions([_row(2400)], history)
+        assert len(regressions) == 1
+        assert regressions[0]["step"] == "classify"
+        assert regressions[0]["baseline_p95_ms"] == 1000
+        assert regressions[0]["ratio"] == 2.4
+
+    def test_ignores_small_increases_and_thin_samples(self):
+        """Growth under 2x, or too few samples on either side, is not an alert."""
+        history = [_row(1000), _row(500, step="db_write", samples=MIN_SAMPLES - 1)]
+        current = [_row(1900), _row(5000, step="db_write"), _row(9000, step="new_step")]
+        assert find_regressions(current, history) == []
+
+
+class TestStageLatencyRollup:
+    async def test_upserts_daily_rows_for_the_requested_day(self):
+        """Each (job_type, step) from the RPC is stored under the rolled-up day."""
+        db = _make_db(current=[_row(800)], history=[])
+
+        await handle_stage_latency_rollup(db=db, day=date(2026, 4, 13))
+
+        params = db.rpc.call_args.args[1]
+        assert params["p_from"].startswith("2026-04-13T00:00:00")
+        assert params["p_to"].startswith("2026-04-14T00:00:00")
+        upserted = db.table.return_value.upsert.call_args.args[0]
+        assert upserted == [{"day": "2026-04-13", **_row(800)}]
+        assert db.table.return_value.upsert.call_args.kwargs["on_conflict"] == "day,job_type,step"
+
+    async def test_alerts_on_regression(self):
+        """A regressed stage is logged and sent to Sentry as a warning."""
+        db = _make_db(current=[_row(3000)], history=[_row(1000), _row(1200)])
+
+        with patch("workers.handlers.stage_latency_rollup.sentry_sdk") as mock_sentry:
+            regressions = await handle_stage_latency_rollup(db=db, day=date(2026, 4, 13))
+
+        assert [r["step"] for r in regressions] == ["classify"]
+        mock_sentry.capture_message.assert_called_once()
+        assert "classify_shop_photos.classify" in mock_sentry.capture_message.call_args.args[0]
+
+    async def test_no_timings_skips_write(self):
+        """A day without completed jobs writes nothing."""
+        db = _make_db(current=[], history=[])
+
+        assert await handle_stage_latency_rollup(db=db, day=date(2026, 4, 13)) == []
+        db.table.return_value.upsert.assert_not_called()
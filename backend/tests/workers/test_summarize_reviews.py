@@ -2,8 +2,11 @@ from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
+from core.config import settings
 from models.types import ReviewSummaryResult, ReviewTopic
+from providers.scraper.interface import ScrapedShopData
 from workers.handlers.summarize_reviews import handle_summarize_reviews
+from workers.persist import persist_scraped_data
 
 
 class TestSummarizeReviewsHandler:
@@ -11,8 +14,14 @@ class TestSummarizeReviewsHandler:
         self,
         google_review_rows: list[dict] | None = None,
         checkin_texts: list[dict] | None = None,
+        shop_row: dict | None = None,
+        new_review_rows: list[dict] | None = None,
+        new_checkin_rows: list[dict] | None = None,
     ) -> MagicMock:
-        """Build a db mock with shop_reviews table and get_ranked_checkin_texts RPC."""
+        """Build a db mock with shop_reviews table and get_ranked_checkin_texts RPC.
+
+        shop_row is the stored summary state; new_*_rows answer the "created since" queries.
+        """
         db = MagicMock()
 
         # shop_reviews table query
@@ -20,10 +29,21 @@ class TestSummarizeReviewsHandler:
         shop_reviews_table.select.return_value.eq.return_value.order.return_value.limit.return_value.execute.return_value = MagicMock(
             data=google_review_rows if google_review_rows is not None else []
         )
+        shop_reviews_table.select.return_value.eq.return_value.gt.return_value.order.return_value.limit.return_value.execute.return_value = MagicMock(
+            data=new_review_rows or []
+        )
+
+        check_ins_table = MagicMock()
+        check_ins_table.select.return_value.eq.return_value.gt.return_value.order.return_value.limit.return_value.execute.return_value = MagicMock(
+            data=new_checkin_rows or []
+        )
 
         # shops table update
         shops_table = MagicMock()
         shops_table.update.return_value.eq.return_value.execute.return_value = MagicMock(data=[])
+        shops_table.select.return_value.eq.return_value.single.return_value.execute.return_value = (
+            MagicMock(data=shop_row or {})
+        )
 
         # job_queue table — isolated so its updates don't pollute shops_table.call_args
         job_queue_table = MagicMock()
@@ -32,6 +52,8 @@ class TestSummarizeReviewsHandler:
         def _route(name: str) -> MagicMock:
             if name == "shop_reviews":
                 return shop_reviews_table
+            if name == "check_ins":
+                return check_ins_table
             if name == "job_queue":
                 return job_queue_table
             return shops_table
@@ -70,6 +92,7 @@ class TestSummarizeReviewsHandler:
         llm.summarize_reviews.assert_called_once_with(
             google_reviews=["Great pour-over", "Slow service"],
             checkin_texts=["很安靜"],
+            previous=None,
         )
 
     async def test_handler_persists_review_topics(self):
@@ -115,6 +138,25 @@ class TestSummarizeReviewsHandler:
         queue.enqueue.assert_called_once()
         assert queue.enqueue.call_args.kwargs["job_type"].value == "generate_embedding"
 
+    async def test_submission_context_is_carried_to_embedding(self):
+        """A submission chain keeps submission_id on the embedding job it enqueues."""
+        db = self._make_db(google_review_rows=[], checkin_texts=[])
+        queue = AsyncMock()
+
+        await handle_summarize_reviews(
+            {"shop_id": "shop-1", "submission_id": "sub-1", "submitted_by": "user-1"},
+            db,
+            AsyncMock(),
+            queue,
+            "job-1",
+        )
+
+        assert queue.enqueue.call_args.kwargs["payload"] == {
+            "shop_id": "shop-1",
+            "submission_id": "sub-1",
+            "submitted_by": "user-1",
+        }
+
     async def test_handler_google_only_no_checkins(self):
         """With only Google reviews (no check-ins), still calls LLM and persists."""
         db = self._make_db(
@@ -136,6 +178,7 @@ class TestSummarizeReviewsHandler:
         llm.summarize_reviews.assert_called_once_with(
             google_reviews=["Great espresso"],
             checkin_texts=[],
+            previous=None,
         )
 
     async def test_llm_failure_propagates_without_enqueuing_embedding(self):
@@ -202,6 +245,146 @@ class TestSummarizeReviewsHandler:
         assert rpc_params["p_shop_id"] == "shop-d4e5f6"
         assert rpc_params["p_min_length"] == 15
 
+    async def test_existing_summary_is_revised_with_only_new_texts(self):
+        """A summarized shop sends the stored summary plus texts created since it, not every review."""
+        db = self._make_db(
+            google_review_rows=[{"text": f"old review {i}"} for i in range(50)],
+            shop_row={
+                "community_summary": "手沖出色，適合工作",
+                "review_topics": [{"topic": "手沖", "count": 6}],
+                "community_summary_updated_at": "2026-10-01T00:00:00+00:00",
+                "community_summary_incremental_texts": 3,
+            },
+            new_review_rows=[{"text": "新開的甜點很好吃"}],
+            new_checkin_rows=[
+                {"review_text": "插座很多，整天工作都沒有問題，咖啡也好喝", "note": None},
+                {"review_text": "", "note": "短"},
+            ],
+        )
+        llm = AsyncMock()
+        llm.summarize_reviews.return_value = ReviewSummaryResult(
+            summary_zh_tw="手沖與甜點出色，插座多適合工作",
+            review_topics=[ReviewTopic(topic="手沖", count=6), ReviewTopic(topic="插座", count=1)],
+        )
+        queue = AsyncMock()
+        queue.get_status.return_value = "claimed"
+
+        await handle_summarize_reviews({"shop_id": "shop-1"}, db, llm, queue, "job-1")
+
+        kwargs = llm.summarize_reviews.call_args.kwargs
+        assert kwargs["google_reviews"] == ["新開的甜點很好吃"]
+        assert kwargs["checkin_texts"] == ["插座很多，整天工作都沒有問題，咖啡也好喝"]
+        assert kwargs["previous"].summary_zh_tw == "手沖出色，適合工作"
+        assert kwargs["previous"].review_topics == [ReviewTopic(topic="手沖", count=6)]
+        db.rpc.assert_not_called()
+        update_payload = db._shops_table.update.call_args[0][0]
+        assert update_payload["community_summary_incremental_texts"] == 5
+
+    async def test_drift_threshold_forces_a_full_rebuild(self, monkeypatch):
+        """Past summarize_rebuild_after_texts folded texts, the summary is rebuilt from every text."""
+        monkeypatch.setattr(settings, "summarize_rebuild_after_texts", 10)
+        db = self._make_db(
+            google_review_rows=[{"text": "Great pour-over"}],
+            checkin_texts=[{"text": "很安靜"}],
+            shop_row={
+                "community_summary": "手沖出色",
+                "review_topics": [],
+                "community_summary_updated_at": "2026-10-01T00:00:00+00:00",
+                "community_summary_incremental_texts": 9,
+            },
+            new_review_rows=[{"text": "新評論一"}, {"text": "新評論二"}],
+        )
+        llm = AsyncMock()
+        llm.summarize_reviews.return_value = ReviewSummaryResult(
+            summary_zh_tw="手沖出色，環境安靜", review_topics=[]
+        )
+        queue = AsyncMock()
+        queue.get_status.return_value = "claimed"
+
+        await handle_summarize_reviews({"shop_id": "shop-1"}, db, llm, queue, "job-1")
+
+        llm.summarize_reviews.assert_called_once_with(
+            google_reviews=["Great pour-over"],
+            checkin_texts=["很安靜"],
+            previous=None,
+        )
+        update_payload = db._shops_table.update.call_args[0][0]
+        assert update_payload["community_summary_incremental_texts"] == 0
+
+    async def test_no_new_texts_keeps_the_summary_and_embeds(self):
+        """Nothing written since the stored summary: no LLM call, embedding still chained."""
+        db = self._make_db(
+            google_review_rows=[{"text": "Great pour-over"}],
+            shop_row={
+                "community_summary": "手沖出色",
+                "review_topics": [],
+                "community_summary_updated_at": "2026-10-01T00:00:00+00:00",
+                "community_summary_incremental_texts": 0,
+            },
+        )
+        llm = AsyncMock()
+        queue = AsyncMock()
+
+        await handle_summarize_reviews({"shop_id": "shop-1"}, db, llm, queue, "job-1")
+
+        llm.summarize_reviews.assert_not_called()
+        db._shops_table.update.assert_not_called()
+        assert queue.enqueue.call_args.kwargs["job_type"].value == "generate_embedding"
+
+    async def test_rescraped_reviews_are_not_new_again(self):
+        """Re-persisting a shop's reviews keeps created_at, so only the genuinely new one is folded in."""
+        stored = [
+            {
+                "shop_id": "shop-1",
+                "text": f"old review {i}",
+                "created_at": "2026-09-01T00:00:00+00:00",
+            }
+            for i in range(3)
+        ]
+        persist_db = MagicMock()
+        persist_db.table.return_value.select.return_value.eq.return_value.execute.return_value = (
+            MagicMock(data=stored)
+        )
+        rescraped = ScrapedShopData(
+            name="Rufous Coffee",
+            address="台北市大安區復興南路二段79號",
+            latitude=25.033,
+            longitude=121.544,
+            google_place_id="ChIJ_rufous",
+            country_code="TW",
+            reviews=[{"text": row["text"]} for row in stored] + [{"text": "新開的甜點很好吃"}],
+        )
+        await persist_scraped_data("shop-1", rescraped, persist_db, AsyncMock())
+        reinserted = persist_db.table.return_value.insert.call_args.args[0]
+
+        db = self._make_db(
+            shop_row={
+                "community_summary": "手沖出色",
+                "review_topics": [{"topic": "手沖", "count": 6}],
+                "community_summary_updated_at": "2026-10-01T00:00:00+00:00",
+                "community_summary_incremental_texts": 0,
+            },
+        )
+
+        def _created_after(column: str, since: str) -> MagicMock:
+            chain = MagicMock()
+            chain.order.return_value.limit.return_value.execute.return_value = MagicMock(
+                data=[row for row in reinserted if row[column] > since]
+            )
+            return chain
+
+        db.table("shop_reviews").select.return_value.eq.return_value.gt.side_effect = _created_after
+        llm = AsyncMock()
+        llm.summarize_reviews.return_value = ReviewSummaryResult(
+            summary_zh_tw="手沖與甜點出色", review_topics=[ReviewTopic(topic="手沖", count=6)]
+        )
+        queue = AsyncMock()
+        queue.get_status.return_value = "claimed"
+
+        await handle_summarize_reviews({"shop_id": "shop-1"}, db, llm, queue, "job-1")
+
+        assert llm.summarize_reviews.call_args.kwargs["google_reviews"] == ["新開的甜點很好吃"]
+
 
 @pytest.mark.asyncio
 async def test_summarize_reviews_writes_step_timings_to_db():
@@ -223,6 +406,9 @@ async def test_summarize_reviews_writes_step_timings_to_db():
 
     shops_table = MagicMock()
     shops_table.update.return_value.eq.return_value.execute.return_value = MagicMock()
+    shops_table.select.return_value.eq.return_value.single.return_value.execute.return_value = (
+        MagicMock(data={})
+    )
 
     job_queue_table = MagicMock()
     job_queue_table.update.return_value.eq.return_value.execute.return_value = MagicMock()
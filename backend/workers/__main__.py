@@ -0,0 +1,20 @@
+import argparse
+
+from core.config import settings
+from workers.runner import run_worker
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the CafeRoam background job worker")
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=settings.worker_processes,
+        help="Number of worker processes (default: WORKER_PROCESSES)",
+    )
+    args = parser.parse_args()
+    run_worker(args.processes)
+
+
+if __name__ == "__main__":
+    main()
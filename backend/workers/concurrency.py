@@ -0,0 +1,203 @@
+"""Adaptive per-provider concurrency for the job scheduler.
+
+Job types that call the same provider model share one quota, so in-flight capacity is
+tracked per "<provider>:<model>" key rather than per JobType. Each key has an AIMD
+controller — additive increase while job latency stays near its baseline, multiplicative
+decrease on a 429 — plus an optional token bucket capping job starts per minute
+(WORKER_PROVIDER_REQUESTS_PER_MINUTE). The per-type WORKER_CONCURRENCY_* settings still
+apply on top as hard caps.
+
+Handlers that fan out several calls within one job (e.g. photo classification) also share a
+per-key call semaphore, so one job cannot monopolise the key's in-process capacity.
+"""
+
+import asyncio
+import math
+import time
+from typing import Any
+
+from core.config import settings
+from models.types import JobType
+
+# A job counts as "healthy" for growth if it ran within this multiple of the latency baseline.
+_LATENCY_TOLERANCE = 2.0
+_LATENCY_EWMA_ALPHA = 0.1
+_DECREASE_FACTOR = 0.5
+# After a 429, stop claiming for this long and ignore further 429s from the same burst.
+_THROTTLE_COOLDOWN_SECONDS = 30.0
+
+
+class TokenBucket:
+    def __init__(self, rate_per_second: float, capacity: float) -> None:
+        self._rate = rate_per_second
+        self._capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self._updated_at)
+        self._tokens = min(self._capacity, self._tokens + elapsed * self._rate)
+        self._updated_at = now
+
+    def take(self, n: int, now: float | None = None) -> int:
+        """Take up to n whole tokens; returns how many were granted."""
+        self._refill(time.monotonic() if now is None else now)
+        granted = min(n, math.floor(self._tokens))
+        self._tokens -= granted
+        return max(0, granted)
+
+    def refund(self, n: int) -> None:
+        self._tokens = min(self._capacity, self._tokens + n)
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+
+class ProviderThrottle:
+    """AIMD in-flight limit plus optional token bucket for one provider model."""
+
+    def __init__(
+        self,
+        key: str,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        bucket: TokenBucket | None = None,
+    ) -> None:
+        self.key = key
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.in_flight = 0
+        self.bucket = bucket
+        self.latency_baseline: float | None = None
+        self.cooldown_until = 0.0
+        self.throttle_count = 0
+
+    def reserve(self, wanted: int, now: float | None = None) -> int:
+        """Reserve up to `wanted` slots. Callers must settle each slot exactly once
+        (on_success / on_throttle / on_failure) or hand unused ones back via unreserve()."""
+        now = time.monotonic() if now is None else now
+        if wanted <= 0 or now < self.cooldown_until:
+            return 0
+        granted = min(wanted, math.floor(self.limit) - self.in_flight)
+        if granted <= 0:
+            return 0
+        if self.bucket is not None:
+            granted = self.bucket.take(granted, now)
+        self.in_flight += granted
+        return granted
+
+    def unreserve(self, n: int) -> None:
+        if n <= 0:
+            return
+        self.in_flight = max(0, self.in_flight - n)
+        if self.bucket is not None:
+            self.bucket.refund(n)
+
+    def on_success(self, latency_seconds: float) -> None:
+        self.in_flight = max(0, self.in_flight - 1)
+        baseline = self.latency_baseline
+        if baseline is None or latency_seconds <= baseline * _LATENCY_TOLERANCE:
+            # +1 per window of `limit` completions, like TCP congestion avoidance
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / max(self.limit, 1.0))
+        self.latency_baseline = (
+            latency_seconds
+            if baseline is None
+            else (1 - _LATENCY_EWMA_ALPHA) * baseline + _LATENCY_EWMA_ALPHA * latency_seconds
+        )
+
+    def on_throttle(self, now: float | None = None) -> None:
+        now = time.monotonic() if now is None else now
+        self.in_flight = max(0, self.in_flight - 1)
+        self.throttle_count += 1
+        if now < self.cooldown_until:
+            return  # same burst of 429s — already backed off
+        self.limit = max(float(self.min_limit), self.limit * _DECREASE_FACTOR)
+        self.cooldown_until = now + _THROTTLE_COOLDOWN_SECONDS
+
+    def on_failure(self) -> None:
+        """Non-throttle failure: free the slot without adjusting the limit."""
+        self.in_flight = max(0, self.in_flight - 1)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "latency_baseline_seconds": (
+                round(self.latency_baseline, 3) if self.latency_baseline is not None else None
+            ),
+            "cooling_down": time.monotonic() < self.cooldown_until,
+            "throttle_count": self.throttle_count,
+            "tokens": round(self.bucket.tokens, 2) if self.bucket is not None else None,
+        }
+
+
+_throttles: dict[str, ProviderThrottle] = {}
+_call_semaphores: dict[str, asyncio.Semaphore] = {}
+
+
+def provider_key(job_type: JobType) -> str | None:
+    """Return the "<provider>:<model>" whose quota a job type mainly consumes, if any."""
+    llm = settings.llm_provider
+    # hybrid keeps enrich_shop on Anthropic and routes the other methods to OpenAI
+    anthropic_enrich = llm in ("anthropic", "hybrid")
+    anthropic_other = llm == "anthropic"
+    match job_type:
+        case JobType.ENRICH_SHOP:
+            if anthropic_enrich:
+                return f"anthropic:{settings.anthropic_model}"
+            return f"openai:{settings.openai_llm_model}"
+        case JobType.ENRICH_MENU_PHOTO:
+            if anthropic_other:
+                return f"anthropic:{settings.anthropic_model}"
+            return f"openai:{settings.openai_llm_classify_model}"
+        case JobType.CLASSIFY_SHOP_PHOTOS | JobType.SUMMARIZE_REVIEWS:
+            if anthropic_other:
+                return f"anthropic:{settings.anthropic_classify_model}"
+            return f"openai:{settings.openai_llm_classify_model}"
+        case JobType.GENERATE_EMBEDDING:
+            return f"{settings.embeddings_provider}:{settings.openai_embedding_model}"
+        case JobType.SCRAPE_BATCH:
+            # Concurrent actor runs count against the account's Apify run/memory limits
+            return f"{settings.scraper_provider}:google-places"
+        case _:
+            return None
+
+
+def get_provider_throttle(job_type: JobType) -> ProviderThrottle | None:
+    key = provider_key(job_type)
+    if key is None:
+        return None
+    throttle = _throttles.get(key)
+    if throttle is None:
+        rpm = settings.worker_provider_requests_per_minute.get(key)
+        bucket = TokenBucket(rate_per_second=rpm / 60, capacity=max(1, rpm // 6)) if rpm else None
+        throttle = ProviderThrottle(
+            key,
+            initial_limit=settings.worker_provider_initial_concurrency,
+            min_limit=settings.worker_provider_min_concurrency,
+            max_limit=settings.worker_provider_max_concurrency,
+            bucket=bucket,
+        )
+        _throttles[key] = throttle
+    return throttle
+
+
+def get_provider_call_semaphore(job_type: JobType) -> asyncio.Semaphore:
+    """Process-wide cap on concurrent LLM calls made from inside jobs of this type's provider.
+
+    Job types without a provider key share one unnamed semaphore.
+    """
+    key = provider_key(job_type) or ""
+    semaphore = _call_semaphores.get(key)
+    if semaphore is None:
+        semaphore = _call_semaphores[key] = asyncio.Semaphore(
+            settings.worker_provider_call_concurrency
+        )
+    return semaphore
+
+
+def get_provider_throttle_status() -> dict[str, dict[str, Any]]:
+    return {key: throttle.snapshot() for key, throttle in _throttles.items()}
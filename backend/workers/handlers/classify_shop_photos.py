@@ -1,3 +1,4 @@
+import asyncio
 import contextlib
 import re
 import time
@@ -7,9 +8,11 @@ from typing import Any, cast
 import structlog
 from supabase import Client
 
+from core.config import settings
 from core.db import first
 from models.types import JobType, PhotoCategory
 from providers.llm.interface import LLMProvider
+from workers.concurrency import get_provider_call_semaphore
 from workers.queue import JobQueue
 
 logger = structlog.get_logger()
@@ -31,6 +34,64 @@ def to_thumbnail_url(url: str, width: int = 400, height: int = 225) -> str:
     return url
 
 
+async def classify_thumbnails(
+    photos: list[dict[str, Any]], llm: LLMProvider
+) -> list[dict[str, Any]]:
+    """Classify thumbnails in groups of worker_classify_photos_per_request, groups concurrently.
+
+    Requests are bounded per shop (worker_classify_photo_concurrency) and per provider model
+    across the process. A failed group is retried one photo per request; a photo whose own
+    request fails is skipped and stays unclassified for the next run.
+    """
+    shop_slots = asyncio.Semaphore(settings.worker_classify_photo_concurrency)
+    provider_slots = get_provider_call_semaphore(JobType.CLASSIFY_SHOP_PHOTOS)
+    size = max(1, settings.worker_classify_photos_per_request)
+    groups = [photos[i : i + size] for i in range(0, len(photos), size)]
+
+    async def _classify_one(photo: dict[str, Any]) -> PhotoCategory | None:
+        try:
+            async with shop_slots, provider_slots:
+                return await llm.classify_photo(to_thumbnail_url(photo["url"]))
+        except Exception:
+            logger.warning(
+                "Photo classification failed, skipping",
+                photo_id=photo["id"],
+                exc_info=True,
+            )
+            return None
+
+    async def _classify_group(group: list[dict[str, Any]]) -> list[PhotoCategory | None]:
+        if len(group) == 1:
+            return [await _classify_one(group[0])]
+        try:
+            async with shop_slots, provider_slots:
+                categories = await llm.classify_photos([to_thumbnail_url(p["url"]) for p in group])
+            if len(categories) != len(group):
+                raise ValueError(f"expected {len(group)} categories, got {len(categories)}")
+            return list(categories)
+        except Exception:
+            logger.warning(
+                "Multi-photo classification failed, retrying per photo",
+                photo_ids=[p["id"] for p in group],
+                exc_info=True,
+            )
+            return list(await asyncio.gather(*(_classify_one(p) for p in group)))
+
+    results = await asyncio.gather(*(_classify_group(g) for g in groups))
+    classified: list[dict[str, Any]] = []
+    for group, categories in zip(groups, results, strict=True):
+        for photo, category in zip(group, categories, strict=True):
+            if category is not None:
+                classified.append(
+                    {
+                        "id": photo["id"],
+                        "category": category,
+                        "uploaded_at": photo.get("uploaded_at"),
+                    }
+                )
+    return classified
+
+
 async def handle_classify_shop_photos(
     payload: dict[str, Any],
     db: Client,
@@ -63,23 +124,7 @@ async def handle_classify_shop_photos(
         t0 = time.monotonic()
         logger.info("Classifying photos", shop_id=shop_id, count=len(photos))
 
-        # Classify each photo individually (for fault isolation); accumulate in memory
-        classified: list[dict[str, Any]] = []
-        for photo in photos:
-            thumbnail = to_thumbnail_url(photo["url"])
-            try:
-                category = await llm.classify_photo(thumbnail)
-            except Exception:
-                logger.warning(
-                    "Photo classification failed, skipping",
-                    photo_id=photo["id"],
-                    exc_info=True,
-                )
-                continue
-
-            classified.append(
-                {"id": photo["id"], "category": category, "uploaded_at": photo.get("uploaded_at")}
-            )
+        classified = await classify_thumbnails(photos, llm)
 
         # Enforce caps against global totals; mutates item["category"] for excess rows
         menu_slots = max(0, _MENU_CAP - existing_counts.get(PhotoCategory.MENU, 0))
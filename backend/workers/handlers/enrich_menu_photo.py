@@ -1,11 +1,16 @@
+import asyncio
+import contextlib
+import time
 from datetime import UTC, datetime
 from typing import Any
 
 import structlog
 from supabase import Client
 
-from models.types import JobType
+from core.config import settings
+from models.types import JobType, MenuExtractionResult
 from providers.llm.interface import LLMProvider
+from workers.concurrency import get_provider_call_semaphore
 from workers.queue import JobQueue
 
 logger = structlog.get_logger()
@@ -16,8 +21,14 @@ async def handle_enrich_menu_photo(
     db: Client,
     llm: LLMProvider,
     queue: JobQueue,
+    job_id: str | None = None,
 ) -> None:
-    """Extract menu items from menu photos, persist with source attribution, trigger re-embed."""
+    """Extract menu items from menu photos, persist with source attribution, trigger re-embed.
+
+    Photos are extracted concurrently (worker_menu_extract_concurrency per job). The
+    extract_menu_photo step records the slowest photo as duration_ms, each photo's latency
+    in photo_ms and the whole extraction in wall_ms.
+    """
     shop_id = payload["shop_id"]
 
     # Support both new multi-photo and legacy single-photo payloads
@@ -32,71 +43,106 @@ async def handle_enrich_menu_photo(
             return
         photos = [{"photo_id": None, "image_url": image_url}]
 
-    # Accumulate all rows and photo-id deletes across photos before writing
-    all_rows: list[dict[str, Any]] = []
-    photo_ids_to_delete: list[str] = []
-    all_new_names: list[str] = []
-
-    for photo in photos:
-        photo_id = photo.get("photo_id")
-        image_url = photo["image_url"]
-
-        try:
-            result = await llm.extract_menu_data(image_url=image_url)
-        except Exception:
-            logger.exception(
-                "LLM extraction failed",
-                shop_id=shop_id,
-                photo_id=photo_id,
-            )
-            continue
+    # Extract every photo concurrently; failures only drop their own photo
+    step_timings: dict[str, dict[str, Any]] = {}
+    photo_ms = [0] * len(photos)
+    t0 = time.monotonic()
+    extract_slots = asyncio.Semaphore(settings.worker_menu_extract_concurrency)
+    provider_slots = get_provider_call_semaphore(JobType.ENRICH_MENU_PHOTO)
+
+    async def _extract(n: int, photo: dict[str, Any]) -> MenuExtractionResult | None:
+        async with extract_slots, provider_slots:
+            started = time.monotonic()
+            try:
+                return await llm.extract_menu_data(image_url=photo["image_url"])
+            except Exception:
+                logger.exception(
+                    "LLM extraction failed",
+                    shop_id=shop_id,
+                    photo_id=photo.get("photo_id"),
+                )
+                return None
+            finally:
+                photo_ms[n] = int((time.monotonic() - started) * 1000)
+
+    try:
+        results = await asyncio.gather(*(_extract(n, photo) for n, photo in enumerate(photos)))
+        # One stage key whatever the photo count, so stage latency stays comparable per job
+        step_timings["extract_menu_photo"] = {
+            "duration_ms": max(photo_ms),
+            "photo_ms": photo_ms,
+            "wall_ms": int((time.monotonic() - t0) * 1000),
+        }
+
+        # Accumulate all rows and photo-id deletes across photos before writing
+        all_rows: list[dict[str, Any]] = []
+        photo_ids_to_delete: list[str] = []
+        all_new_names: list[str] = []
+
+        for photo, result in zip(photos, results, strict=True):
+            photo_id = photo.get("photo_id")
+            if result is None:
+                continue
+
+            if not result.items:
+                logger.info(
+                    "No items extracted",
+                    shop_id=shop_id,
+                    photo_id=photo_id,
+                )
+                continue
+
+            rows = [
+                {
+                    "shop_id": shop_id,
+                    "item_name": item["name"],
+                    "price": item.get("price"),
+                    "category": item.get("category"),
+                    "source": "photo",
+                    "source_photo_id": photo_id,
+                    "extracted_at": datetime.now(UTC).isoformat(),
+                }
+                for item in result.items
+                if item.get("name")
+            ]
+
+            if not rows:
+                continue
+
+            if photo_id:
+                photo_ids_to_delete.append(photo_id)
+
+            all_new_names.extend(row["item_name"] for row in rows)
+            all_rows.extend(rows)
+
+        if not all_rows:
+            return
 
-        if not result.items:
-            logger.info(
-                "No items extracted",
-                shop_id=shop_id,
-                photo_id=photo_id,
-            )
-            continue
-
-        rows = [
-            {
-                "shop_id": shop_id,
-                "item_name": item["name"],
-                "price": item.get("price"),
-                "category": item.get("category"),
-                "source": "photo",
-                "source_photo_id": photo_id,
-                "extracted_at": datetime.now(UTC).isoformat(),
-            }
-            for item in result.items
-            if item.get("name")
-        ]
-
-        if not rows:
-            continue
-
-        if photo_id:
-            photo_ids_to_delete.append(photo_id)
-
-        all_new_names.extend(row["item_name"] for row in rows)
-        all_rows.extend(rows)
-
-    if not all_rows:
-        return
-
-    # Batch delete: existing items for each processed photo
-    if photo_ids_to_delete:
-        db.table("shop_menu_items").delete().in_("source_photo_id", photo_ids_to_delete).execute()
-
-    # Batch delete: photo-wins over review-sourced items with colliding names
-    if all_new_names:
-        db.table("shop_menu_items").delete().eq("shop_id", shop_id).eq("source", "review").in_(
-            "item_name", all_new_names
-        ).execute()
-
-    # Batch insert all rows
-    db.table("shop_menu_items").insert(all_rows).execute()
+        t0 = time.monotonic()
+        # Batch delete: existing items for each processed photo
+        if photo_ids_to_delete:
+            db.table("shop_menu_items").delete().in_(
+                "source_photo_id", photo_ids_to_delete
+            ).execute()
+
+        # Batch delete: photo-wins over review-sourced items with colliding names
+        if all_new_names:
+            db.table("shop_menu_items").delete().eq("shop_id", shop_id).eq("source", "review").in_(
+                "item_name", all_new_names
+            ).execute()
+
+        # Batch insert all rows
+        db.table("shop_menu_items").insert(all_rows).execute()
+        step_timings["db_write"] = {"duration_ms": int((time.monotonic() - t0) * 1000)}
+    finally:
+        if job_id is not None:
+            with contextlib.suppress(Exception):
+                (
+                    db.table("job_queue")
+                    .update({"step_timings": step_timings})
+                    .eq("id", job_id)
+                    .execute()
+                )
 
     logger.info(
         "Menu items written",
@@ -109,9 +155,13 @@ async def handle_enrich_menu_photo(
         job_type=JobType.GENERATE_EMBEDDING,
         payload={"shop_id": shop_id},
         priority=5,
+        dedupe_key=shop_id,
+        debounce_seconds=settings.worker_enqueue_debounce_seconds,
     )
     await queue.enqueue(
         job_type=JobType.SYNC_MENU_HIGHLIGHTS,
         payload={"shop_id": shop_id},
         priority=5,
+        dedupe_key=shop_id,
+        debounce_seconds=settings.worker_enqueue_debounce_seconds,
     )
@@ -6,8 +6,14 @@ from typing import Any, cast
 import structlog
 from supabase import Client
 
+from core.config import settings
 from core.lang import is_zh_dominant
-from models.types import JobType, ShopEnrichmentInput
+from models.types import (
+    EnrichmentResult,
+    JobType,
+    ShopEnrichmentInput,
+    TarotEnrichmentResult,
+)
 from providers.llm.interface import LLMProvider
 from workers.job_guard import check_job_still_claimed
 from workers.job_log import log_job_event
@@ -16,6 +22,168 @@ from workers.queue import JobQueue
 logger = structlog.get_logger()
 
 
+def load_enrichment_input(db: Client, shop_id: str) -> ShopEnrichmentInput:
+    """Shop row, reviews and up to three VIBE photos as enrich_shop / assign_tarot input."""
+    shop_response = (
+        db.table("shops")
+        .select(
+            "id, name, description, categories, price_range, "
+            "socket, limited_time, rating, review_count, google_maps_features"
+        )
+        .eq("id", shop_id)
+        .single()
+        .execute()
+    )
+    shop = cast("dict[str, Any]", shop_response.data)
+
+    reviews_response = db.table("shop_reviews").select("text").eq("shop_id", shop_id).execute()
+    review_rows = cast("list[dict[str, Any]]", reviews_response.data)
+    reviews = [r["text"] for r in review_rows if r.get("text")]
+
+    vibe_photos_response = (
+        db.table("shop_photos")
+        .select("url")
+        .eq("shop_id", shop_id)
+        .eq("category", "VIBE")
+        .limit(3)
+        .execute()
+    )
+    vibe_photo_rows = cast("list[dict[str, Any]]", vibe_photos_response.data)
+    vibe_photo_urls = [r["url"] for r in vibe_photo_rows if r.get("url")]
+
+    return ShopEnrichmentInput(
+        name=shop["name"],
+        reviews=reviews,
+        description=shop.get("description"),
+        categories=shop.get("categories", []),
+        price_range=shop.get("price_range"),
+        socket=shop.get("socket"),
+        limited_time=shop.get("limited_time"),
+        rating=shop.get("rating"),
+        review_count=shop.get("review_count"),
+        google_maps_features=shop.get("google_maps_features") or {},
+        vibe_photo_urls=vibe_photo_urls,
+    )
+
+
+def mark_enrichment_failed(db: Client, shop_id: str, reason: str) -> None:
+    db.table("shops").update(
+        {
+            "processing_status": "failed",
+            "rejection_reason": reason,
+            "updated_at": datetime.now(UTC).isoformat(),
+        }
+    ).eq("id", shop_id).execute()
+
+
+def write_shop_enrichment(db: Client, shop_id: str, result: EnrichmentResult) -> None:
+    mode = result.mode_scores
+    db.table("shops").update(
+        {
+            "description": result.summary,
+            "enriched_at": datetime.now(UTC).isoformat(),
+            "mode_work": mode.work if mode else None,
+            "mode_rest": mode.rest if mode else None,
+            "mode_social": mode.social if mode else None,
+            "processing_status": "embedding",
+            "coffee_origins": result.coffee_origins,
+        }
+    ).eq("id", shop_id).execute()
+
+
+def write_shop_tags(db: Client, shop_id: str, result: EnrichmentResult) -> None:
+    # Re-enrichment replaces tags, not appends
+    db.table("shop_tags").delete().eq("shop_id", shop_id).execute()
+    if result.tags:
+        tag_rows: list[dict[str, Any]] = [
+            {
+                "shop_id": shop_id,
+                "tag_id": tag.id,
+                "confidence": result.tag_confidences.get(tag.id, 0.0),
+            }
+            for tag in result.tags
+        ]
+        db.table("shop_tags").insert(tag_rows).execute()
+
+
+def write_tarot(db: Client, shop_id: str, tarot: TarotEnrichmentResult) -> None:
+    if tarot.tarot_title:
+        db.table("shops").update(
+            {
+                "tarot_title": tarot.tarot_title,
+                "flavor_text": tarot.flavor_text,
+            }
+        ).eq("id", shop_id).execute()
+        logger.info("Tarot assigned", shop_id=shop_id, title=tarot.tarot_title)
+
+
+def write_review_menu_items(db: Client, shop_id: str, menu_items: list[dict[str, Any]]) -> None:
+    """Review-sourced menu items (DEV-313); items already extracted from photos win."""
+    if not menu_items:
+        return
+    # Delete existing review-sourced items for this shop
+    db.table("shop_menu_items").delete().eq("shop_id", shop_id).eq("source", "review").execute()
+
+    # Photo-wins: check which items already exist from photos
+    photo_items = cast(
+        "list[dict[str, Any]]",
+        db.table("shop_menu_items")
+        .select("item_name")
+        .eq("shop_id", shop_id)
+        .eq("source", "photo")
+        .execute()
+        .data
+        or [],
+    )
+    photo_names = {row["item_name"] for row in photo_items}
+
+    # Filter out items that already exist from photos
+    review_rows = [
+        {
+            "shop_id": shop_id,
+            "item_name": item["name"],
+            "price": item.get("price"),
+            "category": item.get("category"),
+            "source": "review",
+            "source_photo_id": None,
+            "extracted_at": datetime.now(UTC).isoformat(),
+        }
+        for item in menu_items
+        if item.get("name") and item["name"] not in photo_names
+    ]
+
+    if review_rows:
+        db.table("shop_menu_items").insert(review_rows).execute()
+        logger.info(
+            "Review-sourced menu items written",
+            shop_id=shop_id,
+            count=len(review_rows),
+        )
+
+
+async def enqueue_after_enrichment(queue: JobQueue, payload: dict[str, Any]) -> None:
+    """Chain SUMMARIZE_REVIEWS (carrying submission context) and SYNC_MENU_HIGHLIGHTS."""
+    shop_id = payload["shop_id"]
+    enqueue_payload: dict[str, Any] = {"shop_id": shop_id}
+    for key in ("submission_id", "submitted_by", "batch_id"):
+        if payload.get(key):
+            enqueue_payload[key] = payload[key]
+
+    await queue.enqueue(
+        job_type=JobType.SUMMARIZE_REVIEWS,
+        payload=enqueue_payload,
+        priority=5,
+        dedupe_key=shop_id,
+    )
+    await queue.enqueue(
+        job_type=JobType.SYNC_MENU_HIGHLIGHTS,
+        payload={"shop_id": shop_id},
+        priority=5,
+        dedupe_key=shop_id,
+        debounce_seconds=settings.worker_enqueue_debounce_seconds,
+    )
+
+
 async def handle_enrich_shop(
     payload: dict[str, Any],
     db: Client,
@@ -41,46 +209,7 @@ async def handle_enrich_shop(
         )
 
         t0 = time.monotonic()
-        shop_response = (
-            db.table("shops")
-            .select(
-                "id, name, description, categories, price_range, "
-                "socket, limited_time, rating, review_count, google_maps_features"
-            )
-            .eq("id", shop_id)
-            .single()
-            .execute()
-        )
-        shop = cast("dict[str, Any]", shop_response.data)
-
-        reviews_response = db.table("shop_reviews").select("text").eq("shop_id", shop_id).execute()
-        review_rows = cast("list[dict[str, Any]]", reviews_response.data)
-        reviews = [r["text"] for r in review_rows if r.get("text")]
-
-        vibe_photos_response = (
-            db.table("shop_photos")
-            .select("url")
-            .eq("shop_id", shop_id)
-            .eq("category", "VIBE")
-            .limit(3)
-            .execute()
-        )
-        vibe_photo_rows = cast("list[dict[str, Any]]", vibe_photos_response.data)
-        vibe_photo_urls = [r["url"] for r in vibe_photo_rows if r.get("url")]
-
-        enrichment_input = ShopEnrichmentInput(
-            name=shop["name"],
-            reviews=reviews,
-            description=shop.get("description"),
-            categories=shop.get("categories", []),
-            price_range=shop.get("price_range"),
-            socket=shop.get("socket"),
-            limited_time=shop.get("limited_time"),
-            rating=shop.get("rating"),
-            review_count=shop.get("review_count"),
-            google_maps_features=shop.get("google_maps_features") or {},
-            vibe_photo_urls=vibe_photo_urls,
-        )
+        enrichment_input = load_enrichment_input(db, shop_id)
         step_timings["fetch_data"] = {"duration_ms": int((time.monotonic() - t0) * 1000)}
 
         await log_job_event(
@@ -106,33 +235,18 @@ async def handle_enrich_shop(
                 shop_id=shop_id,
                 summary_preview=result.summary[:80],
             )
-            db.table("shops").update(
-                {
-                    "processing_status": "failed",
-                    "rejection_reason": "Enrichment failed: summary not in Traditional Chinese",
-                    "updated_at": datetime.now(UTC).isoformat(),
-                }
-            ).eq("id", shop_id).execute()
+            mark_enrichment_failed(
+                db, shop_id, "Enrichment failed: summary not in Traditional Chinese"
+            )
             _failure_recorded = True
             raise ValueError(f"Enrichment summary for shop {shop_id} is not in Traditional Chinese")
 
         t0 = time.monotonic()
-        mode = result.mode_scores
         if job_id and not await check_job_still_claimed(queue, job_id):
             logger.warning("job.aborted_midflight job_id=%s handler=enrich_shop", job_id)
             await log_job_event(db, job_id, "warn", "job.aborted_midflight", shop_id=str(shop_id))
             return
-        db.table("shops").update(
-            {
-                "description": result.summary,
-                "enriched_at": datetime.now(UTC).isoformat(),
-                "mode_work": mode.work if mode else None,
-                "mode_rest": mode.rest if mode else None,
-                "mode_social": mode.social if mode else None,
-                "processing_status": "embedding",
-                "coffee_origins": result.coffee_origins,
-            }
-        ).eq("id", shop_id).execute()
+        write_shop_enrichment(db, shop_id, result)
         await log_job_event(
             db,
             job_id,
@@ -142,95 +256,22 @@ async def handle_enrich_shop(
             columns=["description", "enriched_at", "tags"],
         )
 
-        # Re-enrichment replaces tags, not appends
         if job_id and not await check_job_still_claimed(queue, job_id):
             logger.warning("job.aborted_midflight job_id=%s handler=enrich_shop", job_id)
             await log_job_event(db, job_id, "warn", "job.aborted_midflight", shop_id=str(shop_id))
             return
-        db.table("shop_tags").delete().eq("shop_id", shop_id).execute()
-        if result.tags:
-            tag_rows = [
-                {
-                    "shop_id": shop_id,
-                    "tag_id": tag.id,
-                    "confidence": result.tag_confidences.get(tag.id, 0.0),
-                }
-                for tag in result.tags
-            ]
-            db.table("shop_tags").insert(tag_rows).execute()
+        write_shop_tags(db, shop_id, result)
 
         try:
-            tarot = await llm.assign_tarot(enrichment_input)
-            if tarot.tarot_title:
-                db.table("shops").update(
-                    {
-                        "tarot_title": tarot.tarot_title,
-                        "flavor_text": tarot.flavor_text,
-                    }
-                ).eq("id", shop_id).execute()
-                logger.info("Tarot assigned", shop_id=shop_id, title=tarot.tarot_title)
+            # Combined enrichment already carries the tarot; otherwise ask separately
+            tarot = result.tarot or await llm.assign_tarot(enrichment_input)
+            write_tarot(db, shop_id, tarot)
         except Exception:
             logger.warning("Tarot enrichment failed — continuing", shop_id=shop_id, exc_info=True)
         step_timings["db_write"] = {"duration_ms": int((time.monotonic() - t0) * 1000)}
 
-        # --- Review-sourced menu items (DEV-313) ---
-        if result.menu_items:
-            # Delete existing review-sourced items for this shop
-            db.table("shop_menu_items").delete().eq("shop_id", shop_id).eq(
-                "source", "review"
-            ).execute()
-
-            # Photo-wins: check which items already exist from photos
-            photo_items = cast(
-                "list[dict[str, Any]]",
-                db.table("shop_menu_items")
-                .select("item_name")
-                .eq("shop_id", shop_id)
-                .eq("source", "photo")
-                .execute()
-                .data
-                or [],
-            )
-            photo_names = {row["item_name"] for row in photo_items}
-
-            # Filter out items that already exist from photos
-            review_rows = [
-                {
-                    "shop_id": shop_id,
-                    "item_name": item["name"],
-                    "price": item.get("price"),
-                    "category": item.get("category"),
-                    "source": "review",
-                    "source_photo_id": None,
-                    "extracted_at": datetime.now(UTC).isoformat(),
-                }
-                for item in result.menu_items
-                if item.get("name") and item["name"] not in photo_names
-            ]
-
-            if review_rows:
-                db.table("shop_menu_items").insert(review_rows).execute()
-                logger.info(
-                    "Review-sourced menu items written",
-                    shop_id=shop_id,
-                    count=len(review_rows),
-                )
-
-        enqueue_payload: dict[str, Any] = {"shop_id": shop_id}
-        for key in ("submission_id", "submitted_by", "batch_id"):
-            if payload.get(key):
-                enqueue_payload[key] = payload[key]
-
-        await queue.enqueue(
-            job_type=JobType.SUMMARIZE_REVIEWS,
-            payload=enqueue_payload,
-            priority=5,
-        )
-        await queue.enqueue(
-            job_type=JobType.SYNC_MENU_HIGHLIGHTS,
-            payload={"shop_id": shop_id},
-            priority=5,
-        )
+        write_review_menu_items(db, shop_id, result.menu_items)
+        await enqueue_after_enrichment(queue, payload)
 
         logger.info("Shop enriched", shop_id=shop_id, tag_count=len(result.tags))
         await log_job_event(db, job_id, "info", "job.end", status="ok")
@@ -238,13 +279,7 @@ async def handle_enrich_shop(
     except Exception as exc:
         await log_job_event(db, job_id, "error", "job.error", error=str(exc))
         if not _failure_recorded and (not job_id or await check_job_still_claimed(queue, job_id)):
-            db.table("shops").update(
-                {
-                    "processing_status": "failed",
-                    "rejection_reason": f"Enrichment error: {exc}",
-                    "updated_at": datetime.now(UTC).isoformat(),
-                }
-            ).eq("id", shop_id).execute()
+            mark_enrichment_failed(db, shop_id, f"Enrichment error: {exc}")
         raise
     finally:
         if job_id is not None:
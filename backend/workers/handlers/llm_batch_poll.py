@@ -0,0 +1,277 @@
+"""Bulk LLM runs through provider batch APIs.
+
+submit_llm_batch loads each shop's input, submits one provider batch and enqueues an
+LLM_BATCH_POLL job. The poll job re-enqueues itself until the batch has ended, then writes
+every result through the same persistence helpers the interactive handlers use and chains
+the same follow-up jobs. Shops whose request failed (or that the batch never answered in
+time) fall back to the regular interactive job.
+"""
+
+from datetime import UTC, datetime, timedelta
+from typing import Any, Literal, cast
+
+import structlog
+from supabase import Client
+
+from core.config import settings
+from core.lang import is_zh_dominant
+from models.types import (
+    EnrichmentResult,
+    JobType,
+    ReviewSummaryResult,
+    TarotEnrichmentResult,
+)
+from providers.llm.interface import LLMBatchProvider, LLMBatchRequest, LLMBatchResult
+from workers.handlers.enrich_shop import (
+    enqueue_after_enrichment,
+    load_enrichment_input,
+    mark_enrichment_failed,
+    write_review_menu_items,
+    write_shop_enrichment,
+    write_shop_tags,
+    write_tarot,
+)
+from workers.handlers.summarize_reviews import load_summary_input, persist_review_summary
+from workers.queue import JobQueue
+
+logger = structlog.get_logger()
+
+BatchKind = Literal["summarize_reviews", "enrich_shop"]
+
+# Interactive job each kind falls back to, with the priority the batch path would have used
+_FALLBACK_JOB: dict[BatchKind, tuple[JobType, int]] = {
+    "summarize_reviews": (JobType.SUMMARIZE_REVIEWS, 2),
+    "enrich_shop": (JobType.ENRICH_SHOP, 2),
+}
+
+
+async def _enqueue_fallback(queue: JobQueue, kind: BatchKind, shop_ids: list[str]) -> None:
+    if not shop_ids:
+        return
+    job_type, priority = _FALLBACK_JOB[kind]
+    await queue.enqueue_batch(
+        job_type=job_type,
+        payloads=[{"shop_id": sid} for sid in shop_ids],
+        priority=priority,
+        dedupe_field="shop_id",
+    )
+    logger.info("LLM batch fallback to interactive jobs", kind=kind, count=len(shop_ids))
+
+
+async def submit_llm_batch(
+    kind: BatchKind,
+    shop_ids: list[str],
+    db: Client,
+    batch_llm: LLMBatchProvider,
+    queue: JobQueue,
+) -> str | None:
+    """Submit one provider batch for shop_ids and schedule its first poll.
+
+    enrich_shop batches carry an assign_tarot request per shop too (unless combined
+    enrichment returns the tarot with the enrichment): tarot only needs the enrichment
+    input, so both are answered by the same batch. Shops with nothing to
+    summarize go straight to SUMMARIZE_REVIEWS, which chains them to embedding.
+    Returns the batch id, or None when no request was submitted.
+    """
+    requests: list[LLMBatchRequest] = []
+    skipped: list[str] = []
+    # Per-shop persist_review_summary arguments, carried on the poll payload
+    summary_inputs: dict[str, dict[str, Any]] = {}
+    for shop_id in shop_ids:
+        if kind == "summarize_reviews":
+            summary_input = load_summary_input(db, shop_id)
+            if not summary_input.text_count:
+                skipped.append(shop_id)
+                continue
+            requests.append(
+                LLMBatchRequest(
+                    custom_id=shop_id,
+                    method="summarize_reviews",
+                    google_reviews=summary_input.google_reviews,
+                    checkin_texts=summary_input.checkin_texts,
+                    previous=summary_input.previous,
+                )
+            )
+            summary_inputs[shop_id] = {
+                "as_of": summary_input.as_of.isoformat(),
+                "incremental_texts": summary_input.incremental_texts,
+            }
+        else:
+            shop = load_enrichment_input(db, shop_id)
+            requests.append(LLMBatchRequest(custom_id=shop_id, method="enrich_shop", shop=shop))
+            if not settings.llm_enrich_with_tarot:
+                requests.append(
+                    LLMBatchRequest(custom_id=shop_id, method="assign_tarot", shop=shop)
+                )
+
+    await _enqueue_fallback(queue, kind, skipped)
+    if not requests:
+        return None
+
+    batch_id = await batch_llm.submit_batch(requests)
+    skipped_ids = set(skipped)
+    submitted = [sid for sid in shop_ids if sid not in skipped_ids]
+    now = datetime.now(UTC)
+    poll_payload: dict[str, Any] = {
+        "batch_id": batch_id,
+        "kind": kind,
+        "shop_ids": submitted,
+        "submitted_at": now.isoformat(),
+    }
+    if summary_inputs:
+        poll_payload["summary_inputs"] = summary_inputs
+    await queue.enqueue(
+        job_type=JobType.LLM_BATCH_POLL,
+        payload=poll_payload,
+        priority=2,
+        scheduled_at=now + timedelta(seconds=settings.llm_batch_poll_interval_seconds),
+    )
+    logger.info("Submitted LLM batch", kind=kind, batch_id=batch_id, shops=len(submitted))
+    return batch_id
+
+
+def _apply_summary(
+    db: Client,
+    shop_id: str,
+    result: ReviewSummaryResult,
+    summary_input: dict[str, Any] | None,
+) -> None:
+    if not result.summary_zh_tw:
+        logger.warning("LLM returned empty summary — skipping DB write", shop_id=shop_id)
+        return
+    if summary_input is None:
+        persist_review_summary(db, shop_id, result)
+        return
+    persist_review_summary(
+        db,
+        shop_id,
+        result,
+        as_of=datetime.fromisoformat(summary_input["as_of"]),
+        incremental_texts=summary_input["incremental_texts"],
+    )
+
+
+def _apply_enrichment(db: Client, shop_id: str, result: EnrichmentResult) -> None:
+    if result.summary and not is_zh_dominant(result.summary):
+        mark_enrichment_failed(db, shop_id, "Enrichment failed: summary not in Traditional Chinese")
+        raise ValueError(f"Enrichment summary for shop {shop_id} is not in Traditional Chinese")
+    write_shop_enrichment(db, shop_id, result)
+    write_shop_tags(db, shop_id, result)
+    write_review_menu_items(db, shop_id, result.menu_items)
+
+
+async def _apply_results(
+    kind: BatchKind,
+    shop_ids: list[str],
+    results: list[LLMBatchResult],
+    db: Client,
+    queue: JobQueue,
+    summary_inputs: dict[str, dict[str, Any]],
+) -> tuple[list[str], list[str]]:
+    """Persist batch results; returns (succeeded, failed) shop ids."""
+    by_method: dict[str, dict[str, LLMBatchResult]] = {}
+    for item in results:
+        by_method.setdefault(item.method, {})[item.custom_id] = item
+
+    primary = by_method.get(kind, {})
+    tarots = by_method.get("assign_tarot", {})
+    succeeded: list[str] = []
+    failed: list[str] = []
+    for shop_id in shop_ids:
+        entry = primary.get(shop_id)
+        if entry is None or entry.result is None:
+            logger.warning(
+                "LLM batch request failed",
+                kind=kind,
+                shop_id=shop_id,
+                error=entry.error if entry else "missing from batch output",
+            )
+            failed.append(shop_id)
+            continue
+        try:
+            if kind == "summarize_reviews":
+                _apply_summary(
+                    db,
+                    shop_id,
+                    cast("ReviewSummaryResult", entry.result),
+                    summary_inputs.get(shop_id),
+                )
+                await queue.enqueue(
+                    job_type=JobType.GENERATE_EMBEDDING,
+                    payload={"shop_id": shop_id},
+                    priority=2,
+                    dedupe_key=shop_id,
+                    debounce_seconds=settings.worker_enqueue_debounce_seconds,
+                )
+            else:
+                enrichment = cast("EnrichmentResult", entry.result)
+                _apply_enrichment(db, shop_id, enrichment)
+                tarot = tarots.get(shop_id)
+                if enrichment.tarot is not None:
+                    write_tarot(db, shop_id, enrichment.tarot)
+                elif tarot is not None and tarot.result is not None:
+                    write_tarot(db, shop_id, cast("TarotEnrichmentResult", tarot.result))
+                elif tarot is not None:
+                    logger.warning(
+                        "Tarot enrichment failed — continuing", shop_id=shop_id, error=tarot.error
+                    )
+                await enqueue_after_enrichment(queue, {"shop_id": shop_id})
+        except Exception as exc:
+            # Same outcome as the interactive handler raising: no retry for a
+            # non-zh-TW result, which would most likely come back the same
+            logger.warning("LLM batch result rejected", kind=kind, shop_id=shop_id, error=str(exc))
+            continue
+        succeeded.append(shop_id)
+    return succeeded, failed
+
+
+async def handle_llm_batch_poll(
+    payload: dict[str, Any],
+    db: Client,
+    batch_llm: LLMBatchProvider,
+    queue: JobQueue,
+) -> None:
+    """Collect a submitted LLM batch, or re-enqueue this poll until the batch has ended."""
+    batch_id: str = payload["batch_id"]
+    kind = cast("BatchKind", payload["kind"])
+    shop_ids: list[str] = payload["shop_ids"]
+
+    if not await batch_llm.batch_finished(batch_id):
+        submitted_at = datetime.fromisoformat(payload["submitted_at"])
+        waited = (datetime.now(UTC) - submitted_at).total_seconds()
+        if waited >= settings.llm_batch_max_wait_seconds:
+            logger.warning(
+                "LLM batch did not finish in time — falling back",
+                batch_id=batch_id,
+                waited_seconds=int(waited),
+            )
+            # The provider bills whatever the batch finishes, and the interactive jobs are
+            # about to redo every shop, so stop it first
+            try:
+                await batch_llm.cancel_batch(batch_id)
+            except Exception as exc:
+                logger.warning("LLM batch cancel failed", batch_id=batch_id, error=str(exc))
+            await _enqueue_fallback(queue, kind, shop_ids)
+            return
+        await queue.enqueue(
+            job_type=JobType.LLM_BATCH_POLL,
+            payload=payload,
+            priority=2,
+            scheduled_at=datetime.now(UTC)
+            + timedelta(seconds=settings.llm_batch_poll_interval_seconds),
+        )
+        logger.info("LLM batch still running", batch_id=batch_id, kind=kind)
+        return
+
+    results = await batch_llm.batch_results(batch_id)
+    succeeded, failed = await _apply_results(
+        kind, shop_ids, results, db, queue, payload.get("summary_inputs", {})
+    )
+    await _enqueue_fallback(queue, kind, failed)
+    logger.info(
+        "LLM batch collected",
+        batch_id=batch_id,
+        kind=kind,
+        succeeded=len(succeeded),
+        failed=len(failed),
+    )
@@ -3,17 +3,24 @@ from typing import Any, cast
 import structlog
 from supabase import Client
 
+from core.config import settings
 from models.types import CHECKIN_MIN_TEXT_LENGTH, JobType
+from providers.llm.interface import LLMBatchProvider
+from workers.handlers.llm_batch_poll import submit_llm_batch
 from workers.queue import JobQueue
 
 logger = structlog.get_logger()
 
 
-async def handle_reembed_reviewed_shops(db: Client, queue: JobQueue) -> None:
+async def handle_reembed_reviewed_shops(
+    db: Client, queue: JobQueue, batch_llm: LLMBatchProvider | None = None
+) -> None:
     """Find shops with new check-in text since their last embedding and enqueue re-embed jobs.
 
     Called nightly by the scheduler. Uses an RPC to efficiently find shops where
     check_ins.created_at > shops.last_embedded_at and the check-in has qualifying text.
+    With a batch provider and at least llm_batch_min_requests shops, the summaries go out as
+    one provider batch (collected by LLM_BATCH_POLL) instead of a SUMMARIZE_REVIEWS job each.
     """
     response = db.rpc(
         "find_shops_needing_review_reembed",
@@ -28,10 +35,19 @@ async def handle_reembed_reviewed_shops(db: Client, queue: JobQueue) -> None:
     shop_ids = [row["id"] for row in shop_rows]
     logger.info("Re-embedding shops with new check-in text", count=len(shop_ids))
 
+    if (
+        batch_llm is not None
+        and settings.llm_batch_enabled
+        and len(shop_ids) >= settings.llm_batch_min_requests
+    ):
+        await submit_llm_batch("summarize_reviews", shop_ids, db, batch_llm, queue)
+        return
+
     await queue.enqueue_batch(
         job_type=JobType.SUMMARIZE_REVIEWS,
         payloads=[{"shop_id": sid} for sid in shop_ids],
         priority=2,  # lower than user-triggered work
+        dedupe_field="shop_id",
     )
 
     logger.info("Enqueued review re-embed jobs", count=len(shop_ids))
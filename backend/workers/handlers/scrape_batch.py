@@ -1,15 +1,36 @@
+import contextlib
 from datetime import UTC, datetime
 from typing import Any
 
 import structlog
 from supabase import Client
 
+from core.config import settings
 from providers.scraper.interface import BatchScrapeInput, ScraperProvider
-from workers.persist import persist_scraped_data
+from workers.persist import ScrapedShop, load_scrape_baselines, persist_scraped_batch
 from workers.queue import JobQueue
 
 logger = structlog.get_logger()
 
+# Streamed results are persisted in set-based flushes of this many shops
+_PERSIST_FLUSH_SIZE = 10
+
+
+def shard_scrape_payloads(
+    batch_id: str, shops: list[dict[str, Any]], shard_size: int | None = None
+) -> list[dict[str, Any]]:
+    """Split one logical batch into SCRAPE_BATCH payloads of at most shard_size shops.
+
+    Shards keep the same batch_id so downstream jobs still group by batch; each runs as
+    its own actor run, so one slow place only holds back its shard.
+    """
+    size = max(1, shard_size or settings.worker_scrape_shard_size)
+    chunks = [shops[i : i + size] for i in range(0, len(shops), size)]
+    return [
+        {"batch_id": batch_id, "shard": index, "shards": len(chunks), "shops": chunk}
+        for index, chunk in enumerate(chunks, start=1)
+    ]
+
 
 async def handle_scrape_batch(
     payload: dict[str, Any],
@@ -17,11 +38,12 @@ async def handle_scrape_batch(
     scraper: ScraperProvider,
     queue: JobQueue,
 ) -> None:
-    """Scrape multiple shops in a single Apify actor run.
+    """Scrape multiple shops in a single Apify actor run, persisting each as it arrives.
 
     Payload shape:
         {
             "batch_id": str,
+            "shard"?: int, "shards"?: int,
             "shops": [
                 {"shop_id": str, "google_maps_url": str,
                  "submission_id"?: str, "submitted_by"?: str}
@@ -36,7 +58,17 @@ async def handle_scrape_batch(
         return
 
     shop_ids = [s["shop_id"] for s in raw_shops]
-    logger.info("Batch scraping shops", batch_id=batch_id, count=len(shop_ids))
+    logger.info(
+        "Batch scraping shops",
+        batch_id=batch_id,
+        shard=payload.get("shard"),
+        shards=payload.get("shards"),
+        count=len(shop_ids),
+    )
+
+    # Fingerprints of already-settled shops, read before their status is overwritten, let
+    # unchanged re-scrapes skip persistence and enrichment
+    baselines = load_scrape_baselines(db, shop_ids)
 
     # Set all shops to scraping in one batch UPDATE
     db.table("shops").update(
@@ -48,28 +80,6 @@ async def handle_scrape_batch(
         for s in raw_shops
     ]
 
-    try:
-        results = await scraper.scrape_batch(batch_inputs)
-    except Exception as exc:
-        logger.error("Batch scrape provider failed entirely", batch_id=batch_id, error=str(exc))
-        db.table("shops").update(
-            {
-                "processing_status": "failed",
-                "rejection_reason": f"Scrape batch error: {exc}",
-                "updated_at": datetime.now(UTC).isoformat(),
-            }
-        ).in_("id", shop_ids).execute()
-        for s in raw_shops:
-            if s.get("submission_id"):
-                db.table("shop_submissions").update(
-                    {
-                        "status": "failed",
-                        "failure_reason": f"Scrape batch error: {exc}",
-                        "updated_at": datetime.now(UTC).isoformat(),
-                    }
-                ).eq("id", s["submission_id"]).execute()
-        raise
-
     # Build lookup for submission context
     meta: dict[str, dict[str, str | None]] = {
         s["shop_id"]: {
@@ -81,78 +91,138 @@ async def handle_scrape_batch(
 
     succeeded = 0
     failed = 0
-
-    for result in results:
-        shop_id = result.shop_id
-        shop_meta = meta.get(shop_id, {})
-
-        if result.data is None:
-            logger.warning(
-                "Batch: shop not found on Google Maps",
-                shop_id=shop_id,
-                batch_id=batch_id,
-            )
-            db.table("shops").update(
-                {
-                    "processing_status": "failed",
-                    "rejection_reason": "Place not found on Google Maps",
-                    "updated_at": datetime.now(UTC).isoformat(),
-                }
-            ).eq("id", shop_id).execute()
-
-            submission_id = shop_meta.get("submission_id")
-            if submission_id:
-                db.table("shop_submissions").update(
-                    {
-                        "status": "failed",
-                        "failure_reason": "Place not found on Google Maps",
-                        "updated_at": datetime.now(UTC).isoformat(),
-                    }
-                ).eq("id", submission_id).execute()
-
-            failed += 1
-            continue
-
-        try:
-            await persist_scraped_data(
-                shop_id=shop_id,
-                data=result.data,
-                db=db,
-                queue=queue,
-                submission_id=shop_meta.get("submission_id"),
-                submitted_by=shop_meta.get("submitted_by"),
-                batch_id=batch_id,
-            )
-            succeeded += 1
-        except Exception as exc:
-            logger.error(
-                "Batch: failed to persist shop",
-                shop_id=shop_id,
-                batch_id=batch_id,
-                error=str(exc),
-            )
+    seen: set[str] = set()
+    pending: list[ScrapedShop] = []
+
+    async def _flush() -> None:
+        nonlocal succeeded, failed
+        if not pending:
+            return
+        failures = await persist_scraped_batch(pending, db, queue, batch_id=batch_id)
+        for shop in pending:
+            exc = failures.get(shop.shop_id)
+            if exc is None:
+                succeeded += 1
+            else:
+                _mark_persist_failed(shop.shop_id, meta.get(shop.shop_id, {}), batch_id, exc, db)
+                failed += 1
+        pending.clear()
+
+    # Results are persisted (and their downstream jobs enqueued) in small set-based flushes
+    # as the actor produces them, so enrichment starts while the rest are still scraping.
+    try:
+        async with contextlib.aclosing(scraper.scrape_batch_stream(batch_inputs)) as results:
+            async for result in results:
+                seen.add(result.shop_id)
+                shop_meta = meta.get(result.shop_id, {})
+                if result.data is None:
+                    _mark_not_found(result.shop_id, shop_meta, batch_id, db)
+                    failed += 1
+                    continue
+                pending.append(
+                    ScrapedShop(
+                        shop_id=result.shop_id,
+                        data=result.data,
+                        submission_id=shop_meta.get("submission_id"),
+                        submitted_by=shop_meta.get("submitted_by"),
+                        baseline=baselines.get(result.shop_id),
+                    )
+                )
+                if len(pending) >= _PERSIST_FLUSH_SIZE:
+                    await _flush()
+        await _flush()
+    except Exception as exc:
+        # Shops already scraped are still worth keeping
+        await _flush()
+        unfinished = [s for s in raw_shops if s["shop_id"] not in seen]
+        logger.error(
+            "Batch scrape provider failed",
+            batch_id=batch_id,
+            error=str(exc),
+            persisted=succeeded,
+            unfinished=len(unfinished),
+        )
+        if unfinished:
             db.table("shops").update(
                 {
                     "processing_status": "failed",
-                    "rejection_reason": f"Scrape error: {exc}",
+                    "rejection_reason": f"Scrape batch error: {exc}",
                     "updated_at": datetime.now(UTC).isoformat(),
                 }
-            ).eq("id", shop_id).execute()
-            submission_id = shop_meta.get("submission_id")
-            if submission_id:
+            ).in_("id", [s["shop_id"] for s in unfinished]).execute()
+        for s in unfinished:
+            if s.get("submission_id"):
                 db.table("shop_submissions").update(
                     {
                         "status": "failed",
-                        "failure_reason": f"Persist error: {exc}",
+                        "failure_reason": f"Scrape batch error: {exc}",
                         "updated_at": datetime.now(UTC).isoformat(),
                     }
-                ).eq("id", submission_id).execute()
-            failed += 1
+                ).eq("id", s["submission_id"]).execute()
+        raise
 
     logger.info(
         "Batch scrape complete",
         batch_id=batch_id,
         succeeded=succeeded,
         failed=failed,
-        total=len(results),
+        total=len(seen),
+    )
+
+
+def _mark_not_found(
+    shop_id: str, shop_meta: dict[str, str | None], batch_id: str, db: Client
+) -> None:
+    logger.warning(
+        "Batch: shop not found on Google Maps",
+        shop_id=shop_id,
+        batch_id=batch_id,
+    )
+    db.table("shops").update(
+        {
+            "processing_status": "failed",
+            "rejection_reason": "Place not found on Google Maps",
+            "updated_at": datetime.now(UTC).isoformat(),
+        }
+    ).eq("id", shop_id).execute()
+
+    submission_id = shop_meta.get("submission_id")
+    if submission_id:
+        db.table("shop_submissions").update(
+            {
+                "status": "failed",
+                "failure_reason": "Place not found on Google Maps",
+                "updated_at": datetime.now(UTC).isoformat(),
+            }
+        ).eq("id", submission_id).execute()
+
+
+def _mark_persist_failed(
+    shop_id: str,
+    shop_meta: dict[str, str | None],
+    batch_id: str,
+    exc: Exception,
+    db: Client,
+) -> None:
+    logger.error(
+        "Batch: failed to persist shop",
+        shop_id=shop_id,
+        batch_id=batch_id,
+        error=str(exc),
     )
+    db.table("shops").update(
+        {
+            "processing_status": "failed",
+            "rejection_reason": f"Scrape error: {exc}",
+            "updated_at": datetime.now(UTC).isoformat(),
+        }
+    ).eq("id", shop_id).execute()
+    submission_id = shop_meta.get("submission_id")
+    if submission_id:
+        db.table("shop_submissions").update(
+            {
+                "status": "failed",
+                "failure_reason": f"Persist error: {exc}",
+                "updated_at": datetime.now(UTC).isoformat(),
+            }
+        ).eq("id", submission_id).execute()
@@ -0,0 +1,174 @@
+import contextlib
+import time
+from datetime import datetime
+from typing import Any, cast
+
+import structlog
+from supabase import Client
+
+from models.types import JobType
+from providers.embeddings.interface import EmbeddingsProvider
+from providers.llm.interface import LLMProvider
+from workers.handlers.classify_shop_photos import handle_classify_shop_photos
+from workers.handlers.enrich_shop import handle_enrich_shop
+from workers.handlers.generate_embedding import handle_generate_embedding
+from workers.handlers.publish_shop import handle_publish_shop
+from workers.handlers.summarize_reviews import handle_summarize_reviews
+from workers.job_log import log_job_event
+from workers.queue import JobQueue
+
+logger = structlog.get_logger()
+
+# Stages in pipeline order. Each stage's handler enqueues the next one; the pipeline
+# intercepts that enqueue and runs the stage inline instead.
+PIPELINE_STAGES: tuple[JobType, ...] = (
+    JobType.CLASSIFY_SHOP_PHOTOS,
+    JobType.ENRICH_SHOP,
+    JobType.SUMMARIZE_REVIEWS,
+    JobType.GENERATE_EMBEDDING,
+    JobType.PUBLISH_SHOP,
+)
+
+
+class _InlineQueue(JobQueue):
+    """JobQueue that holds back the next pipeline stage instead of inserting it.
+
+    Side jobs a stage spawns (ENRICH_MENU_PHOTO, SYNC_MENU_HIGHLIGHTS) are enqueued as usual.
+    """
+
+    def __init__(self, db: Client, next_stage: JobType | None):
+        super().__init__(db=db)
+        self._next_stage = next_stage
+        self.handoff: dict[str, Any] | None = None
+
+    async def enqueue(
+        self,
+        job_type: JobType,
+        payload: dict[str, Any],
+        priority: int = 0,
+        scheduled_at: datetime | None = None,
+        dedupe_key: str | None = None,
+        debounce_seconds: int = 0,
+    ) -> str:
+        if job_type == self._next_stage:
+            self.handoff = payload
+            return f"inline:{job_type.value}"
+        return await super().enqueue(
+            job_type,
+            payload,
+            priority=priority,
+            scheduled_at=scheduled_at,
+            dedupe_key=dedupe_key,
+            debounce_seconds=debounce_seconds,
+        )
+
+
+async def _run_stage(
+    stage: JobType,
+    payload: dict[str, Any],
+    db: Client,
+    llm: LLMProvider,
+    embeddings: EmbeddingsProvider,
+    queue: JobQueue,
+    job_id: str,
+) -> None:
+    match stage:
+        case JobType.CLASSIFY_SHOP_PHOTOS:
+            await handle_classify_shop_photos(
+                payload=payload, db=db, llm=llm, queue=queue, job_id=job_id
+            )
+        case JobType.ENRICH_SHOP:
+            await handle_enrich_shop(payload=payload, db=db, llm=llm, queue=queue, job_id=job_id)
+        case JobType.SUMMARIZE_REVIEWS:
+            await handle_summarize_reviews(
+                payload=payload, db=db, llm=llm, queue=queue, job_id=job_id
+            )
+        case JobType.GENERATE_EMBEDDING:
+            await handle_generate_embedding(
+                payload=payload, db=db, embeddings=embeddings, queue=queue, job_id=job_id
+            )
+        case JobType.PUBLISH_SHOP:
+            await handle_publish_shop(payload=payload, db=db)
+
+
+def _read_stage_timings(db: Client, job_id: str) -> dict[str, Any]:
+    """Stage handlers overwrite the job's step_timings; read back what the last one wrote."""
+    with contextlib.suppress(Exception):
+        response = db.table("job_queue").select("step_timings").eq("id", job_id).single().execute()
+        return cast("dict[str, Any]", response.data or {}).get("step_timings") or {}
+    return {}
+
+
+async def handle_shop_pipeline(
+    payload: dict[str, Any],
+    db: Client,
+    llm: LLMProvider,
+    embeddings: EmbeddingsProvider,
+    queue: JobQueue,
+    job_id: str,
+    attempts: int = 1,
+) -> None:
+    """Run classify → enrich → summarize → embed → publish for one shop inside this job.
+
+    Saves a poll cycle and a claim/complete round trip per stage for user submissions.
+    If a stage raises, that stage is enqueued as a regular job (with its own retry budget)
+    and the rest of the pipeline continues through the queue as before. A retried pipeline
+    job never re-runs inline: it hands its starting stage straight to the queue.
+    """
+    shop_id = payload["shop_id"]
+    start_stage = JobType(payload["start_stage"])
+    stage_payload = {k: v for k, v in payload.items() if k != "start_stage"}
+
+    if attempts > 1:
+        logger.info("Shop pipeline retried, falling back to per-stage jobs", shop_id=shop_id)
+        await queue.enqueue(job_type=start_stage, payload=stage_payload, priority=5)
+        return
+
+    step_timings: dict[str, dict[str, Any]] = {}
+    await log_job_event(
+        db, job_id, "info", "job.start", job_type="shop_pipeline", shop_id=str(shop_id)
+    )
+    stage: JobType | None = start_stage
+    stages_run = 0
+    try:
+        while stage is not None:
+            index = PIPELINE_STAGES.index(stage)
+            next_stage = PIPELINE_STAGES[index + 1] if index + 1 < len(PIPELINE_STAGES) else None
+            inline_queue = _InlineQueue(db, next_stage)
+            t0 = time.monotonic()
+            stages_run += 1
+            try:
+                await _run_stage(stage, stage_payload, db, llm, embeddings, inline_queue, job_id)
+            except Exception as exc:
+                logger.warning(
+                    "Shop pipeline stage failed, falling back to per-stage job",
+                    shop_id=shop_id,
+                    stage=stage.value,
+                    error=str(exc),
+                )
+                await log_job_event(
+                    db, job_id, "warn", "pipeline.fallback", stage=stage.value, error=str(exc)
+                )
+                await queue.enqueue(job_type=stage, payload=stage_payload, priority=5)
+                return
+            finally:
+                if stage != JobType.PUBLISH_SHOP:  # the only stage without step_timings
+                    for step, timing in _read_stage_timings(db, job_id).items():
+                        step_timings[f"{stage.value}.{step}"] = timing
+                step_timings[stage.value] = {"duration_ms": int((time.monotonic() - t0) * 1000)}
+
+            if inline_queue.handoff is None:
+                # The stage decided not to advance (shop closed, job cancelled, already live)
+                break
+            stage, stage_payload = next_stage, inline_queue.handoff
+
+        logger.info("Shop pipeline finished", shop_id=shop_id, stages=stages_run)
+        await log_job_event(db, job_id, "info", "job.end", status="ok")
+    finally:
+        with contextlib.suppress(Exception):
+            (
+                db.table("job_queue")
+                .update({"step_timings": step_timings})
+                .eq("id", str(job_id))
+                .execute()
+            )
@@ -0,0 +1,98 @@
+import statistics
+from datetime import UTC, date, datetime, time, timedelta
+from typing import Any, cast
+
+import sentry_sdk
+import structlog
+from supabase import Client
+
+logger = structlog.get_logger()
+
+# A stage regresses when its p95 reaches this multiple of its trailing baseline
+REGRESSION_FACTOR = 2.0
+BASELINE_DAYS = 7
+# Ignore (job_type, step) pairs with too few samples to give a stable p95
+MIN_SAMPLES = 20
+
+
+def fetch_stage_latency(db: Client, start: datetime, end: datetime) -> list[dict[str, Any]]:
+    """Exact p50/p95/p99 per (job_type, step) for jobs completed in [start, end)."""
+    response = db.rpc(
+        "job_stage_latency", {"p_from": start.isoformat(), "p_to": end.isoformat()}
+    ).execute()
+    return cast("list[dict[str, Any]]", response.data or [])
+
+
+def fetch_daily_rollups(db: Client, since: date, until: date) -> list[dict[str, Any]]:
+    """Stored daily rollups for since <= day < until."""
+    response = (
+        db.table("job_stage_latency_daily")
+        .select("day, job_type, step, samples, p50_ms, p95_ms, p99_ms, max_ms")
+        .gte("day", since.isoformat())
+        .lt("day", until.isoformat())
+        .order("day")
+        .execute()
+    )
+    return cast("list[dict[str, Any]]", response.data or [])
+
+
+def find_regressions(
+    current: list[dict[str, Any]], history: list[dict[str, Any]]
+) -> list[dict[str, Any]]:
+    """Stages whose current p95 is at least REGRESSION_FACTOR x the median daily p95 in history."""
+    baseline_p95: dict[tuple[str, str], list[float]] = {}
+    for row in history:
+        if int(row["samples"]) >= MIN_SAMPLES:
+            key = (str(row["job_type"]), str(row["step"]))
+            baseline_p95.setdefault(key, []).append(float(row["p95_ms"]))
+
+    regressions: list[dict[str, Any]] = []
+    for row in current:
+        key = (str(row["job_type"]), str(row["step"]))
+        if int(row["samples"]) < MIN_SAMPLES or key not in baseline_p95:
+            continue
+        baseline = statistics.median(baseline_p95[key])
+        p95 = float(row["p95_ms"])
+        if baseline > 0 and p95 >= baseline * REGRESSION_FACTOR:
+            regressions.append(
+                {
+                    "job_type": key[0],
+                    "step": key[1],
+                    "p95_ms": p95,
+                    "baseline_p95_ms": baseline,
+                    "ratio": round(p95 / baseline, 2),
+                    "samples": int(row["samples"]),
+                }
+            )
+    return regressions
+
+
+async def handle_stage_latency_rollup(db: Client, day: date | None = None) -> list[dict[str, Any]]:
+    """Roll up step_timings for one UTC day (default: yesterday) and alert on p95 regressions.
+
+    Returns the regressions found so callers and tests can inspect them.
+    """
+    day = day or (datetime.now(UTC).date() - timedelta(days=1))
+    start = datetime.combine(day, time.min, tzinfo=UTC)
+    rows = fetch_stage_latency(db, start, start + timedelta(days=1))
+    if not rows:
+        logger.info("No step timings to roll up", day=day.isoformat())
+        return []
+
+    db.table("job_stage_latency_daily").upsert(
+        [{"day": day.isoformat(), **row} for row in rows],
+        on_conflict="day,job_type,step",
+    ).execute()
+    logger.info("Rolled up stage latency", day=day.isoformat(), stages=len(rows))
+
+    history = fetch_daily_rollups(db, day - timedelta(days=BASELINE_DAYS), day)
+    regressions = find_regressions(rows, history)
+    for regression in regressions:
+        logger.warning("Stage latency regression", day=day.isoformat(), **regression)
+        sentry_sdk.capture_message(
+            f"Stage latency regression: {regression['job_type']}.{regression['step']} "
+            f"p95 {regression['p95_ms']:.0f}ms vs baseline "
+            f"{regression['baseline_p95_ms']:.0f}ms ({regression['ratio']}x)",
+            level="warning",
+        )
+    return regressions
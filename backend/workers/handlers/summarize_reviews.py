@@ -1,13 +1,21 @@
 import contextlib
 import time
+from dataclasses import dataclass
 from datetime import UTC, datetime
 from typing import Any, cast
 
 import structlog
 from supabase import Client
 
+from core.config import settings
 from core.lang import is_zh_dominant
-from models.types import CHECKIN_MIN_TEXT_LENGTH, MAX_COMMUNITY_TEXTS, JobType
+from models.types import (
+    CHECKIN_MIN_TEXT_LENGTH,
+    MAX_COMMUNITY_TEXTS,
+    JobType,
+    ReviewSummaryResult,
+    ReviewTopic,
+)
 from providers.llm.interface import LLMProvider
 from workers.job_guard import check_job_still_claimed
 from workers.job_log import log_job_event
@@ -17,6 +25,166 @@ logger = structlog.get_logger()
 MAX_GOOGLE_REVIEWS = 50
 
 
+@dataclass
+class ReviewSummaryInput:
+    """The texts one summarize_reviews call is fed (see load_summary_input)."""
+
+    google_reviews: list[str]
+    checkin_texts: list[str]
+    # Stored summary to revise with the texts; None for a full rebuild
+    previous: ReviewSummaryResult | None
+    # Texts folded into the summary since its last full rebuild, these included
+    incremental_texts: int
+    # Stored as community_summary_updated_at, so texts written after loading are not skipped
+    as_of: datetime
+
+    @property
+    def text_count(self) -> int:
+        return len(self.google_reviews) + len(self.checkin_texts)
+
+
+def load_review_texts(db: Client, shop_id: str) -> tuple[list[str], list[str]]:
+    """Return (google_reviews, checkin_texts) fed to summarize_reviews for one shop."""
+    reviews_result = (
+        db.table("shop_reviews")
+        .select("text")
+        .eq("shop_id", shop_id)
+        .order("created_at", desc=True)
+        .limit(MAX_GOOGLE_REVIEWS)
+        .execute()
+    )
+    google_reviews = [
+        row["text"]
+        for row in cast("list[dict[str, Any]]", reviews_result.data or [])
+        if row.get("text")
+    ]
+
+    # Fetch ranked check-in texts (same RPC used by generate_embedding)
+    response = db.rpc(
+        "get_ranked_checkin_texts",
+        {
+            "p_shop_id": shop_id,
+            "p_min_length": CHECKIN_MIN_TEXT_LENGTH,
+            "p_limit": MAX_COMMUNITY_TEXTS,
+        },
+    ).execute()
+    rows = cast("list[dict[str, Any]]", response.data or [])
+    checkin_texts = [row["text"] for row in rows if row.get("text")]
+    return google_reviews, checkin_texts
+
+
+def load_new_review_texts(db: Client, shop_id: str, since: str) -> tuple[list[str], list[str]]:
+    """Return (google_reviews, checkin_texts) created after since, newest first.
+
+    Check-in texts are built and length-filtered like get_ranked_checkin_texts.
+    """
+    reviews_result = (
+        db.table("shop_reviews")
+        .select("text")
+        .eq("shop_id", shop_id)
+        .gt("created_at", since)
+        .order("created_at", desc=True)
+        .limit(MAX_GOOGLE_REVIEWS)
+        .execute()
+    )
+    google_reviews = [
+        row["text"]
+        for row in cast("list[dict[str, Any]]", reviews_result.data or [])
+        if row.get("text")
+    ]
+
+    checkins_result = (
+        db.table("check_ins")
+        .select("review_text, note")
+        .eq("shop_id", shop_id)
+        .gt("created_at", since)
+        .order("created_at", desc=True)
+        .limit(MAX_COMMUNITY_TEXTS)
+        .execute()
+    )
+    checkin_texts: list[str] = []
+    for row in cast("list[dict[str, Any]]", checkins_result.data or []):
+        review_text, note = row.get("review_text") or "", row.get("note") or ""
+        if max(len(review_text), len(note)) >= CHECKIN_MIN_TEXT_LENGTH:
+            checkin_texts.append(f"{review_text} {note}".strip())
+    return google_reviews, checkin_texts
+
+
+def load_summary_input(db: Client, shop_id: str) -> ReviewSummaryInput:
+    """Return what the next community summary of one shop is built from.
+
+    A shop that already has a summary gets an incremental update: only the texts created
+    since community_summary_updated_at, plus the stored summary and topics to revise.
+    Once more than summarize_rebuild_after_texts texts have been folded in that way, the
+    summary is rebuilt from every text instead, so drift does not compound.
+    """
+    as_of = datetime.now(UTC)
+    if settings.summarize_incremental_enabled:
+        response = (
+            db.table("shops")
+            .select(
+                "community_summary, review_topics, community_summary_updated_at, "
+                "community_summary_incremental_texts"
+            )
+            .eq("id", shop_id)
+            .single()
+            .execute()
+        )
+        row = cast("dict[str, Any]", response.data or {})
+        since = row.get("community_summary_updated_at")
+        if row.get("community_summary") and since:
+            google_reviews, checkin_texts = load_new_review_texts(db, shop_id, since)
+            folded = (
+                (row.get("community_summary_incremental_texts") or 0)
+                + len(google_reviews)
+                + len(checkin_texts)
+            )
+            if folded <= settings.summarize_rebuild_after_texts:
+                previous = ReviewSummaryResult(
+                    summary_zh_tw=row["community_summary"],
+                    review_topics=[
+                        ReviewTopic.model_validate(topic)
+                        for topic in row.get("review_topics") or []
+                    ],
+                )
+                return ReviewSummaryInput(google_reviews, checkin_texts, previous, folded, as_of)
+            logger.info("Summary drift threshold reached — full rebuild", shop_id=shop_id)
+
+    google_reviews, checkin_texts = load_review_texts(db, shop_id)
+    return ReviewSummaryInput(google_reviews, checkin_texts, None, 0, as_of)
+
+
+def persist_review_summary(
+    db: Client,
+    shop_id: str,
+    result: ReviewSummaryResult,
+    *,
+    as_of: datetime | None = None,
+    incremental_texts: int = 0,
+) -> None:
+    """Write a community summary to shops; raises ValueError if it is not zh-TW dominant.
+
+    as_of is when its texts were loaded (default now); incremental_texts is 0 after a
+    full rebuild.
+    """
+    if not is_zh_dominant(result.summary_zh_tw):
+        logger.warning(
+            "Community summary is not zh-TW dominant — skipping DB write",
+            shop_id=shop_id,
+            summary_preview=result.summary_zh_tw[:80],
+        )
+        raise ValueError(f"Community summary for shop {shop_id} is not in Traditional Chinese")
+
+    db.table("shops").update(
+        {
+            "community_summary": result.summary_zh_tw,
+            "review_topics": [topic.model_dump() for topic in result.review_topics],
+            "community_summary_updated_at": (as_of or datetime.now(UTC)).isoformat(),
+            "community_summary_incremental_texts": incremental_texts,
+        }
+    ).eq("id", shop_id).execute()
+
+
 async def handle_summarize_reviews(
     payload: dict[str, Any],
     db: Client,
@@ -26,12 +194,18 @@ async def handle_summarize_reviews(
 ) -> None:
     """Generate a community summary for a shop from Google and check-in reviews.
 
-    Fetches Google reviews plus top ranked check-in texts, calls the LLM to summarize,
-    stores the summary and review topics in shops, then chains to GENERATE_EMBEDDING.
-    If no qualifying texts exist from either source, skips the LLM and enqueues embedding directly.
+    Fetches Google reviews plus top ranked check-in texts (or, for a shop that already has
+    a summary, only the texts written since it; see load_summary_input), calls the LLM to
+    summarize, stores the summary and review topics in shops, then chains to GENERATE_EMBEDDING.
+    If there are no texts to summarize, skips the LLM and enqueues embedding directly.
     """
     shop_id = payload["shop_id"]
     job_id = cast("str", job_id)
+    # Keep submission context on the chain so claims can prioritise it and publish can close it
+    embed_payload: dict[str, Any] = {"shop_id": shop_id}
+    for key in ("submission_id", "submitted_by", "batch_id"):
+        if payload.get(key):
+            embed_payload[key] = payload[key]
     step_timings: dict[str, dict[str, int]] = {}
     logger.info("Summarizing reviews", shop_id=shop_id)
 
@@ -46,40 +220,21 @@ async def handle_summarize_reviews(
         )
 
         t0 = time.monotonic()
-        reviews_result = (
-            db.table("shop_reviews")
-            .select("text")
-            .eq("shop_id", shop_id)
-            .order("created_at", desc=True)
-            .limit(MAX_GOOGLE_REVIEWS)
-            .execute()
-        )
-        google_reviews = [
-            row["text"]
-            for row in cast("list[dict[str, Any]]", reviews_result.data or [])
-            if row.get("text")
-        ]
-
-        # Fetch ranked check-in texts (same RPC used by generate_embedding)
-        response = db.rpc(
-            "get_ranked_checkin_texts",
-            {
-                "p_shop_id": shop_id,
-                "p_min_length": CHECKIN_MIN_TEXT_LENGTH,
-                "p_limit": MAX_COMMUNITY_TEXTS,
-            },
-        ).execute()
-
-        rows = cast("list[dict[str, Any]]", response.data or [])
-        checkin_texts = [row["text"] for row in rows if row.get("text")]
+        summary_input = load_summary_input(db, shop_id)
         step_timings["fetch_reviews"] = {"duration_ms": int((time.monotonic() - t0) * 1000)}
 
-        if not google_reviews and not checkin_texts:
-            logger.info("No qualifying review texts — skipping summarization", shop_id=shop_id)
+        if not summary_input.text_count:
+            logger.info(
+                "No new review texts — skipping summarization",
+                shop_id=shop_id,
+                incremental=summary_input.previous is not None,
+            )
             await queue.enqueue(
                 job_type=JobType.GENERATE_EMBEDDING,
-                payload={"shop_id": shop_id},
+                payload=embed_payload,
                 priority=2,
+                dedupe_key=shop_id,
+                debounce_seconds=settings.worker_enqueue_debounce_seconds,
             )
             return
 
@@ -90,8 +245,9 @@ async def handle_summarize_reviews(
 
         t0 = time.monotonic()
         result = await llm.summarize_reviews(
-            google_reviews=google_reviews,
-            checkin_texts=checkin_texts,
+            google_reviews=summary_input.google_reviews,
+            checkin_texts=summary_input.checkin_texts,
+            previous=summary_input.previous,
         )
         step_timings["llm_call"] = {"duration_ms": int((time.monotonic() - t0) * 1000)}
 
@@ -99,8 +255,10 @@ async def handle_summarize_reviews(
             logger.warning("LLM returned empty summary — skipping DB write", shop_id=shop_id)
             await queue.enqueue(
                 job_type=JobType.GENERATE_EMBEDDING,
-                payload={"shop_id": shop_id},
+                payload=embed_payload,
                 priority=2,
+                dedupe_key=shop_id,
+                debounce_seconds=settings.worker_enqueue_debounce_seconds,
             )
             return
 
@@ -108,23 +266,15 @@ async def handle_summarize_reviews(
             await log_job_event(db, job_id, "warn", "job.aborted_midflight", shop_id=str(shop_id))
             return
 
-        if not is_zh_dominant(result.summary_zh_tw):
-            logger.warning(
-                "Community summary is not zh-TW dominant — skipping DB write",
-                shop_id=shop_id,
-                summary_preview=result.summary_zh_tw[:80],
-            )
-            raise ValueError(f"Community summary for shop {shop_id} is not in Traditional Chinese")
-
         # Persist summary to DB
         t0 = time.monotonic()
-        db.table("shops").update(
-            {
-                "community_summary": result.summary_zh_tw,
-                "review_topics": [topic.model_dump() for topic in result.review_topics],
-                "community_summary_updated_at": datetime.now(UTC).isoformat(),
-            }
-        ).eq("id", shop_id).execute()
+        persist_review_summary(
+            db,
+            shop_id,
+            result,
+            as_of=summary_input.as_of,
+            incremental_texts=summary_input.incremental_texts,
+        )
         step_timings["db_write"] = {"duration_ms": int((time.monotonic() - t0) * 1000)}
         await log_job_event(
             db,
@@ -139,14 +289,17 @@ async def handle_summarize_reviews(
             "Community summary generated",
             shop_id=shop_id,
             summary_length=len(result.summary_zh_tw),
-            review_count=len(google_reviews) + len(checkin_texts),
+            review_count=summary_input.text_count,
+            incremental=summary_input.previous is not None,
         )
 
         # Chain to embedding generation
         await queue.enqueue(
             job_type=JobType.GENERATE_EMBEDDING,
-            payload={"shop_id": shop_id},
+            payload=embed_payload,
             priority=2,
+            dedupe_key=shop_id,
+            debounce_seconds=settings.worker_enqueue_debounce_seconds,
         )
 
         await log_job_event(db, job_id, "info", "job.end", status="ok")
@@ -0,0 +1,90 @@
+"""Lease-based leader election for cron triggers and the stuck-job reaper.
+
+Every scheduler that registers maintenance jobs (API replicas, worker process 0) calls
+renew_leadership() on an interval. The first to upsert the `scheduler_leases` row holds
+it until it stops renewing; after `worker_leader_lease_seconds` any other replica can
+take over. Cron triggers and reclaim_stuck_jobs check is_leader() before doing work.
+"""
+
+import os
+import socket
+import uuid
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import sentry_sdk
+import structlog
+
+from core.config import settings
+from db.supabase_client import get_service_role_client
+from workers.queue import JobQueue
+
+logger = structlog.get_logger()
+
+LEASE_NAME = "scheduler"
+
+# Unique per process: spawned worker processes re-import this module.
+HOLDER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+_is_leader: bool = False
+# Local view of the lease expiry, measured from *before* the renew call so clock
+# skew between app and DB can only make us step down early, never late.
+_lease_expires_at: datetime | None = None
+
+
+def is_leader() -> bool:
+    return _is_leader and _lease_expires_at is not None and datetime.now(UTC) < _lease_expires_at
+
+
+async def renew_leadership() -> None:
+    """Acquire or renew the scheduler lease. Steps down on DB errors once the lease lapses."""
+    global _is_leader, _lease_expires_at
+    requested_at = datetime.now(UTC)
+    try:
+        db = get_service_role_client()
+        queue = JobQueue(db=db)
+        acquired = await queue.acquire_leader_lease(
+            LEASE_NAME, HOLDER_ID, ttl_seconds=settings.worker_leader_lease_seconds
+        )
+    except Exception as e:
+        logger.warning("Leader lease renewal failed", holder_id=HOLDER_ID, error=str(e))
+        sentry_sdk.capture_exception(e)
+        if _is_leader and not is_leader():
+            logger.warning("Leader lease lapsed, stepping down", holder_id=HOLDER_ID)
+            _is_leader = False
+        return
+
+    if acquired:
+        _lease_expires_at = requested_at + timedelta(seconds=settings.worker_leader_lease_seconds)
+        if not _is_leader:
+            logger.info("Acquired scheduler leadership", holder_id=HOLDER_ID)
+        _is_leader = True
+    else:
+        if _is_leader:
+            logger.warning("Lost scheduler leadership", holder_id=HOLDER_ID)
+        _is_leader = False
+        _lease_expires_at = None
+
+
+async def release_leadership() -> None:
+    """Release the lease on shutdown so failover doesn't wait for expiry."""
+    global _is_leader, _lease_expires_at
+    if not _is_leader:
+        return
+    _is_leader = False
+    _lease_expires_at = None
+    try:
+        db = get_service_role_client()
+        queue = JobQueue(db=db)
+        await queue.release_leader_lease(LEASE_NAME, HOLDER_ID)
+        logger.info("Released scheduler leadership", holder_id=HOLDER_ID)
+    except Exception as e:
+        logger.warning("Leader lease release failed", holder_id=HOLDER_ID, error=str(e))
+
+
+def get_leader_status() -> dict[str, Any]:
+    return {
+        "holder_id": HOLDER_ID,
+        "is_leader": is_leader(),
+        "lease_expires_at": _lease_expires_at.isoformat() if _lease_expires_at else None,
+    }
@@ -0,0 +1,205 @@
+"""Job queue metrics recorded in each scheduler process.
+
+Counters and latency windows are updated as jobs are claimed and finish, so recording
+never touches the job_queue table. Every process publishes export_metrics() to the
+worker_metrics table on an interval; /health/queue combines the fresh rows with
+merge_job_type_metrics(), so API replicas and each standalone worker process all count.
+"""
+
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+
+from models.types import Job, JobType
+
+# Recent samples kept per job type for percentiles
+_LATENCY_WINDOW = 500
+# Completions counted for throughput over this trailing window
+_THROUGHPUT_WINDOW_SECONDS = 300.0
+
+
+def _samples() -> deque[float]:
+    return deque(maxlen=_LATENCY_WINDOW)
+
+
+@dataclass
+class JobTypeMetrics:
+    claimed: int = 0
+    completed: int = 0
+    failed: int = 0
+    retried: int = 0  # claims of a job that had already been attempted
+    rate_limited: int = 0
+    wait_seconds: deque[float] = field(default_factory=_samples)
+    run_seconds: deque[float] = field(default_factory=_samples)
+    completed_at: deque[float] = field(default_factory=_samples)
+
+
+_metrics: dict[JobType, JobTypeMetrics] = {}
+
+
+def _for(job_type: JobType) -> JobTypeMetrics:
+    metrics = _metrics.get(job_type)
+    if metrics is None:
+        metrics = _metrics[job_type] = JobTypeMetrics()
+    return metrics
+
+
+def percentile(samples: deque[float] | list[float], q: float) -> float | None:
+    """Nearest-rank percentile (q in 0..100); None when there are no samples."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def record_claimed(job: Job, now: datetime | None = None) -> None:
+    """Record a claim; wait time is measured from when the job became runnable."""
+    metrics = _for(job.job_type)
+    metrics.claimed += 1
+    if job.attempts > 1:
+        metrics.retried += 1
+    now = now or datetime.now(UTC)
+    metrics.wait_seconds.append(max(0.0, (now - job.scheduled_at).total_seconds()))
+
+
+def record_finished(
+    job_type: JobType, run_seconds: float, *, ok: bool, rate_limited: bool = False
+) -> None:
+    metrics = _for(job_type)
+    metrics.run_seconds.append(run_seconds)
+    if ok:
+        metrics.completed += 1
+        metrics.completed_at.append(time.monotonic())
+    else:
+        metrics.failed += 1
+        if rate_limited:
+            metrics.rate_limited += 1
+
+
+def _round(value: float | None) -> float | None:
+    return round(value, 3) if value is not None else None
+
+
+# Running per-process counters; they restart from zero with the process
+_COUNTERS = ("claimed", "completed", "failed", "rate_limited")
+
+
+def _export(metrics: JobTypeMetrics, cutoff: float) -> dict[str, Any]:
+    return {
+        "claimed": metrics.claimed,
+        "completed": metrics.completed,
+        "failed": metrics.failed,
+        "retried": metrics.retried,
+        "rate_limited": metrics.rate_limited,
+        # completed_at is monotonic and meaningless in another process; ship the count
+        "completed_recent": sum(1 for t in metrics.completed_at if t >= cutoff),
+        "wait_seconds": [round(v, 3) for v in metrics.wait_seconds],
+        "run_seconds": [round(v, 3) for v in metrics.run_seconds],
+    }
+
+
+def export_metrics() -> dict[str, dict[str, Any]]:
+    """Raw counters and latency samples per job type, for publishing to worker_metrics."""
+    cutoff = time.monotonic() - _THROUGHPUT_WINDOW_SECONDS
+    return {job_type.value: _export(metrics, cutoff) for job_type, metrics in _metrics.items()}
+
+
+def counter_totals(export: dict[str, Any]) -> dict[str, int]:
+    """One process's running counters for a job type, under the reported *_total keys."""
+    return {f"{key}_total": export.get(key, 0) for key in _COUNTERS}
+
+
+def merge_job_type_metrics(exports: list[dict[str, Any]]) -> dict[str, Any]:
+    """Combine one job type's exports from several processes into the reported figures.
+    Percentiles are taken over the union of every process's sample window."""
+    claimed = sum(e.get("claimed", 0) for e in exports)
+    retried = sum(e.get("retried", 0) for e in exports)
+    recent = sum(e.get("completed_recent", 0) for e in exports)
+    wait = [v for e in exports for v in e.get("wait_seconds", [])]
+    run = [v for e in exports for v in e.get("run_seconds", [])]
+    return {
+        **{f"{key}_total": sum(e.get(key, 0) for e in exports) for key in _COUNTERS},
+        "retry_rate": round(retried / claimed, 3) if claimed else None,
+        "throughput_per_minute": round(recent / (_THROUGHPUT_WINDOW_SECONDS / 60), 2),
+        "wait_seconds_p50": _round(percentile(wait, 50)),
+        "wait_seconds_p95": _round(percentile(wait, 95)),
+        "run_seconds_p50": _round(percentile(run, 50)),
+        "run_seconds_p95": _round(percentile(run, 95)),
+    }
+
+
+def reset_metrics() -> None:
+    _metrics.clear()
+
+
+# Prometheus text exposition: (metric name, help, type, key in the per-type dict)
+_PROMETHEUS_GAUGES: tuple[tuple[str, str, str, str], ...] = (
+    ("caferoam_jobs_pending", "Pending jobs in job_queue", "gauge", "pending"),
+    ("caferoam_jobs_claimed", "Claimed jobs in job_queue", "gauge", "claimed"),
+    (
+        "caferoam_jobs_oldest_pending_age_seconds",
+        "Age of the oldest runnable pending job",
+        "gauge",
+        "oldest_pending_age_seconds",
+    ),
+    ("caferoam_jobs_in_flight", "Jobs running across workers", "gauge", "in_flight"),
+    ("caferoam_jobs_concurrency_limit", "Summed per-type limit", "gauge", "limit"),
+    (
+        "caferoam_jobs_backing_off",
+        "1 while any worker has the type in 429 backoff",
+        "gauge",
+        "backing_off",
+    ),
+    (
+        "caferoam_jobs_wait_seconds_p50",
+        "Median scheduled-to-claim wait",
+        "gauge",
+        "wait_seconds_p50",
+    ),
+    ("caferoam_jobs_wait_seconds_p95", "p95 scheduled-to-claim wait", "gauge", "wait_seconds_p95"),
+    (
+        "caferoam_jobs_run_seconds_p50",
+        "Median claim-to-finish run time",
+        "gauge",
+        "run_seconds_p50",
+    ),
+    ("caferoam_jobs_run_seconds_p95", "p95 claim-to-finish run time", "gauge", "run_seconds_p95"),
+)
+
+
+# Counters are exported per worker process: (metric name, help, key in counter_totals())
+_PROMETHEUS_COUNTERS: tuple[tuple[str, str, str], ...] = (
+    ("caferoam_jobs_claimed_total", "Jobs claimed", "claimed_total"),
+    ("caferoam_jobs_completed_total", "Jobs completed", "completed_total"),
+    ("caferoam_jobs_failed_total", "Jobs failed", "failed_total"),
+    ("caferoam_jobs_rate_limited_total", "Jobs failed by a 429", "rate_limited_total"),
+)
+
+
+def render_prometheus(job_types: dict[str, dict[str, Any]], workers: dict[str, Any]) -> str:
+    """Render the job_types and workers blocks of get_queue_metrics() in Prometheus text format.
+
+    Counters carry a worker label instead of being summed: the sum drops whenever a process
+    restarts or its row goes stale, which Prometheus would read as a counter reset.
+    """
+    lines: list[str] = []
+    for name, help_text, metric_type, key in _PROMETHEUS_GAUGES:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for job_type, values in sorted(job_types.items()):
+            value = values.get(key)
+            if value is None:
+                continue
+            lines.append(f'{name}{{job_type="{job_type}"}} {float(value)}')
+    for name, help_text, key in _PROMETHEUS_COUNTERS:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for worker, snapshot in sorted(workers.items()):
+            for job_type, counters in sorted(snapshot.get("job_types", {}).items()):
+                labels = f'job_type="{job_type}",worker="{worker}"'
+                lines.append(f"{name}{{{labels}}} {float(counters.get(key, 0))}")
+    return "\n".join(lines) + "\n"
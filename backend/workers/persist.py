@@ -1,8 +1,13 @@
+import hashlib
+import json
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
+from typing import Any, cast
 
 import structlog
 from supabase import Client
 
+from core.config import settings
 from models.types import JobType
 from providers.scraper.interface import ScrapedShopData
 from services.district_service import _parse_city_district
@@ -10,29 +15,171 @@ from workers.queue import JobQueue
 
 logger = structlog.get_logger()
 
+# Statuses where the last pipeline run finished, so the shop's enrichment, summary and
+# embedding reflect its stored scrape_fingerprints
+_SETTLED_STATUSES = ("live", "pending_review")
 
-async def persist_scraped_data(
-    shop_id: str,
-    data: ScrapedShopData,
-    db: Client,
-    queue: JobQueue,
-    submission_id: str | None = None,
-    submitted_by: str | None = None,
-    batch_id: str | None = None,
-) -> None:
-    """Persist scraped shop data and enqueue the next pipeline step.
 
-    When photos are present: enqueues CLASSIFY_SHOP_PHOTOS, which enqueues
-    ENRICH_SHOP after classification. When no photos: enqueues ENRICH_SHOP
-    directly with submission context so shops are not left in 'enriching' status.
+def _with_submission_context(
+    payload: dict[str, object],
+    submission_id: str | None,
+    submitted_by: str | None,
+    batch_id: str | None,
+) -> dict[str, object]:
+    if submission_id:
+        payload["submission_id"] = submission_id
+    if submitted_by:
+        payload["submitted_by"] = submitted_by
+    if batch_id:
+        payload["batch_id"] = batch_id
+    return payload
 
-    Shared by single and batch scrape handlers.
+
+def _digest(items: list[object]) -> str:
+    encoded = sorted(json.dumps(item, sort_keys=True, ensure_ascii=False) for item in items)
+    return hashlib.sha256("\n".join(encoded).encode()).hexdigest()
+
+
+def scrape_fingerprints(data: ScrapedShopData) -> dict[str, str]:
+    """Order-insensitive content hashes of the scraped parts that drive downstream work.
+
+    rating and review_count are left out: they drift between scrapes without changing
+    anything the LLM stages produce, and are written regardless.
     """
+    return {
+        "reviews": _digest(
+            [
+                [r["text"], r.get("stars"), r.get("published_at")]
+                for r in data.reviews
+                if r.get("text")
+            ]
+        ),
+        "photos": _digest(
+            [[p.url, p.uploaded_at.isoformat() if p.uploaded_at else None] for p in data.photos]
+        ),
+        "hours": _digest([data.opening_hours or []]),
+        "attributes": _digest(
+            [
+                data.name,
+                data.address,
+                data.latitude,
+                data.longitude,
+                data.google_place_id,
+                data.phone,
+                data.website,
+                data.menu_url,
+                data.instagram_url,
+                data.facebook_url,
+                data.threads_url,
+                data.price_range,
+                data.google_maps_features,
+            ]
+        ),
+    }
+
+
+@dataclass
+class ScrapeBaseline:
+    """A settled shop's status and fingerprints from before it was re-scraped."""
+
+    processing_status: str
+    fingerprints: dict[str, str]
+
+
+def load_scrape_baselines(db: Client, shop_ids: list[str]) -> dict[str, ScrapeBaseline]:
+    """Snapshot settled, fingerprinted shops; call before the scrape resets their status."""
+    if not shop_ids:
+        return {}
+    response = (
+        db.table("shops")
+        .select("id, processing_status, scrape_fingerprints")
+        .in_("id", shop_ids)
+        .in_("processing_status", list(_SETTLED_STATUSES))
+        .not_.is_("scrape_fingerprints", "null")
+        .execute()
+    )
+    rows = cast("list[dict[str, Any]]", response.data or [])
+    return {
+        str(row["id"]): ScrapeBaseline(
+            processing_status=str(row["processing_status"]),
+            fingerprints=dict(row["scrape_fingerprints"]),
+        )
+        for row in rows
+    }
+
+
+@dataclass
+class ScrapedShop:
+    """One scraped shop plus the submission context it was requested with."""
+
+    shop_id: str
+    data: ScrapedShopData
+    submission_id: str | None = None
+    submitted_by: str | None = None
+    baseline: ScrapeBaseline | None = None
+
+
+@dataclass
+class _PersistPlan:
+    """Everything persisting one shop writes, computed before touching the DB."""
+
+    shop_id: str
+    shop_update: dict[str, object]
+    review_rows: list[dict[str, object]] = field(default_factory=list)
+    photo_rows: list[dict[str, object]] = field(default_factory=list)
+    # (job_type, payload, priority) of the next pipeline step, if the shop advances
+    next_job: tuple[JobType, dict[str, object], int] | None = None
+    # next_job merges into a pending job of its type for the shop (dedupe_key=shop_id)
+    dedupe_next_job: bool = False
+    # Linked to the shop (status=processing) only when the shop advances
+    submission_id: str | None = None
+
+
+def _review_rows(shop_id: str, data: ScrapedShopData) -> list[dict[str, object]]:
+    return [
+        {
+            "shop_id": shop_id,
+            "text": r["text"],
+            "stars": r.get("stars"),
+            "published_at": r.get("published_at"),
+        }
+        for r in data.reviews
+        if r.get("text")
+    ]
+
+
+def _keep_created_at(
+    rows: list[dict[str, object]], old_reviews: list[dict[str, Any]]
+) -> list[dict[str, object]]:
+    """Carry created_at over to re-inserted reviews whose text was already stored.
+
+    Incremental summaries treat reviews created after the last summary as new; without
+    this, every review replacement would make every review new again.
+    """
+    first_seen: dict[str, str] = {}
+    for old in old_reviews:
+        if old.get("text") and old.get("created_at"):
+            text, created_at = str(old["text"]), str(old["created_at"])
+            first_seen[text] = min(first_seen.get(text, created_at), created_at)
+    # Every row carries the column: a bulk insert sends NULL for keys some rows lack
+    now = datetime.now(UTC).isoformat()
+    return [{**row, "created_at": first_seen.get(str(row["text"]), now)} for row in rows]
+
+
+def _plan_persist(
+    shop_id: str,
+    data: ScrapedShopData,
+    submission_id: str | None,
+    submitted_by: str | None,
+    batch_id: str | None,
+    baseline: ScrapeBaseline | None = None,
+) -> _PersistPlan:
     # Permanently closed shops: store basic data but don't enrich.
     if data.permanently_closed:
         reason = "Permanently closed per Google Maps"
         logger.info("Shop is permanently closed — skipping enrichment", shop_id=shop_id)
-        db.table("shops").update(
+        return _PersistPlan(
+            shop_id,
             {
                 "name": data.name,
                 "address": data.address,
@@ -44,9 +191,8 @@ async def persist_scraped_data(
                 "processing_status": "failed",
                 "rejection_reason": reason,
                 "updated_at": datetime.now(UTC).isoformat(),
-            }
-        ).eq("id", shop_id).execute()
-        return
+            },
+        )
 
     # Geo-gate: reject non-Taiwan shops before spending API budget on enrichment.
     # countryCode "TW" is the primary signal; 台灣/臺灣 in the address is a fallback
@@ -65,7 +211,8 @@ async def persist_scraped_data(
             country_code=data.country_code,
             address=data.address[:60],
         )
-        db.table("shops").update(
+        return _PersistPlan(
+            shop_id,
             {
                 "name": data.name,
                 "address": data.address,
@@ -75,9 +222,39 @@ async def persist_scraped_data(
                 "processing_status": "out_of_region",
                 "rejection_reason": reason,
                 "updated_at": datetime.now(UTC).isoformat(),
+            },
+        )
+
+    fingerprints = scrape_fingerprints(data)
+    if baseline is not None and not submission_id:
+        changed = {
+            part
+            for part, digest in fingerprints.items()
+            if baseline.fingerprints.get(part) != digest
+        }
+        if changed <= {"reviews"}:
+            # Re-scrape of a settled shop with nothing material changed: keep its status and
+            # skip the review/photo rewrite and the LLM chain. New reviews only need a fresh
+            # summary and embedding (the embedding handler re-embeds live shops in place).
+            settled_update: dict[str, object] = {
+                "rating": data.rating,
+                "review_count": data.review_count,
+                "scrape_fingerprints": fingerprints,
+                "processing_status": baseline.processing_status,
+                "updated_at": datetime.now(UTC).isoformat(),
             }
-        ).eq("id", shop_id).execute()
-        return
+            if not changed:
+                logger.info("Scraped shop unchanged — skipping persistence", shop_id=shop_id)
+                return _PersistPlan(shop_id, settled_update)
+            logger.info("Only reviews changed — re-summarizing", shop_id=shop_id)
+            return _PersistPlan(
+                shop_id,
+                settled_update,
+                review_rows=_review_rows(shop_id, data),
+                next_job=(JobType.SUMMARIZE_REVIEWS, {"shop_id": shop_id}, 2),
+                # Repeated re-scrapes before the summary runs collapse into one job
+                dedupe_next_job=True,
+            )
 
     # Extract city and district from address string
     geo = _parse_city_district(data.address)
@@ -101,6 +278,7 @@ async def persist_scraped_data(
         "threads_url": data.threads_url,
         "price_range": data.price_range,
         "google_maps_features": data.google_maps_features,
+        "scrape_fingerprints": fingerprints,
         "processing_status": "enriching",
         "updated_at": datetime.now(UTC).isoformat(),
     }
@@ -108,74 +286,206 @@ async def persist_scraped_data(
         shop_payload["city"] = city_en
     if district_zh:
         shop_payload["district"] = district_zh
-    db.table("shops").update(shop_payload).eq("id", shop_id).execute()
 
-    # Replace reviews: snapshot old rows, delete, insert fresh batch.
-    # If insert fails, restore the snapshot to avoid losing existing reviews.
-    if data.reviews:
-        review_rows = [
-            {
-                "shop_id": shop_id,
-                "text": r["text"],
-                "stars": r.get("stars"),
-                "published_at": r.get("published_at"),
-            }
-            for r in data.reviews
-            if r.get("text")
-        ]
-        if review_rows:
-            snapshot = db.table("shop_reviews").select("*").eq("shop_id", shop_id).execute()
-            old_reviews = snapshot.data or []
-            db.table("shop_reviews").delete().eq("shop_id", shop_id).execute()
-            try:
-                db.table("shop_reviews").insert(review_rows).execute()
-            except Exception:
-                logger.warning("Review insert failed — restoring snapshot", shop_id=shop_id)
-                if old_reviews:
-                    db.table("shop_reviews").insert(old_reviews).execute()
-                raise  # Caller must reset shop status to "failed" before propagating
-
-    # Store photos — upsert on (shop_id, url) to avoid duplicates on re-scrape
-    if data.photos:
-        photo_rows = [
-            {
-                "shop_id": shop_id,
-                "url": photo.url,
-                "uploaded_at": photo.uploaded_at.isoformat() if photo.uploaded_at else None,
-                "sort_order": i,
-            }
-            for i, photo in enumerate(data.photos)
-        ]
-        db.table("shop_photos").upsert(photo_rows, on_conflict="shop_id,url").execute()
+    # Photos are upserted on (shop_id, url) to avoid duplicates on re-scrape
+    photo_rows: list[dict[str, object]] = [
+        {
+            "shop_id": shop_id,
+            "url": photo.url,
+            "uploaded_at": photo.uploaded_at.isoformat() if photo.uploaded_at else None,
+            "sort_order": i,
+        }
+        for i, photo in enumerate(data.photos)
+    ]
 
+    next_job: tuple[JobType, dict[str, object], int]
+    if submission_id and settings.worker_pipeline_fast_path:
+        # User submissions run every stage inside one SHOP_PIPELINE job so they go live
+        # without waiting a poll cycle per stage. Batch imports keep per-stage jobs.
+        start_stage = JobType.CLASSIFY_SHOP_PHOTOS if data.photos else JobType.ENRICH_SHOP
+        next_job = (
+            JobType.SHOP_PIPELINE,
+            _with_submission_context(
+                {"shop_id": shop_id, "start_stage": start_stage.value},
+                submission_id,
+                submitted_by,
+                batch_id,
+            ),
+            5,
+        )
+    elif data.photos:
         # Queue photo classification — classify handler enqueues ENRICH_SHOP afterward.
         # Submission context is not forwarded here; classify reads it from the DB.
-        await queue.enqueue(
-            job_type=JobType.CLASSIFY_SHOP_PHOTOS,
-            payload={"shop_id": shop_id},
-            priority=2,
-        )
+        next_job = (JobType.CLASSIFY_SHOP_PHOTOS, {"shop_id": shop_id}, 2)
     else:
         # No photos: skip classification and go straight to enrichment with full context.
-        enrich_payload: dict[str, object] = {"shop_id": shop_id}
-        if submission_id:
-            enrich_payload["submission_id"] = submission_id
-        if submitted_by:
-            enrich_payload["submitted_by"] = submitted_by
-        if batch_id:
-            enrich_payload["batch_id"] = batch_id
+        next_job = (
+            JobType.ENRICH_SHOP,
+            _with_submission_context({"shop_id": shop_id}, submission_id, submitted_by, batch_id),
+            5,
+        )
+
+    return _PersistPlan(
+        shop_id,
+        shop_payload,
+        review_rows=_review_rows(shop_id, data),
+        photo_rows=photo_rows,
+        next_job=next_job,
+        submission_id=submission_id,
+    )
+
+
+async def persist_scraped_data(
+    shop_id: str,
+    data: ScrapedShopData,
+    db: Client,
+    queue: JobQueue,
+    submission_id: str | None = None,
+    submitted_by: str | None = None,
+    batch_id: str | None = None,
+    baseline: ScrapeBaseline | None = None,
+) -> None:
+    """Persist scraped shop data and enqueue the next pipeline step.
+
+    When photos are present: enqueues CLASSIFY_SHOP_PHOTOS, which enqueues
+    ENRICH_SHOP after classification. When no photos: enqueues ENRICH_SHOP
+    directly with submission context so shops are not left in 'enriching' status.
+    User submissions instead get one SHOP_PIPELINE job starting at that same stage.
+
+    Content fingerprints are stored with the shop. Given the baseline of a settled shop
+    (see load_scrape_baselines), an unchanged re-scrape only restores its status, and a
+    reviews-only change replaces reviews and enqueues SUMMARIZE_REVIEWS (→ embedding).
+
+    Shared by single and batch scrape handlers; see persist_scraped_batch for the
+    set-based path used by batch scrapes.
+    """
+    plan = _plan_persist(shop_id, data, submission_id, submitted_by, batch_id, baseline)
+    db.table("shops").update(plan.shop_update).eq("id", shop_id).execute()
+    if plan.next_job is None:
+        return
+
+    # Replace reviews: snapshot old rows, delete, insert fresh batch.
+    # If insert fails, restore the snapshot to avoid losing existing reviews.
+    if plan.review_rows:
+        snapshot = db.table("shop_reviews").select("*").eq("shop_id", shop_id).execute()
+        old_reviews = cast("list[dict[str, Any]]", snapshot.data or [])
+        db.table("shop_reviews").delete().eq("shop_id", shop_id).execute()
+        try:
+            db.table("shop_reviews").insert(
+                _keep_created_at(plan.review_rows, old_reviews)
+            ).execute()
+        except Exception:
+            logger.warning("Review insert failed — restoring snapshot", shop_id=shop_id)
+            if old_reviews:
+                db.table("shop_reviews").insert(old_reviews).execute()
+            raise  # Caller must reset shop status to "failed" before propagating
+
+    if plan.photo_rows:
+        db.table("shop_photos").upsert(plan.photo_rows, on_conflict="shop_id,url").execute()
+
+    job_type, payload, priority = plan.next_job
+    if plan.dedupe_next_job:
         await queue.enqueue(
-            job_type=JobType.ENRICH_SHOP,
-            payload=enrich_payload,
-            priority=5,
+            job_type=job_type,
+            payload=payload,
+            priority=priority,
+            dedupe_key=shop_id,
+            debounce_seconds=settings.worker_enqueue_debounce_seconds,
         )
+    else:
+        await queue.enqueue(job_type=job_type, payload=payload, priority=priority)
 
     # Link submission to shop
-    if submission_id:
+    if plan.submission_id:
         db.table("shop_submissions").update(
             {
                 "shop_id": shop_id,
                 "status": "processing",
                 "updated_at": datetime.now(UTC).isoformat(),
             }
-        ).eq("id", submission_id).execute()
+        ).eq("id", plan.submission_id).execute()
+
+
+async def persist_scraped_batch(
+    shops: list[ScrapedShop],
+    db: Client,
+    queue: JobQueue,
+    batch_id: str | None = None,
+) -> dict[str, Exception]:
+    """Persist many scraped shops with one RPC plus one job insert per job type.
+
+    persist_scraped_shops applies every shop update, review replacement, photo upsert and
+    submission link in one transaction. If it fails, nothing is written and each shop is
+    retried through persist_scraped_data so a single bad shop only fails itself.
+    Returns the shops that could not be persisted, keyed by shop_id.
+    """
+    if not shops:
+        return {}
+    plans = [
+        _plan_persist(s.shop_id, s.data, s.submission_id, s.submitted_by, batch_id, s.baseline)
+        for s in shops
+    ]
+    try:
+        db.rpc(
+            "persist_scraped_shops",
+            {
+                "p_shops": [
+                    {
+                        "shop_id": plan.shop_id,
+                        "shop": plan.shop_update,
+                        "reviews": plan.review_rows,
+                        "photos": plan.photo_rows,
+                        "submission_id": plan.submission_id if plan.next_job else None,
+                    }
+                    for plan in plans
+                ]
+            },
+        ).execute()
+    except Exception as exc:
+        logger.warning(
+            "Bulk persist failed — falling back to per-shop persistence",
+            batch_id=batch_id,
+            shops=len(shops),
+            error=str(exc),
+        )
+        failures: dict[str, Exception] = {}
+        for s in shops:
+            try:
+                await persist_scraped_data(
+                    shop_id=s.shop_id,
+                    data=s.data,
+                    db=db,
+                    queue=queue,
+                    submission_id=s.submission_id,
+                    submitted_by=s.submitted_by,
+                    batch_id=batch_id,
+                    baseline=s.baseline,
+                )
+            except Exception as shop_exc:
+                failures[s.shop_id] = shop_exc
+        return failures
+
+    # Shops are written; enqueue their next steps grouped by (job type, priority, dedupe)
+    grouped: dict[tuple[JobType, int, bool], list[_PersistPlan]] = {}
+    for plan in plans:
+        if plan.next_job is not None:
+            job_type, _, priority = plan.next_job
+            grouped.setdefault((job_type, priority, plan.dedupe_next_job), []).append(plan)
+    failures = {}
+    for (job_type, priority, dedupe), group in grouped.items():
+        payloads: list[dict[str, Any]] = [dict(plan.next_job[1]) for plan in group if plan.next_job]
+        try:
+            if dedupe:
+                await queue.enqueue_batch(
+                    job_type,
+                    payloads,
+                    priority=priority,
+                    dedupe_field="shop_id",
+                    debounce_seconds=settings.worker_enqueue_debounce_seconds,
+                )
+            else:
+                await queue.enqueue_batch(job_type, payloads, priority=priority)
+        except Exception as exc:
+            for plan in group:
+                failures[plan.shop_id] = exc
+    return failures
@@ -12,6 +12,15 @@ from models.types import Job, JobReasonCode, JobStatus, JobType
 logger = structlog.get_logger()
 
 
+def _fair_claim_params() -> dict[str, Any]:
+    """Priority aging and submission-share arguments shared by the claim RPCs."""
+    return {
+        "p_aging_seconds": settings.worker_priority_aging_seconds,
+        "p_aging_max": settings.worker_priority_aging_max,
+        "p_submission_share": settings.worker_submission_claim_share,
+    }
+
+
 class JobQueue:
     def __init__(self, db: Client):
         self._db = db
@@ -22,8 +31,27 @@ class JobQueue:
         payload: dict[str, Any],
         priority: int = 0,
         scheduled_at: datetime | None = None,
+        dedupe_key: str | None = None,
+        debounce_seconds: int = 0,
     ) -> str:
+        """Insert a pending job and return its id.
+
+        With a dedupe_key (typically the shop_id), a pending job of the same type and key
+        absorbs this request instead: payloads are merged and the existing id is returned.
+        debounce_seconds delays the job and pushes back an existing job's scheduled_at, so a
+        burst of requests for one shop runs once after the burst settles.
+        """
         now = datetime.now(UTC)
+        if dedupe_key is not None:
+            ids = await self._enqueue_deduped(
+                job_type,
+                {dedupe_key: payload},
+                priority,
+                scheduled_at or now,
+                debounce_seconds,
+            )
+            return first(ids, "enqueue job")
+        run_at = (scheduled_at or now) + timedelta(seconds=debounce_seconds)
         response = (
             self._db.table("job_queue")
             .insert(
@@ -34,7 +62,7 @@ class JobQueue:
                     "priority": priority,
                     "attempts": 0,
                     "max_attempts": 3,
-                    "scheduled_at": (scheduled_at or now).isoformat(),
+                    "scheduled_at": run_at.isoformat(),
                 }
             )
             .execute()
@@ -48,11 +76,27 @@ class JobQueue:
         payloads: list[dict[str, Any]],
         priority: int = 0,
         scheduled_at: datetime | None = None,
+        dedupe_field: str | None = None,
+        debounce_seconds: int = 0,
     ) -> list[str]:
-        """Insert multiple jobs in a single DB round-trip."""
+        """Insert multiple jobs in a single DB round-trip.
+
+        With dedupe_field (e.g. "shop_id"), payloads are keyed by that field and merged
+        into matching pending jobs as in enqueue(); one id is returned per distinct key.
+        debounce_seconds delays the jobs as in enqueue().
+        """
         now = datetime.now(UTC)
         if not payloads:
             return []
+        if dedupe_field is not None:
+            keyed: dict[str, dict[str, Any]] = {}
+            for payload in payloads:
+                key = str(payload[dedupe_field])
+                keyed[key] = {**keyed.get(key, {}), **payload}
+            return await self._enqueue_deduped(
+                job_type, keyed, priority, scheduled_at or now, debounce_seconds
+            )
+        run_at = (scheduled_at or now) + timedelta(seconds=debounce_seconds)
         records = [
             {
                 "job_type": job_type.value,
@@ -61,7 +105,7 @@ class JobQueue:
                 "priority": priority,
                 "attempts": 0,
                 "max_attempts": 3,
-                "scheduled_at": (scheduled_at or now).isoformat(),
+                "scheduled_at": run_at.isoformat(),
             }
             for payload in payloads
         ]
@@ -69,6 +113,32 @@ class JobQueue:
         rows = cast("list[dict[str, Any]]", response.data)
         return [str(row["id"]) for row in rows]
 
+    async def _enqueue_deduped(
+        self,
+        job_type: JobType,
+        keyed_payloads: dict[str, dict[str, Any]],
+        priority: int,
+        scheduled_at: datetime,
+        debounce_seconds: int,
+    ) -> list[str]:
+        """Calls RPC `enqueue_jobs_deduped`, which upserts against the partial unique index
+        on (job_type, dedupe_key) for never-claimed pending jobs."""
+        response = self._db.rpc(
+            "enqueue_jobs_deduped",
+            {
+                "p_job_type": job_type.value,
+                "p_jobs": [
+                    {"dedupe_key": key, "payload": payload}
+                    for key, payload in keyed_payloads.items()
+                ],
+                "p_priority": priority,
+                "p_scheduled_at": (scheduled_at + timedelta(seconds=debounce_seconds)).isoformat(),
+                "p_debounce": debounce_seconds > 0,
+            },
+        ).execute()
+        rows = cast("list[dict[str, Any]]", response.data or [])
+        return [str(row["id"]) for row in rows]
+
     async def claim(self, job_type: JobType | None = None) -> Job | None:
         """Calls RPC `claim_job` which atomically claims the next pending job
         using FOR UPDATE SKIP LOCKED, ordered by priority DESC, scheduled_at ASC."""
@@ -80,25 +150,49 @@ class JobQueue:
         rows = cast("list[dict[str, Any]]", response.data)
         return Job(**first(rows, "claim job"))
 
-    async def get_pending_job_types(self) -> list[JobType]:
-        """Single-query discovery of job types with pending work via SELECT DISTINCT RPC."""
-        response = self._db.rpc("get_pending_job_types", {}).execute()
-        rows = cast("list[dict[str, Any]]", response.data or [])
-        result: list[JobType] = []
-        for row in rows:
-            try:
-                result.append(JobType(row["job_type"]))
-            except ValueError:
-                logger.warning("Unknown job_type in queue, skipping", job_type=row.get("job_type"))
-        return result
+    async def claim_multi(
+        self,
+        capacity: dict[JobType, int],
+        groups: dict[JobType, str] | None = None,
+        group_capacity: dict[str, int] | None = None,
+    ) -> list[Job]:
+        """Claim up to capacity[job_type] jobs of each type in a single RPC.
 
-    async def claim_batch(self, job_type: JobType, limit: int = 1) -> list[Job]:
+        Types mapped to the same group (e.g. a provider model) also share
+        group_capacity[group]. Types are served in the dict's order.
+        """
+        job_types = [jt for jt, limit in capacity.items() if limit > 0]
+        if not job_types:
+            return []
+        groups = groups or {}
         response = self._db.rpc(
-            "claim_jobs_batch", {"p_job_type": job_type.value, "p_limit": limit}
+            "claim_jobs_multi",
+            {
+                "p_job_types": [jt.value for jt in job_types],
+                "p_limits": [capacity[jt] for jt in job_types],
+                "p_groups": [groups.get(jt) for jt in job_types],
+                "p_group_limits": group_capacity or {},
+                **_fair_claim_params(),
+            },
         ).execute()
-        if not response.data:
-            return []
-        return [Job(**row) for row in cast("list[dict[str, Any]]", response.data)]
+        return [Job(**row) for row in cast("list[dict[str, Any]]", response.data or [])]
+
+    async def get_depth(self) -> dict[JobType, dict[str, Any]]:
+        """Per-type pending/claimed counts and oldest ages via RPC `get_job_queue_depth`,
+        which only reads the partial index over active (pending/claimed) rows."""
+        response = self._db.rpc("get_job_queue_depth", {}).execute()
+        depth: dict[JobType, dict[str, Any]] = {}
+        for row in cast("list[dict[str, Any]]", response.data or []):
+            try:
+                job_type = JobType(row["job_type"])
+            except ValueError:
+                continue
+            depth[job_type] = {
+                "pending": int(row.get("pending") or 0),
+                "claimed": int(row.get("claimed") or 0),
+                "oldest_pending_age_seconds": row.get("oldest_pending_age_seconds"),
+            }
+        return depth
 
     async def get_status(self, job_id: str) -> str | None:
         result = (
@@ -150,6 +244,21 @@ class JobQueue:
                 }
             ).eq("id", job_id).execute()
 
+    async def release(self, job: Job, reason: str) -> None:
+        """Return a claimed job to pending without spending an attempt (e.g. worker shutdown).
+
+        dedupe_key is cleared: a new request for the same shop may already hold the key.
+        """
+        self._db.table("job_queue").update(
+            {
+                "status": JobStatus.PENDING.value,
+                "attempts": max(job.attempts - 1, 0),
+                "claimed_at": None,
+                "last_error": reason,
+                "dedupe_key": None,
+            }
+        ).eq("id", job.id).eq("status", JobStatus.CLAIMED.value).execute()
+
     async def reclaim_stuck_jobs(self) -> tuple[int, int]:
         """Reclaim jobs stuck in CLAIMED status beyond the configured timeout.
         Returns (reclaimed_count, failed_count)."""
@@ -197,6 +306,57 @@ class JobQueue:
             sentry_sdk.capture_exception(exc)
             return True
 
+    async def acquire_leader_lease(self, name: str, holder_id: str, ttl_seconds: int) -> bool:
+        """Acquire or renew a scheduler lease. Returns True iff holder_id holds it afterwards.
+        Unlike acquire_cron_lock this fails closed — errors propagate to the caller."""
+        response = self._db.rpc(
+            "acquire_scheduler_lease",
+            {"p_name": name, "p_holder_id": holder_id, "p_ttl_seconds": ttl_seconds},
+        ).execute()
+        return response.data is True
+
+    async def release_leader_lease(self, name: str, holder_id: str) -> None:
+        """Drop a lease held by holder_id so another replica can take over immediately."""
+        self._db.table("scheduler_leases").delete().eq("name", name).eq(
+            "holder_id", holder_id
+        ).execute()
+
+    async def publish_worker_metrics(self, holder_id: str, snapshot: dict[str, Any]) -> None:
+        """Upsert this process's metrics snapshot into worker_metrics."""
+        self._db.rpc(
+            "publish_worker_metrics",
+            {"p_holder_id": holder_id, "p_snapshot": snapshot},
+        ).execute()
+
+    async def get_worker_metrics(self, since: datetime) -> list[dict[str, Any]]:
+        """Snapshots published at or after `since` — one row per live process."""
+        response = (
+            self._db.table("worker_metrics")
+            .select("holder_id, snapshot, updated_at")
+            .gte("updated_at", since.isoformat())
+            .execute()
+        )
+        return cast("list[dict[str, Any]]", response.data or [])
+
+    async def archive_terminal_jobs(
+        self, completed_days: int, failed_days: int, batch_size: int = 1000
+    ) -> tuple[int, int]:
+        """Move one batch of old terminal jobs and their logs into the archive tables.
+        Returns (jobs_archived, logs_archived)."""
+        response = self._db.rpc(
+            "archive_terminal_jobs",
+            {
+                "p_completed_days": completed_days,
+                "p_failed_days": failed_days,
+                "p_batch_size": batch_size,
+            },
+        ).execute()
+        rows = cast("list[dict[str, Any]]", response.data or [])
+        if not rows:
+            return (0, 0)
+        row = first(rows, "archive_terminal_jobs")
+        return (int(row["jobs_archived"]), int(row["logs_archived"]))
+
     async def cleanup_old_cron_locks(self, retention_days: int = 7) -> None:
         """Delete cron_locks older than retention period."""
         cutoff = (datetime.now(UTC) - timedelta(days=retention_days)).isoformat()
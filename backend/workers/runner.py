@@ -0,0 +1,126 @@
+"""Standalone job worker — runs the queue poller and job handlers outside the API process.
+
+Usage (run from backend/):
+    uv run python -m workers [--processes N]
+
+Each process runs its own AsyncIOScheduler and event loop, so per-type concurrency
+limits (WORKER_CONCURRENCY_*) apply per process. Claims stay disjoint across processes
+because claim_jobs_multi uses FOR UPDATE SKIP LOCKED. Only process 0 registers the cron
+triggers and the stuck-job reaper, and those only fire while it holds the leader lease.
+"""
+
+import asyncio
+import multiprocessing
+import signal
+import time
+from multiprocessing.context import SpawnContext, SpawnProcess
+from types import FrameType
+
+import sentry_sdk
+import structlog
+
+from core.config import settings
+from providers.registry import close_provider_registry
+from workers.leader import release_leadership
+from workers.scheduler import create_scheduler, drain_jobs, poll_pending_job_types
+
+logger = structlog.get_logger()
+
+_SUPERVISE_INTERVAL_SECONDS = 1.0
+# Children drain in-flight jobs for WORKER_SHUTDOWN_GRACE_SECONDS before exiting
+_CHILD_JOIN_MARGIN_SECONDS = 5.0
+
+
+def _init_sentry() -> None:
+    if not settings.sentry_dsn:
+        return
+    sentry_sdk.init(
+        dsn=settings.sentry_dsn,
+        environment=settings.environment,
+        traces_sample_rate=0.1,
+        send_default_pii=False,
+    )
+
+
+async def serve(process_index: int, stop: asyncio.Event | None = None) -> None:
+    """Run one worker process until SIGTERM/SIGINT (or until `stop` is set)."""
+    stop = stop or asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    scheduler = create_scheduler(include_maintenance=process_index == 0)
+    scheduler.start()
+    logger.info(
+        "Worker process started",
+        process_index=process_index,
+        registered_jobs=len(scheduler.get_jobs()),
+    )
+    try:
+        # Don't wait a full poll interval after a deploy before picking up work.
+        await poll_pending_job_types()
+        await stop.wait()
+    finally:
+        await drain_jobs()
+        scheduler.shutdown(wait=False)
+        await release_leadership()
+        await close_provider_registry()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.remove_signal_handler(sig)
+        logger.info("Worker process stopped", process_index=process_index)
+
+
+def _process_main(process_index: int) -> None:
+    _init_sentry()
+    asyncio.run(serve(process_index))
+
+
+def _spawn(ctx: SpawnContext, process_index: int) -> SpawnProcess:
+    proc = ctx.Process(
+        target=_process_main,
+        args=(process_index,),
+        name=f"caferoam-worker-{process_index}",
+    )
+    proc.start()
+    return proc
+
+
+def run_worker(processes: int) -> None:
+    """Start `processes` worker processes and restart any that exit unexpectedly.
+
+    With a single process the worker runs in the current interpreter (no supervisor).
+    """
+    if processes < 1:
+        raise ValueError(f"processes must be >= 1, got {processes}")
+    logger.info("Starting CafeRoam worker", processes=processes, environment=settings.environment)
+    if processes == 1:
+        _process_main(0)
+        return
+
+    stopping = False
+
+    def _request_stop(signum: int, frame: FrameType | None) -> None:
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, _request_stop)
+    signal.signal(signal.SIGINT, _request_stop)
+
+    ctx = multiprocessing.get_context("spawn")
+    children = {i: _spawn(ctx, i) for i in range(processes)}
+    while not stopping:
+        time.sleep(_SUPERVISE_INTERVAL_SECONDS)
+        for index, proc in list(children.items()):
+            if not stopping and not proc.is_alive():
+                logger.error(
+                    "Worker process exited unexpectedly, restarting",
+                    process_index=index,
+                    exitcode=proc.exitcode,
+                )
+                children[index] = _spawn(ctx, index)
+
+    for proc in children.values():
+        proc.terminate()
+    for proc in children.values():
+        proc.join(timeout=settings.worker_shutdown_grace_seconds + _CHILD_JOIN_MARGIN_SECONDS)
+    logger.info("CafeRoam worker stopped")
@@ -1,4 +1,6 @@
 import asyncio
+import random
+import time
 import uuid
 from collections.abc import Awaitable, Callable
 from datetime import UTC, datetime, timedelta
@@ -14,33 +16,54 @@ from core.config import settings
 from db.supabase_client import get_service_role_client
 from models.types import Job, JobReasonCode, JobType, TaxonomyTag
 from providers.email import get_email_provider
-from providers.embeddings import get_embeddings_provider
 from providers.issue_tracker import get_issue_tracker_provider
-from providers.llm import get_llm_provider
+from providers.llm.cached_adapter import llm_cache_bypass
+from providers.registry import get_provider_registry
 from providers.scraper import get_scraper_provider
+from workers.concurrency import (
+    ProviderThrottle,
+    get_provider_throttle,
+    get_provider_throttle_status,
+    provider_key,
+)
 from workers.handlers.account_deletion import delete_expired_accounts
 from workers.handlers.classify_shop_photos import handle_classify_shop_photos
 from workers.handlers.enrich_menu_photo import handle_enrich_menu_photo
 from workers.handlers.enrich_shop import handle_enrich_shop
 from workers.handlers.generate_embedding import handle_generate_embedding
+from workers.handlers.llm_batch_poll import handle_llm_batch_poll
 from workers.handlers.publish_shop import handle_publish_shop
 from workers.handlers.reembed_reviewed_shops import handle_reembed_reviewed_shops
-from workers.handlers.scrape_batch import handle_scrape_batch
+from workers.handlers.scrape_batch import handle_scrape_batch, shard_scrape_payloads
 from workers.handlers.shop_data_report import handle_shop_data_report
+from workers.handlers.shop_pipeline import handle_shop_pipeline
+from workers.handlers.stage_latency_rollup import handle_stage_latency_rollup
 from workers.handlers.summarize_reviews import handle_summarize_reviews
 from workers.handlers.sync_menu_highlights import handle_sync_menu_highlights
 from workers.handlers.weekly_email import handle_weekly_email
+from workers.leader import HOLDER_ID, get_leader_status, is_leader, renew_leadership
+from workers.metrics import (
+    counter_totals,
+    export_metrics,
+    merge_job_type_metrics,
+    record_claimed,
+    record_finished,
+)
 from workers.queue import JobQueue
 
 logger = structlog.get_logger()
 
 # Per-type concurrency tracking (safe: asyncio is single-threaded)
 _in_flight: dict[JobType, int] = {jt: 0 for jt in JobType}
+# Flat 429 backoff for job types without a provider throttle (see workers/concurrency.py)
 _rate_limit_backoff_until: dict[JobType, datetime] = {}
 
 # Strong references to in-flight tasks prevent premature GC
 _tasks: set[asyncio.Task[None]] = set()
 
+# Set by drain_jobs(): no new claims, and cancelled jobs are released instead of failed
+_draining = False
+
 # Last successful poll timestamp for health checks
 _last_poll_at: datetime | None = None
 
@@ -63,11 +86,18 @@ _reclaim_backoff_until: datetime | None = None
 
 
 def idempotent_cron(job_name: str, window: str) -> Callable[..., Callable[..., Awaitable[None]]]:
-    """Decorator that prevents cron jobs from double-firing within the same time window."""
+    """Decorator that prevents cron jobs from double-firing within the same time window.
+
+    Only the scheduler leader fires; the cron_locks row stays as a second guard for
+    the window between a leader stopping and its lease expiring.
+    """
 
     def decorator(func: Callable[..., Awaitable[None]]) -> Callable[..., Awaitable[None]]:
         @wraps(func)
         async def wrapper(*args: object, **kwargs: object) -> None:
+            if not is_leader():
+                logger.debug("Not scheduler leader, skipping cron", job_name=job_name)
+                return
             db = get_service_role_client()
             queue = JobQueue(db=db)
             if not queue.acquire_cron_lock(job_name, window=window):
@@ -114,15 +144,19 @@ def _get_job_concurrency(job_type: JobType) -> int:
             return settings.worker_concurrency_publish
         case JobType.SCRAPE_BATCH:
             return settings.worker_concurrency_scrape
+        case JobType.SHOP_PIPELINE:
+            return settings.worker_concurrency_pipeline
         case _:
             return settings.worker_concurrency_default
 
 
 async def _dispatch_job(job: Job, db: Client, queue: JobQueue) -> None:
+    # Adapters (and their HTTP connection pools) live for the process, not the job
+    providers = get_provider_registry()
     match job.job_type:
         case JobType.ENRICH_SHOP | JobType.ENRICH_MENU_PHOTO:
             taxonomy = _get_cached_taxonomy(db)
-            llm = get_llm_provider(taxonomy=taxonomy)
+            llm = providers.llm(taxonomy=taxonomy)
             if job.job_type == JobType.ENRICH_SHOP:
                 await handle_enrich_shop(
                     payload=job.payload,
@@ -137,9 +171,10 @@ async def _dispatch_job(job: Job, db: Client, queue: JobQueue) -> None:
                     db=db,
                     llm=llm,
                     queue=queue,
+                    job_id=job.id,
                 )
         case JobType.GENERATE_EMBEDDING:
-            embeddings = get_embeddings_provider()
+            embeddings = providers.embeddings()
             await handle_generate_embedding(
                 payload=job.payload,
                 db=db,
@@ -168,9 +203,9 @@ async def _dispatch_job(job: Job, db: Client, queue: JobQueue) -> None:
         case JobType.ADMIN_DIGEST_EMAIL:
             logger.info("Admin digest email not yet implemented, skipping")
         case JobType.REEMBED_REVIEWED_SHOPS:
-            await handle_reembed_reviewed_shops(db=db, queue=queue)
+            await handle_reembed_reviewed_shops(db=db, queue=queue, batch_llm=providers.llm_batch())
         case JobType.CLASSIFY_SHOP_PHOTOS:
-            llm = get_llm_provider()
+            llm = providers.llm()
             await handle_classify_shop_photos(
                 payload=job.payload,
                 db=db,
@@ -178,7 +213,7 @@ async def _dispatch_job(job: Job, db: Client, queue: JobQueue) -> None:
                 queue=queue,
             )
         case JobType.SUMMARIZE_REVIEWS:
-            llm = get_llm_provider()
+            llm = providers.llm()
             await handle_summarize_reviews(
                 payload=job.payload,
                 db=db,
@@ -186,6 +221,24 @@ async def _dispatch_job(job: Job, db: Client, queue: JobQueue) -> None:
                 queue=queue,
                 job_id=job.id,
             )
+        case JobType.SHOP_PIPELINE:
+            taxonomy = _get_cached_taxonomy(db)
+            await handle_shop_pipeline(
+                payload=job.payload,
+                db=db,
+                llm=providers.llm(taxonomy=taxonomy),
+                embeddings=providers.embeddings(),
+                queue=queue,
+                job_id=job.id,
+                attempts=job.attempts,
+            )
+        case JobType.LLM_BATCH_POLL:
+            await handle_llm_batch_poll(
+                payload=job.payload,
+                db=db,
+                batch_llm=providers.llm_batch(taxonomy=_get_cached_taxonomy(db)),
+                queue=queue,
+            )
         case _:
             logger.warning("Unknown job type", job_type=job.job_type)
 
@@ -193,16 +246,29 @@ async def _dispatch_job(job: Job, db: Client, queue: JobQueue) -> None:
 async def _run_job(job: Job) -> None:
     job_type = job.job_type
     logger.info("Processing job", job_id=job.id, job_type=job_type)
+    throttle = get_provider_throttle(job_type)
+    settled = False
     queue: JobQueue | None = None
+    started = time.monotonic()
     try:
         db = get_service_role_client()
         queue = JobQueue(db=db)
-        await _dispatch_job(job, db, queue)
+        with llm_cache_bypass(bool(job.payload.get("bypass_llm_cache"))):
+            await _dispatch_job(job, db, queue)
+        run_seconds = time.monotonic() - started
+        if throttle is not None:
+            throttle.on_success(run_seconds)
+            settled = True
         await queue.complete(job.id)
+        record_finished(job_type, run_seconds, ok=True)
         logger.info("Job completed", job_id=job.id)
     except asyncio.CancelledError:
         logger.warning("Job cancelled during shutdown", job_id=job.id)
-        if queue is not None:
+        record_finished(job_type, time.monotonic() - started, ok=False)
+        if queue is not None and _draining:
+            # Interrupted by a deploy, not by the job itself: hand it back untouched
+            await queue.release(job, reason="Released during worker shutdown")
+        elif queue is not None:
             await queue.fail(
                 job.id,
                 error="Job cancelled during shutdown",
@@ -212,9 +278,21 @@ async def _run_job(job: Job) -> None:
     except Exception as e:
         logger.error("Job failed", job_id=job.id, error=str(e))
         sentry_sdk.capture_exception(e)
-        if _is_rate_limit_error(e):
-            _rate_limit_backoff_until[job_type] = datetime.now(UTC) + timedelta(seconds=30)
-            logger.warning("Rate limited, backing off", job_type=job_type, seconds=30)
+        rate_limited = _is_rate_limit_error(e)
+        record_finished(job_type, time.monotonic() - started, ok=False, rate_limited=rate_limited)
+        if rate_limited:
+            if throttle is not None and not settled:
+                throttle.on_throttle()
+                settled = True
+                logger.warning(
+                    "Rate limited, shrinking provider concurrency",
+                    job_type=job_type,
+                    provider=throttle.key,
+                    limit=throttle.limit,
+                )
+            else:
+                _rate_limit_backoff_until[job_type] = datetime.now(UTC) + timedelta(seconds=30)
+                logger.warning("Rate limited, backing off", job_type=job_type, seconds=30)
         if queue is not None:
             await queue.fail(
                 job.id,
@@ -223,32 +301,80 @@ async def _run_job(job: Job) -> None:
             )
     finally:
         _in_flight[job_type] -= 1
+        if throttle is not None and not settled:
+            throttle.on_failure()
 
 
-async def process_job_type(job_type: JobType) -> None:
-    now = datetime.now(UTC)
-    backoff = _rate_limit_backoff_until.get(job_type)
-    if backoff and now < backoff:
-        return
-
-    max_concurrency = _get_job_concurrency(job_type)
-    available = max_concurrency - _in_flight[job_type]
-    if available <= 0:
-        return
-
-    db = get_service_role_client()
-    queue = JobQueue(db=db)
-    jobs = await queue.claim_batch(job_type, limit=available)
-    if not jobs:
-        return
-
+def _start_jobs(jobs: list[Job]) -> None:
     for job in jobs:
-        _in_flight[job_type] += 1
+        _in_flight[job.job_type] += 1
+        record_claimed(job)
         task = asyncio.create_task(_run_job(job))
         _tasks.add(task)
         task.add_done_callback(_tasks.discard)
 
 
+def _claim_order() -> list[JobType]:
+    """Job types in a weighted random order (WORKER_CLAIM_WEIGHTS, default 1).
+
+    Sorting by u ** (1 / weight) puts a type first with probability proportional to its
+    weight, so types sharing a provider group split it by weight over many ticks.
+    """
+    weights = settings.worker_claim_weights
+    return sorted(
+        JobType,
+        key=lambda jt: random.random() ** (1 / max(weights.get(jt.value, 1.0), 1e-6)),
+        reverse=True,
+    )
+
+
+async def claim_all_job_types(queue: JobQueue) -> None:
+    """Claim work for every job type with spare capacity in one claim_jobs_multi round trip.
+
+    Types in 429 backoff or at their concurrency limit are skipped. Types sharing a
+    provider throttle reserve slots as a group; unclaimed slots are handed back.
+    """
+    now = datetime.now(UTC)
+    job_types = _claim_order()
+
+    capacity: dict[JobType, int] = {}
+    for job_type in job_types:
+        backoff = _rate_limit_backoff_until.get(job_type)
+        if backoff and now < backoff:
+            continue
+        available = _get_job_concurrency(job_type) - _in_flight[job_type]
+        if available > 0:
+            capacity[job_type] = available
+
+    groups: dict[JobType, str] = {}
+    wanted: dict[str, int] = {}
+    throttles: dict[str, ProviderThrottle] = {}
+    for job_type, available in capacity.items():
+        throttle = get_provider_throttle(job_type)
+        if throttle is None:
+            continue
+        groups[job_type] = throttle.key
+        throttles[throttle.key] = throttle
+        wanted[throttle.key] = wanted.get(throttle.key, 0) + available
+    reserved = {key: throttles[key].reserve(n) for key, n in wanted.items()}
+    capacity = {jt: n for jt, n in capacity.items() if jt not in groups or reserved[groups[jt]] > 0}
+
+    try:
+        jobs = await queue.claim_multi(capacity, groups=groups, group_capacity=reserved)
+    except Exception:
+        for key, n in reserved.items():
+            throttles[key].unreserve(n)
+        raise
+    claimed: dict[str, int] = {}
+    for job in jobs:
+        group = groups.get(job.job_type)
+        if group is not None:
+            claimed[group] = claimed.get(group, 0) + 1
+    for key, n in reserved.items():
+        throttles[key].unreserve(n - claimed.get(key, 0))
+    _start_jobs(jobs)
+
+
 @idempotent_cron("weekly_email", window="week")
 async def run_weekly_email() -> None:
     db = get_service_role_client()
@@ -270,9 +396,39 @@ async def run_shop_data_report() -> None:
     await handle_shop_data_report(db=db, issue_tracker=issue_tracker)
 
 
+@idempotent_cron("stage_latency_rollup", window="day")
+async def run_stage_latency_rollup() -> None:
+    db = get_service_role_client()
+    await handle_stage_latency_rollup(db=db)
+
+
+_ARCHIVE_BATCH_SIZE = 1000
+# Caps one night's archival at 50k jobs; a larger backlog drains over following nights.
+_ARCHIVE_MAX_BATCHES = 50
+
+
+@idempotent_cron("archive_old_jobs", window="day")
+async def run_archive_old_jobs() -> None:
+    """Move terminal jobs past retention (and their job_logs) into the archive tables."""
+    db = get_service_role_client()
+    queue = JobQueue(db=db)
+    total_jobs = total_logs = 0
+    for _ in range(_ARCHIVE_MAX_BATCHES):
+        jobs, logs = await queue.archive_terminal_jobs(
+            completed_days=settings.worker_job_retention_days,
+            failed_days=settings.worker_failed_job_retention_days,
+            batch_size=_ARCHIVE_BATCH_SIZE,
+        )
+        total_jobs += jobs
+        total_logs += logs
+        if jobs < _ARCHIVE_BATCH_SIZE:
+            break
+    logger.info("Archived old jobs", jobs=total_jobs, logs=total_logs)
+
+
 @idempotent_cron("daily_batch_scrape", window="day")
 async def run_daily_batch_scrape() -> None:
-    """Query all pending shops with google_maps_url, enqueue as SCRAPE_BATCH."""
+    """Query all pending shops with google_maps_url, enqueue them as SCRAPE_BATCH shards."""
     db = get_service_role_client()
     queue = JobQueue(db=db)
 
@@ -310,11 +466,14 @@ async def run_daily_batch_scrape() -> None:
             entry["submitted_by"] = str(sub["submitted_by"])
         batch_shops.append(entry)
 
-    await queue.enqueue(
-        job_type=JobType.SCRAPE_BATCH,
-        payload={"batch_id": batch_id, "shops": batch_shops},
+    shards = shard_scrape_payloads(batch_id, batch_shops)
+    await queue.enqueue_batch(JobType.SCRAPE_BATCH, shards)
+    logger.info(
+        "daily_batch_scrape: enqueued",
+        batch_id=batch_id,
+        count=len(batch_shops),
+        shards=len(shards),
     )
-    logger.info("daily_batch_scrape: enqueued", batch_id=batch_id, count=len(batch_shops))
 
 
 @idempotent_cron("sweep_timed_out", window="hour")
@@ -347,23 +506,15 @@ async def run_sweep_timed_out() -> None:
 
 
 async def poll_pending_job_types() -> None:
-    """Single-poll loop: one DB query to find pending types, then dispatch each."""
+    """Single-poll loop: one claim_jobs_multi round trip claims work for every type."""
     global _last_poll_at, _poll_failure_count, _poll_connected, _poll_backoff_until
     now = datetime.now(UTC)
-    if _poll_backoff_until is not None and now < _poll_backoff_until:
+    if _draining or (_poll_backoff_until is not None and now < _poll_backoff_until):
         return
     try:
         db = get_service_role_client()
         queue = JobQueue(db=db)
-        pending_types = await queue.get_pending_job_types()
-        results = await asyncio.gather(
-            *(process_job_type(jt) for jt in pending_types),
-            return_exceptions=True,
-        )
-        for exc in results:
-            if isinstance(exc, Exception):
-                logger.error("process_job_type failed during poll", error=str(exc))
-                sentry_sdk.capture_exception(exc)
+        await claim_all_job_types(queue)
         if not _poll_connected:
             logger.info("DB connection restored, poll resuming normally")
         _poll_failure_count = 0
@@ -382,9 +533,35 @@ async def poll_pending_job_types() -> None:
         _poll_connected = False
 
 
+async def drain_jobs(grace_seconds: float | None = None) -> None:
+    """Stop claiming, give in-flight jobs grace_seconds to finish, then release the rest.
+
+    Released jobs go back to pending with their attempt refunded, so a deploy neither
+    throws away finished work nor pushes unfinished jobs into retry backoff.
+    """
+    global _draining
+    _draining = True
+    if grace_seconds is None:
+        grace_seconds = settings.worker_shutdown_grace_seconds
+    pending = set(_tasks)
+    if not pending:
+        return
+    logger.info("Draining in-flight jobs", jobs=len(pending), grace_seconds=grace_seconds)
+    _, unfinished = await asyncio.wait(pending, timeout=grace_seconds)
+    if not unfinished:
+        logger.info("All in-flight jobs finished before shutdown")
+        return
+    logger.warning("Releasing unfinished jobs to pending", jobs=len(unfinished))
+    for task in unfinished:
+        task.cancel()
+    await asyncio.gather(*unfinished, return_exceptions=True)
+
+
 async def reclaim_stuck_jobs() -> None:
-    """Reclaim jobs stuck in CLAIMED status."""
+    """Reclaim jobs stuck in CLAIMED status. Runs on the scheduler leader only."""
     global _reclaim_failure_count, _reclaim_connected, _reclaim_backoff_until
+    if not is_leader():
+        return
     now = datetime.now(UTC)
     if _reclaim_backoff_until is None or now >= _reclaim_backoff_until:
         try:
@@ -448,12 +625,112 @@ def get_scheduler_status(scheduler: AsyncIOScheduler) -> dict[str, Any]:
             for job in jobs
         ],
         "last_poll_at": _last_poll_at.isoformat() if _last_poll_at else None,
+        "leader": get_leader_status(),
+        "provider_throttles": get_provider_throttle_status(),
     }
 
 
-def create_scheduler() -> AsyncIOScheduler:
-    scheduler = AsyncIOScheduler(timezone="Asia/Taipei")
+def _worker_snapshot() -> dict[str, Any]:
+    """This process's limits, in-flight counts and raw metrics, as published to worker_metrics."""
+    now = datetime.now(UTC)
+    throttles = get_provider_throttle_status()
+    exported = export_metrics()
+    job_types: dict[str, dict[str, Any]] = {}
+    for job_type in JobType:
+        provider = provider_key(job_type)
+        throttle = throttles.get(provider) if provider is not None else None
+        backoff = _rate_limit_backoff_until.get(job_type)
+        backing_off = bool(backoff and now < backoff) or bool(
+            throttle is not None and throttle["cooling_down"]
+        )
+        job_types[job_type.value] = {
+            "in_flight": _in_flight[job_type],
+            "limit": _get_job_concurrency(job_type),
+            "backing_off": backing_off,
+            **exported.get(job_type.value, {}),
+        }
+    return {
+        "last_poll_at": _last_poll_at.isoformat() if _last_poll_at else None,
+        "job_types": job_types,
+        "provider_throttles": throttles,
+    }
+
+
+async def publish_worker_metrics() -> None:
+    """Publish this process's snapshot so /health/queue can aggregate every worker."""
+    try:
+        db = get_service_role_client()
+        queue = JobQueue(db=db)
+        await queue.publish_worker_metrics(HOLDER_ID, _worker_snapshot())
+    except Exception as e:
+        logger.warning("Worker metrics publish failed", holder_id=HOLDER_ID, error=str(e))
 
+
+async def get_queue_metrics() -> dict[str, Any]:
+    """Per-type queue depth plus claim/run metrics and limits summed over every worker.
+
+    Depth comes from one indexed RPC. Everything else comes from the worker_metrics rows
+    published within WORKER_METRICS_STALE_SECONDS, so the figures are the same whichever
+    API replica serves the request, and whether or not it runs a scheduler itself.
+    """
+    db = get_service_role_client()
+    queue = JobQueue(db=db)
+    depth = await queue.get_depth()
+    now = datetime.now(UTC)
+    rows = await queue.get_worker_metrics(
+        since=now - timedelta(seconds=settings.worker_metrics_stale_seconds)
+    )
+    snapshots = [cast("dict[str, Any]", row["snapshot"]) for row in rows]
+    job_types: dict[str, dict[str, Any]] = {}
+    for job_type in JobType:
+        per_worker = [
+            s["job_types"][job_type.value]
+            for s in snapshots
+            if job_type.value in s.get("job_types", {})
+        ]
+        job_types[job_type.value] = {
+            "pending": 0,
+            "claimed": 0,
+            "oldest_pending_age_seconds": None,
+            **depth.get(job_type, {}),
+            "in_flight": sum(w.get("in_flight", 0) for w in per_worker),
+            "limit": sum(w.get("limit", 0) for w in per_worker),
+            "provider": provider_key(job_type),
+            "backing_off": any(w.get("backing_off") for w in per_worker),
+            **merge_job_type_metrics(per_worker),
+        }
+    polls = [s["last_poll_at"] for s in snapshots if s.get("last_poll_at")]
+    return {
+        "generated_at": now.isoformat(),
+        "last_poll_at": max(polls) if polls else None,
+        "job_types": job_types,
+        "workers": {
+            row["holder_id"]: {
+                "updated_at": row["updated_at"],
+                "last_poll_at": row["snapshot"].get("last_poll_at"),
+                "provider_throttles": row["snapshot"].get("provider_throttles", {}),
+                "job_types": {
+                    job_type: counter_totals(export)
+                    for job_type, export in row["snapshot"].get("job_types", {}).items()
+                },
+            }
+            for row in rows
+        },
+    }
+
+
+def _add_maintenance_jobs(scheduler: AsyncIOScheduler) -> None:
+    """Register cron triggers, the stuck-job reaper and the leader lease renewal.
+    Cron work only runs on whichever replica currently holds the leader lease."""
+    scheduler.add_job(
+        renew_leadership,
+        "interval",
+        seconds=settings.worker_leader_renew_seconds,
+        id="renew_leadership",
+        max_instances=1,
+        coalesce=True,
+        next_run_time=datetime.now(UTC),
+    )
     scheduler.add_job(
         run_weekly_email,
         "cron",
@@ -488,12 +765,43 @@ def create_scheduler() -> AsyncIOScheduler:
         minute=10,
         id="daily_batch_scrape",
     )
+    scheduler.add_job(
+        run_stage_latency_rollup,
+        "cron",
+        hour=3,
+        minute=20,
+        id="stage_latency_rollup",
+    )
+    scheduler.add_job(
+        run_archive_old_jobs,
+        "cron",
+        hour=4,
+        minute=0,
+        id="archive_old_jobs",
+    )
     scheduler.add_job(
         run_sweep_timed_out,
         "cron",
         minute=30,
         id="sweep_timed_out",
     )
+    scheduler.add_job(
+        reclaim_stuck_jobs,
+        "interval",
+        minutes=30,
+        id="reclaim_stuck_jobs",
+        max_instances=1,
+        coalesce=True,
+    )
+
+
+def create_scheduler(*, include_maintenance: bool = True) -> AsyncIOScheduler:
+    """Build the scheduler. Secondary worker processes pass include_maintenance=False
+    so they only poll the queue; cron triggers and the reaper stay in a single process."""
+    scheduler = AsyncIOScheduler(timezone="Asia/Taipei")
+
+    if include_maintenance:
+        _add_maintenance_jobs(scheduler)
 
     scheduler.add_job(
         poll_pending_job_types,
@@ -504,12 +812,11 @@ def create_scheduler() -> AsyncIOScheduler:
         coalesce=True,
         misfire_grace_time=settings.worker_poll_interval_seconds,
     )
-
     scheduler.add_job(
-        reclaim_stuck_jobs,
+        publish_worker_metrics,
         "interval",
-        minutes=30,
-        id="reclaim_stuck_jobs",
+        seconds=settings.worker_metrics_publish_seconds,
+        id="publish_worker_metrics",
         max_instances=1,
         coalesce=True,
     )
@@ -0,0 +1,35 @@
+-- Lease-based leader election for the APScheduler cron triggers and reclaim loop.
+-- Every replica renews on an interval; only the current holder runs cron work.
+-- A lease that is not renewed before expires_at can be taken over by any replica.
+CREATE TABLE scheduler_leases (
+  name       TEXT        PRIMARY KEY,
+  holder_id  TEXT        NOT NULL,
+  expires_at TIMESTAMPTZ NOT NULL,
+  renewed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Enable RLS but allow service_role full access (no user-facing reads)
+ALTER TABLE scheduler_leases ENABLE ROW LEVEL SECURITY;
+
+-- Acquire or renew a lease. Returns TRUE when p_holder_id holds the lease afterwards.
+-- The upsert only overwrites the row when the caller already holds it or it has expired,
+-- so two replicas racing for an expired lease cannot both win.
+CREATE OR REPLACE FUNCTION acquire_scheduler_lease(
+  p_name TEXT,
+  p_holder_id TEXT,
+  p_ttl_seconds INT DEFAULT 60
+)
+RETURNS BOOLEAN AS $$
+  WITH upserted AS (
+    INSERT INTO scheduler_leases (name, holder_id, expires_at, renewed_at)
+    VALUES (p_name, p_holder_id, now() + make_interval(secs => p_ttl_seconds), now())
+    ON CONFLICT (name) DO UPDATE
+      SET holder_id  = EXCLUDED.holder_id,
+          expires_at = EXCLUDED.expires_at,
+          renewed_at = EXCLUDED.renewed_at
+      WHERE scheduler_leases.holder_id = EXCLUDED.holder_id
+         OR scheduler_leases.expires_at < now()
+    RETURNING holder_id
+  )
+  SELECT EXISTS (SELECT 1 FROM upserted);
+$$ LANGUAGE sql VOLATILE SECURITY DEFINER SET search_path = public;
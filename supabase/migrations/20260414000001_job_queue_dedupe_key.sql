@@ -0,0 +1,40 @@
+-- Enqueue-time deduplication for per-shop jobs.
+-- A job enqueued with a dedupe_key merges into the pending, never-claimed job with the
+-- same (job_type, dedupe_key) instead of inserting a duplicate. Jobs that have been
+-- claimed at least once (attempts > 0) drop out of the index, so retries and a fresh
+-- request for the same shop never collide.
+ALTER TABLE job_queue ADD COLUMN dedupe_key TEXT;
+
+CREATE UNIQUE INDEX idx_job_queue_pending_dedupe
+  ON job_queue (job_type, dedupe_key)
+  WHERE status = 'pending' AND attempts = 0 AND dedupe_key IS NOT NULL;
+
+-- Insert or merge a batch of keyed jobs in one statement. p_jobs is a JSON array of
+-- {"dedupe_key": TEXT, "payload": JSONB}; keys must be unique within the batch.
+-- On conflict the payloads are merged (new keys win, existing keys such as
+-- submission_id are kept), the higher priority wins, and scheduled_at is:
+--   * pushed back to the new time when p_debounce is TRUE (trailing-edge debounce)
+--   * kept at the earlier time otherwise.
+-- Returns the id of the inserted or merged job for each input row.
+CREATE OR REPLACE FUNCTION enqueue_jobs_deduped(
+  p_job_type TEXT,
+  p_jobs JSONB,
+  p_priority INT DEFAULT 0,
+  p_scheduled_at TIMESTAMPTZ DEFAULT now(),
+  p_debounce BOOLEAN DEFAULT FALSE
+)
+RETURNS TABLE (id UUID, dedupe_key TEXT) AS $$
+  INSERT INTO job_queue AS q
+    (job_type, payload, status, priority, attempts, max_attempts, scheduled_at, dedupe_key)
+  SELECT p_job_type, j->'payload', 'pending', p_priority, 0, 3, p_scheduled_at, j->>'dedupe_key'
+  FROM jsonb_array_elements(p_jobs) AS j
+  ON CONFLICT (job_type, dedupe_key)
+    WHERE status = 'pending' AND attempts = 0 AND dedupe_key IS NOT NULL
+  DO UPDATE SET
+    payload      = q.payload || EXCLUDED.payload,
+    priority     = GREATEST(q.priority, EXCLUDED.priority),
+    scheduled_at = CASE WHEN p_debounce
+                        THEN GREATEST(q.scheduled_at, EXCLUDED.scheduled_at)
+                        ELSE LEAST(q.scheduled_at, EXCLUDED.scheduled_at) END
+  RETURNING q.id, q.dedupe_key;
+$$ LANGUAGE sql VOLATILE SECURITY DEFINER SET search_path = public;
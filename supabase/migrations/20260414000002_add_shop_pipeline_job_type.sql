@@ -0,0 +1,13 @@
+-- SHOP_PIPELINE runs a user submission's classify → enrich → summarize → embed → publish
+-- stages inside one claimed job. The constraint is rebuilt from the full JobType enum:
+-- SYNC_MENU_HIGHLIGHTS and shop_data_report were never added to it.
+ALTER TABLE job_queue DROP CONSTRAINT IF EXISTS job_queue_job_type_check;
+ALTER TABLE job_queue ADD CONSTRAINT job_queue_job_type_check
+  CHECK (job_type IN (
+    'enrich_shop', 'enrich_menu_photo', 'generate_embedding',
+    'staleness_sweep', 'weekly_email',
+    'scrape_shop', 'scrape_batch', 'publish_shop', 'admin_digest_email',
+    'reembed_reviewed_shops', 'classify_shop_photos',
+    'summarize_reviews', 'SYNC_MENU_HIGHLIGHTS', 'shop_data_report',
+    'shop_pipeline'
+  ));
@@ -0,0 +1,24 @@
+-- Queue depth for the /health/queue metrics endpoint.
+-- The partial index covers only active rows, so the RPC's cost tracks queue depth
+-- rather than the size of job_queue (completed/failed history is never scanned).
+CREATE INDEX idx_job_queue_active_by_type
+  ON job_queue (job_type, status, scheduled_at)
+  WHERE status IN ('pending', 'claimed');
+
+CREATE OR REPLACE FUNCTION get_job_queue_depth()
+RETURNS TABLE (
+  job_type TEXT,
+  pending BIGINT,
+  claimed BIGINT,
+  oldest_pending_age_seconds DOUBLE PRECISION
+) AS $$
+  SELECT
+    q.job_type,
+    count(*) FILTER (WHERE q.status = 'pending'),
+    count(*) FILTER (WHERE q.status = 'claimed'),
+    EXTRACT(EPOCH FROM now() - min(q.scheduled_at)
+      FILTER (WHERE q.status = 'pending' AND q.scheduled_at <= now()))::DOUBLE PRECISION
+  FROM job_queue q
+  WHERE q.status IN ('pending', 'claimed')
+  GROUP BY q.job_type;
+$$ LANGUAGE sql STABLE SECURITY DEFINER SET search_path = public;
@@ -0,0 +1,53 @@
+-- Per-stage latency analytics over job_queue.step_timings.
+-- step_timings is {"<step>": {"duration_ms": N, ...}, ...} as written by each handler.
+-- job_stage_latency() computes exact percentiles for a time range; the nightly rollup
+-- stores one row per (day, job_type, step) so history survives job_queue retention.
+CREATE TABLE job_stage_latency_daily (
+  day        DATE        NOT NULL,
+  job_type   TEXT        NOT NULL,
+  step       TEXT        NOT NULL,
+  samples    INT         NOT NULL,
+  p50_ms     DOUBLE PRECISION NOT NULL,
+  p95_ms     DOUBLE PRECISION NOT NULL,
+  p99_ms     DOUBLE PRECISION NOT NULL,
+  max_ms     DOUBLE PRECISION NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  PRIMARY KEY (day, job_type, step)
+);
+
+-- Enable RLS but allow service_role full access (admin-only reads via the API)
+ALTER TABLE job_stage_latency_daily ENABLE ROW LEVEL SECURITY;
+
+-- Range scans over recently completed jobs that recorded timings
+CREATE INDEX idx_job_queue_completed_timings
+  ON job_queue (completed_at)
+  WHERE status = 'completed' AND step_timings IS NOT NULL;
+
+CREATE OR REPLACE FUNCTION job_stage_latency(p_from TIMESTAMPTZ, p_to TIMESTAMPTZ)
+RETURNS TABLE (
+  job_type TEXT,
+  step     TEXT,
+  samples  INT,
+  p50_ms   DOUBLE PRECISION,
+  p95_ms   DOUBLE PRECISION,
+  p99_ms   DOUBLE PRECISION,
+  max_ms   DOUBLE PRECISION
+) AS $$
+  SELECT
+    q.job_type,
+    t.key,
+    count(*)::INT,
+    percentile_cont(0.50) WITHIN GROUP (ORDER BY (t.value->>'duration_ms')::DOUBLE PRECISION),
+    percentile_cont(0.95) WITHIN GROUP (ORDER BY (t.value->>'duration_ms')::DOUBLE PRECISION),
+    percentile_cont(0.99) WITHIN GROUP (ORDER BY (t.value->>'duration_ms')::DOUBLE PRECISION),
+    max((t.value->>'duration_ms')::DOUBLE PRECISION)
+  FROM job_queue q
+  CROSS JOIN LATERAL jsonb_each(q.step_timings) AS t
+  WHERE q.status = 'completed'
+    AND q.step_timings IS NOT NULL
+    AND q.completed_at >= p_from
+    AND q.completed_at < p_to
+    AND jsonb_typeof(t.value) = 'object'
+    AND t.value ? 'duration_ms'
+  GROUP BY q.job_type, t.key;
+$$ LANGUAGE sql STABLE SECURITY DEFINER SET search_path = public;
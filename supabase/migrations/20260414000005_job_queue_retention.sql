@@ -0,0 +1,80 @@
+-- Retention for job_queue and job_logs.
+-- Terminal jobs (completed / failed / dead_letter / cancelled) older than the retention
+-- window move to job_queue_archive together with their job_logs rows, keeping the hot
+-- tables sized by recent activity instead of all-time history.
+
+CREATE TABLE job_queue_archive (LIKE job_queue INCLUDING DEFAULTS);
+ALTER TABLE job_queue_archive ADD COLUMN archived_at TIMESTAMPTZ NOT NULL DEFAULT now();
+ALTER TABLE job_queue_archive ADD PRIMARY KEY (id);
+CREATE INDEX idx_job_queue_archive_created ON job_queue_archive (created_at DESC);
+
+CREATE TABLE job_logs_archive (LIKE job_logs INCLUDING DEFAULTS);
+ALTER TABLE job_logs_archive ADD COLUMN archived_at TIMESTAMPTZ NOT NULL DEFAULT now();
+ALTER TABLE job_logs_archive ADD PRIMARY KEY (id);
+CREATE INDEX idx_job_logs_archive_job ON job_logs_archive (job_id, created_at DESC);
+
+-- RLS: deny all direct access (server-side service-role only)
+ALTER TABLE job_queue_archive ENABLE ROW LEVEL SECURITY;
+ALTER TABLE job_logs_archive ENABLE ROW LEVEL SECURITY;
+
+-- Hot-path partial indexes. claim_jobs_batch and get_pending_job_types filter pending rows
+-- by job_type; reclaim_stuck_jobs filters claimed rows by claimed_at. Both stay proportional
+-- to live work no matter how much history the table holds.
+CREATE INDEX idx_job_queue_pending_by_type
+  ON job_queue (job_type, priority DESC, scheduled_at ASC)
+  WHERE status = 'pending';
+
+CREATE INDEX idx_job_queue_claimed
+  ON job_queue (claimed_at)
+  WHERE status = 'claimed';
+
+-- Terminal rows eligible for archival, oldest first
+CREATE INDEX idx_job_queue_terminal_created
+  ON job_queue (created_at)
+  WHERE status IN ('completed', 'failed', 'dead_letter', 'cancelled');
+
+-- Move up to p_batch_size eligible jobs (and their logs) into the archive tables.
+-- Completed/cancelled jobs are kept p_completed_days, failed/dead-letter p_failed_days so the
+-- admin dead-letter view keeps its recent history. Returns the counts moved; callers loop
+-- until jobs_archived < p_batch_size.
+-- The INSERT ... SELECT q.* relies on archive columns matching job_queue + archived_at:
+-- when adding a column to job_queue, add it to job_queue_archive in the same migration.
+CREATE OR REPLACE FUNCTION archive_terminal_jobs(
+  p_completed_days INT DEFAULT 14,
+  p_failed_days INT DEFAULT 30,
+  p_batch_size INT DEFAULT 1000
+)
+RETURNS TABLE (jobs_archived INT, logs_archived INT) AS $$
+  WITH victims AS (
+    SELECT id FROM job_queue
+    WHERE (
+        status IN ('completed', 'cancelled')
+        AND created_at < now() - make_interval(days => p_completed_days)
+      ) OR (
+        status IN ('failed', 'dead_letter')
+        AND created_at < now() - make_interval(days => p_failed_days)
+      )
+    ORDER BY created_at
+    LIMIT p_batch_size
+    FOR UPDATE SKIP LOCKED
+  ),
+  moved_logs AS (
+    INSERT INTO job_logs_archive
+    SELECT l.*, now() FROM job_logs l WHERE l.job_id IN (SELECT id FROM victims)
+    RETURNING 1
+  ),
+  moved_jobs AS (
+    INSERT INTO job_queue_archive
+    SELECT q.*, now() FROM job_queue q WHERE q.id IN (SELECT id FROM victims)
+    RETURNING 1
+  ),
+  -- job_logs rows go with their job via ON DELETE CASCADE
+  deleted AS (
+    DELETE FROM job_queue WHERE id IN (SELECT id FROM victims)
+    RETURNING 1
+  )
+  SELECT
+    (SELECT count(*) FROM moved_jobs)::INT,
+    (SELECT count(*) FROM moved_logs)::INT
+  FROM (SELECT count(*) FROM deleted) AS d;
+$$ LANGUAGE sql VOLATILE SECURITY DEFINER SET search_path = public;
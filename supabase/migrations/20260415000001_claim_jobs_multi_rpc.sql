@@ -0,0 +1,48 @@
+-- Claim jobs for every job type in one round trip.
+-- The poller passes per-type capacity (concurrency limit minus in-flight, skipping types in
+-- backoff). Job types that share a provider quota carry the same group name, and the group
+-- capacity caps how many jobs all of its types may claim together. Types are served in the
+-- order given; the caller rotates that order so no type in a group is starved.
+-- Each per-type claim is the same FOR UPDATE SKIP LOCKED update as claim_jobs_batch.
+CREATE OR REPLACE FUNCTION claim_jobs_multi(
+  p_job_types TEXT[],
+  p_limits INT[],
+  p_groups TEXT[] DEFAULT NULL,
+  p_group_limits JSONB DEFAULT '{}'
+)
+RETURNS SETOF job_queue AS $$
+DECLARE
+  remaining JSONB := COALESCE(p_group_limits, '{}');
+  grp TEXT;
+  lim INT;
+  claimed INT;
+BEGIN
+  FOR i IN 1 .. COALESCE(array_length(p_job_types, 1), 0) LOOP
+    lim := p_limits[i];
+    grp := p_groups[i];
+    IF grp IS NOT NULL AND remaining ? grp THEN
+      lim := LEAST(lim, (remaining->>grp)::INT);
+    END IF;
+    CONTINUE WHEN lim IS NULL OR lim <= 0;
+
+    RETURN QUERY
+      UPDATE job_queue
+      SET status = 'claimed', claimed_at = now(), attempts = attempts + 1
+      WHERE id IN (
+        SELECT q.id FROM job_queue q
+        WHERE q.status = 'pending'
+          AND q.scheduled_at <= now()
+          AND q.job_type = p_job_types[i]
+        ORDER BY q.priority DESC, q.scheduled_at ASC
+        FOR UPDATE SKIP LOCKED
+        LIMIT lim
+      )
+      RETURNING *;
+
+    GET DIAGNOSTICS claimed = ROW_COUNT;
+    IF grp IS NOT NULL AND remaining ? grp THEN
+      remaining := jsonb_set(remaining, ARRAY[grp], to_jsonb((remaining->>grp)::INT - claimed));
+    END IF;
+  END LOOP;
+END;
+$$ LANGUAGE plpgsql VOLATILE SECURITY DEFINER SET search_path = public;
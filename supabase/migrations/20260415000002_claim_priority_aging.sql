@@ -0,0 +1,137 @@
+-- Priority aging and a reserved share for user submissions in job claiming.
+-- Static priorities let a large nightly backlog (e.g. summarize_reviews at priority 5 for
+-- every shop) sit ahead of user-facing work indefinitely. Claims now order by an effective
+-- priority that grows by one point per p_aging_seconds spent runnable (capped at
+-- p_aging_max), and within each claim a share of the limit is offered first to jobs whose
+-- payload carries submission_id, so submission chains keep moving during bulk runs.
+
+-- Effective priority used by the claim order. STABLE because it reads now().
+CREATE OR REPLACE FUNCTION job_effective_priority(
+  p_priority INT,
+  p_scheduled_at TIMESTAMPTZ,
+  p_aging_seconds INT,
+  p_aging_max INT
+)
+RETURNS INT AS $$
+  SELECT p_priority + CASE
+    WHEN p_aging_seconds > 0 THEN
+      LEAST(p_aging_max, FLOOR(GREATEST(EXTRACT(EPOCH FROM now() - p_scheduled_at), 0) / p_aging_seconds))::INT
+    ELSE 0
+  END;
+$$ LANGUAGE sql STABLE;
+
+-- Pending submission-chain jobs, read by the reserved-share pass below
+CREATE INDEX idx_job_queue_pending_submissions
+  ON job_queue (job_type, scheduled_at)
+  WHERE status = 'pending' AND payload ? 'submission_id';
+
+-- Claim up to p_limit jobs of one type. The first CEIL(p_limit * p_submission_share) slots go
+-- to submission-chain jobs; whatever they leave unused, plus the rest, go to any job.
+-- Both passes use FOR UPDATE SKIP LOCKED, so concurrent callers claim disjoint rows.
+CREATE OR REPLACE FUNCTION claim_jobs_fair(
+  p_job_type TEXT,
+  p_limit INT,
+  p_aging_seconds INT DEFAULT 300,
+  p_aging_max INT DEFAULT 5,
+  p_submission_share REAL DEFAULT 0.5
+)
+RETURNS SETOF job_queue AS $$
+DECLARE
+  reserved INT := CEIL(p_limit * LEAST(GREATEST(p_submission_share, 0), 1))::INT;
+  claimed INT := 0;
+BEGIN
+  IF p_limit IS NULL OR p_limit <= 0 THEN
+    RETURN;
+  END IF;
+
+  IF reserved > 0 THEN
+    RETURN QUERY
+      UPDATE job_queue
+      SET status = 'claimed', claimed_at = now(), attempts = attempts + 1
+      WHERE id IN (
+        SELECT q.id FROM job_queue q
+        WHERE q.status = 'pending'
+          AND q.scheduled_at <= now()
+          AND q.job_type = p_job_type
+          AND q.payload ? 'submission_id'
+        ORDER BY job_effective_priority(q.priority, q.scheduled_at, p_aging_seconds, p_aging_max) DESC,
+          q.scheduled_at ASC
+        FOR UPDATE SKIP LOCKED
+        LIMIT reserved
+      )
+      RETURNING *;
+    GET DIAGNOSTICS claimed = ROW_COUNT;
+  END IF;
+
+  IF claimed < p_limit THEN
+    RETURN QUERY
+      UPDATE job_queue
+      SET status = 'claimed', claimed_at = now(), attempts = attempts + 1
+      WHERE id IN (
+        SELECT q.id FROM job_queue q
+        WHERE q.status = 'pending'
+          AND q.scheduled_at <= now()
+          AND q.job_type = p_job_type
+        ORDER BY job_effective_priority(q.priority, q.scheduled_at, p_aging_seconds, p_aging_max) DESC,
+          q.scheduled_at ASC
+        FOR UPDATE SKIP LOCKED
+        LIMIT p_limit - claimed
+      )
+      RETURNING *;
+  END IF;
+END;
+$$ LANGUAGE plpgsql VOLATILE SECURITY DEFINER SET search_path = public;
+
+-- claim_jobs_batch and claim_jobs_multi gain the fairness parameters. Drop the old
+-- signatures first so PostgREST does not see two overloads.
+DROP FUNCTION IF EXISTS claim_jobs_batch(TEXT, INT);
+CREATE OR REPLACE FUNCTION claim_jobs_batch(
+  p_job_type TEXT,
+  p_limit INT DEFAULT 1,
+  p_aging_seconds INT DEFAULT 300,
+  p_aging_max INT DEFAULT 5,
+  p_submission_share REAL DEFAULT 0.5
+)
+RETURNS SETOF job_queue AS $$
+  SELECT * FROM claim_jobs_fair(
+    p_job_type, p_limit, p_aging_seconds, p_aging_max, p_submission_share
+  );
+$$ LANGUAGE sql VOLATILE SECURITY DEFINER SET search_path = public;
+
+DROP FUNCTION IF EXISTS claim_jobs_multi(TEXT[], INT[], TEXT[], JSONB);
+CREATE OR REPLACE FUNCTION claim_jobs_multi(
+  p_job_types TEXT[],
+  p_limits INT[],
+  p_groups TEXT[] DEFAULT NULL,
+  p_group_limits JSONB DEFAULT '{}',
+  p_aging_seconds INT DEFAULT 300,
+  p_aging_max INT DEFAULT 5,
+  p_submission_share REAL DEFAULT 0.5
+)
+RETURNS SETOF job_queue AS $$
+DECLARE
+  remaining JSONB := COALESCE(p_group_limits, '{}');
+  grp TEXT;
+  lim INT;
+  claimed INT;
+BEGIN
+  FOR i IN 1 .. COALESCE(array_length(p_job_types, 1), 0) LOOP
+    lim := p_limits[i];
+    grp := p_groups[i];
+    IF grp IS NOT NULL AND remaining ? grp THEN
+      lim := LEAST(lim, (remaining->>grp)::INT);
+    END IF;
+    CONTINUE WHEN lim IS NULL OR lim <= 0;
+
+    RETURN QUERY
+      SELECT * FROM claim_jobs_fair(
+        p_job_types[i], lim, p_aging_seconds, p_aging_max, p_submission_share
+      );
+
+    GET DIAGNOSTICS claimed = ROW_COUNT;
+    IF grp IS NOT NULL AND remaining ? grp THEN
+      remaining := jsonb_set(remaining, ARRAY[grp], to_jsonb((remaining->>grp)::INT - claimed));
+    END IF;
+  END LOOP;
+END;
+$$ LANGUAGE plpgsql VOLATILE SECURITY DEFINER SET search_path = public;
@@ -0,0 +1,4 @@
+-- Prompt-cache hit ratio per LLM call: tokens_cache_read / all prompt tokens
+-- (tokens_input + tokens_cache_write + tokens_cache_read). Written by log_api_usage;
+-- NULL for calls without token counts (apify, embeddings without usage).
+ALTER TABLE api_usage_log ADD COLUMN cache_hit_ratio NUMERIC(5, 4);
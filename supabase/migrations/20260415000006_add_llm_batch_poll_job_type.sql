@@ -0,0 +1,13 @@
+-- LLM_BATCH_POLL collects a provider batch (Anthropic Message Batches / OpenAI Batch API)
+-- submitted for bulk summarize_reviews or enrich_shop runs, re-enqueueing itself until the
+-- batch ends.
+ALTER TABLE job_queue DROP CONSTRAINT IF EXISTS job_queue_job_type_check;
+ALTER TABLE job_queue ADD CONSTRAINT job_queue_job_type_check
+  CHECK (job_type IN (
+    'enrich_shop', 'enrich_menu_photo', 'generate_embedding',
+    'staleness_sweep', 'weekly_email',
+    'scrape_shop', 'scrape_batch', 'publish_shop', 'admin_digest_email',
+    'reembed_reviewed_shops', 'classify_shop_photos',
+    'summarize_reviews', 'SYNC_MENU_HIGHLIGHTS', 'shop_data_report',
+    'shop_pipeline', 'llm_batch_poll'
+  ));
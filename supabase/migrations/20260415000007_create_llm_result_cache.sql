@@ -0,0 +1,31 @@
+-- Content-addressed LLM result cache. cache_key is sha256 over (method, model, prompt version,
+-- canonical inputs), computed by CachedLLMAdapter; retries, admin re-enqueues and re-scrapes
+-- of unchanged shops replay the stored result instead of calling the model again.
+CREATE TABLE llm_result_cache (
+  cache_key   TEXT PRIMARY KEY,
+  method      TEXT NOT NULL,
+  model       TEXT NOT NULL,
+  result      JSONB NOT NULL,
+  created_at  TIMESTAMPTZ NOT NULL DEFAULT now(),
+  expires_at  TIMESTAMPTZ NOT NULL
+);
+
+COMMENT ON TABLE llm_result_cache IS 'LLM results keyed by a hash of method, model, prompt version and inputs.';
+
+-- TTL cleanup index
+CREATE INDEX idx_llm_result_cache_expires ON llm_result_cache(expires_at);
+
+-- RLS: deny all direct access (server-side service-role only)
+ALTER TABLE llm_result_cache ENABLE ROW LEVEL SECURITY;
+
+-- Daily cleanup of expired entries; same pg_cron guard as cleanup-search-cache.
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+    PERFORM cron.schedule(
+      'cleanup-llm-result-cache',
+      '30 3 * * *',
+      $cmd$DELETE FROM llm_result_cache WHERE expires_at < now()$cmd$
+    );
+  END IF;
+END $$;
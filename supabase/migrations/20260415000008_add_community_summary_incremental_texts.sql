@@ -0,0 +1,7 @@
+-- Incremental community summaries: SUMMARIZE_REVIEWS revises the stored summary with only the
+-- texts created since community_summary_updated_at. This counts the texts folded in that way
+-- since the last full rebuild (reset to 0 by a rebuild) so the worker knows when to rebuild.
+ALTER TABLE shops ADD COLUMN community_summary_incremental_texts INT NOT NULL DEFAULT 0;
+
+-- "Texts since the last summary" lookups
+CREATE INDEX IF NOT EXISTS idx_check_ins_shop_created ON check_ins (shop_id, created_at DESC);
@@ -0,0 +1,73 @@
+-- Keep shop_reviews.created_at for reviews that survive a re-scrape.
+-- Incremental community summaries (20260415000008) pick up reviews created after the last
+-- summary. Replacing a shop's reviews used to reset created_at on all of them, so an
+-- unchanged review came back as new and was counted into the summary topics again.
+-- persist_scraped_shops (20260415000004) now carries created_at over by (shop_id, text);
+-- persist_scraped_data does the same for the per-shop path.
+CREATE OR REPLACE FUNCTION persist_scraped_shops(p_shops JSONB)
+RETURNS INT AS $$
+DECLARE
+  updated INT;
+BEGIN
+  UPDATE shops s
+  SET (
+    name, address, latitude, longitude, google_place_id, rating, review_count,
+    opening_hours, phone, website, menu_url, instagram_url, facebook_url, threads_url,
+    price_range, google_maps_features, city, district, processing_status,
+    rejection_reason, scrape_fingerprints, updated_at
+  ) = (
+    SELECT
+      r.name, r.address, r.latitude, r.longitude, r.google_place_id, r.rating, r.review_count,
+      r.opening_hours, r.phone, r.website, r.menu_url, r.instagram_url, r.facebook_url,
+      r.threads_url, r.price_range, r.google_maps_features, r.city, r.district,
+      r.processing_status, r.rejection_reason, r.scrape_fingerprints, r.updated_at
+    FROM jsonb_populate_record(s, e.item->'shop') AS r
+  )
+  FROM jsonb_array_elements(p_shops) AS e(item)
+  WHERE s.id = (e.item->>'shop_id')::UUID;
+  GET DIAGNOSTICS updated = ROW_COUNT;
+
+  -- The INSERT reads the deleted rows from the CTE, not the table, so it still sees them
+  WITH replaced AS (
+    DELETE FROM shop_reviews sr
+    USING jsonb_array_elements(p_shops) AS e(item)
+    WHERE sr.shop_id = (e.item->>'shop_id')::UUID
+      AND jsonb_array_length(COALESCE(e.item->'reviews', '[]')) > 0
+    RETURNING sr.shop_id, sr.text, sr.created_at
+  ),
+  first_seen AS (
+    SELECT shop_id, text, MIN(created_at) AS created_at
+    FROM replaced
+    GROUP BY shop_id, text
+  )
+  INSERT INTO shop_reviews (shop_id, text, stars, published_at, created_at)
+  SELECT
+    (e.item->>'shop_id')::UUID, r.text, r.stars, r.published_at,
+    COALESCE(f.created_at, now())
+  FROM jsonb_array_elements(p_shops) AS e(item)
+  CROSS JOIN LATERAL
+    jsonb_populate_recordset(NULL::shop_reviews, COALESCE(e.item->'reviews', '[]')) AS r
+  LEFT JOIN first_seen f
+    ON f.shop_id = (e.item->>'shop_id')::UUID AND f.text = r.text;
+
+  -- DISTINCT ON: one upsert may not touch the same (shop_id, url) twice
+  INSERT INTO shop_photos (shop_id, url, uploaded_at, sort_order)
+  SELECT DISTINCT ON (shop_id, url) shop_id, url, uploaded_at, sort_order
+  FROM (
+    SELECT (e.item->>'shop_id')::UUID AS shop_id, p.url, p.uploaded_at, p.sort_order
+    FROM jsonb_array_elements(p_shops) AS e(item),
+      jsonb_populate_recordset(NULL::shop_photos, COALESCE(e.item->'photos', '[]')) AS p
+  ) AS photos
+  ORDER BY shop_id, url, sort_order
+  ON CONFLICT (shop_id, url) DO UPDATE
+    SET uploaded_at = EXCLUDED.uploaded_at, sort_order = EXCLUDED.sort_order;
+
+  UPDATE shop_submissions sub
+  SET shop_id = (e.item->>'shop_id')::UUID, status = 'processing', updated_at = now()
+  FROM jsonb_array_elements(p_shops) AS e(item)
+  WHERE e.item->>'submission_id' IS NOT NULL
+    AND sub.id = (e.item->>'submission_id')::UUID;
+
+  RETURN updated;
+END;
+$$ LANGUAGE plpgsql VOLATILE SECURITY DEFINER SET search_path = public;
@@ -0,0 +1,102 @@
+-- Bounded claim candidates and a floor on the submission reserve (claim_jobs_fair,
+-- 20260415000002).
+--
+-- 1. Both passes ordered every runnable row of the type by job_effective_priority(), an
+--    expression no index serves, so each claim tick locked and sorted the whole pending
+--    backlog of the type. That is exactly the large nightly backlog aging is meant for.
+--    Each pass now re-ranks a bounded candidate set instead: the top rows by raw
+--    (priority DESC, scheduled_at ASC), read from idx_job_queue_pending_by_type, plus the
+--    oldest runnable rows, read from idx_job_queue_pending_oldest. Aging only ever lifts
+--    old rows, so those two sets hold the rows that win on effective priority. A mid-
+--    priority, mid-age row can be passed over for a tick until the sets turn over.
+-- 2. The reserve was CEIL(p_limit * share), so at p_limit = 1 (the usual case once a
+--    type's concurrency is nearly used) submissions took absolute precedence. It is now
+--    FLOOR: at p_limit = 1 submission chains compete on effective priority, where their
+--    enqueue priority (5) already puts them ahead of bulk work.
+--
+-- Weighting across job types is applied by the caller: claim_all_job_types orders types by
+-- WORKER_CLAIM_WEIGHTS, and claim_jobs_multi serves them in that order against any shared
+-- provider-group limit.
+
+CREATE INDEX IF NOT EXISTS idx_job_queue_pending_oldest
+  ON job_queue (job_type, scheduled_at)
+  WHERE status = 'pending';
+
+CREATE OR REPLACE FUNCTION claim_jobs_fair(
+  p_job_type TEXT,
+  p_limit INT,
+  p_aging_seconds INT DEFAULT 300,
+  p_aging_max INT DEFAULT 5,
+  p_submission_share REAL DEFAULT 0.5
+)
+RETURNS SETOF job_queue AS $$
+DECLARE
+  reserved INT := FLOOR(p_limit * LEAST(GREATEST(p_submission_share, 0), 1))::INT;
+  -- Rows re-ranked per pass, from each of the two index orders
+  candidates INT := GREATEST(p_limit * 4, 32);
+  claimed INT := 0;
+BEGIN
+  IF p_limit IS NULL OR p_limit <= 0 THEN
+    RETURN;
+  END IF;
+
+  IF reserved > 0 THEN
+    RETURN QUERY
+      UPDATE job_queue
+      SET status = 'claimed', claimed_at = now(), attempts = attempts + 1
+      WHERE id IN (
+        SELECT q.id FROM job_queue q
+        WHERE q.id IN (
+            SELECT c.id FROM job_queue c
+            WHERE c.status = 'pending'
+              AND c.scheduled_at <= now()
+              AND c.job_type = p_job_type
+              AND c.payload ? 'submission_id'
+            ORDER BY c.scheduled_at ASC
+            LIMIT candidates
+          )
+          AND q.status = 'pending'
+        ORDER BY job_effective_priority(q.priority, q.scheduled_at, p_aging_seconds, p_aging_max) DESC,
+          q.scheduled_at ASC
+        FOR UPDATE SKIP LOCKED
+        LIMIT reserved
+      )
+      RETURNING *;
+    GET DIAGNOSTICS claimed = ROW_COUNT;
+  END IF;
+
+  IF claimed < p_limit THEN
+    RETURN QUERY
+      UPDATE job_queue
+      SET status = 'claimed', claimed_at = now(), attempts = attempts + 1
+      WHERE id IN (
+        SELECT q.id FROM job_queue q
+        WHERE q.id IN (
+            (
+              SELECT c.id FROM job_queue c
+              WHERE c.status = 'pending'
+                AND c.scheduled_at <= now()
+                AND c.job_type = p_job_type
+              ORDER BY c.priority DESC, c.scheduled_at ASC
+              LIMIT candidates
+            )
+            UNION
+            (
+              SELECT c.id FROM job_queue c
+              WHERE c.status = 'pending'
+                AND c.scheduled_at <= now()
+                AND c.job_type = p_job_type
+              ORDER BY c.scheduled_at ASC
+              LIMIT candidates
+            )
+          )
+          AND q.status = 'pending'
+        ORDER BY job_effective_priority(q.priority, q.scheduled_at, p_aging_seconds, p_aging_max) DESC,
+          q.scheduled_at ASC
+        FOR UPDATE SKIP LOCKED
+        LIMIT p_limit - claimed
+      )
+      RETURNING *;
+  END IF;
+END;
+$$ LANGUAGE plpgsql VOLATILE SECURITY DEFINER SET search_path = public;
@@ -0,0 +1,30 @@
+-- Per-process job metrics published by every scheduler (API replicas and each worker
+-- process), so /health/queue can aggregate them instead of reporting only the memory
+-- of whichever process serves the request. One row per process, overwritten in place.
+CREATE TABLE worker_metrics (
+  holder_id  TEXT        PRIMARY KEY,
+  snapshot   JSONB       NOT NULL,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Enable RLS but allow service_role full access (admin-only reads via the API)
+ALTER TABLE worker_metrics ENABLE ROW LEVEL SECURITY;
+
+-- Upsert the caller's snapshot and drop rows left behind by processes that stopped
+-- publishing long ago (crashes, scaled-down replicas). The table stays one row per
+-- live process, so the cleanup is a scan of a handful of rows.
+CREATE OR REPLACE FUNCTION publish_worker_metrics(
+  p_holder_id TEXT,
+  p_snapshot JSONB,
+  p_retain_seconds INT DEFAULT 3600
+)
+RETURNS VOID AS $$
+  INSERT INTO worker_metrics (holder_id, snapshot, updated_at)
+  VALUES (p_holder_id, p_snapshot, now())
+  ON CONFLICT (holder_id) DO UPDATE
+    SET snapshot   = EXCLUDED.snapshot,
+        updated_at = EXCLUDED.updated_at;
+
+  DELETE FROM worker_metrics
+  WHERE updated_at < now() - make_interval(secs => p_retain_seconds);
+$$ LANGUAGE sql VOLATILE SECURITY DEFINER SET search_path = public;